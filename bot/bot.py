@@ -4,6 +4,9 @@ from discord.ext import commands
 import dotenv
 from pathlib import Path # type: ignore (pylance shadow stdlib issues)
 
+from bot.global_game_info import current_games, loop_monitor, hand_images
+from bot.health_server import HealthServer
+
 config = dotenv.dotenv_values(Path('storage/.env'))
 
 bot = commands.Bot()
@@ -13,12 +16,25 @@ bot.load_extension("bot.game_cog")
 if str(config["DEV_MODE"]).lower() == "true":
     bot.debug_guilds = [764385563289452545]
 
+# Set METRICS_PORT to serve metrics and a readiness check on localhost (see health_server.py)
+health_server: HealthServer | None = None
+if config.get("METRICS_PORT"):
+    health_server = HealthServer(current_games, bot.is_ready, port=int(str(config["METRICS_PORT"])), lag_monitor=loop_monitor)
+
+# Set CARD_ATLAS to the path of a card atlas to show hands as images (see hand_image.py)
+if config.get("CARD_ATLAS"):
+    hand_images.load_atlas(Path(str(config["CARD_ATLAS"])))
+
 @bot.event
 async def on_ready():
     if bot.user is None:
         return
 
     print(f"Logged in as {bot.user} (ID: {bot.user.id})")
+    loop_monitor.start()
+    # on_ready runs again after reconnecting, but the server only needs starting once
+    if health_server is not None and not health_server.running:
+        await health_server.start()
     async for guild in bot.fetch_guilds():
         print(guild.name)
 
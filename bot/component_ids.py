@@ -0,0 +1,90 @@
+from dataclasses import dataclass # type: ignore (pylance shadow stdlib issues)
+import zlib # type: ignore (pylance shadow stdlib issues)
+
+from unogame.card import Card
+
+# Every custom id made here starts with this, so other components' ids are left alone
+CUSTOM_ID_PREFIX = "uno"
+
+# Discord doesn't allow custom ids longer than this
+MAX_CUSTOM_ID_LENGTH = 100
+
+PLAY_CARD_ACTION = "play"
+DRAW_ACTION = "draw"
+CHOOSE_COLOR_ACTION = "color"
+PAGE_ACTION = "page"
+
+@dataclass(frozen=True)
+class ComponentRoute:
+    """
+    Everything needed to handle a click on a game component, kept in the component's custom id instead of in a View,
+    so any click can be handled by one dispatcher (see game_support.dispatch_component), even after a restart.
+    Numbers are written in base 36 to fit in Discord's 100 characters
+
+    Attributes:
+        action (str): What the component does, one of the *_ACTION constants
+        game_id (int): The seed of the game the component is for, so components from an older game in the same channel are turned away
+        player_id (int): The player the component was sent to
+        version (int): The player's hand version when the component was sent (see get_hand_version)
+        argument (str): Anything else the action needs, like a color or a page
+    """
+    action: str
+    game_id: int
+    player_id: int
+    version: int
+    argument: str = ""
+
+    def to_custom_id(self) -> str:
+        """
+        Raises:
+            ValueError: If the custom id would be too long for Discord
+
+        Returns:
+            str: The custom id
+        """
+        custom_id = ":".join([CUSTOM_ID_PREFIX, self.action, to_base_36(self.game_id), to_base_36(self.player_id), to_base_36(self.version), self.argument])
+        if len(custom_id) > MAX_CUSTOM_ID_LENGTH:
+            raise ValueError(f"Custom id {custom_id} is longer than {MAX_CUSTOM_ID_LENGTH} characters")
+        return custom_id
+
+    @classmethod
+    def from_custom_id(cls, custom_id: str | None) -> "ComponentRoute | None":
+        """
+        Returns:
+            ComponentRoute | None: The route, or None if the custom id wasn't made by to_custom_id
+        """
+        if custom_id is None:
+            return None
+        parts = custom_id.split(":", 5)
+        if len(parts) != 6 or parts[0] != CUSTOM_ID_PREFIX:
+            return None
+        try:
+            return cls(parts[1], int(parts[2], 36), int(parts[3], 36), int(parts[4], 36), parts[5])
+        except ValueError:
+            return None
+
+
+def to_base_36(number: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    if number == 0:
+        return "0"
+    sign = "-" if number < 0 else ""
+    number = abs(number)
+    result = ""
+    while number > 0:
+        number, digit = divmod(number, 36)
+        result = digits[digit] + result
+    return sign + result
+
+def get_hand_version(hand: list[Card]) -> int:
+    """
+    Returns a number that changes whenever the hand does, so a click on a component showing an older hand can be turned away
+    without touching the game. Unlike hash(), it's the same in every process
+
+    Args:
+        hand (list[Card]): The hand
+
+    Returns:
+        int: The version
+    """
+    return zlib.crc32("|".join([str(card) for card in hand]).encode())
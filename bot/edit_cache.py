@@ -0,0 +1,81 @@
+from typing import Any
+from collections import OrderedDict # type: ignore (pylance shadow stdlib issues)
+import json # type: ignore (pylance shadow stdlib issues)
+
+# How many messages to remember, the least recently edited ones are forgotten first
+DEFAULT_MAX_MESSAGES = 4096
+
+def hash_message(content: str | None = None, embed: dict | None = None, components: list | None = None) -> int:
+    """
+    Hashes what a message would show. Component custom ids aren't part of it, since they're made up fresh for every view
+    and don't change what the player sees
+
+    Args:
+        content (str | None): The message text
+        embed (dict | None): The embed, from Embed.to_dict()
+        components (list | None): The components, from View.to_components()
+
+    Returns:
+        int: The hash
+    """
+    return hash(json.dumps([content, embed, strip_custom_ids(components)], sort_keys=True, default=str))
+
+def strip_custom_ids(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: strip_custom_ids(item) for key, item in value.items() if key != "custom_id"}
+    if isinstance(value, list):
+        return [strip_custom_ids(item) for item in value]
+    return value
+
+
+class EditCache:
+
+    def __init__(self, max_messages: int = DEFAULT_MAX_MESSAGES) -> None:
+        """
+        Remembers the hash of what was last sent to each message, so edits that wouldn't change anything can be skipped
+
+        Args:
+            max_messages (int): How many messages to remember
+        """
+        self.max_messages = max_messages
+        self._hashes: OrderedDict[int, int] = OrderedDict()
+        self.skipped_count = 0
+        self.sent_count = 0
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def is_unchanged(self, message_id: int, content_hash: int) -> bool:
+        """
+        Returns whether the message already shows this, counting it as a skipped edit if it does
+
+        Args:
+            message_id (int): The message
+            content_hash (int): The hash of the edit, from hash_message
+
+        Returns:
+            bool: True if the edit can be skipped
+        """
+        if self._hashes.get(message_id) != content_hash:
+            return False
+        self._hashes.move_to_end(message_id)
+        self.skipped_count += 1
+        return True
+
+    def remember(self, message_id: int, content_hash: int) -> None:
+        """
+        Remembers what a message shows, once it's been sent. Only call this after the edit went through,
+        so a failed edit is tried again next time
+
+        Args:
+            message_id (int): The message
+            content_hash (int): The hash of what was sent, from hash_message
+        """
+        self.sent_count += 1
+        self._hashes[message_id] = content_hash
+        self._hashes.move_to_end(message_id)
+        if len(self._hashes) > self.max_messages:
+            self._hashes.popitem(last=False)
+
+    def forget(self, message_id: int) -> None:
+        self._hashes.pop(message_id, None)
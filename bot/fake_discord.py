@@ -0,0 +1,317 @@
+from typing import Any
+from collections import Counter # type: ignore (pylance shadow stdlib issues)
+import asyncio # type: ignore (pylance shadow stdlib issues)
+import itertools # type: ignore (pylance shadow stdlib issues)
+import random # type: ignore (pylance shadow stdlib issues)
+import time # type: ignore (pylance shadow stdlib issues)
+
+# A local stand-in for the parts of the Discord interaction API that game_support.py uses, for load tests (see load_test.py).
+# Nothing here talks to Discord: every call just waits a while, as if it had, and keeps the messages it was sent
+
+# Discord shows "This interaction failed" if there's no first response within this many seconds
+INTERACTION_RESPONSE_TIMEOUT = 3.0
+
+# For edits, to tell leaving something as it is apart from removing it
+_MISSING: Any = object()
+
+class NotFound(Exception): pass
+class InteractionResponded(Exception): pass
+
+class FakeDiscordAPI:
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.02, rate_limit: float | None = 50.0, burst: int = 50,
+            rng: random.Random | None = None) -> None:
+        """
+        Everything the fake objects need to share: simulated latency, a global rate limit, and counts of what happened
+
+        Args:
+            latency (float): How long each API call takes, in seconds
+            jitter (float): Up to this much extra time is added to each call, at random
+            rate_limit (float | None): How many calls per second are allowed before calls have to wait, or None for no limit
+            burst (int): How many calls can go through at once before the rate limit kicks in
+            rng (random.Random | None): For the jitter. Defaults to a new one
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.rng = rng if rng is not None else random.Random()
+
+        self.calls: Counter[str] = Counter()
+        self.rate_limit_waits = 0
+        self.rate_limit_wait_seconds = 0.0
+        self.late_responses = 0
+
+        self._ids = itertools.count(1)
+        self._tokens = float(burst)
+        self._last_refill = time.perf_counter()
+        self._delete_tasks: set[asyncio.Task] = set()
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    async def call(self, route: str) -> None:
+        """
+        Waits as long as a call to Discord would, including any time spent waiting on the rate limit
+
+        Args:
+            route (str): What's being called, for counting
+        """
+        self.calls[route] += 1
+        if self.rate_limit is not None:
+            now = time.perf_counter()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._last_refill) * self.rate_limit)
+            self._last_refill = now
+            # Take the token now, even if it has to be waited for, so calls go through in order
+            self._tokens -= 1
+            if self._tokens < 0:
+                wait = -self._tokens / self.rate_limit
+                self.rate_limit_waits += 1
+                self.rate_limit_wait_seconds += wait
+                await asyncio.sleep(wait)
+        await asyncio.sleep(self.latency + self.rng.random() * self.jitter)
+
+    def delete_later(self, message: "FakeMessage", delay: float | None) -> None:
+        if delay is None:
+            return
+        async def delete():
+            await asyncio.sleep(delay)
+            try:
+                await message.delete()
+            except NotFound:
+                pass
+        task = asyncio.get_running_loop().create_task(delete())
+        self._delete_tasks.add(task)
+        task.add_done_callback(self._delete_tasks.discard)
+
+    def cancel_pending_deletes(self) -> None:
+        for task in self._delete_tasks:
+            task.cancel()
+        self._delete_tasks = set()
+
+
+class FakeUser:
+
+    def __init__(self, user_id: int) -> None:
+        self.id = user_id
+        self.name = f"User {user_id}"
+
+
+class FakeMessage:
+
+    def __init__(self, api: FakeDiscordAPI, channel: "FakeChannel", content: str | None = None, embed: Any = None, view: Any = None,
+            ephemeral: bool = False) -> None:
+        self.api = api
+        self.channel = channel
+        self.id = api.next_id()
+        self.content = content
+        self.embed = embed
+        self.view = view
+        self.ephemeral = ephemeral
+        self.deleted = False
+        if view is not None:
+            view.message = self
+
+    async def edit(self, content: str | None = _MISSING, embed: Any = _MISSING, view: Any = _MISSING, **kwargs) -> "FakeMessage":
+        await self.api.call("edit_message")
+        if self.deleted:
+            raise NotFound("Unknown Message")
+        self.update(content, embed, view)
+        return self
+
+    def update(self, content: str | None = _MISSING, embed: Any = _MISSING, view: Any = _MISSING) -> None:
+        if content is not _MISSING:
+            self.content = content
+        if embed is not _MISSING:
+            self.embed = embed
+        if view is not _MISSING:
+            self.view = view
+            if view is not None:
+                view.message = self
+
+    async def delete(self, delay: float | None = None) -> None:
+        if delay is not None:
+            self.api.delete_later(self, delay)
+            return
+        await self.api.call("delete_message")
+        if self.deleted:
+            raise NotFound("Unknown Message")
+        self.deleted = True
+        self.channel.messages.pop(self.id, None)
+
+
+class FakeChannel:
+
+    def __init__(self, api: FakeDiscordAPI, channel_id: int | None = None) -> None:
+        self.api = api
+        self.id = channel_id if channel_id is not None else api.next_id()
+        # Messages everyone can see, by id
+        self.messages: dict[int, FakeMessage] = {}
+
+    async def send(self, content: str | None = None, embed: Any = None, view: Any = None, delete_after: float | None = None, **kwargs) -> FakeMessage:
+        await self.api.call("send_message")
+        message = FakeMessage(self.api, self, content, embed, view)
+        self.messages[message.id] = message
+        self.api.delete_later(message, delete_after)
+        return message
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        await self.api.call("fetch_message")
+        if message_id not in self.messages:
+            raise NotFound("Unknown Message")
+        return self.messages[message_id]
+
+
+class FakeInteractionResponse:
+
+    def __init__(self, interaction: "FakeInteraction") -> None:
+        self._interaction = interaction
+        self._responded = False
+
+    def is_done(self) -> bool:
+        return self._responded
+
+    async def send_message(self, content: str | None = None, embed: Any = None, view: Any = None, ephemeral: bool = False,
+            delete_after: float | None = None, **kwargs) -> "FakeInteraction":
+        self._start_response()
+        await self._interaction.api.call("interaction_response")
+        message = self._interaction.add_message(content, embed, view, ephemeral)
+        self._interaction.original_message = message
+        self._interaction.api.delete_later(message, delete_after)
+        return self._interaction
+
+    async def defer(self, ephemeral: bool = False, **kwargs) -> None:
+        self._start_response()
+        await self._interaction.api.call("interaction_response")
+
+    async def edit_message(self, content: str | None = _MISSING, embed: Any = _MISSING, view: Any = _MISSING, **kwargs) -> None:
+        # Answers a component interaction by editing the message the component is on
+        self._start_response()
+        await self._interaction.api.call("interaction_response")
+        if self._interaction.message is None:
+            raise NotFound("Unknown Message")
+        self._interaction.message.update(content, embed, view)
+
+    def _start_response(self) -> None:
+        if self._responded:
+            raise InteractionResponded("This interaction has already been responded to before")
+        self._responded = True
+        if time.perf_counter() - self._interaction.created_at > INTERACTION_RESPONSE_TIMEOUT:
+            self._interaction.api.late_responses += 1
+
+
+class FakeFollowup:
+
+    def __init__(self, interaction: "FakeInteraction") -> None:
+        self._interaction = interaction
+
+    async def send(self, content: str | None = None, embed: Any = None, view: Any = None, ephemeral: bool = False,
+            delete_after: float | None = None, **kwargs) -> FakeMessage:
+        await self._interaction.api.call("followup")
+        message = self._interaction.add_message(content, embed, view, ephemeral)
+        self._interaction.api.delete_later(message, delete_after)
+        return message
+
+
+class FakeInteraction:
+
+    def __init__(self, api: FakeDiscordAPI, channel: FakeChannel, user: FakeUser, message: FakeMessage | None = None,
+            data: dict[str, Any] | None = None) -> None:
+        """
+        A slash command or component interaction. Ephemeral messages sent for it are only kept in `messages`,
+        since only the user who started it can see them
+
+        Args:
+            api (FakeDiscordAPI): The fake API
+            channel (FakeChannel): Where the interaction happened
+            user (FakeUser): Who started it
+            message (FakeMessage | None): The message whose component was used, for component interactions
+            data (dict[str, Any] | None): The interaction's data, like the custom_id and values of the component that was used
+        """
+        self.api = api
+        self.id = api.next_id()
+        self.channel = channel
+        self.channel_id = channel.id
+        self.user = user
+        self.message = message
+        self.data = data if data is not None else {}
+        self.custom_id: str | None = self.data.get("custom_id")
+        self.created_at = time.perf_counter()
+
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(self)
+        self.original_message: FakeMessage | None = None
+        # Every message sent in response, in order
+        self.messages: list[FakeMessage] = []
+
+    async def original_response(self) -> FakeMessage:
+        await self.api.call("original_response")
+        if self.original_message is None:
+            raise NotFound("Unknown Webhook")
+        return self.original_message
+
+    async def edit_original_response(self, content: str | None = _MISSING, embed: Any = _MISSING, view: Any = _MISSING, **kwargs) -> FakeMessage:
+        return await self._get_original_message().edit(content=content, embed=embed, view=view)
+
+    async def delete_original_response(self) -> None:
+        await self._get_original_message().delete()
+
+    def _get_original_message(self) -> FakeMessage:
+        # Like Discord, a component interaction that was deferred instead of answered edits the message the component is on
+        if self.original_message is not None:
+            return self.original_message
+        if self.message is not None:
+            return self.message
+        raise NotFound("Unknown Webhook")
+
+    def add_message(self, content: str | None, embed: Any, view: Any, ephemeral: bool) -> FakeMessage:
+        message = FakeMessage(self.api, self.channel, content, embed, view, ephemeral)
+        self.messages.append(message)
+        if not ephemeral:
+            self.channel.messages[message.id] = message
+        return message
+
+
+class FakeBot:
+
+    def get_application_command(self, name: str) -> None:
+        return None
+
+
+class FakeApplicationContext:
+
+    def __init__(self, api: FakeDiscordAPI, channel: FakeChannel, user: FakeUser, bot: FakeBot | None = None) -> None:
+        """
+        A slash command's context, wrapping its interaction
+        """
+        self.interaction = FakeInteraction(api, channel, user)
+        self.bot = bot if bot is not None else FakeBot()
+
+    @property
+    def channel(self) -> FakeChannel:
+        return self.interaction.channel
+
+    @property
+    def channel_id(self) -> int:
+        return self.interaction.channel_id
+
+    @property
+    def author(self) -> FakeUser:
+        return self.interaction.user
+
+    @property
+    def response(self) -> FakeInteractionResponse:
+        return self.interaction.response
+
+    @property
+    def followup(self) -> FakeFollowup:
+        return self.interaction.followup
+
+    async def respond(self, *args, **kwargs) -> FakeInteraction | FakeMessage:
+        # Like py-cord, responds to the interaction the first time, then sends followups
+        if not self.interaction.response.is_done():
+            return await self.interaction.response.send_message(*args, **kwargs)
+        return await self.interaction.followup.send(*args, **kwargs)
+
+    async def defer(self, ephemeral: bool = False, **kwargs) -> None:
+        await self.interaction.response.defer(ephemeral=ephemeral)
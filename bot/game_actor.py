@@ -0,0 +1,100 @@
+from typing import Callable, TypeVar
+import asyncio # type: ignore (pylance shadow stdlib issues)
+import contextvars # type: ignore (pylance shadow stdlib issues)
+
+from unogame.game import UnoGame
+
+# How many commands can wait for one game before new ones are turned away
+DEFAULT_MAX_QUEUE_DEPTH = 16
+
+T = TypeVar("T")
+
+class GameBusyError(Exception): pass
+
+class GameActor:
+
+    def __init__(self, game: UnoGame, max_queue_depth: int = DEFAULT_MAX_QUEUE_DEPTH) -> None:
+        """
+        Runs every change to one game through a single task, one command at a time, in the order they were submitted.
+        Commands are plain functions, so each one (a move, plus rendering what the move changed) happens all at once,
+        and the Discord calls that follow can't see a game that's halfway through someone else's move.
+        Different games each have their own actor, so they never wait on each other
+
+        Args:
+            game (UnoGame): The game
+            max_queue_depth (int): How many commands can be waiting at once before submit raises GameBusyError
+        """
+        self.game = game
+        self.max_queue_depth = max_queue_depth
+
+        self._queue: asyncio.Queue[tuple[Callable[[UnoGame], object], asyncio.Future]] = asyncio.Queue(max_queue_depth)
+        self._task: asyncio.Task | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def submit(self, command: Callable[[UnoGame], T]) -> T:
+        """
+        Queues a command and waits for it to run
+
+        Args:
+            command (Callable[[UnoGame], T]): Called with the game. It shouldn't await anything
+
+        Raises:
+            GameBusyError: If too many commands are already waiting
+            Exception: Whatever the command raised
+
+        Returns:
+            T: What the command returned
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((command, future))
+        except asyncio.QueueFull:
+            raise GameBusyError("Too many moves are waiting for this game")
+
+        if self._task is None or self._task.done():
+            # A fresh context, so the actor doesn't carry around whichever interaction happened to start it
+            self._task = asyncio.get_running_loop().create_task(self._run(), context=contextvars.Context())
+        return await future
+
+    def is_superseded(self, state_hash: int) -> bool:
+        """
+        Checks whether something rendered by a command is out of date, because a later command has changed the game since.
+        Commands that fail or don't change anything leave the game's state hash alone, so they don't count
+
+        Args:
+            state_hash (int): `UnoGame.get_state_hash` from when it was rendered
+
+        Returns:
+            bool: True if the game has changed since
+        """
+        return self.game.get_state_hash() != state_hash
+
+    def stop(self) -> None:
+        """
+        Stops running commands. Anything still waiting is cancelled
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+
+    async def _run(self) -> None:
+        # Stops once the queue is empty, and submit starts it again, so idle games don't keep a task around
+        while not self._queue.empty():
+            command, future = self._queue.get_nowait()
+            # Whoever submitted it stopped waiting, so nobody needs it to happen
+            if future.cancelled():
+                continue
+            try:
+                result = command(self.game)
+            except Exception as error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+            # Let everything else (like the callers rendering) run between commands
+            await asyncio.sleep(0)
@@ -33,6 +33,21 @@ class GameCog(commands.Cog):
     @commands.slash_command(name="hand", description="Privately look at your hand")
     async def show_hand(self, ctx: discord.ApplicationContext):
         await game_support.run_hand_command(ctx.interaction)
+
+    @commands.slash_command(name="add_bots", description="Fill empty seats with computer players")
+    async def add_bots(self, ctx: discord.ApplicationContext,
+            seats: discord.Option(int, "How many players the game should have", min_value=2, max_value=10, default=4)):  # type: ignore - py-cord option annotation
+        await game_support.run_add_bots_command(ctx, seats)
+
+    @commands.slash_command(name="hint", description="Privately get a suggestion for your next move")
+    async def hint(self, ctx: discord.ApplicationContext):
+        await game_support.run_hint_command(ctx)
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        # Game components aren't kept as views, they're routed by custom id (see component_ids.py)
+        if interaction.type == discord.InteractionType.component:
+            await game_support.dispatch_component(interaction)
             
 
 
@@ -1,36 +1,153 @@
-from typing import Callable, Coroutine
+from typing import Callable, Coroutine, Hashable
+import asyncio # type: ignore (pylance shadow stdlib issues)
+import contextvars # type: ignore (pylance shadow stdlib issues)
+import io # type: ignore (pylance shadow stdlib issues)
+import logging # type: ignore (pylance shadow stdlib issues)
 import discord
 from discord.interactions import Interaction
 from bot.global_variables import *
-from bot.global_game_info import current_games
+from bot.global_game_info import current_games, game_actors, bot_players, running_bot_turns, bot_turn_tasks, ai_pool, hint_cache, render_scheduler, edit_cache, hand_page_cache, player_lists, hand_images
+from bot.edit_cache import hash_message
+from bot.component_ids import ComponentRoute, PLAY_CARD_ACTION, DRAW_ACTION, CHOOSE_COLOR_ACTION, PAGE_ACTION, get_hand_version
+from bot.hand_pages import HandPage
+from bot.player_list import PlayerListRenderer
+from bot.game_actor import GameActor, GameBusyError
+from bot.interaction_metrics import timed_interaction, engine_time, render_time, discord_time
 from unogame.card import Card, CardColors
 from unogame.deck import OutOfCardsError
-from unogame.game import MustPlayCardError, OutOfTurnError, UnoGame, UnoStates
+from unogame.determinize import HiddenHandSampler
+from unogame.game import MustPlayCardError, OutOfTurnError, UnoGame, UnoRules, UnoStates, MOVE_ERRORS
+from unogame.ismcts import SearchSettings, choose_move
+from unogame.move import UnoMove, MoveTypes
+from unogame.solver import Hint
+from unogame.worker_pool import PoolBusyError
 from unogame.player import Player
 
+logger = logging.getLogger(__name__)
+
+#region actors
+
+BUSY_MESSAGE = "This game is busy right now, try again in a moment!"
+
+def get_game_actor(channel_id: int) -> GameActor:
+    """
+    Returns the actor that every change to the channel's game goes through, making a new one if the game is new
+    """
+    game = current_games[channel_id]
+    actor = game_actors.get(channel_id)
+    if actor is None or actor.game is not game:
+        if actor is not None:
+            actor.stop()
+        actor = GameActor(game)
+        game_actors[channel_id] = actor
+    return actor
+
+def move_command(ctx: discord.ApplicationContext | discord.Interaction, move: Callable[[UnoGame], object],
+        expected_state_hash: int | None = None) -> Callable[[UnoGame], tuple[discord.Embed, int] | None]:
+    """
+    Makes a command for a game's actor that makes a move, then renders the lobby right away so it shows the game just after this move
+
+    Args:
+        ctx (discord.ApplicationContext | discord.Interaction): The interaction the move is for
+        move (Callable[[UnoGame], object]): Makes the move
+        expected_state_hash (int | None): If given, the move is only made if the game is still in this state
+
+    Returns:
+        Callable[[UnoGame], tuple[discord.Embed, int] | None]: The command, which returns the lobby embed and the state hash
+        of the game it shows, or None if the game wasn't in the expected state
+    """
+    def command(game: UnoGame) -> tuple[discord.Embed, int] | None:
+        if expected_state_hash is not None and game.get_state_hash() != expected_state_hash:
+            return None
+        move(game)
+        return game_status_embed(ctx), game.get_state_hash()
+    return command
+
+async def run_move_interaction(interaction: discord.Interaction, move: Callable[[UnoGame], object], success_message: str,
+        error_messages: dict[type[Exception], str], hand_key: Hashable | None = None,
+        refresh_hand: Callable[[discord.Interaction], Coroutine] | None = None, after_move: Callable[[], Coroutine] | None = None):
+    """
+    What every move made from a component goes through. The interaction is acknowledged straight away, so the player only waits for
+    one round trip however busy things are. Then the move is made in the game's actor, and every message it changes is updated in the
+    background (see RenderScheduler), where a newer update for the same message replaces one that hasn't been sent yet
+
+    Args:
+        interaction (discord.Interaction): The component interaction
+        move (Callable[[UnoGame], object]): Makes the move
+        success_message (str): What to tell the player if the move worked
+        error_messages (dict[type[Exception], str]): What to tell the player for each error the move can raise. Anything else is raised
+        hand_key (Hashable | None): Identifies the hand message refresh_hand updates
+        refresh_hand (Callable[[discord.Interaction], Coroutine] | None): Updates the player's hand message, after the move or an error
+        after_move (Callable[[], Coroutine] | None): Anything else to do in the background after the move worked
+    """
+    with discord_time():
+        await interaction.response.defer()
+
+    channel_id: int = interaction.channel_id  # type: ignore - channel_id is only None outside of guilds
+    try:
+        with engine_time():
+            rendered_lobby = await get_game_actor(channel_id).submit(move_command(interaction, move))
+    except GameBusyError:
+        schedule_notice(interaction, BUSY_MESSAGE)
+        return
+    except Exception as error:
+        for error_type, message in error_messages.items():
+            if isinstance(error, error_type):
+                if refresh_hand is not None:
+                    render_scheduler.schedule(("hand", hand_key), lambda: refresh_hand(interaction))
+                schedule_notice(interaction, message)
+                return
+        raise
+
+    game = current_games[channel_id]
+    if refresh_hand is not None:
+        render_scheduler.schedule(("hand", hand_key), lambda: refresh_hand(interaction))
+    render_scheduler.schedule(("lobby", channel_id), lambda: refresh_lobby_message(interaction, game, rendered_lobby))
+    if after_move is not None:
+        render_scheduler.schedule(("after_move", interaction.id), after_move)
+    schedule_notice(interaction, success_message)
+    schedule_bot_turns(interaction)
+
+def schedule_notice(interaction: discord.Interaction, message: str):
+    """
+    Privately tells the player something in the background, after their interaction was deferred
+    """
+    async def send_notice():
+        with discord_time():
+            await interaction.followup.send(message, ephemeral=True, delete_after=5)  # type: ignore - pylance overload issue
+    render_scheduler.schedule(("notice", interaction.id), send_notice)
+
+#endregion
+
 #region lobby
+@timed_interaction("lobby")
 async def run_lobby_command(ctx: discord.ApplicationContext):
 
     if ctx.channel_id not in current_games:
-        await ctx.respond(embed=discord.Embed(description="There is not a game in this channel yet!"))
+        with discord_time():
+            await ctx.respond(embed=discord.Embed(description="There is not a game in this channel yet!"))
         return
     
     game = current_games[ctx.channel_id]
 
     response_embed = discord.Embed(description="An error occurred", color=ERROR_COLOR)
 
-    if game.state == UnoStates.PREGAME:
-        embed = discord.Embed(title=f"<#{ctx.channel_id}> lobby")
-        embed.add_field(name="Players:", value="\n".join([f"<@{player.player_id}>" for player in game.players]))
-        response_embed = embed
-        
-    else:
-        response_embed = game_status_embed(ctx)
+    with render_time():
+        if game.state == UnoStates.PREGAME:
+            embed = discord.Embed(title=f"<#{ctx.channel_id}> lobby")
+            player_list = get_player_list(ctx.channel_id, game)  # type: ignore - channel_id is only None outside of guilds
+            embed.add_field(name="Players:", value=player_list.render(lambda player_id: player_mention(ctx.channel_id, player_id), show_turn=False))
+            response_embed = embed
+            
+        else:
+            response_embed = game_status_embed(ctx)
 
 
-    sent_message = await ctx.response.send_message(embed=response_embed)
+    with discord_time():
+        sent_message = await ctx.response.send_message(embed=response_embed)
 
-    game.lobby_message_id = (await sent_message.original_response()).id
+        game.lobby_message_id = (await sent_message.original_response()).id
+    edit_cache.remember(game.lobby_message_id, hash_message(embed=response_embed.to_dict()))
 
 def game_status_embed(ctx: discord.ApplicationContext | discord.Interaction) -> discord.Embed:
 
@@ -40,228 +157,296 @@ def game_status_embed(ctx: discord.ApplicationContext | discord.Interaction) ->
     game = current_games[ctx.channel_id]
     embed = discord.Embed(title=f"Game in <#{ctx.channel_id}>", color=game.deck.top_card.get_color_code())
 
-    def turn_annotation(i):
-
-        player: Player = game.players[i]
-        player_line = f"<@{player.player_id}> - Cards: {len(player.hand)}"
-
-        if i == game.turn_index:
-            return f"__{player_line}__ {'↓' if not game.reversed else '↑'}"
-        else:
-            return player_line
-            
-    annotated_player_list = [turn_annotation(i) for i in range(len(game.players))]
-
-    embed.add_field(name="Players:", value="\n".join(annotated_player_list), inline=False)
-    embed.add_field(name="Game", value=(f"{game.status_message}\nIt's <@{game.players[game.turn_index].player_id}>'s turn" % game.status_players), inline=False)
+    player_list = get_player_list(ctx.channel_id, game)  # type: ignore - channel_id is only None outside of guilds
+    embed.add_field(name="Players:", value=player_list.render(lambda player_id: player_mention(ctx.channel_id, player_id)), inline=False)
+    embed.add_field(name="Game", value=(f"{game.status_message}\nIt's {player_mention(ctx.channel_id, game.players[game.turn_index].player_id)}'s turn" % game.status_players), inline=False)
     embed.set_thumbnail(url=game.deck.top_card.get_image_url())
 
     return embed
 
+def get_player_list(channel_id: int, game: UnoGame) -> PlayerListRenderer:
+    """
+    Returns the renderer for the channel's player list, making a new one if the game is new
+    """
+    player_list = player_lists.get(channel_id)
+    if player_list is None or player_list.game is not game:
+        player_list = PlayerListRenderer(game)
+        player_lists[channel_id] = player_list
+    return player_list
+
+def player_mention(channel_id: int | None, player_id: int) -> str:
+    if player_id in bot_players.get(channel_id, set()):  # type: ignore - channel_id is only None outside of guilds
+        return f"Computer player {player_id}"
+    return f"<@{player_id}>"
+
 #endregion
 
 #region hand
+@timed_interaction("hand")
 async def run_hand_command(interaction: discord.Interaction):
 
     if interaction.user is None:
         response_embed = discord.Embed(description="An error occurred", color=ERROR_COLOR)
-        await interaction.response.send_message(embed=response_embed, ephemeral=True)
+        with discord_time():
+            await interaction.response.send_message(embed=response_embed, ephemeral=True)
         return
     
     if interaction.channel_id not in current_games:
         response_embed = discord.Embed(description="There is not a game in this channel yet!")
-        await interaction.response.send_message(embed=response_embed, ephemeral=True)
+        with discord_time():
+            await interaction.response.send_message(embed=response_embed, ephemeral=True)
         return
 
     game = current_games[interaction.channel_id]
     try:
         player = game.get_player(interaction.user.id)
-        response_embed = hand_embed(player)
-        response_view = HandView(game, player)
-        await interaction.response.send_message(embed=response_embed, view=response_view , ephemeral=True)
+        with render_time():
+            response_embed, response_view, image_file = render_hand(game, player)
+        with discord_time():
+            await interaction.response.send_message(embed=response_embed, view=response_view , ephemeral=True, **get_file_kwargs(image_file))
         
         if game.state == UnoStates.WAITING_FOR_WILD_COLOR and game.is_players_turn(player):
-            await interaction.followup.send(embed=color_choice_embed(), view=ChooseColorView(game, player), ephemeral=True)
+            with discord_time():
+                await interaction.followup.send(embed=color_choice_embed(), view=color_choice_view(game, player), ephemeral=True)
 
 
     except ValueError:
         response_embed = discord.Embed(description="You aren't in the game!", color=ERROR_COLOR)
-        await interaction.response.send_message.respond(embed=response_embed, view=None , ephemeral=True)
+        with discord_time():
+            await interaction.response.send_message.respond(embed=response_embed, view=None , ephemeral=True)
         return
 
-def hand_embed(player: Player) -> discord.Embed:
+def render_hand(game: UnoGame, player: Player, page: int = 0) -> tuple[discord.Embed, discord.ui.View, discord.File | None]:
+    """
+    Renders one page of the player's hand. Pages are built once per hand version (see HandPageCache), so turning pages doesn't go
+    through the hand again. If there's a card atlas loaded, the hand is shown as one image instead of emoji (see hand_image.py)
+
+    Args:
+        game (UnoGame): The game
+        player (Player): The player whose hand it is
+        page (int): Which page to show. Pages past either end show the first or last page
+
+    Returns:
+        tuple[discord.Embed, discord.ui.View, discord.File | None]: The hand message's embed, components, and image if there is one
+    """
+    version = get_hand_version(player.hand)
+    pages = hand_page_cache.get_pages(game.seed, player.player_id, version, player.hand)
+    page = min(max(page, 0), len(pages) - 1)
+    image_file = None
+    if hand_images.enabled:
+        image_name, image = hand_images.render(player.hand)
+        image_file = discord.File(io.BytesIO(image), image_name)
+    embed = hand_embed(player, pages, page, image_file.filename if image_file is not None else None)
+    return embed, hand_view(game, player, version, pages, page), image_file
+
+def hand_embed(player: Player, pages: tuple[HandPage, ...], page: int, image_name: str | None = None) -> discord.Embed:
     embed = discord.Embed(title=f"Your hand")
-    embed.add_field(name="Cards", value=", ".join([card.get_emoji_mention() for card in player.hand]))
+    if image_name is not None:
+        embed.set_image(url=f"attachment://{image_name}")
+        footer = f"{len(player.hand)} cards" if len(pages) == 1 else f"{len(player.hand)} cards, menu page {page + 1}/{len(pages)}"
+    else:
+        field_name = "Cards" if len(pages) == 1 else f"Cards (page {page + 1}/{len(pages)})"
+        embed.add_field(name=field_name, value=pages[page].text if len(pages[page].cards) > 0 else "No cards")
+        footer = f"{len(player.hand)} cards"
+    embed.set_footer(text=footer)
     return embed
+
+def get_file_kwargs(image_file: discord.File | None, editing: bool = False) -> dict:
+    """
+    Returns the arguments for sending or editing a message with the image, if there is one
+    """
+    if image_file is None:
+        return {}
+    # Edits keep the old attachments unless they're replaced
+    return {"file": image_file, "attachments": []} if editing else {"file": image_file}
     
 def color_choice_embed() -> discord.Embed:
     return discord.Embed(description="Pick a color")
 
-class ChooseColorView(discord.ui.View):
-    def __init__(self, game: UnoGame, player: Player):
-        super().__init__()
+def stateless_view(*items: discord.ui.Item) -> discord.ui.View:
+    """
+    Makes a view that's only used to send its components. It's stopped straight away, so py-cord drops it from its view store
+    instead of keeping it around until it times out. Clicks on its components go to dispatch_component by custom id instead
+    """
+    view = discord.ui.View(*items, timeout=None)
+    view.stop()
+    return view
+
+def hand_view(game: UnoGame, player: Player, version: int, pages: tuple[HandPage, ...], page: int) -> discord.ui.View:
+    def custom_id(action: str, argument: int) -> str:
+        return ComponentRoute(action, game.seed, player.player_id, version, str(argument)).to_custom_id()
+
+    items: list[discord.ui.Item] = []
+    if len(pages[page].cards) > 0:
+        items.append(discord.ui.Select(
+            # The page goes along with moves, so the hand stays on it afterwards
+            custom_id=custom_id(PLAY_CARD_ACTION, page),
+            placeholder="Choose a card to play...",
+            min_values=1,
+            max_values=1,
+            # Values are card ids, which are shorter than card names (Card.from_string reads either)
+            options=[discord.SelectOption(label=str(card) if count == 1 else f"{card} x{count}", value=str(card.card_id), emoji=card.get_emoji_mention())
+                for card, count in pages[page].cards]
+        ))
+    items.append(discord.ui.Button(label="Draw", emoji=Card.BACK_EMOJI, custom_id=custom_id(DRAW_ACTION, page)))
+    if len(pages) > 1:
+        items.append(discord.ui.Button(label="Previous", custom_id=custom_id(PAGE_ACTION, page - 1), disabled=page == 0))
+        items.append(discord.ui.Button(label="Next", custom_id=custom_id(PAGE_ACTION, page + 1), disabled=page == len(pages) - 1))
+    return stateless_view(*items)
+
+def color_choice_view(game: UnoGame, player: Player) -> discord.ui.View:
+    version = get_hand_version(player.hand)
+    return stateless_view(*[discord.ui.Button(label=color.value, emoji=Card.BACK_EMOJI,
+        custom_id=ComponentRoute(CHOOSE_COLOR_ACTION, game.seed, player.player_id, version, color.name).to_custom_id())
+        for color in (CardColors.RED, CardColors.BLUE, CardColors.YELLOW, CardColors.GREEN)])
+
+async def refresh_hand_message(interaction: discord.Interaction):
+    """
+    Shows the player's hand as it is now in the hand message whose component they used
+    """
+    game = current_games.get(interaction.channel_id)  # type: ignore - channel_id is only None outside of guilds
+    if game is None or interaction.user is None or interaction.message is None:
+        return
+    try:
+        player = game.get_player(interaction.user.id)
+    except ValueError:
+        return
 
-        self.add_item(self.ColorButton(game, player, CardColors.RED))
-        self.add_item(self.ColorButton(game, player, CardColors.BLUE))
-        self.add_item(self.ColorButton(game, player, CardColors.YELLOW))
-        self.add_item(self.ColorButton(game, player, CardColors.GREEN))
+    route = ComponentRoute.from_custom_id(interaction.custom_id)
+    page = int(route.argument) if route is not None and route.argument.lstrip("-").isdigit() else 0
+    with render_time():
+        embed, view, image_file = render_hand(game, player, page)
+        content_hash = hash_message(embed=embed.to_dict(), components=view.to_components())
+    if edit_cache.is_unchanged(interaction.message.id, content_hash):
+        return
+    with discord_time():
+        # A deferred component interaction's original response is the message the component is on
+        await interaction.edit_original_response(embed=embed, view=view, **get_file_kwargs(image_file, editing=True))
+    edit_cache.remember(interaction.message.id, content_hash)
 
+async def delete_component_message(interaction: discord.Interaction):
+    with discord_time():
+        await interaction.delete_original_response()
 
-    class ColorButton(discord.ui.Button):
-        def __init__(self, game: UnoGame, player: Player, color: CardColors):
-            super().__init__(label=color.value, emoji=Card.BACK_EMOJI)
-            self.game = game
-            self.player = player
-            self.color = color
+#endregion
 
+#region components
 
-        async def refresh_hand(self, interaction: discord.Interaction):
-            if self.view is not None:
-                await self.view.message.delete()
-            await run_hand_command(interaction)
+STALE_HAND_MESSAGE = "Your hand changed since then, so nothing happened. Try again!"
 
-        async def refresh_lobby(self, interaction: discord.Interaction):
-            lobby_message_id = self.game.lobby_message_id
-            if lobby_message_id is not None:
-                message = await interaction.channel.fetch_message(lobby_message_id)  # type: ignore - pylance channel type issue
-                await message.edit(embed=game_status_embed(interaction))
-            else:
-                message = await interaction.channel.send(embed=game_status_embed(interaction))  # type: ignore - pylance channel type issue
-                self.game.lobby_message_id = message.id
+async def dispatch_component(interaction: discord.Interaction):
+    """
+    Handles a click on any game component, from the route in its custom id (see component_ids.py).
+    Nothing is kept per message, and clicks on components from an older hand are turned away before the game is touched.
+    Components that weren't made by ComponentRoute are left alone
+    """
+    route = ComponentRoute.from_custom_id(interaction.custom_id)
+    if route is None or route.action not in component_handlers:
+        return
 
-        async def callback(self, interaction: Interaction):
-            try:
-                self.game.choose_color_move(self.player, self.color)
-                await self.refresh_lobby(interaction)
-                await interaction.response.send_message(f"You picked {self.color}", ephemeral=True, delete_after=5)  # type: ignore - pylance overload issue
-                if self.view is not None:
-                    await self.view.message.delete() 
-
-            except OutOfTurnError:
-                await interaction.followup.send("It's not your turn", ephemeral=True, delete_after=5)  # type: ignore - pylance overload issue
-    
-class HandView(discord.ui.View):
-    def __init__(self, game: UnoGame, player: Player, message: discord.Message | None = None):
-        super().__init__()
+    game = current_games.get(interaction.channel_id)  # type: ignore - channel_id is only None outside of guilds
+    if game is None or game.seed != route.game_id:
+        with discord_time():
+            await interaction.response.send_message("That game is over", ephemeral=True, delete_after=5)
+        return
+    if interaction.user is None or interaction.user.id != route.player_id:
+        with discord_time():
+            await interaction.response.send_message("That isn't your hand", ephemeral=True, delete_after=5)
+        return
+    try:
+        player = game.get_player(route.player_id)
+    except ValueError:
+        with discord_time():
+            await interaction.response.send_message("You aren't in the game!", ephemeral=True, delete_after=5)
+        return
 
-        self.add_item(self.HandDropdown(game, player, self.refresh_hand))
-        self.add_item(self.HandButton(game, player, self.refresh_hand))
-            
-        self.input_message = message
-        self.player = player
-        self.game = game
-  
-        
-    async def refresh_hand(self, interaction: discord.Interaction):
-        if self.input_message is not None:
-            await self.input_message.edit(embed=hand_embed(self.player), view=HandView(self.game, self.player, self.input_message))
-        elif self.message is not None:
-            await self.message.edit(embed=hand_embed(self.player), view=HandView(self.game, self.player, self.message))
+    # Turning the page doesn't change the game, so it just shows the page of the hand as it is now
+    if route.action != PAGE_ACTION and get_hand_version(player.hand) != route.version:
+        with discord_time():
+            await interaction.response.defer()
+        if route.action == CHOOSE_COLOR_ACTION:
+            render_scheduler.schedule(("after_move", interaction.id), lambda: delete_component_message(interaction))
         else:
-            await interaction.followup.send(embed=hand_embed(self.player), view=HandView(self.game, self.player))
-
-    class HandButton(discord.ui.Button):
-        def __init__(self, game: UnoGame, player: Player, refresh_callback):
-            super().__init__(label="Draw", emoji=Card.BACK_EMOJI)
-            self.game = game
-            self.player = player
-            self.refresh_callback = refresh_callback
-
-        async def refresh_lobby(self, interaction: discord.Interaction):
-            lobby_message_id = self.game.lobby_message_id
-            if lobby_message_id is not None:
-                message = await interaction.channel.fetch_message(lobby_message_id)  # type: ignore - pylance channel type issue
-                await message.edit(embed=game_status_embed(interaction))
-            else:
-                message = await interaction.channel.send(embed=game_status_embed(interaction))  # type: ignore - pylance channel type issue
-                self.game.lobby_message_id = message.id
-
-        async def callback(self, interaction: Interaction):
-            try:
-                self.game.draw_card_move(self.player)
-                await self.refresh_callback(interaction)
-                await self.refresh_lobby(interaction)
-                await interaction.followup.send(f"You drew cards", ephemeral=True, delete_after=5)  # type: ignore - pylance overload issue
-                
-
-            except MustPlayCardError:
-                await interaction.followup.send("You need to play a card", ephemeral=True, delete_after=5)  # type: ignore - pylance overload issue
-
-            except OutOfTurnError:
-                await interaction.followup.send("It's not your turn", ephemeral=True, delete_after=5)  # type: ignore - pylance overload issue
-
-
-    class HandDropdown(discord.ui.Select):
-        def __init__(self, game: UnoGame, player: Player, refresh_callback):
-            hand_no_duplicates = []
-            for card in player.hand:
-                if card not in hand_no_duplicates:
-                    hand_no_duplicates.append(card)
-
-            options = [discord.SelectOption(label=str(card), emoji=card.get_emoji_mention()) for card in hand_no_duplicates]
-            
-            super().__init__(
-                placeholder="Choose a card to play...",
-                min_values=1,
-                max_values=1,
-                options=options
-            )
-            self.player = player
-            self.game = game
-            self.refresh_callback = refresh_callback
-
-        async def refresh_lobby(self, interaction: discord.Interaction):
-            lobby_message_id = self.game.lobby_message_id
-            if lobby_message_id is not None:
-                message = await interaction.channel.fetch_message(lobby_message_id)  # type: ignore - pylance channel type issue
-                await message.edit(embed=game_status_embed(interaction))
-            else:
-                message = await interaction.channel.send(embed=game_status_embed(interaction))  # type: ignore - pylance channel type issue
-                self.game.lobby_message_id = message.id
-
-
-        async def callback(self, interaction: discord.Interaction):
-            card_chosen = Card.from_string(self.values[0])
-            try:
-                self.game.play_card_move(self.player, card_chosen)
-                await self.refresh_callback(interaction)
-                await self.refresh_lobby(interaction)
-                await interaction.followup.send(f"You played {str(card_chosen)}", ephemeral=True, delete_after=5)  # type: ignore - pylance overload issue              
-
-            except:
-                await self.refresh_callback(interaction)
-                await interaction.followup.send("You can't play that right now!", ephemeral=True, delete_after=5)  # type: ignore - pylance overload issue
-            
-            
-    
+            render_scheduler.schedule(("hand", interaction.message.id), lambda: refresh_hand_message(interaction))  # type: ignore - component interactions always have a message
+        schedule_notice(interaction, STALE_HAND_MESSAGE)
+        return
 
+    await component_handlers[route.action](interaction, player, route)
+
+@timed_interaction("HandDropdown")
+async def run_play_card_component(interaction: discord.Interaction, player: Player, route: ComponentRoute):
+    card_chosen = Card.from_string(interaction.data["values"][0])  # type: ignore - select interactions always have values
+    await run_move_interaction(interaction, lambda game: game.play_card_move(player, card_chosen), f"You played {str(card_chosen)}",
+        {Exception: "You can't play that right now!"},
+        interaction.message.id, refresh_hand_message)  # type: ignore - component interactions always have a message
+
+@timed_interaction("HandButton")
+async def run_draw_component(interaction: discord.Interaction, player: Player, route: ComponentRoute):
+    await run_move_interaction(interaction, lambda game: game.draw_card_move(player), "You drew cards",
+        {MustPlayCardError: "You need to play a card", OutOfTurnError: "It's not your turn"},
+        interaction.message.id, refresh_hand_message)  # type: ignore - component interactions always have a message
+
+@timed_interaction("HandPage")
+async def run_page_component(interaction: discord.Interaction, player: Player, route: ComponentRoute):
+    game = current_games[interaction.channel_id]  # type: ignore - channel_id is only None outside of guilds
+    with render_time():
+        embed, view, image_file = render_hand(game, player, int(route.argument))
+        content_hash = hash_message(embed=embed.to_dict(), components=view.to_components())
+    with discord_time():
+        # Turning the page is the response, so it only takes one call
+        await interaction.response.edit_message(embed=embed, view=view, **get_file_kwargs(image_file, editing=True))
+    edit_cache.remember(interaction.message.id, content_hash)  # type: ignore - component interactions always have a message
+
+@timed_interaction("ColorButton")
+async def run_choose_color_component(interaction: discord.Interaction, player: Player, route: ComponentRoute):
+    color = CardColors[route.argument]
+    await run_move_interaction(interaction, lambda game: game.choose_color_move(player, color), f"You picked {color}",
+        {OutOfTurnError: "It's not your turn"}, after_move=lambda: delete_component_message(interaction))
+
+# Component action -> what handles it
+component_handlers: dict[str, Callable[[discord.Interaction, Player, ComponentRoute], Coroutine]] = {
+    PLAY_CARD_ACTION: run_play_card_component,
+    DRAW_ACTION: run_draw_component,
+    CHOOSE_COLOR_ACTION: run_choose_color_component,
+    PAGE_ACTION: run_page_component,
+}
 
 #endregion
 
 #region start
 
+@timed_interaction("start")
 async def run_start_game_command(ctx: discord.ApplicationContext):
     if ctx.channel_id not in current_games:
         create_command = ctx.bot.get_application_command("create_game")
         response_string = "There isn't a game in this channel yet!"
         if create_command is not None:
             response_string += f" Create one with </{create_command.name}:{create_command.id}>"
-        await ctx.respond(embed=discord.Embed(description=response_string, color=INFO_COLOR), delete_after=10)
+        with discord_time():
+            await ctx.respond(embed=discord.Embed(description=response_string, color=INFO_COLOR), delete_after=10)
         return
     
     game = current_games[ctx.channel_id]
     
     try:
-        game.start_game()
+        with engine_time():
+            await get_game_actor(ctx.channel_id).submit(lambda game: game.start_game())
         embed_response = discord.Embed(description="Game started!", color=SUCCESS_COLOR)
-        await ctx.respond(embed=embed_response)
+        with discord_time():
+            await ctx.respond(embed=embed_response)
 
         await run_lobby_command(ctx)
+        schedule_bot_turns(ctx)
 
         return
     except OutOfTurnError:
         embed_response = discord.Embed(description="The game already started!", color=ERROR_COLOR)
-        await ctx.respond(embed=embed_response)
+        with discord_time():
+            await ctx.respond(embed=embed_response)
+        return
+    except GameBusyError:
+        with discord_time():
+            await ctx.respond(embed=discord.Embed(description=BUSY_MESSAGE, color=ERROR_COLOR), delete_after=5)
         return
     
 
@@ -271,28 +456,302 @@ async def run_start_game_command(ctx: discord.ApplicationContext):
 
 #region join
 
+@timed_interaction("join")
 async def run_join_command(ctx: discord.ApplicationContext):
     if ctx.channel_id not in current_games:
         create_command = ctx.bot.get_application_command("create_game")
         response_string = "There isn't a game in this channel yet!"
         if create_command is not None:
             response_string += f" Create one with </create_game:{create_command.id}>"
-        await ctx.respond(embed=discord.Embed(description=response_string, color=INFO_COLOR), delete_after=10)
+        with discord_time():
+            await ctx.respond(embed=discord.Embed(description=response_string, color=INFO_COLOR), delete_after=10)
         return
 
     try:
-        current_games[ctx.channel_id].create_player(ctx.author.id)
-        await ctx.respond(embed=discord.Embed(description="You joined the game!", color=SUCCESS_COLOR), delete_after=5)
+        with engine_time():
+            await get_game_actor(ctx.channel_id).submit(lambda game: game.create_player(ctx.author.id))
+        with discord_time():
+            await ctx.respond(embed=discord.Embed(description="You joined the game!", color=SUCCESS_COLOR), delete_after=5)
         await run_hand_command(ctx.interaction)
 
     except ValueError as error:
-        await ctx.respond(embed=discord.Embed(description="You are already in this game!", color=ERROR_COLOR), delete_after=5)
+        with discord_time():
+            await ctx.respond(embed=discord.Embed(description="You are already in this game!", color=ERROR_COLOR), delete_after=5)
     except OutOfCardsError as error:
-        await ctx.respond(embed=discord.Embed(description="There aren't enough cards to add another player!", color=ERROR_COLOR), delete_after=5)
+        with discord_time():
+            await ctx.respond(embed=discord.Embed(description="There aren't enough cards to add another player!", color=ERROR_COLOR), delete_after=5)
+    except GameBusyError:
+        with discord_time():
+            await ctx.respond(embed=discord.Embed(description=BUSY_MESSAGE, color=ERROR_COLOR), delete_after=5)
 
 
 #endregion
 
+
+#region bots
+
+# Computer players think in the worker pool for at most this long per move, so the event loop keeps running
+BOT_SEARCH_SETTINGS = SearchSettings(time_limit=0.15)
+# If the pool hasn't answered by then (because it's busy with other channels), the bot gives up on that search
+BOT_MOVE_DEADLINE = 1.0
+# A tiny search run right on the event loop, for when the pool is full or too slow
+FALLBACK_SEARCH_SETTINGS = SearchSettings(time_limit=None, max_iterations=8, rollout_depth=10)
+# How long computer players wait before trying again when their game's actor is full
+BOT_BUSY_RETRY_DELAY = 0.25
+
+@timed_interaction("add_bots")
+async def run_add_bots_command(ctx: discord.ApplicationContext, seats: int):
+    if ctx.channel_id not in current_games:
+        with discord_time():
+            await ctx.respond(embed=discord.Embed(description="There isn't a game in this channel yet!", color=INFO_COLOR), delete_after=10)
+        return
+
+    game = current_games[ctx.channel_id]
+    if game.state != UnoStates.PREGAME:
+        with discord_time():
+            await ctx.respond(embed=discord.Embed(description="The game already started!", color=ERROR_COLOR), delete_after=5)
+        return
+
+    channel_bot_players = bot_players.setdefault(ctx.channel_id, set())
+
+    def add_bots(game: UnoGame) -> int:
+        added_count = 0
+        while len(game.players) < seats:
+            # Discord ids are huge, so small ids can never belong to a real user
+            bot_id = max(channel_bot_players, default=0) + 1
+            try:
+                game.create_player(bot_id)
+            except OutOfCardsError:
+                break
+            channel_bot_players.add(bot_id)
+            added_count += 1
+        return added_count
+
+    try:
+        with engine_time():
+            added_count = await get_game_actor(ctx.channel_id).submit(add_bots)
+    except GameBusyError:
+        with discord_time():
+            await ctx.respond(embed=discord.Embed(description=BUSY_MESSAGE, color=ERROR_COLOR), delete_after=5)
+        return
+
+    with discord_time():
+        if added_count == 0:
+            await ctx.respond(embed=discord.Embed(description="There aren't any empty seats to fill!", color=ERROR_COLOR), delete_after=5)
+        else:
+            await ctx.respond(embed=discord.Embed(description=f"Added {added_count} computer player{'s' if added_count != 1 else ''}!", color=SUCCESS_COLOR), delete_after=5)
+
+def schedule_bot_turns(ctx: discord.ApplicationContext | discord.Interaction):
+    """
+    Starts computer players' turns in the background, so the command or button that triggered them
+    can finish (and acknowledge its interaction) right away
+    """
+    # A fresh context, so the turns are timed on their own rather than as part of the interaction that started them
+    task = asyncio.get_running_loop().create_task(run_bot_turns(ctx), context=contextvars.Context())
+    # The loop only keeps weak references to tasks
+    bot_turn_tasks.add(task)
+    task.add_done_callback(bot_turn_tasks.discard)
+
+@timed_interaction("bot_turns")
+async def run_bot_turns(ctx: discord.ApplicationContext | discord.Interaction):
+    """
+    Lets computer players take turns until it's a human's turn or the game ends.
+    The search runs in the worker pool on a snapshot of the game, and the move is only made if nobody else moved in the meantime
+    """
+    channel_id = ctx.channel_id
+    if channel_id is None or channel_id in running_bot_turns or channel_id not in current_games:
+        return
+
+    running_bot_turns.add(channel_id)
+    try:
+        game = current_games[channel_id]
+        while game.state != UnoStates.PREGAME and game.state != UnoStates.PLAYER_WON:
+            player = game.players[game.turn_index]
+            if player.player_id not in bot_players.get(channel_id, set()):
+                break
+
+            state_hash = game.get_state_hash()
+            sampler = game.get_hand_sampler(player.player_id)
+            try:
+                with engine_time():
+                    move = await ai_pool.choose_move(channel_id, game, player.player_id, BOT_SEARCH_SETTINGS, BOT_MOVE_DEADLINE, sampler)
+            except PoolBusyError:
+                move = None
+
+            # Someone jumped in while the bot was thinking, so think again
+            if game.get_state_hash() != state_hash:
+                continue
+
+            with engine_time():
+                if move is None:
+                    move = choose_move(game, player.player_id, FALLBACK_SEARCH_SETTINGS, None, sampler)
+                if move is None:
+                    break
+
+                chosen_move = move
+                try:
+                    rendered_lobby = await get_game_actor(channel_id).submit(move_command(ctx,
+                        lambda game: make_bot_move(game, player, chosen_move, sampler), state_hash))
+                except GameBusyError:
+                    # Human moves go first, the bot can try again once they're through
+                    await asyncio.sleep(BOT_BUSY_RETRY_DELAY)
+                    continue
+                # Not even drawing worked, so there's nothing the bot can do
+                except MOVE_ERRORS:
+                    break
+                except Exception:
+                    logger.exception(f"Computer player {player.player_id} couldn't move in channel {channel_id}")
+                    raise
+
+            # Someone moved while the move was waiting its turn in the actor
+            if rendered_lobby is None:
+                continue
+            await refresh_lobby_message(ctx, game, rendered_lobby)
+    finally:
+        running_bot_turns.discard(channel_id)
+
+def make_bot_move(game: UnoGame, player: Player, move: UnoMove, sampler: HiddenHandSampler) -> None:
+    """
+    Makes a computer player's move. If the move doesn't work on the real game, the bot picks again with a quick search,
+    and draws if even that doesn't work
+
+    Raises:
+        Exception: Any of MOVE_ERRORS if drawing doesn't work either
+    """
+    try:
+        game.make_move(move)
+        return
+    except MOVE_ERRORS:
+        pass
+
+    fallback_move = choose_move(game, player.player_id, FALLBACK_SEARCH_SETTINGS, None, sampler)
+    if fallback_move is not None:
+        try:
+            game.make_move(fallback_move)
+            return
+        except MOVE_ERRORS:
+            pass
+    game.draw_card_move(player)
+
+async def refresh_lobby_message(ctx: discord.ApplicationContext | discord.Interaction, game: UnoGame,
+        rendered_lobby: tuple[discord.Embed, int] | None = None):
+    """
+    Shows the game's status in its lobby message, sending a new one if there isn't one yet
+
+    Args:
+        ctx (discord.ApplicationContext | discord.Interaction): The interaction the update is for
+        game (UnoGame): The game
+        rendered_lobby (tuple[discord.Embed, int] | None): The embed and state hash from move_command. If another move has changed
+            the game since, nothing is sent, since that move's update is newer. Defaults to rendering the game as it is now
+    """
+    if rendered_lobby is not None:
+        embed, state_hash = rendered_lobby
+        actor = game_actors.get(ctx.channel_id)  # type: ignore - channel_id is only None outside of guilds
+        if actor is not None and actor.is_superseded(state_hash):
+            return
+    else:
+        with render_time():
+            embed = game_status_embed(ctx)
+    lobby_message_id = game.lobby_message_id
+    content_hash = hash_message(embed=embed.to_dict())
+    if lobby_message_id is not None and edit_cache.is_unchanged(lobby_message_id, content_hash):
+        return
+    with discord_time():
+        if lobby_message_id is not None:
+            message = await ctx.channel.fetch_message(lobby_message_id)  # type: ignore - pylance channel type issue
+            await message.edit(embed=embed)
+        else:
+            message = await ctx.channel.send(embed=embed)  # type: ignore - pylance channel type issue
+            game.lobby_message_id = message.id
+    edit_cache.remember(message.id, content_hash)
+
+#endregion
+
+
+#region hint
+
+# How long the solver can think for
+HINT_TIME_LIMIT = 1.0
+# Discord needs a response within 3 seconds, and waiting in the pool queue counts too
+HINT_DEADLINE = 1.5
+
+@timed_interaction("hint")
+async def run_hint_command(ctx: discord.ApplicationContext):
+    if ctx.channel_id not in current_games:
+        with discord_time():
+            await ctx.respond(embed=discord.Embed(description="There isn't a game in this channel yet!", color=INFO_COLOR), ephemeral=True)
+        return
+
+    game = current_games[ctx.channel_id]
+    try:
+        player = game.get_player(ctx.author.id)
+    except ValueError:
+        with discord_time():
+            await ctx.respond(embed=discord.Embed(description="You aren't in the game!", color=ERROR_COLOR), ephemeral=True)
+        return
+
+    state_hash = game.get_state_hash()
+    hint = hint_cache.get(state_hash, player.player_id)
+    if hint is None:
+        # Searching takes longer than Discord waits for a first response
+        with discord_time():
+            await ctx.defer(ephemeral=True)
+        try:
+            with engine_time():
+                hint = await ai_pool.get_hint(("hint", ctx.channel_id, player.player_id), game, player.player_id, HINT_TIME_LIMIT,
+                    HINT_DEADLINE, game.get_hand_sampler(player.player_id))
+        except PoolBusyError:
+            with discord_time():
+                await ctx.respond(embed=discord.Embed(description="Too many games are thinking right now, try again in a moment!", color=ERROR_COLOR), ephemeral=True)
+            return
+
+        if hint is None:
+            with discord_time():
+                await ctx.respond(embed=discord.Embed(description="There isn't anything for you to do right now!", color=INFO_COLOR), ephemeral=True)
+            return
+        # Only remember the hint if the game didn't move on while it was being worked out
+        if game.get_state_hash() == state_hash:
+            hint_cache.put(state_hash, player.player_id, hint)
+
+    with render_time():
+        embed = hint_embed(ctx.channel_id, game, hint)
+    with discord_time():
+        await ctx.respond(embed=embed, ephemeral=True)
+
+def hint_embed(channel_id: int | None, game: UnoGame, hint: Hint) -> discord.Embed:
+    description = f"**{describe_move(channel_id, game, hint.move)}**\n"
+    if hint.exact:
+        description += f"Solved to the end of the game: {round(hint.score * 100)}% chance to win"
+    else:
+        description += f"About a {round(hint.score * 100)}% chance to win"
+
+    embed = discord.Embed(title="Hint", description=description, color=INFO_COLOR)
+    other_moves = [f"{describe_move(channel_id, game, move)}: {round(score * 100)}%" for move, score in hint.ranked_moves[1:4]]
+    if len(other_moves) > 0:
+        embed.add_field(name="Other options", value="\n".join(other_moves))
+    return embed
+
+def describe_move(channel_id: int | None, game: UnoGame, move: UnoMove) -> str:
+    match move.move_type:
+        case MoveTypes.PLAY_CARD:
+            return f"Play the {move.card}"
+        case MoveTypes.DRAW:
+            return "Draw"
+        case MoveTypes.PASS:
+            return "Pass"
+        case MoveTypes.CHOOSE_COLOR:
+            return f"Choose {move.color.value if move.color is not None else None}"
+        case MoveTypes.SEVEN_SWAP:
+            if move.target_index < len(game.players):
+                return f"Swap hands with {player_mention(channel_id, game.players[move.target_index].player_id)}"
+            return "Swap hands"
+        case MoveTypes.ZERO_ROTATE:
+            return "Rotate hands" if move.rotate else "Don't rotate hands"
+        case _:
+            return str(move)
+
+#endregion
+
 def create_game_embed() -> discord.Embed:
     embed = discord.Embed(title="New game", description="Create a new game in this channel.", color=INFO_COLOR)
     return embed
@@ -306,22 +765,26 @@ class CreateGameView(discord.ui.View):
         super().__init__()
    
     @discord.ui.button(label="Create", style=discord.ButtonStyle.primary)
+    @timed_interaction("CreateGameView")
     async def callback(self, button: discord.Button, interaction: Interaction):
         channel_id = interaction.channel_id
         user_id = interaction.user.id if interaction.user is not None else None
         if channel_id is None or user_id is None:
-            await interaction.response.send_message(embed=discord.Embed(description="An error occurred", color=ERROR_COLOR), delete_after=5)
+            with discord_time():
+                await interaction.response.send_message(embed=discord.Embed(description="An error occurred", color=ERROR_COLOR), delete_after=5)
             return
 
         embed_response = discord.Embed(description="An error occurred", color=ERROR_COLOR)
         if channel_id in current_games:
             embed_response = discord.Embed(description="There is already a game in this channel", color=ERROR_COLOR)
         else:
-            new_game = UnoGame()
+            new_game = UnoGame(UnoRules(scale_decks=True))
             current_games[channel_id] = new_game
+            bot_players.pop(channel_id, None)
             embed_response = discord.Embed(description="New game created!", color=SUCCESS_COLOR)
 
-        if interaction.message is not None:
-            await interaction.message.edit(embed=embed_response, view=None)
-        else:
-            await interaction.response.send_message(embed=embed_response, delete_after=5)
\ No newline at end of file
+        with discord_time():
+            if interaction.message is not None:
+                await interaction.message.edit(embed=embed_response, view=None)
+            else:
+                await interaction.response.send_message(embed=embed_response, delete_after=5)
\ No newline at end of file
@@ -1,5 +1,57 @@
+import asyncio # type: ignore (pylance shadow stdlib issues)
+from bot.edit_cache import EditCache
+from bot.game_actor import GameActor
+from bot.hand_image import HandImageRenderer
+from bot.hand_pages import HandPageCache
+from bot.loop_monitor import LoopLagMonitor
+from bot.player_list import PlayerListRenderer
+from bot.render_scheduler import RenderScheduler
 from unogame.game import UnoGame
+from unogame.solver import HintCache
+from unogame.worker_pool import AIWorkerPool
 
 current_games: dict[int, UnoGame] = {
 
-}
\ No newline at end of file
+}
+
+# Channel id -> the actor every change to that channel's game goes through (see game_actor.py)
+game_actors: dict[int, GameActor] = {
+
+}
+
+# Channel id -> the renderer for that channel's lobby player list (see player_list.py)
+player_lists: dict[int, PlayerListRenderer] = {
+
+}
+
+# Channel id -> ids of the computer players in that channel's game
+bot_players: dict[int, set[int]] = {
+
+}
+
+# Channels where computer players are currently taking their turns
+running_bot_turns: set[int] = set()
+
+# Background tasks running computer players' turns
+bot_turn_tasks: set[asyncio.Task] = set()
+
+# Worker processes for computer player searches
+ai_pool = AIWorkerPool(max_workers=1, max_queue_depth=8)
+
+# Hints already worked out, by (state hash, player id)
+hint_cache = HintCache(max_size=1024)
+
+# Sends message updates in the background, after moves (see game_support.run_move_interaction)
+render_scheduler = RenderScheduler()
+
+# What each lobby and hand message last showed, so edits that wouldn't change anything are skipped
+edit_cache = EditCache()
+
+# Hand pages already built, by (game seed, player id, hand version)
+hand_page_cache = HandPageCache(max_size=1024)
+
+# Draws hands as images once a card atlas is loaded (see bot.py), otherwise hands are shown as emoji
+hand_images = HandImageRenderer(max_size=256)
+
+# Watches for anything holding up the event loop, started once the bot is ready
+loop_monitor = LoopLagMonitor()
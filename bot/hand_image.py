@@ -0,0 +1,238 @@
+from collections import OrderedDict # type: ignore (pylance shadow stdlib issues)
+from pathlib import Path # type: ignore (pylance shadow stdlib issues)
+import argparse # type: ignore (pylance shadow stdlib issues)
+import mmap # type: ignore (pylance shadow stdlib issues)
+import struct # type: ignore (pylance shadow stdlib issues)
+import zlib # type: ignore (pylance shadow stdlib issues)
+
+from unogame.card import Card, CARD_IDS
+
+# Draws hands as one image, put together from a sprite atlas of the card art kept on disk, instead of a string of emoji.
+# Rendering only needs the standard library. Building the atlas from the card images needs Pillow:
+#   python -m bot.hand_image <folder of card images> storage/card_atlas.bin
+# The images are named like the keys of card_images (five_red.png, plus_four_black.png, back.png)
+
+# Atlas file layout (little endian):
+#   header: magic, sprite width, sprite height, sprite count
+#   sprites: RGBA pixels, row by row, one sprite after another. Sprite i is the card with card_id i, then the back of a card
+_ATLAS_MAGIC = b"UNOATLAS"
+_ATLAS_HEADER = struct.Struct("<8sHHH")
+# Where the back of a card is in the atlas, after every card
+BACK_SPRITE = len(CARD_IDS)
+
+DEFAULT_SPRITE_WIDTH = 80
+DEFAULT_SPRITE_HEIGHT = 120
+# How many cards go in one row of a hand image, and how much of each card shows under the next one
+DEFAULT_CARDS_PER_ROW = 20
+CARD_OVERLAP = 2 / 3
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+class AtlasError(Exception): pass
+
+class SpriteAtlas:
+
+    def __init__(self, path: Path) -> None:
+        """
+        A sprite atlas file, memory mapped so sprites are read straight from the page cache instead of being loaded up front
+
+        Args:
+            path (Path): The atlas file (see write_atlas)
+
+        Raises:
+            AtlasError: If the file isn't an atlas, or is cut short
+        """
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _ATLAS_HEADER.size:
+            self._map.close()
+            raise AtlasError(f"{path} is too short to be a sprite atlas")
+        magic, self.sprite_width, self.sprite_height, self.sprite_count = _ATLAS_HEADER.unpack_from(self._map, 0)
+        self.sprite_size = self.sprite_width * self.sprite_height * 4
+        if magic != _ATLAS_MAGIC or len(self._map) < _ATLAS_HEADER.size + self.sprite_count * self.sprite_size:
+            self._map.close()
+            raise AtlasError(f"{path} isn't a sprite atlas, or is missing sprites")
+
+    def get_sprite_row(self, sprite_index: int, row: int) -> bytes:
+        if not 0 <= sprite_index < self.sprite_count:
+            raise AtlasError(f"There's no sprite {sprite_index} in the atlas")
+        start = _ATLAS_HEADER.size + sprite_index * self.sprite_size + row * self.sprite_width * 4
+        return self._map[start:start + self.sprite_width * 4]
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def write_atlas(path: Path, sprite_width: int, sprite_height: int, sprites: list[bytes]) -> None:
+    """
+    Writes a sprite atlas file
+
+    Args:
+        path (Path): Where to write it
+        sprite_width (int): The width of every sprite, in pixels
+        sprite_height (int): The height of every sprite, in pixels
+        sprites (list[bytes]): Each sprite's RGBA pixels, row by row, in card_id order then the back of a card
+
+    Raises:
+        ValueError: If a sprite is the wrong size
+    """
+    for sprite in sprites:
+        if len(sprite) != sprite_width * sprite_height * 4:
+            raise ValueError(f"Sprites should be {sprite_width}x{sprite_height} RGBA")
+    with open(path, "wb") as file:
+        file.write(_ATLAS_HEADER.pack(_ATLAS_MAGIC, sprite_width, sprite_height, len(sprites)))
+        for sprite in sprites:
+            file.write(sprite)
+
+def build_atlas(image_directory: Path, path: Path, sprite_width: int = DEFAULT_SPRITE_WIDTH, sprite_height: int = DEFAULT_SPRITE_HEIGHT) -> None:
+    """
+    Builds a sprite atlas from a folder of card images
+
+    Args:
+        image_directory (Path): The card images, named like the keys of card_images (five_red.png)
+        path (Path): Where to write the atlas
+        sprite_width (int): What width to scale each card to
+        sprite_height (int): What height to scale each card to
+
+    Raises:
+        ImportError: If Pillow isn't installed
+        FileNotFoundError: If a card's image is missing
+    """
+    # Only building the atlas needs Pillow, so the bot doesn't
+    from PIL import Image
+
+    names = [""] * len(CARD_IDS)
+    for (color, face), card_id in CARD_IDS.items():
+        names[card_id] = f"{face.value}_{color.value}"
+    names.append("back")
+
+    sprites = []
+    for name in names:
+        image_path = image_directory / f"{name}.png"
+        if not image_path.exists() and name.endswith("_black"):
+            # Black number cards don't exist in a real deck, so any picture will do
+            image_path = image_directory / "back.png"
+        with Image.open(image_path) as image:
+            sprites.append(image.convert("RGBA").resize((sprite_width, sprite_height)).tobytes())
+    write_atlas(path, sprite_width, sprite_height, sprites)
+
+
+def encode_png(width: int, height: int, pixels: bytes | bytearray) -> bytes:
+    """
+    Encodes RGBA pixels as a PNG, without needing an imaging library
+
+    Args:
+        width (int): The width in pixels
+        height (int): The height in pixels
+        pixels (bytes | bytearray): The RGBA pixels, row by row
+
+    Returns:
+        bytes: The PNG file
+    """
+    def chunk(chunk_type: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+    stride = width * 4
+    # Each row starts with its filter type, 0 for none
+    raw = b"".join([b"\x00" + bytes(pixels[row * stride:(row + 1) * stride]) for row in range(height)])
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return _PNG_SIGNATURE + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+
+
+class HandImageRenderer:
+
+    def __init__(self, atlas: SpriteAtlas | None = None, max_size: int = 256, cards_per_row: int = DEFAULT_CARDS_PER_ROW) -> None:
+        """
+        Draws hands as one PNG, with each card overlapping the last like cards held in a hand.
+        Images are remembered by the cards in the hand (in any order), since lots of players end up with the same small hands.
+        The least recently used are forgotten once there are more than max_size
+
+        Args:
+            atlas (SpriteAtlas | None): The card art. Hands aren't drawn until there is one (see load_atlas)
+            max_size (int): The most images to remember
+            cards_per_row (int): How many cards go in one row before starting the next
+        """
+        self.atlas = atlas
+        self.max_size = max_size
+        self.cards_per_row = cards_per_row
+        self._images: OrderedDict[tuple[int, ...], tuple[str, bytes]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.atlas is not None
+
+    def load_atlas(self, path: Path) -> None:
+        """
+        Starts drawing hands with the atlas at this path
+
+        Raises:
+            AtlasError: If the file isn't an atlas
+        """
+        if self.atlas is not None:
+            self.atlas.close()
+        self.atlas = SpriteAtlas(path)
+        self._images = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def render(self, hand: list[Card]) -> tuple[str, bytes]:
+        """
+        Draws the hand, sorted so the same cards always give the same image
+
+        Args:
+            hand (list[Card]): The hand
+
+        Raises:
+            AtlasError: If there's no atlas loaded
+
+        Returns:
+            tuple[str, bytes]: A file name that's different for every different hand, and the PNG
+        """
+        key = tuple(sorted([card.card_id for card in hand]))
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = (f"hand_{zlib.crc32(bytes(key)):08x}.png", self.draw(key if len(key) > 0 else (BACK_SPRITE,)))
+        self._images[key] = image
+        while len(self._images) > self.max_size:
+            self._images.popitem(last=False)
+        return image
+
+    def draw(self, sprite_indices: tuple[int, ...]) -> bytes:
+        atlas = self.atlas
+        if atlas is None:
+            raise AtlasError("No sprite atlas is loaded")
+
+        step = max(1, round(atlas.sprite_width * (1 - CARD_OVERLAP)))
+        columns = min(len(sprite_indices), self.cards_per_row)
+        rows = -(-len(sprite_indices) // self.cards_per_row)
+        width = step * (columns - 1) + atlas.sprite_width
+        height = rows * atlas.sprite_height
+        stride = width * 4
+        pixels = bytearray(stride * height)
+
+        for position, sprite_index in enumerate(sprite_indices):
+            left = (position % self.cards_per_row) * step * 4
+            top = (position // self.cards_per_row) * atlas.sprite_height
+            # Later cards go on top, so they're copied over whatever's there
+            for row in range(atlas.sprite_height):
+                start = (top + row) * stride + left
+                pixels[start:start + atlas.sprite_width * 4] = atlas.get_sprite_row(sprite_index, row)
+        return encode_png(width, height, pixels)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the sprite atlas for hand images from a folder of card images")
+    parser.add_argument("image_directory", type=Path)
+    parser.add_argument("atlas", type=Path)
+    parser.add_argument("--width", type=int, default=DEFAULT_SPRITE_WIDTH)
+    parser.add_argument("--height", type=int, default=DEFAULT_SPRITE_HEIGHT)
+    arguments = parser.parse_args()
+    build_atlas(arguments.image_directory, arguments.atlas, arguments.width, arguments.height)
@@ -0,0 +1,98 @@
+from dataclasses import dataclass # type: ignore (pylance shadow stdlib issues)
+from collections import OrderedDict # type: ignore (pylance shadow stdlib issues)
+
+from unogame.card import Card
+
+# Discord won't show a select menu with more options than this
+MAX_SELECT_OPTIONS = 25
+# Or an embed field longer than this
+MAX_FIELD_LENGTH = 1024
+
+@dataclass(frozen=True)
+class HandPage:
+    """
+    One page of a hand, small enough for one embed field and one select menu
+
+    Attributes:
+        cards (tuple[tuple[Card, int], ...]): Each different card on the page, with how many of it are in the hand
+        text (str): The cards' emojis with their counts, for the embed
+    """
+    cards: tuple[tuple[Card, int], ...]
+    text: str
+
+
+def get_card_text(card: Card, count: int) -> str:
+    return card.get_emoji_mention() if count == 1 else f"{card.get_emoji_mention()} x{count}"
+
+def build_hand_pages(hand: list[Card]) -> tuple[HandPage, ...]:
+    """
+    Groups the hand into (card, count), in the order the cards were first drawn, and splits it into pages
+    that each fit Discord's limits
+
+    Args:
+        hand (list[Card]): The hand
+
+    Returns:
+        tuple[HandPage, ...]: The pages. There's always at least one, even for an empty hand
+    """
+    counts: dict[Card, int] = {}
+    for card in hand:
+        counts[card] = counts.get(card, 0) + 1
+
+    pages: list[HandPage] = []
+    page_cards: list[tuple[Card, int]] = []
+    page_texts: list[str] = []
+    page_length = 0
+    for card, count in counts.items():
+        text = get_card_text(card, count)
+        # +2 for the ", " between cards
+        if len(page_cards) == MAX_SELECT_OPTIONS or (len(page_cards) > 0 and page_length + 2 + len(text) > MAX_FIELD_LENGTH):
+            pages.append(HandPage(tuple(page_cards), ", ".join(page_texts)))
+            page_cards, page_texts, page_length = [], [], 0
+        page_length += len(text) + (2 if len(page_cards) > 0 else 0)
+        page_cards.append((card, count))
+        page_texts.append(text)
+    pages.append(HandPage(tuple(page_cards), ", ".join(page_texts)))
+    return tuple(pages)
+
+
+class HandPageCache:
+
+    def __init__(self, max_size: int = 1024) -> None:
+        """
+        Remembers the pages built for each hand version, so turning pages (or showing the same hand again) doesn't build them again.
+        The least recently used are forgotten once there are more than max_size
+
+        Args:
+            max_size (int): The most hands to remember
+        """
+        self.max_size = max_size
+        self._pages: OrderedDict[tuple[int, int, int], tuple[HandPage, ...]] = OrderedDict()
+
+    def get_pages(self, game_id: int, player_id: int, version: int, hand: list[Card]) -> tuple[HandPage, ...]:
+        """
+        Returns the pages for the hand, building them if this version of it hasn't been seen yet
+
+        Args:
+            game_id (int): The game's seed
+            player_id (int): The id of the player whose hand it is
+            version (int): The hand's version (see component_ids.get_hand_version)
+            hand (list[Card]): The hand, only used if the pages need building
+
+        Returns:
+            tuple[HandPage, ...]: The pages
+        """
+        key = (game_id, player_id, version)
+        pages = self._pages.get(key)
+        if pages is not None:
+            self._pages.move_to_end(key)
+            return pages
+
+        pages = build_hand_pages(hand)
+        self._pages[key] = pages
+        while len(self._pages) > self.max_size:
+            self._pages.popitem(last=False)
+        return pages
+
+    def __len__(self) -> int:
+        return len(self._pages)
@@ -0,0 +1,218 @@
+from typing import Any, Callable, Iterable
+import logging # type: ignore (pylance shadow stdlib issues)
+
+from bot.loop_monitor import LoopLagMonitor
+from unogame.game import UnoGame, UnoStates
+from unogame.instrumentation import EngineStats, LatencyHistogram, enable_instrumentation
+
+# Only ever listen locally, this is for scraping from the same box
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9108
+
+# The bot isn't ready if the loop is lagging more than this many seconds
+READY_MAX_LOOP_LAG = 1.0
+
+# The engine calls that count as moves
+MOVE_OPERATIONS = ("play_card_move", "draw_card_move")
+
+# Rough sizes for estimate_game_memory, measured by adding up the objects of real games:
+# a game with its deck but no players, each player (with their hand list and index entries), and each card
+GAME_BASE_BYTES = 16000
+PLAYER_BYTES = 1500
+CARD_BYTES = 70
+
+# Histogram buckets, as LatencyHistogram bucket indexes (bucket i counts times under 2^i ns): about 1µs up to about 1s
+_FIRST_HISTOGRAM_BUCKET = 10
+_LAST_HISTOGRAM_BUCKET = 30
+
+class RateLimitCounter(logging.Handler):
+
+    def __init__(self) -> None:
+        """
+        Counts how often py-cord waits on Discord rate limits, and for how long, by watching the warnings it logs
+        """
+        super().__init__(logging.WARNING)
+        self.wait_count = 0
+        self.wait_seconds = 0.0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if "rate limited" not in str(record.msg):
+            return
+        self.wait_count += 1
+        # The retry delay is the first argument of the message
+        if isinstance(record.args, tuple) and len(record.args) > 0 and isinstance(record.args[0], (int, float)):
+            self.wait_seconds += record.args[0]
+
+
+class HealthServer:
+
+    def __init__(self, games: dict[int, UnoGame], is_bot_ready: Callable[[], bool], host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+            stats: EngineStats | None = None, lag_monitor: LoopLagMonitor | None = None) -> None:
+        """
+        Serves Prometheus metrics at /metrics and a readiness check at /ready, over HTTP on localhost.
+        Starting it also turns on the engine instrumentation and the loop lag monitor
+
+        Args:
+            games (dict[int, UnoGame]): The running games, by channel id
+            is_bot_ready (Callable[[], bool]): Returns whether the bot is connected to Discord
+            host (str): Where to listen
+            port (int): Which port to listen on
+            stats (EngineStats | None): Where the engine records calls. Defaults to a new EngineStats
+            lag_monitor (LoopLagMonitor | None): Measures event loop lag. Defaults to a new LoopLagMonitor
+        """
+        self.games = games
+        self.is_bot_ready = is_bot_ready
+        self.host = host
+        self.port = port
+        self.stats = stats if stats is not None else EngineStats()
+        self.lag_monitor = lag_monitor if lag_monitor is not None else LoopLagMonitor()
+        # A monitor passed in is shared with the rest of the bot, so it keeps running when the server stops
+        self._owns_lag_monitor = lag_monitor is None
+        self.rate_limits = RateLimitCounter()
+
+        self._runner: Any = None
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    async def start(self) -> None:
+        """
+        Starts serving. Needs to be called from the running loop
+
+        Raises:
+            ImportError: If aiohttp isn't installed (it comes with py-cord)
+        """
+        from aiohttp import web
+
+        enable_instrumentation(self.stats)
+        self.lag_monitor.start()
+        logging.getLogger("discord.http").addHandler(self.rate_limits)
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        app.router.add_get("/ready", self._handle_ready)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._owns_lag_monitor:
+            self.lag_monitor.stop()
+        logging.getLogger("discord.http").removeHandler(self.rate_limits)
+
+    def is_ready(self) -> bool:
+        return self.is_bot_ready() and self.lag_monitor.last_lag < READY_MAX_LOOP_LAG
+
+    def render_metrics(self) -> str:
+        """
+        Returns every metric in the Prometheus text format
+
+        Returns:
+            str: The metrics page
+        """
+        lines: list[str] = []
+
+        games_by_state = dict.fromkeys(UnoStates, 0)
+        for game in self.games.values():
+            games_by_state[game.state] += 1
+        add_metric(lines, "uno_games", "gauge", "Games by state",
+            [({"state": state.name.lower()}, count) for state, count in games_by_state.items()])
+
+        totals = self.stats.get_operation_totals()
+        move_histograms = [(operation, totals[operation]) for operation in MOVE_OPERATIONS if operation in totals]
+        # Moves per second is left to Prometheus (rate(uno_moves_total[1m])), so any number of scrapers see the same numbers
+        add_metric(lines, "uno_moves", "counter", "Moves made",
+            [({"operation": operation}, histogram.count) for operation, histogram in move_histograms])
+        add_histogram(lines, "uno_engine_latency_seconds", "Time taken by engine calls",
+            [({"operation": operation}, histogram) for operation, histogram in totals.items()])
+
+        add_metric(lines, "uno_event_loop_lag_seconds", "gauge", "Event loop lag at the last check", [({}, self.lag_monitor.last_lag)])
+        add_metric(lines, "uno_event_loop_lag_max_seconds", "gauge", "Highest event loop lag seen", [({}, self.lag_monitor.max_lag)])
+        add_histogram(lines, "uno_event_loop_lag_check_seconds", "Event loop lag at every check", [({}, self.lag_monitor.histogram)])
+        add_metric(lines, "uno_event_loop_stalls", "counter", "Times the event loop stalled (see loop_monitor.py)", [({}, self.lag_monitor.stall_count)])
+
+        add_metric(lines, "uno_game_memory_bytes", "gauge", "Approximate memory used by each game",
+            [({"channel": str(channel_id)}, estimate_game_memory(game)) for channel_id, game in self.games.items()])
+
+        add_metric(lines, "discord_rate_limit_waits", "counter", "Times requests waited on a Discord rate limit", [({}, self.rate_limits.wait_count)])
+        add_metric(lines, "discord_rate_limit_wait_seconds", "counter", "Time spent waiting on Discord rate limits", [({}, self.rate_limits.wait_seconds)])
+
+        add_metric(lines, "uno_ready", "gauge", "Whether the bot is ready", [({}, int(self.is_ready()))])
+        return "\n".join(lines) + "\n"
+
+    async def _handle_metrics(self, request) -> Any:
+        from aiohttp import web
+        return web.Response(text=self.render_metrics(), content_type="text/plain", charset="utf-8")
+
+    async def _handle_ready(self, request) -> Any:
+        from aiohttp import web
+        if self.is_ready():
+            return web.Response(text="ready\n")
+        return web.Response(text="not ready\n", status=503)
+
+
+def add_metric(lines: list[str], name: str, metric_type: str, description: str, samples: Iterable[tuple[dict[str, str], float]]) -> None:
+    """
+    Adds a metric in the Prometheus text format. Counters get _total added to their name
+
+    Args:
+        lines (list[str]): Where to add the lines
+        name (str): The metric name
+        metric_type (str): "counter" or "gauge"
+        description (str): The help text
+        samples (Iterable[tuple[dict[str, str], float]]): (labels, value) for each sample
+    """
+    full_name = f"{name}_total" if metric_type == "counter" else name
+    lines.append(f"# HELP {full_name} {description}")
+    lines.append(f"# TYPE {full_name} {metric_type}")
+    for labels, value in samples:
+        lines.append(f"{full_name}{format_labels(labels)} {value}")
+
+def add_histogram(lines: list[str], name: str, description: str, samples: Iterable[tuple[dict[str, str], LatencyHistogram]]) -> None:
+    """
+    Adds LatencyHistograms as a Prometheus histogram, in seconds
+
+    Args:
+        lines (list[str]): Where to add the lines
+        name (str): The metric name
+        description (str): The help text
+        samples (Iterable[tuple[dict[str, str], LatencyHistogram]]): (labels, histogram) for each sample
+    """
+    lines.append(f"# HELP {name} {description}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, histogram in samples:
+        cumulative_count = sum(histogram.counts[:_FIRST_HISTOGRAM_BUCKET])
+        for bucket in range(_FIRST_HISTOGRAM_BUCKET, _LAST_HISTOGRAM_BUCKET + 1):
+            cumulative_count += histogram.counts[bucket]
+            lines.append(f"{name}_bucket{format_labels({**labels, 'le': repr((1 << bucket) / 1e9)})} {cumulative_count}")
+        lines.append(f"{name}_bucket{format_labels({**labels, 'le': '+Inf'})} {histogram.count}")
+        lines.append(f"{name}_sum{format_labels(labels)} {histogram.total_ns / 1e9}")
+        lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+
+def format_labels(labels: dict[str, str]) -> str:
+    if len(labels) == 0:
+        return ""
+    escaped = [(key, value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")) for key, value in labels.items()]
+    return "{" + ",".join([f"{key}=\"{value}\"" for key, value in escaped]) + "}"
+
+def estimate_game_memory(game: UnoGame) -> int:
+    """
+    Estimates how much memory a game uses from what it already keeps count of: players, cards, and the length of its record.
+    This stays cheap no matter how big games get, since it runs on the event loop for every game on every scrape
+
+    Args:
+        game (UnoGame): The game
+
+    Returns:
+        int: About how many bytes the game uses
+    """
+    card_count = len(game.deck.draw_pile) + len(game.deck.discard_pile) + sum([len(player.hand) for player in game.players])
+    total_bytes = GAME_BASE_BYTES + len(game.players) * PLAYER_BYTES + card_count * CARD_BYTES
+    if game.record is not None:
+        # Player ids are stored as 8 bytes each
+        total_bytes += len(game.record.entries) + len(game.record.player_ids) * 8
+    return total_bytes
@@ -3,6 +3,8 @@ from discord.ext import commands
 import datetime  # type: ignore
 
 import bot.global_variables as global_variables
+from bot.global_game_info import current_games, ai_pool, loop_monitor, edit_cache
+from bot.interaction_metrics import metrics, TOTAL, ENGINE_PHASE, RENDER_PHASE, DISCORD_PHASE, OTHER_PHASE
 
 class InfoCog(commands.Cog):
 
@@ -15,10 +17,52 @@ class InfoCog(commands.Cog):
         embed.add_field(name="Ping", value=f"{round(self.bot.latency*1000, 2)}ms")
         embed.add_field(name="Uptime", value=self.parse_duration((datetime.datetime.utcnow() - global_variables.start_time).total_seconds()))
         embed.add_field(name="Version", value=global_variables.version)
+        embed.add_field(name="Active games", value=str(len(current_games)))
+        embed.add_field(name="Cards in memory", value=str(self.count_cards()))
+        embed.add_field(name="Outbound queue", value=f"{metrics.discord_calls_in_flight} Discord calls, {ai_pool.queue_depth} searches")
+        embed.add_field(name="Message edits", value=f"{edit_cache.sent_count} sent, {edit_cache.skipped_count} skipped as unchanged")
+        embed.add_field(name=f"Response times (last {min(metrics.interaction_count, metrics.window)}, p50/p95/p99)", value=self.latency_table(), inline=False)
+        embed.add_field(name="Event loop", value=self.loop_summary(), inline=False)
+        slowest = metrics.get_slowest_names()
+        if len(slowest) > 0:
+            embed.add_field(name="Slowest (p95)", value="\n".join([f"{name}: {round(p95)}ms" for name, p95 in slowest]), inline=False)
         embed.set_footer(text=f"@{self.bot.user.name if self.bot.user is not None else 'Unknown'} - {self.bot.user.id if self.bot.user is not None else 0}")
 
         await ctx.respond(embed=embed)
 
+    def count_cards(self) -> int:
+        """
+        Counts the cards in every game's hands and piles
+        """
+        card_count = 0
+        for game in current_games.values():
+            card_count += len(game.deck.draw_pile) + len(game.deck.discard_pile)
+            card_count += sum([len(player.hand) for player in game.players])
+        return card_count
+
+    def loop_summary(self) -> str:
+        """
+        Formats the loop lag and what caused the last stall
+        """
+        summary = f"Lag: {round(loop_monitor.last_lag * 1000, 1)}ms (max {round(loop_monitor.max_lag * 1000, 1)}ms)\nStalls: {loop_monitor.stall_count}"
+        if len(loop_monitor.stalls) > 0:
+            stall = loop_monitor.stalls[-1]
+            duration = f"{round(stall.duration * 1000)}ms" if stall.duration is not None else "ongoing"
+            source = f"{stall.interaction_name} in <#{stall.channel_id}>" if stall.interaction_name is not None else "outside any interaction"
+            summary += f"\nLast stall: {duration}, {source}"
+        return summary
+
+    def latency_table(self) -> str:
+        """
+        Formats the rolling percentiles for whole interactions and each part of them
+        """
+        lines = []
+        for label, phase in [("Total", TOTAL), ("Engine", ENGINE_PHASE), ("Render", RENDER_PHASE), ("Discord", DISCORD_PHASE), ("Other", OTHER_PHASE)]:
+            percentiles = metrics.get_percentiles(phase)
+            if percentiles is None:
+                return "Nothing yet"
+            lines.append(f"{label}: " + " / ".join([f"{round(value, 1)}ms" for value in percentiles]))
+        return "\n".join(lines)
 
 
 
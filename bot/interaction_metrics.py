@@ -0,0 +1,257 @@
+from typing import Any, Awaitable, Callable, ContextManager, Coroutine, Generator, Iterator, TypeVar
+from collections import deque # type: ignore (pylance shadow stdlib issues)
+from contextlib import contextmanager # type: ignore (pylance shadow stdlib issues)
+from contextvars import ContextVar # type: ignore (pylance shadow stdlib issues)
+import functools # type: ignore (pylance shadow stdlib issues)
+import time # type: ignore (pylance shadow stdlib issues)
+
+# Every interaction's time is split into these phases. Anything not inside one of the others counts as "other"
+ENGINE_PHASE = "engine"
+RENDER_PHASE = "render"
+DISCORD_PHASE = "discord"
+OTHER_PHASE = "other"
+TOTAL = "total"
+PHASES = (ENGINE_PHASE, RENDER_PHASE, DISCORD_PHASE, OTHER_PHASE)
+
+# How many of the latest interactions the percentiles are worked out from
+ROLLING_WINDOW = 1000
+
+T = TypeVar("T")
+
+class InteractionTimer:
+
+    def __init__(self, name: str, channel_id: int | None = None) -> None:
+        """
+        Times one interaction end to end, split into phases. Phases can be nested, in which case the
+        inner phase's time is taken out of the outer one, so the phases always add up to the total
+
+        Args:
+            name (str): What's being timed, for example "hint" or "HandDropdown"
+            channel_id (int | None): The channel (and so the game) the interaction is for, if known
+        """
+        self.name = name
+        self.channel_id = channel_id
+        self.phase_ns = dict.fromkeys(PHASES, 0)
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: int | None = None
+
+        self._phase_stack = [OTHER_PHASE]
+        self._phase_start_ns = self.start_ns
+
+    @property
+    def finished(self) -> bool:
+        return self.end_ns is not None
+
+    @property
+    def total_ns(self) -> int:
+        return (self.end_ns if self.end_ns is not None else time.perf_counter_ns()) - self.start_ns
+
+    def enter_phase(self, phase: str) -> None:
+        if self.finished:
+            return
+        self._charge_current_phase()
+        self._phase_stack.append(phase)
+
+    def exit_phase(self) -> None:
+        # Background work started by an interaction can outlive it, and shouldn't change its times afterwards
+        if self.finished or len(self._phase_stack) == 1:
+            return
+        self._charge_current_phase()
+        self._phase_stack.pop()
+
+    def finish(self) -> None:
+        if self.finished:
+            return
+        self._charge_current_phase()
+        self._phase_stack = [OTHER_PHASE]
+        self.end_ns = self._phase_start_ns
+
+    def _charge_current_phase(self) -> None:
+        now_ns = time.perf_counter_ns()
+        self.phase_ns[self._phase_stack[-1]] += now_ns - self._phase_start_ns
+        self._phase_start_ns = now_ns
+
+
+class InteractionMetrics:
+
+    def __init__(self, window: int = ROLLING_WINDOW) -> None:
+        """
+        Keeps the latest interaction times, overall and for each kind of interaction, and how many Discord calls are waiting on a response
+
+        Args:
+            window (int): How many of the latest interactions to keep times for
+        """
+        self.window = window
+        # phase (or TOTAL) -> latest times in nanoseconds
+        self.latencies: dict[str, deque[int]] = {phase: deque(maxlen=window) for phase in (TOTAL,) + PHASES}
+        # interaction name -> latest total times in nanoseconds
+        self.latencies_by_name: dict[str, deque[int]] = {}
+        self.interaction_count = 0
+        self.discord_calls_in_flight = 0
+
+    def add(self, timer: InteractionTimer) -> None:
+        """
+        Records a finished interaction
+
+        Args:
+            timer (InteractionTimer): The interaction's timer
+        """
+        self.interaction_count += 1
+        self.latencies[TOTAL].append(timer.total_ns)
+        for phase, elapsed_ns in timer.phase_ns.items():
+            self.latencies[phase].append(elapsed_ns)
+        if timer.name not in self.latencies_by_name:
+            self.latencies_by_name[timer.name] = deque(maxlen=self.window)
+        self.latencies_by_name[timer.name].append(timer.total_ns)
+
+    def get_percentiles(self, phase: str = TOTAL, name: str | None = None) -> tuple[float, float, float] | None:
+        """
+        Returns the rolling p50, p95, and p99 of a phase, in milliseconds
+
+        Args:
+            phase (str): One of PHASES, or TOTAL for the whole interaction
+            name (str | None): Only look at interactions with this name (only works with TOTAL). Defaults to every interaction
+
+        Returns:
+            tuple[float, float, float] | None: p50, p95, p99, or None if there's nothing recorded yet
+        """
+        samples = self.latencies[phase] if name is None else self.latencies_by_name.get(name, ())
+        if len(samples) == 0:
+            return None
+        sorted_samples = sorted(samples)
+        last_index = len(sorted_samples) - 1
+        return tuple(sorted_samples[round(fraction * last_index)] / 1e6 for fraction in (0.5, 0.95, 0.99))  # type: ignore - always three values
+
+    def get_slowest_names(self, count: int = 3) -> list[tuple[str, float]]:
+        """
+        Returns the kinds of interactions with the highest rolling p95
+
+        Args:
+            count (int): How many to return
+
+        Returns:
+            list[tuple[str, float]]: (name, p95 in milliseconds), slowest first
+        """
+        p95s = [(name, self.get_percentiles(TOTAL, name)[1]) for name in self.latencies_by_name]  # type: ignore - names always have samples
+        return sorted(p95s, key=lambda item: item[1], reverse=True)[:count]
+
+
+metrics = InteractionMetrics()
+
+# The timer for the interaction being handled, so helpers don't need it passed in
+current_timer: ContextVar[InteractionTimer | None] = ContextVar("current_timer", default=None)
+
+# The timer of the interaction whose code the loop thread is running right now, set around each step of a timed interaction
+# (see _run_steps). Only the loop thread changes it, but unlike current_timer it can be read from other threads,
+# which is how the loop watchdog works out which game stalled the loop (see loop_monitor.py)
+_running_timer: InteractionTimer | None = None
+
+def get_running_timer() -> InteractionTimer | None:
+    return _running_timer
+
+@contextmanager
+def timed_phase(phase: str) -> Iterator[None]:
+    """
+    Counts the time spent in the block towards a phase of the current interaction, if there is one.
+    Works around awaits too, since each task has its own current interaction
+
+    Args:
+        phase (str): One of PHASES
+    """
+    timer = current_timer.get()
+    if phase == DISCORD_PHASE:
+        metrics.discord_calls_in_flight += 1
+    if timer is not None:
+        timer.enter_phase(phase)
+    try:
+        yield
+    finally:
+        if timer is not None:
+            timer.exit_phase()
+        if phase == DISCORD_PHASE:
+            metrics.discord_calls_in_flight -= 1
+
+def engine_time() -> ContextManager[None]:
+    return timed_phase(ENGINE_PHASE)
+
+def render_time() -> ContextManager[None]:
+    return timed_phase(RENDER_PHASE)
+
+def discord_time() -> ContextManager[None]:
+    return timed_phase(DISCORD_PHASE)
+
+def timed_interaction(name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Decorates a command or component callback so that it's timed end to end and recorded in `metrics`.
+    Interactions handled from inside another timed one (like /join showing the hand) are part of the outer one
+
+    Args:
+        name (str): What to record the interaction as
+    """
+    def decorator(function: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs) -> T:
+            outer_timer = current_timer.get()
+            if outer_timer is not None and not outer_timer.finished:
+                return await function(*args, **kwargs)
+
+            timer = InteractionTimer(name, get_channel_id(args))
+            token = current_timer.set(timer)
+            try:
+                return await _TimedSteps(function(*args, **kwargs), timer)
+            finally:
+                timer.finish()
+                current_timer.reset(token)
+                metrics.add(timer)
+        return wrapper
+    return decorator
+
+class _TimedSteps:
+
+    def __init__(self, coroutine: Coroutine[Any, Any, T], timer: InteractionTimer) -> None:
+        """
+        Awaits the coroutine one step at a time, marking its timer as the running interaction during each step
+        """
+        self.coroutine = coroutine
+        self.timer = timer
+
+    def __await__(self) -> Generator[Any, Any, T]:
+        return _run_steps(self.coroutine, self.timer)
+
+def _run_steps(coroutine: Coroutine[Any, Any, T], timer: InteractionTimer) -> Generator[Any, Any, T]:
+    """
+    Does what `yield from coroutine` does, but sets _running_timer while the coroutine runs, and puts it back whenever it waits
+    """
+    global _running_timer
+    value, error = None, None
+    while True:
+        outer_timer = _running_timer
+        _running_timer = timer
+        try:
+            if error is not None:
+                yielded = coroutine.throw(error)
+            else:
+                yielded = coroutine.send(value)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            _running_timer = outer_timer
+
+        try:
+            value, error = (yield yielded), None
+        except GeneratorExit:
+            coroutine.close()
+            raise
+        except BaseException as thrown:
+            # Cancellation, mostly
+            value, error = None, thrown
+
+def get_channel_id(args: tuple) -> int | None:
+    """
+    Finds the channel id of the context or interaction in a callback's arguments
+    """
+    for arg in args:
+        channel_id = getattr(arg, "channel_id", None)
+        if isinstance(channel_id, int):
+            return channel_id
+    return None
@@ -0,0 +1,224 @@
+from dataclasses import dataclass, field # type: ignore (pylance shadow stdlib issues)
+from collections import Counter # type: ignore (pylance shadow stdlib issues)
+import argparse # type: ignore (pylance shadow stdlib issues)
+import asyncio # type: ignore (pylance shadow stdlib issues)
+import random # type: ignore (pylance shadow stdlib issues)
+import time # type: ignore (pylance shadow stdlib issues)
+
+from bot.fake_discord import FakeDiscordAPI, FakeChannel, FakeUser, FakeInteraction, FakeApplicationContext, FakeMessage, INTERACTION_RESPONSE_TIMEOUT
+from bot.component_ids import ComponentRoute, PLAY_CARD_ACTION, DRAW_ACTION, CHOOSE_COLOR_ACTION
+from bot.global_game_info import current_games, game_actors, render_scheduler
+from unogame.game import UnoGame, UnoStates
+from unogame.move import MoveTypes
+
+# Drives game_support.py through the fake Discord API with lots of simulated players at once, to measure how many
+# interactions the bot layer handles per second and how long players wait, before a release.
+# Needs py-cord installed (for the embeds and views), but never connects to Discord.
+#   python -m bot.load_test --players 2000
+
+# Player ids start here, so they look like Discord ids rather than computer players
+FIRST_PLAYER_ID = 10 ** 17
+
+@dataclass
+class LoadTestReport:
+    players: int
+    games: int
+    duration: float = 0.0
+    interactions: int = 0
+    # Time from clicking to the last response, in seconds, by interaction
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    errors: Counter[str] = field(default_factory=Counter)
+    games_finished: int = 0
+    # Moves the UI has no component for (like passing), which were made on the game directly to keep it going
+    engine_moves: int = 0
+    api_calls: int = 0
+    rate_limit_waits: int = 0
+    late_responses: int = 0
+
+    @property
+    def interactions_per_second(self) -> float:
+        return self.interactions / self.duration if self.duration > 0 else 0.0
+
+    def get_percentiles(self, name: str | None = None) -> tuple[float, float, float]:
+        """
+        Returns the p50, p95, and p99 latency in milliseconds, for one kind of interaction or all of them
+        """
+        samples = sorted(self.latencies.get(name, []) if name is not None else [latency for values in self.latencies.values() for latency in values])
+        if len(samples) == 0:
+            return (0.0, 0.0, 0.0)
+        return tuple(samples[round(fraction * (len(samples) - 1))] * 1000 for fraction in (0.5, 0.95, 0.99))  # type: ignore - always three values
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.players} players in {self.games} games, {self.games_finished} finished, in {self.duration:.1f}s",
+            f"{self.interactions} interactions ({self.interactions_per_second:.1f}/s), {self.engine_moves} moves made outside the UI",
+            f"{self.api_calls} API calls, {self.rate_limit_waits} rate limit waits, {self.late_responses} responses after {INTERACTION_RESPONSE_TIMEOUT:.0f}s",
+            "latency p50/p95/p99 ms: " + " / ".join([f"{value:.0f}" for value in self.get_percentiles()]),
+        ]
+        for name in sorted(self.latencies):
+            lines.append(f"  {name:<16}{len(self.latencies[name]):>8} " + " / ".join([f"{value:.0f}" for value in self.get_percentiles(name)]))
+        for error, count in self.errors.most_common():
+            lines.append(f"  error {error}: {count}")
+        return "\n".join(lines)
+
+
+class SimulatedPlayer:
+
+    def __init__(self, api: FakeDiscordAPI, channel: FakeChannel, game: UnoGame, user: FakeUser, report: LoadTestReport,
+            rng: random.Random, think_time: float) -> None:
+        self.api = api
+        self.channel = channel
+        self.game = game
+        self.user = user
+        self.report = report
+        self.rng = rng
+        self.think_time = think_time
+
+    async def timed(self, name: str, coroutine) -> None:
+        """
+        Runs an interaction, recording how long it took or what went wrong
+        """
+        start = time.perf_counter()
+        try:
+            await coroutine
+        except Exception as error:
+            self.report.errors[f"{name}: {type(error).__name__}"] += 1
+        self.report.interactions += 1
+        self.report.latencies.setdefault(name, []).append(time.perf_counter() - start)
+
+    async def join(self) -> None:
+        import bot.game_support as game_support
+        await self.timed("join", game_support.run_join_command(FakeApplicationContext(self.api, self.channel, self.user)))
+
+    async def click(self, name: str, message: FakeMessage, custom_id: str, values: list[str] | None = None) -> None:
+        import bot.game_support as game_support
+        data = {"custom_id": custom_id, "values": values if values is not None else []}
+        await self.timed(name, game_support.dispatch_component(FakeInteraction(self.api, self.channel, self.user, message, data)))  # type: ignore - stands in for an Interaction
+
+    async def play(self, max_turns: int) -> None:
+        """
+        Clicks through the hand view until the game ends: opens the hand, then picks a card, draws, or picks a color
+        """
+        import bot.game_support as game_support
+
+        for _ in range(max_turns):
+            if self.game.state == UnoStates.PLAYER_WON:
+                return
+            await asyncio.sleep(self.think_time * (0.5 + self.rng.random()))
+
+            player = self.game.get_player(self.user.id)
+            if not self.game.is_players_turn(player):
+                continue
+
+            hand_interaction = FakeInteraction(self.api, self.channel, self.user)
+            await self.timed("hand", game_support.run_hand_command(hand_interaction))  # type: ignore - stands in for an Interaction
+
+            legal_moves = self.game.get_legal_moves(player)
+            if len(legal_moves) == 0:
+                continue
+            move_types = set([move.move_type for move in legal_moves])
+            color_buttons = find_components(hand_interaction, CHOOSE_COLOR_ACTION)
+            dropdowns = find_components(hand_interaction, PLAY_CARD_ACTION)
+            draw_buttons = find_components(hand_interaction, DRAW_ACTION)
+
+            if len(color_buttons) > 0 and MoveTypes.CHOOSE_COLOR in move_types:
+                await self.click("ColorButton", *self.rng.choice(color_buttons))
+            elif len(dropdowns) > 0 and MoveTypes.PLAY_CARD in move_types:
+                card = self.rng.choice([move.card for move in legal_moves if move.move_type == MoveTypes.PLAY_CARD])
+                await self.click("HandDropdown", *dropdowns[0], values=[str(card.card_id)])
+            elif len(draw_buttons) > 0 and MoveTypes.DRAW in move_types:
+                await self.click("HandButton", *draw_buttons[0])
+            else:
+                # Nothing in the UI does this, so do it directly to keep the game moving
+                self.game.make_move(self.rng.choice(legal_moves))
+                self.report.engine_moves += 1
+
+
+def find_components(interaction: FakeInteraction, action: str) -> list[tuple[FakeMessage, str]]:
+    """
+    Returns the (message, custom id) of every component for an action in the messages sent for an interaction
+    """
+    found = []
+    for message in interaction.messages:
+        if message.view is None or message.deleted:
+            continue
+        for item in message.view.children:
+            route = ComponentRoute.from_custom_id(item.custom_id)
+            if route is not None and route.action == action:
+                found.append((message, item.custom_id))
+    return found
+
+async def run_load_test(player_count: int = 1000, players_per_game: int = 4, max_turns: int = 200, think_time: float = 0.5,
+        api: FakeDiscordAPI | None = None, seed: int = 0) -> LoadTestReport:
+    """
+    Sets up games in fake channels, has every player join with /join and start with /start, then has them all play at once
+
+    Args:
+        player_count (int): How many players to simulate
+        players_per_game (int): How many players share each game
+        max_turns (int): Each player stops after this many turns of thinking, even if their game isn't over
+        think_time (float): About how long players wait between clicks, in seconds
+        api (FakeDiscordAPI | None): The fake API, for setting latency and rate limits. Defaults to FakeDiscordAPI's defaults
+        seed (int): Seeds the games and the players' choices
+
+    Returns:
+        LoadTestReport: What happened
+    """
+    import bot.game_support as game_support
+
+    api = api if api is not None else FakeDiscordAPI(rng=random.Random(seed))
+    rng = random.Random(seed)
+    game_count = max(1, player_count // players_per_game)
+    report = LoadTestReport(player_count, game_count)
+
+    start = time.perf_counter()
+    channels: list[FakeChannel] = []
+    players: list[SimulatedPlayer] = []
+    try:
+        for game_index in range(game_count):
+            channel = FakeChannel(api)
+            channels.append(channel)
+            game = UnoGame(seed=seed + game_index)
+            current_games[channel.id] = game
+            seats = players_per_game if game_index < game_count - 1 else player_count - players_per_game * (game_count - 1)
+            for _ in range(seats):
+                user = FakeUser(FIRST_PLAYER_ID + len(players))
+                players.append(SimulatedPlayer(api, channel, game, user, report, random.Random(rng.getrandbits(64)), think_time))
+
+        await asyncio.gather(*[player.join() for player in players])
+        for channel in channels:
+            starter = FakeApplicationContext(api, channel, FakeUser(FIRST_PLAYER_ID))
+            await players[0].timed("start", game_support.run_start_game_command(starter))  # type: ignore - stands in for an ApplicationContext
+
+        await asyncio.gather(*[player.play(max_turns) for player in players])
+        # Moves return before the messages they change are updated
+        await render_scheduler.flush()
+    finally:
+        report.duration = time.perf_counter() - start
+        report.games_finished = sum([1 for channel in channels if current_games[channel.id].state == UnoStates.PLAYER_WON])
+        for channel in channels:
+            current_games.pop(channel.id, None)
+            actor = game_actors.pop(channel.id, None)
+            if actor is not None:
+                actor.stop()
+        api.cancel_pending_deletes()
+        report.api_calls = sum(api.calls.values())
+        report.rate_limit_waits = api.rate_limit_waits
+        report.late_responses = api.late_responses
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the bot's game commands against a fake Discord API")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--players-per-game", type=int, default=4)
+    parser.add_argument("--max-turns", type=int, default=200)
+    parser.add_argument("--think-time", type=float, default=0.5)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds each API call takes")
+    parser.add_argument("--rate-limit", type=float, default=50.0, help="API calls per second before calls have to wait, 0 for no limit")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    fake_api = FakeDiscordAPI(latency=arguments.latency, rate_limit=arguments.rate_limit if arguments.rate_limit > 0 else None,
+        rng=random.Random(arguments.seed))
+    print(asyncio.run(run_load_test(arguments.players, arguments.players_per_game, arguments.max_turns, arguments.think_time, fake_api, arguments.seed)))
@@ -0,0 +1,144 @@
+from dataclasses import dataclass, field # type: ignore (pylance shadow stdlib issues)
+from collections import deque # type: ignore (pylance shadow stdlib issues)
+import asyncio # type: ignore (pylance shadow stdlib issues)
+import logging # type: ignore (pylance shadow stdlib issues)
+import sys # type: ignore (pylance shadow stdlib issues)
+import threading # type: ignore (pylance shadow stdlib issues)
+import time # type: ignore (pylance shadow stdlib issues)
+import traceback # type: ignore (pylance shadow stdlib issues)
+
+from bot.interaction_metrics import get_running_timer
+from unogame.instrumentation import LatencyHistogram
+
+# How often the loop is checked
+LAG_CHECK_INTERVAL = 0.25
+# The loop counts as stalled once it's been stuck on one thing for this long
+STALL_THRESHOLD = 0.1
+# Stack samples taken during one stall, at most
+MAX_STALL_SAMPLES = 5
+# Stalls kept for looking at later
+MAX_STALLS = 50
+# Frames kept in each stack sample
+STACK_LIMIT = 30
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class LoopStall:
+    started_at: float
+    # Filled in once the loop gets going again
+    duration: float | None = None
+    # The interaction whose code was running when the stall was noticed, if any
+    interaction_name: str | None = None
+    channel_id: int | None = None
+    # Formatted stacks of the loop thread, taken while it was stuck
+    stack_samples: list[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        duration = f"{round(self.duration * 1000)}ms" if self.duration is not None else "ongoing"
+        source = f"{self.interaction_name} in channel {self.channel_id}" if self.interaction_name is not None else "no interaction"
+        return f"Event loop stalled for {duration} ({source})\n" + (self.stack_samples[-1] if len(self.stack_samples) > 0 else "")
+
+
+class LoopLagMonitor:
+
+    def __init__(self, interval: float = LAG_CHECK_INTERVAL, stall_threshold: float = STALL_THRESHOLD) -> None:
+        """
+        Measures event loop lag: a background task sleeps for `interval` over and over,
+        and anything past that before it wakes up is time the loop was busy with something else.
+
+        A watchdog thread also checks on the loop, since a stuck loop can't notice that it's stuck. When the loop hasn't
+        woken up `stall_threshold` seconds after it should have, the watchdog takes samples of the loop thread's stack and
+        notes which interaction (and so which game) was running, to find which code paths hold up every guild
+
+        Args:
+            interval (float): How often to check, in seconds
+            stall_threshold (float): How late the loop needs to be to count as stalled, in seconds
+        """
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.histogram = LatencyHistogram()
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls: deque[LoopStall] = deque(maxlen=MAX_STALLS)
+        self.stall_count = 0
+
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        # When the checking task should next wake up, or None if it isn't waiting
+        self._expected_time: float | None = None
+        self._current_stall: LoopStall | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop_watchdog = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """
+        Starts checking in the background. Needs to be called from the running loop
+        """
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._task = self._loop.create_task(self._run())
+
+        self._stop_watchdog.clear()
+        self._watchdog = threading.Thread(target=self._run_watchdog, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._stop_watchdog.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+        self._expected_time = None
+
+    def add_lag(self, lag: float) -> None:
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.histogram.add(int(lag * 1e9))
+
+    async def _run(self) -> None:
+        while True:
+            self._expected_time = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - self._expected_time)
+            self._expected_time = None
+            self.add_lag(lag)
+
+            stall = self._current_stall
+            if stall is not None:
+                self._current_stall = None
+                stall.duration = lag
+                logger.warning(str(stall))
+
+    def _run_watchdog(self) -> None:
+        # Checks often enough to catch a stall soon after it passes the threshold
+        check_interval = min(self.interval, self.stall_threshold) / 2
+        while not self._stop_watchdog.wait(check_interval):
+            expected_time = self._expected_time
+            if expected_time is None or time.perf_counter() - expected_time < self.stall_threshold:
+                continue
+
+            stall = self._current_stall
+            if stall is None:
+                stall = LoopStall(started_at=expected_time)
+                interaction_timer = get_running_timer()
+                if interaction_timer is not None:
+                    stall.interaction_name = interaction_timer.name
+                    stall.channel_id = interaction_timer.channel_id
+                self._current_stall = stall
+                self.stalls.append(stall)
+                self.stall_count += 1
+
+            if len(stall.stack_samples) < MAX_STALL_SAMPLES:
+                frame = sys._current_frames().get(self._loop_thread_id)  # type: ignore - the loop thread is always running
+                if frame is not None:
+                    stall.stack_samples.append("".join(traceback.format_stack(frame, STACK_LIMIT)))
@@ -0,0 +1,79 @@
+from typing import Callable
+
+from unogame.game import UnoGame
+
+# How many players are shown after the current one (in the direction of play), and before
+DEFAULT_PLAYERS_AHEAD = 6
+DEFAULT_PLAYERS_BEHIND = 3
+
+class PlayerListRenderer:
+
+    def __init__(self, game: UnoGame, players_ahead: int = DEFAULT_PLAYERS_AHEAD, players_behind: int = DEFAULT_PLAYERS_BEHIND) -> None:
+        """
+        Renders a game's player list for its lobby message. Big games only show the players around whoever's turn it is,
+        so the list stays the same size however many players there are. Each player's line is kept until their card count changes,
+        so an update only rebuilds the lines of players whose hands changed
+
+        Args:
+            game (UnoGame): The game
+            players_ahead (int): How many players to show who are next to play
+            players_behind (int): How many players to show who just played
+        """
+        self.game = game
+        self.players_ahead = players_ahead
+        self.players_behind = players_behind
+        # player_id -> (card count, line)
+        self._lines: dict[int, tuple[int, str]] = {}
+        # How many lines have been built, rather than reused
+        self.built_count = 0
+
+    def get_line(self, player_id: int, card_count: int, mention: Callable[[int], str]) -> str:
+        cached = self._lines.get(player_id)
+        if cached is not None and cached[0] == card_count:
+            return cached[1]
+        line = f"{mention(player_id)} - Cards: {card_count}"
+        self._lines[player_id] = (card_count, line)
+        self.built_count += 1
+        return line
+
+    def get_window(self) -> list[int]:
+        """
+        Returns the indices of the players to show, in seat order. Everyone, if there aren't too many
+        """
+        game = self.game
+        player_count = len(game.players)
+        if player_count <= self.players_ahead + self.players_behind + 1:
+            return list(range(player_count))
+        # Seat order runs backwards while reversed, so ahead is to the left instead of the right
+        before, after = (self.players_ahead, self.players_behind) if game.reversed else (self.players_behind, self.players_ahead)
+        return [(game.turn_index + offset) % player_count for offset in range(-before, after + 1)]
+
+    def render(self, mention: Callable[[int], str], show_turn: bool = True) -> str:
+        """
+        Renders the player list
+
+        Args:
+            mention (Callable[[int], str]): Turns a player id into how the player is shown
+            show_turn (bool): Whether to mark whose turn it is. Before the game starts, the first players are shown instead
+
+        Returns:
+            str: The player list, one player per line
+        """
+        game = self.game
+        if show_turn:
+            window = self.get_window()
+        else:
+            window = list(range(min(len(game.players), self.players_ahead + self.players_behind + 1)))
+
+        lines = []
+        for index in window:
+            player = game.players[index]
+            line = self.get_line(player.player_id, len(player.hand), mention)
+            if show_turn and index == game.turn_index:
+                line = f"__{line}__ {'↓' if not game.reversed else '↑'}"
+            lines.append(line)
+
+        hidden_count = len(game.players) - len(window)
+        if hidden_count > 0:
+            lines.append(f"...and {hidden_count} more ({len(game.players)} players, {sum([len(player.hand) for player in game.players])} cards in hands)")
+        return "\n".join(lines)
@@ -0,0 +1,60 @@
+from typing import Awaitable, Callable, Hashable
+import asyncio # type: ignore (pylance shadow stdlib issues)
+import contextvars # type: ignore (pylance shadow stdlib issues)
+import logging # type: ignore (pylance shadow stdlib issues)
+
+logger = logging.getLogger(__name__)
+
+class RenderScheduler:
+
+    def __init__(self) -> None:
+        """
+        Runs message updates in the background, so interactions can finish as soon as their move is made.
+        Updates are keyed by what they update (a lobby or hand message for example). Only one update per key runs at a time,
+        and a new update replaces any that's still waiting for the same key, so a busy game sends its latest state
+        instead of every state in between
+        """
+        # key -> the newest update waiting to run
+        self._pending: dict[Hashable, Callable[[], Awaitable[object]]] = {}
+        # key -> the task running updates for it
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self.superseded_count = 0
+        self.failed_count = 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def schedule(self, key: Hashable, render: Callable[[], Awaitable[object]]) -> None:
+        """
+        Runs an update in the background, after any update already running for the same key
+
+        Args:
+            key (Hashable): What the update updates
+            render (Callable[[], Awaitable[object]]): Does the update
+        """
+        if key in self._pending:
+            self.superseded_count += 1
+        self._pending[key] = render
+        if key not in self._tasks:
+            # A fresh context, so updates aren't counted as part of the interaction that scheduled them
+            self._tasks[key] = asyncio.get_running_loop().create_task(self._run(key), context=contextvars.Context())
+
+    async def flush(self) -> None:
+        """
+        Waits until every scheduled update has run
+        """
+        while len(self._tasks) > 0:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def _run(self, key: Hashable) -> None:
+        try:
+            while key in self._pending:
+                render = self._pending.pop(key)
+                try:
+                    await render()
+                except Exception:
+                    self.failed_count += 1
+                    logger.exception(f"Update for {key} failed")
+        finally:
+            del self._tasks[key]
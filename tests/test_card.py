@@ -103,4 +103,49 @@ def test_can_be_jumped_in():
 
     assert not test_card_four.can_be_jumped_in(test_top_card)
 
-    assert test_card_five.can_be_jumped_in(test_top_wild)
\ No newline at end of file
+    assert test_card_five.can_be_jumped_in(test_top_wild)
+
+def test_card_id():
+    """
+    Tests that Card.card_id is shared by equal cards, unique otherwise, and used as the hash
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    assert Card(CardColors.RED, CardFaces.FOUR).card_id == Card(CardColors.RED, CardFaces.FOUR).card_id
+    assert Card(CardColors.RED, CardFaces.FOUR).card_id != Card(CardColors.BLUE, CardFaces.FOUR).card_id
+
+    all_ids = {Card(color, face).card_id for color in CardColors for face in CardFaces}
+    assert len(all_ids) == len(CardColors) * len(CardFaces)
+
+    # Equal cards need equal hashes
+    assert hash(Card(CardColors.WILD, CardFaces.WILD)) == hash(Card(CardColors.WILD, CardFaces.WILD))
+    assert len({Card(CardColors.RED, CardFaces.FOUR), Card(CardColors.RED, CardFaces.FOUR)}) == 1
+
+
+def test_from_string():
+    """
+    Tests that Card.from_string reads cards from their strings or card ids, and turns away anything else
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    for color in CardColors:
+        for face in CardFaces:
+            card = Card(color, face)
+            assert Card.from_string(str(card)) == card
+            assert Card.from_string(str(card.card_id)) is Card.from_string(str(card))
+
+    assert Card.from_string("red five").return_to_discard
+    # Colored wilds only come from choosing a color, so they never go back in the deck
+    assert not Card.from_string("green plus_four").return_to_discard
+    assert Card.from_string("black plus_four").return_to_discard
+
+    for string in ["", "red", "red  five", "purple five", "75", "-1", "red five "]:
+        try:
+            Card.from_string(string)
+            raise AssertionError(f"from_string should have raised a ValueError for {string!r}")
+        except ValueError:
+            pass
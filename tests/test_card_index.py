@@ -0,0 +1,94 @@
+from unogame.card_index import CardLocationIndex
+from unogame.card import Card, CardColors, CardFaces
+from unogame.player import Player
+
+def test_add_and_remove_card():
+    """
+    Tests that CardLocationIndex.add_card and CardLocationIndex.remove_card track holders and copy counts correctly
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    test_index = CardLocationIndex()
+
+    test_index.add_card(0, Card(CardColors.RED, CardFaces.FOUR))
+    test_index.add_card(0, Card(CardColors.RED, CardFaces.FOUR))
+    test_index.add_card(1, Card(CardColors.RED, CardFaces.FOUR))
+
+    assert test_index.get_holders(Card(CardColors.RED, CardFaces.FOUR)) == {0, 1}
+    assert test_index.get_holders(Card(CardColors.BLUE, CardFaces.FOUR)) == set()
+
+    # Player 0 has two copies, so they should still hold one after playing one
+    test_index.remove_card(0, Card(CardColors.RED, CardFaces.FOUR))
+    assert test_index.get_holders(Card(CardColors.RED, CardFaces.FOUR)) == {0, 1}
+
+    test_index.remove_card(0, Card(CardColors.RED, CardFaces.FOUR))
+    assert test_index.get_holders(Card(CardColors.RED, CardFaces.FOUR)) == {1}
+
+    # Removing a card that isn't tracked shouldn't do anything
+    test_index.remove_card(0, Card(CardColors.RED, CardFaces.FOUR))
+    test_index.remove_card(2, Card(CardColors.GREEN, CardFaces.SKIP))
+    assert test_index.get_holders(Card(CardColors.RED, CardFaces.FOUR)) == {1}
+
+    # Empty entries should be cleaned up
+    test_index.remove_card(1, Card(CardColors.RED, CardFaces.FOUR))
+    assert test_index.holders == {}
+
+
+def test_hands_and_rebuild():
+    """
+    Tests that CardLocationIndex.add_hand, CardLocationIndex.remove_hand, and CardLocationIndex.rebuild work correctly
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    player_0 = Player(0)
+    player_1 = Player(1)
+
+    player_0.hand = [Card(CardColors.RED, CardFaces.FOUR), Card(CardColors.WILD, CardFaces.WILD)]
+    player_1.hand = [Card(CardColors.WILD, CardFaces.WILD), Card(CardColors.BLUE, CardFaces.NINE)]
+
+    test_index = CardLocationIndex()
+    test_index.add_hand(player_0.player_id, player_0.hand)
+    test_index.add_hand(player_1.player_id, player_1.hand)
+
+    assert test_index.get_holders(Card(CardColors.WILD, CardFaces.WILD)) == {0, 1}
+
+    test_index.remove_hand(player_0.player_id, player_0.hand)
+
+    assert test_index.get_holders(Card(CardColors.WILD, CardFaces.WILD)) == {1}
+    assert test_index.get_holders(Card(CardColors.RED, CardFaces.FOUR)) == set()
+
+    # Rebuilding should give the same result as adding every hand
+    test_index.rebuild([player_0, player_1])
+
+    assert test_index.get_holders(Card(CardColors.WILD, CardFaces.WILD)) == {0, 1}
+    assert test_index.get_holders(Card(CardColors.RED, CardFaces.FOUR)) == {0}
+    assert test_index.get_holders(Card(CardColors.BLUE, CardFaces.NINE)) == {1}
+
+
+def test_move_holders():
+    """
+    Tests that CardLocationIndex.move_holders moves whole hands between players, including around in a circle
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    players = [Player(0), Player(1), Player(2)]
+    players[0].hand = [Card(CardColors.RED, CardFaces.FOUR), Card(CardColors.RED, CardFaces.FOUR)]
+    players[1].hand = [Card(CardColors.WILD, CardFaces.WILD)]
+    players[2].hand = [Card(CardColors.WILD, CardFaces.WILD), Card(CardColors.BLUE, CardFaces.NINE)]
+
+    test_index = CardLocationIndex()
+    test_index.rebuild(players)
+    test_index.move_holders({0: 1, 1: 2, 2: 0})
+
+    # Passing the hands along by hand should give the same index
+    players[0].hand, players[1].hand, players[2].hand = players[2].hand, players[0].hand, players[1].hand
+    expected_index = CardLocationIndex()
+    expected_index.rebuild(players)
+    assert test_index.holders == expected_index.holders
+    assert test_index.holders[Card(CardColors.RED, CardFaces.FOUR).card_id] == {1: 2}
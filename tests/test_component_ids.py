@@ -0,0 +1,40 @@
+from bot.component_ids import ComponentRoute, PLAY_CARD_ACTION, CHOOSE_COLOR_ACTION, MAX_CUSTOM_ID_LENGTH, get_hand_version
+from unogame.card import Card
+
+def test_component_route():
+    """
+    Tests that ComponentRoute survives being turned into a custom id and back, and leaves other custom ids alone
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    route = ComponentRoute(CHOOSE_COLOR_ACTION, 2 ** 64 - 1, 10 ** 19, 2 ** 32 - 1, "RED")
+    custom_id = route.to_custom_id()
+    assert len(custom_id) <= MAX_CUSTOM_ID_LENGTH
+    assert ComponentRoute.from_custom_id(custom_id) == route
+    assert ComponentRoute.from_custom_id(ComponentRoute(PLAY_CARD_ACTION, 0, 5, 0).to_custom_id()) == ComponentRoute(PLAY_CARD_ACTION, 0, 5, 0)
+
+    for other_id in [None, "", "a1b2c3", "uno:play:1:2", "uno:play:x!:2:3:", "notuno:play:1:2:3:"]:
+        assert ComponentRoute.from_custom_id(other_id) is None
+
+    try:
+        ComponentRoute(PLAY_CARD_ACTION, 0, 0, 0, "x" * MAX_CUSTOM_ID_LENGTH).to_custom_id()
+        raise AssertionError("to_custom_id should have raised a ValueError")
+    except ValueError:
+        pass
+
+
+def test_hand_version():
+    """
+    Tests that get_hand_version changes when the hand does
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    hand = [Card.from_string("red five"), Card.from_string("blue seven")]
+    version = get_hand_version(hand)
+    assert get_hand_version(list(hand)) == version
+    assert get_hand_version(hand[:1]) != version
+    assert get_hand_version(hand + [Card.from_string("green one")]) != version
@@ -0,0 +1,70 @@
+from unogame.conformance import run_conformance, run_game, shrink, replay_moves
+from unogame.game import UnoGame, UnoRules, RulesKey
+from unogame.card import CardColors, CardFaces
+from unogame.player import Player
+
+class BrokenGame(UnoGame):
+    """
+    Forgets to pass the turn after a blue five
+    """
+    def play_card_move(self, player: Player, card, allow_mismatch_play: bool = False) -> None:
+        turn_index = self.turn_index
+        super().play_card_move(player, card, allow_mismatch_play)
+        if card.color == CardColors.BLUE and card.face == CardFaces.FIVE:
+            self.turn_index = turn_index
+
+def create_broken_game(rules: UnoRules, seed: int) -> UnoGame:
+    return BrokenGame(rules, seed=seed, record=False)
+
+
+def test_engines_agree():
+    """
+    Tests that UnoGame agrees with ReferenceUnoGame on random games, both in this process and in worker processes
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    report = run_conformance(60, processes=1)
+    assert report.games == 60
+    assert report.moves > 1000
+    assert report.divergences == [], str(report.divergences[0])
+
+    report = run_conformance(20, first_seed=1000, processes=2)
+    assert report.games == 20
+    assert report.divergences == [], str(report.divergences[0])
+
+
+def test_divergences_are_found_and_shrunk():
+    """
+    Tests that a broken engine is caught, and that the divergence is shrunk to a small reproduction that still diverges
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    report = run_conformance(200, processes=1, max_divergences=1, candidate_factory=create_broken_game)
+    assert len(report.divergences) == 1
+    divergence = report.divergences[0]
+
+    # The last move is the blue five
+    last_move = divergence.moves[-1]
+    assert last_move.card is not None and last_move.card.color == CardColors.BLUE and last_move.card.face == CardFaces.FIVE
+    assert replay_moves(divergence.seed, divergence.rules_key, divergence.player_count, divergence.moves,
+        candidate_factory=create_broken_game) is not None
+    assert "State part" in str(divergence)
+
+    # None of the moves or rules left can be removed
+    for i in range(len(divergence.moves) - 1):
+        assert replay_moves(divergence.seed, divergence.rules_key, divergence.player_count, divergence.moves[:i] + divergence.moves[i + 1:],
+            candidate_factory=create_broken_game) is None
+    for bit in range(16):
+        if divergence.rules_key.flags & (1 << bit):
+            rules_key = RulesKey(divergence.rules_key.flags & ~(1 << bit), divergence.rules_key.starting_hand_size, 1)
+            assert replay_moves(divergence.seed, rules_key, divergence.player_count, divergence.moves, candidate_factory=create_broken_game) is None
+
+    # The same seed gives the same divergence, which shrinks the same way
+    _, repeated = run_game(divergence.seed, candidate_factory=create_broken_game)
+    assert repeated is not None
+    assert len(repeated.moves) >= len(divergence.moves)
+    assert shrink(repeated, candidate_factory=create_broken_game).moves == divergence.moves
@@ -0,0 +1,199 @@
+from unogame.determinize import HiddenHandSampler
+from unogame.game import UnoGame, UnoRules, UnoStates
+from unogame.card import Card, CardColors, CardFaces, CARDS_BY_ID
+
+from array import array
+import random
+
+def hidden_cards(game: UnoGame, observer_id: int) -> list[str]:
+    """
+    Every card the observer can't see, sorted
+    """
+    cards = game.deck.draw_pile + [card for player in game.players if player.player_id != observer_id for card in player.hand]
+    return sorted(str(card) for card in cards)
+
+def check_sampler(game: UnoGame, sampler: HiddenHandSampler) -> None:
+    """
+    Checks that the sampler's unseen and known cards add up to the real hidden cards, and that known cards are really there
+    """
+    unseen_cards = [str(CARDS_BY_ID[card_id]) for card_id, count in enumerate(sampler.unseen_counts) for _ in range(count)]
+    known_cards = []
+    for player_id, card_ids in sampler.known_cards.items():
+        hand = [str(card) for card in game.get_player(player_id).hand]
+        for card_id in card_ids:
+            assert str(CARDS_BY_ID[card_id]) in hand
+            hand.remove(str(CARDS_BY_ID[card_id]))
+            known_cards.append(str(CARDS_BY_ID[card_id]))
+
+    assert sorted(unseen_cards + known_cards) == hidden_cards(game, sampler.observer_id)
+    assert sampler.unseen_total == len(unseen_cards)
+
+
+def test_determinize():
+    """
+    Tests that HiddenHandSampler.determinize only reshuffles the cards the observer can't see
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    rng = random.Random(32)
+    test_game = UnoGame()
+    for player_id in range(4):
+        test_game.create_player(player_id)
+    test_game.start_game()
+
+    sampler = HiddenHandSampler.from_game(test_game, 2)
+    check_sampler(test_game, sampler)
+
+    for _ in range(5):
+        test_determinization = sampler.determinize(test_game, rng)
+
+        # The observer's hand, every hand size, and the visible cards stay the same
+        assert test_determinization.get_player(2).hand == test_game.get_player(2).hand
+        assert [len(player.hand) for player in test_determinization.players] == [len(player.hand) for player in test_game.players]
+        assert test_determinization.deck.top_card == test_game.deck.top_card
+        assert test_determinization.deck.discard_pile == test_game.deck.discard_pile
+
+        # No cards were made up or lost
+        assert hidden_cards(test_determinization, 2) == hidden_cards(test_game, 2)
+
+        # Derived state is rebuilt for the new hands
+        state_hash = test_determinization.get_state_hash()
+        test_determinization.rehash()
+        assert test_determinization.get_state_hash() == state_hash
+        holders = test_determinization.card_index.holders
+        test_determinization.rebuild_card_index()
+        assert test_determinization.card_index.holders == holders
+
+    # A sampler that doesn't match the game is caught
+    test_game.players[0].hand.append(Card(CardColors.RED, CardFaces.ONE))
+    try:
+        sampler.determinize(test_game, rng)
+        raise AssertionError("determinize should have raised a ValueError")
+    except ValueError:
+        pass
+
+
+def test_sample_batch():
+    """
+    Tests that HiddenHandSampler.sample_batch fills a preallocated array with valid deals that actually vary
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    rng = random.Random(32)
+    test_game = UnoGame()
+    for player_id in range(3):
+        test_game.create_player(player_id)
+    test_game.start_game()
+
+    sampler = test_game.get_hand_sampler(0)
+    deal_size = sampler.unseen_total
+    unseen_card_ids = sorted(card_id for card_id, count in enumerate(sampler.unseen_counts) for _ in range(count))
+
+    out = array("B", bytes(200 * deal_size))
+    deals = sampler.sample_batch(test_game, 200, rng, out)
+    assert deals is out
+
+    first_hands = set()
+    for deal_index in range(200):
+        deal = deals[deal_index * deal_size:(deal_index + 1) * deal_size]
+        assert sorted(deal) == unseen_card_ids
+        first_hands.add(tuple(sorted(deal[:7])))
+
+        # Any deal can be turned into a game
+        if deal_index < 3:
+            test_determinization = sampler.determinize(test_game, rng, deal)
+            assert [str(card) for card in test_determinization.players[1].hand] == [str(CARDS_BY_ID[card_id]) for card_id in deal[:7]]
+
+    assert len(first_hands) > 150
+
+    try:
+        sampler.sample_batch(test_game, 201, rng, out)
+        raise AssertionError("sample_batch should have raised a ValueError")
+    except ValueError:
+        pass
+
+
+def test_tracking():
+    """
+    Tests that samplers from UnoGame.get_hand_sampler stay correct through random games,
+    and remember the cards seen in seven swaps and zero rotations
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    rng = random.Random(32)
+
+    for _ in range(8):
+        test_game = UnoGame(UnoRules(jump_ins=True, stacking=True, draw_until_can_play=False, seven_swap_hands=True, zero_rotate_hands=True))
+        for player_id in range(rng.randrange(2, 5)):
+            test_game.create_player(player_id)
+        test_game.start_game()
+
+        samplers = [test_game.get_hand_sampler(player.player_id) for player in test_game.players]
+
+        for _ in range(150):
+            legal_moves = []
+            for player in test_game.players:
+                legal_moves += test_game.get_legal_moves(player)
+            if len(legal_moves) == 0:
+                break
+
+            try:
+                test_game.make_move(rng.choice(legal_moves))
+            # The deck can run dry with everyone holding lots of cards
+            except IndexError:
+                break
+
+            for sampler in samplers:
+                check_sampler(test_game, sampler)
+
+            if test_game.state == UnoStates.PLAYER_WON:
+                break
+
+        # Samplers still produce valid deals
+        for sampler in samplers:
+            test_determinization = sampler.determinize(test_game, rng)
+            assert hidden_cards(test_determinization, sampler.observer_id) == hidden_cards(test_game, sampler.observer_id)
+
+    # Swapping hands tells both players exactly what the other is holding
+    test_game = UnoGame(UnoRules(seven_swap_hands=True))
+    for player_id in range(3):
+        test_game.create_player(player_id)
+    test_game.start_game()
+    sampler = test_game.get_hand_sampler(0)
+    old_hand = [card.card_id for card in test_game.players[0].hand]
+
+    test_game.players[0].hand.append(Card(CardColors.RED, CardFaces.SEVEN))
+    test_game.deck.top_card = Card(CardColors.RED, CardFaces.ONE)
+    test_game.rebuild_card_index()
+    test_game.rehash()
+    sampler.rebuild(test_game)
+
+    test_game.play_card_move(test_game.players[0], Card(CardColors.RED, CardFaces.SEVEN))
+    test_game.seven_swap_move(test_game.players[0], 2)
+    assert sorted(sampler.known_cards[2]) == sorted(old_hand)
+    check_sampler(test_game, sampler)
+
+    # The known cards stay with player 2 in every determinization
+    for _ in range(5):
+        test_determinization = sampler.determinize(test_game, rng)
+        assert sorted(card.card_id for card in test_determinization.players[2].hand) == sorted(old_hand)
+
+    # Cards shuffled back into the draw pile are unseen again
+    test_game = UnoGame(UnoRules(force_play=False, draw_until_can_play=False))
+    test_game.create_player(0)
+    test_game.create_player(1)
+    test_game.start_game()
+    test_game.deck.discard_pile += test_game.deck.draw_pile
+    test_game.deck.draw_pile = []
+    sampler = test_game.get_hand_sampler(1)
+    assert sampler.unseen_total == 7
+
+    test_game.draw_card_move(test_game.players[0])
+    check_sampler(test_game, sampler)
+    assert sampler.unseen_total == len(test_game.deck.draw_pile) + 8
@@ -0,0 +1,36 @@
+from bot.edit_cache import EditCache, hash_message
+
+def test_edit_cache():
+    """
+    Tests that EditCache skips edits that wouldn't change a message, and forgets the oldest messages when it's full
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    embed = {"title": "Hand", "fields": [{"name": "Cards", "value": "R1 B2"}]}
+    components = [{"type": 1, "components": [{"type": 2, "label": "Draw", "custom_id": "a1b2"}]}]
+    # A new view makes up new custom ids, but looks the same
+    same_components = [{"type": 1, "components": [{"custom_id": "c3d4", "label": "Draw", "type": 2}]}]
+    content_hash = hash_message(embed=embed, components=components)
+    assert hash_message(embed=dict(reversed(embed.items())), components=same_components) == content_hash
+    assert hash_message(embed={"title": "Hand", "fields": [{"name": "Cards", "value": "R1"}]}, components=components) != content_hash
+    assert hash_message(embed=embed) != content_hash
+
+    cache = EditCache(max_messages=2)
+    assert not cache.is_unchanged(1, content_hash)
+    cache.remember(1, content_hash)
+    assert cache.is_unchanged(1, content_hash)
+    assert not cache.is_unchanged(1, hash_message(embed=embed))
+    assert cache.skipped_count == 1 and cache.sent_count == 1
+
+    # Message 1 was used more recently than 2, so 2 is the one forgotten
+    cache.remember(2, content_hash)
+    assert cache.is_unchanged(1, content_hash)
+    cache.remember(3, content_hash)
+    assert len(cache) == 2
+    assert not cache.is_unchanged(2, content_hash)
+    assert cache.is_unchanged(3, content_hash)
+
+    cache.forget(3)
+    assert not cache.is_unchanged(3, content_hash)
@@ -0,0 +1,91 @@
+from bot.fake_discord import FakeDiscordAPI, FakeChannel, FakeUser, FakeInteraction, FakeApplicationContext, NotFound, InteractionResponded
+
+import asyncio
+import time
+
+class FakeView:
+    message = None
+
+
+def test_fake_interactions():
+    """
+    Tests that the fake Discord API keeps messages, responses, and followups the way Discord does
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    api = FakeDiscordAPI(latency=0.001, jitter=0, rate_limit=None)
+    channel = FakeChannel(api)
+    user = FakeUser(5)
+
+    async def run_test():
+        ctx = FakeApplicationContext(api, channel, user)
+        assert ctx.channel_id == channel.id and ctx.author is user
+
+        # respond sends the first response, then followups
+        view = FakeView()
+        sent = await ctx.respond("hi", view=view)
+        followup = await ctx.respond("again", ephemeral=True, delete_after=0.01)
+        assert view.message is (await sent.original_response())
+        assert len(ctx.interaction.messages) == 2
+        assert view.message.id in channel.messages
+        # Only the user can see ephemeral messages
+        assert followup.id not in channel.messages
+
+        try:
+            await ctx.response.send_message("twice")
+            raise AssertionError("send_message should have raised an InteractionResponded")
+        except InteractionResponded:
+            pass
+
+        # Messages can be edited, fetched, and deleted
+        message = await channel.send("lobby", delete_after=0.02)
+        await message.edit(content="edited", view=None)
+        assert (await channel.fetch_message(message.id)).content == "edited"
+        await asyncio.sleep(0.05)
+        assert followup.deleted and message.deleted
+        try:
+            await channel.fetch_message(message.id)
+            raise AssertionError("fetch_message should have raised a NotFound")
+        except NotFound:
+            pass
+
+        # Component interactions point at the message that was clicked
+        component_interaction = FakeInteraction(api, channel, user, view.message)
+        await component_interaction.response.defer()
+        assert component_interaction.response.is_done()
+        try:
+            await component_interaction.original_response()
+            raise AssertionError("original_response should have raised a NotFound")
+        except NotFound:
+            pass
+
+    asyncio.run(run_test())
+    assert api.calls["interaction_response"] == 2
+    assert api.calls["followup"] == 1
+    assert api.calls["delete_message"] == 2
+    assert api.late_responses == 0
+
+
+def test_fake_rate_limit():
+    """
+    Tests that the fake Discord API makes calls wait once they go over the rate limit
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    api = FakeDiscordAPI(latency=0, jitter=0, rate_limit=100, burst=10)
+    channel = FakeChannel(api)
+
+    async def run_test():
+        await asyncio.gather(*[channel.send("spam") for _ in range(30)])
+
+    start = time.perf_counter()
+    asyncio.run(run_test())
+    # 10 go through straight away, then the other 20 wait their turn at 100 per second
+    assert 0.18 <= time.perf_counter() - start < 0.5
+    assert api.rate_limit_waits == 20
+    assert 1.9 < api.rate_limit_wait_seconds < 2.2
+    assert len(channel.messages) == 30
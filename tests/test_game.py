@@ -2,6 +2,11 @@ from unogame.game import UnoGame, UnoRules, UnoStates, OutOfTurnError, OutOfCard
 from unogame.player import Player
 from unogame.card import Card, CardColors, CardFaces
 from unogame.deck import DeckManager
+from unogame.card_index import CardLocationIndex
+from unogame.move import UnoMove, MoveTypes
+from unogame.replay import GameReplayer
+from unogame.events import (GameEvent, CardPlayed, CardsDrawn, ColorChosen, HandsSwapped, HandsRotated, StackChanged,
+    DirectionReversed, TurnAdvanced, PlayerWon)
 
 def test_constructor():
     """
@@ -1214,4 +1219,486 @@ def test_seven_swap():
         test_game.play_card_move(player_1, Card(CardColors.GREEN, CardFaces.SEVEN))
         raise AssertionError("seven_swap_move should have raised an OutOfTurnError")
     except OutOfTurnError:
-        pass 
\ No newline at end of file
+        pass 
+
+def test_card_index_and_jump_in_players():
+    """
+    Tests that UnoGame.card_index is kept up to date by moves, and that UnoGame.get_jump_in_player_ids
+    finds the players who can jump in
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    def index_matches_hands(game: UnoGame) -> bool:
+        expected = CardLocationIndex()
+        expected.rebuild(game.players)
+        return expected.holders == game.card_index.holders
+
+    test_game = UnoGame()
+
+    test_game.create_player(0)
+    test_game.create_player(1)
+    test_game.create_player(2)
+
+    # Drawing hands should have filled in the index
+    assert index_matches_hands(test_game)
+
+    # Now set up specific hands, which means the index has to be rebuilt
+    player_0 = test_game.get_player(0)
+    player_1 = test_game.get_player(1)
+    player_2 = test_game.get_player(2)
+
+    player_0.hand = [Card(CardColors.GREEN, CardFaces.EIGHT), Card(CardColors.GREEN, CardFaces.SEVEN), Card(CardColors.GREEN, CardFaces.ZERO), Card(CardColors.RED, CardFaces.ONE)]
+    player_1.hand = [Card(CardColors.GREEN, CardFaces.EIGHT), Card(CardColors.GREEN, CardFaces.NINE)]
+    player_2.hand = [Card(CardColors.GREEN, CardFaces.EIGHT), Card(CardColors.WILD, CardFaces.WILD), Card(CardColors.BLUE, CardFaces.FIVE)]
+    test_game.rebuild_card_index()
+
+    test_game.deck.top_card = Card(CardColors.GREEN, CardFaces.EIGHT)
+
+    # Jump-ins are off by default, and the game hasn't started
+    assert test_game.get_jump_in_player_ids() == set()
+    test_game.ruleset.jump_ins = True
+    assert test_game.get_jump_in_player_ids() == set()
+
+    test_game.start_game()
+
+    # Player 0 would just be playing normally, so only 1 and 2 count
+    assert test_game.get_jump_in_player_ids() == {1, 2}
+
+    test_game.play_card_move(player_2, Card(CardColors.GREEN, CardFaces.EIGHT))
+    assert index_matches_hands(test_game)
+    # Player 2 is now the one whose turn it is (then play moves on to player 0)
+    assert test_game.turn_index == 0
+    assert test_game.get_jump_in_player_ids() == {1}
+
+    # Draws should be tracked too
+    test_game.ruleset.force_play = False
+    test_game.draw_card_move(player_0)
+    assert index_matches_hands(test_game)
+    test_game.pass_turn_move(player_0)
+
+    # Put player 0's hand back to something known, since they drew a random card
+    player_0.hand = [Card(CardColors.GREEN, CardFaces.SEVEN), Card(CardColors.GREEN, CardFaces.ZERO), Card(CardColors.RED, CardFaces.ONE)]
+    test_game.rebuild_card_index()
+
+    # Wild top cards can't be jumped in on, but colored wilds can be matched by wilds
+    test_game.play_card_move(player_1, Card(CardColors.GREEN, CardFaces.NINE))
+    test_game.deck.top_card = Card(CardColors.WILD, CardFaces.WILD)
+    assert test_game.get_jump_in_player_ids() == set()
+    test_game.deck.top_card = Card(CardColors.RED, CardFaces.WILD, return_to_discard=False)
+    assert test_game.turn_index == 2
+    assert test_game.get_jump_in_player_ids() == set()
+    test_game.turn_index = 0
+    assert test_game.get_jump_in_player_ids() == {2}
+
+    # Swaps and rotations move hands between players
+    test_game.ruleset.seven_swap_hands = True
+    test_game.ruleset.zero_rotate_hands = True
+    test_game.turn_index = 0
+    test_game.deck.top_card = Card(CardColors.GREEN, CardFaces.ONE)
+
+    test_game.play_card_move(player_0, Card(CardColors.GREEN, CardFaces.SEVEN))
+    test_game.seven_swap_move(player_0, 2)
+    assert index_matches_hands(test_game)
+
+    test_game.turn_index = 2
+    player_2.hand.append(Card(CardColors.GREEN, CardFaces.ZERO))
+    test_game.rebuild_card_index()
+    test_game.play_card_move(player_2, Card(CardColors.GREEN, CardFaces.ZERO))
+    test_game.zero_rotate_move(player_2, True)
+    assert index_matches_hands(test_game)
+    # Both ways round
+    test_game.reversed = not test_game.reversed
+    test_game.turn_index = 2
+    player_2.hand.append(Card(CardColors.GREEN, CardFaces.ZERO))
+    test_game.rebuild_card_index()
+    test_game.deck.top_card = Card(CardColors.GREEN, CardFaces.ONE)
+    test_game.play_card_move(player_2, Card(CardColors.GREEN, CardFaces.ZERO))
+    test_game.zero_rotate_move(player_2, True)
+    assert index_matches_hands(test_game)
+
+    # Removing a player takes their cards out of the index
+    test_game.remove_player(1)
+    assert index_matches_hands(test_game)
+
+
+def test_rules_key():
+    """
+    Tests that UnoRules.to_key and RulesKey.to_rules convert back and forth correctly, and that keys can be used as dict keys
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    test_rules = UnoRules()
+
+    assert test_rules.to_key() == UnoRules().to_key()
+    assert test_rules.to_key().to_rules() == test_rules
+
+    # Calling to_key again without changes should give the cached key
+    assert test_rules.to_key() is test_rules.to_key()
+
+    test_rules.stacking = True
+    test_rules.zero_rotate_hands = True
+    test_rules.number_of_decks = 3
+
+    test_key = test_rules.to_key()
+
+    assert test_key != UnoRules().to_key()
+    assert test_key.has_rule("stacking")
+    assert test_key.has_rule("zero_rotate_hands")
+    assert not test_key.has_rule("jump_ins")
+    assert test_key.number_of_decks == 3
+
+    # Round trip
+    assert test_key.to_rules() == test_rules
+    assert test_key.to_rules().to_key() == test_key
+
+    # Equal rules should share a cache entry
+    cache = {test_key: "cached"}
+    assert cache[UnoRules(stacking=True, zero_rotate_hands=True, number_of_decks=3).to_key()] == "cached"
+
+    # Changing a rule back should give an equal key again
+    test_rules.stacking = False
+    test_rules.zero_rotate_hands = False
+    test_rules.number_of_decks = 1
+    assert test_rules.to_key() == UnoRules().to_key()
+
+
+def full_game_summary(game: UnoGame) -> tuple:
+    """
+    Everything about a game that moves can change, in an easy to compare form
+    """
+    return (
+        [(player.player_id, [str(card) for card in player.hand]) for player in game.players],
+        [str(card) for card in game.deck.draw_pile],
+        [str(card) for card in game.deck.discard_pile],
+        str(game.deck.top_card),
+        game.turn_index,
+        game.current_stack,
+        game.reversed,
+        game.state,
+        {card_id: holders.copy() for card_id, holders in game.card_index.holders.items()},
+    )
+
+
+def test_clone():
+    """
+    Tests that UnoGame.clone makes a copy that can be changed without affecting the original
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    test_game = UnoGame()
+    test_game.create_player(0)
+    test_game.create_player(1)
+    test_game.start_game()
+
+    original_summary = full_game_summary(test_game)
+    test_clone = test_game.clone()
+
+    assert full_game_summary(test_clone) == original_summary
+    assert type(test_clone) == UnoGame
+
+    # Play a bunch of moves on the clone
+    for _ in range(20):
+        current_player = test_clone.players[test_clone.turn_index]
+        legal_moves = test_clone.get_legal_moves(current_player)
+        if len(legal_moves) == 0:
+            break
+        test_clone.make_move(legal_moves[0])
+
+    assert full_game_summary(test_clone) != original_summary
+    assert full_game_summary(test_game) == original_summary
+
+    # The cards themselves should be shared
+    # (apart from colored wilds, which are made when the color is picked)
+    assert (test_clone.deck.top_card is test_game.deck.top_card or not test_clone.deck.top_card.return_to_discard or
+        test_clone.deck.top_card in test_game.deck.draw_pile + [card for player in test_game.players for card in player.hand])
+
+
+def test_legal_moves_apply_and_undo():
+    """
+    Tests that every move from UnoGame.get_legal_moves can be made, and that UnoGame.undo puts the game back
+    exactly how it was after UnoGame.apply, across random games with random rules
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    import random
+    rng = random.Random(29)
+
+    for _ in range(10):
+        test_game = UnoGame()
+        for name in ["jump_ins", "stacking", "jump_ins_stack", "stack_plus_fours_on_plus_twos", "force_play", "draw_until_can_play",
+                "seven_swap_hands", "force_seven_swap", "zero_rotate_hands", "force_zero_rotate"]:
+            setattr(test_game.ruleset, name, rng.random() < 0.5)
+
+        for player_id in range(rng.randrange(2, 5)):
+            test_game.create_player(player_id)
+        test_game.start_game()
+
+        for _ in range(40):
+            summary = full_game_summary(test_game)
+
+            all_legal_moves = []
+            for player in test_game.players:
+                legal_moves = test_game.get_legal_moves(player)
+                all_legal_moves += legal_moves
+
+                # Any card in the hand that isn't listed should be rejected
+                legal_cards = [move.card for move in legal_moves if move.move_type == MoveTypes.PLAY_CARD]
+                for card in player.hand:
+                    if card not in legal_cards:
+                        try:
+                            test_game.apply(UnoMove(MoveTypes.PLAY_CARD, player.player_id, card=card))
+                            raise AssertionError(f"{card} should not have been playable")
+                        except (OutOfTurnError, InvalidCardPlayedError):
+                            pass
+                        assert full_game_summary(test_game) == summary
+
+            if len(all_legal_moves) == 0:
+                break
+
+            # Every legal move should work and be undoable
+            for move in all_legal_moves:
+                test_game.apply(move)
+                test_game.undo()
+                assert full_game_summary(test_game) == summary, str(move)
+
+            test_game.apply(rng.choice(all_legal_moves))
+
+            if test_game.state == UnoStates.PLAYER_WON:
+                break
+
+    # Nothing left to undo
+    test_game = UnoGame()
+    try:
+        test_game.undo()
+        raise AssertionError("undo should have raised an IndexError")
+    except IndexError:
+        pass
+
+
+def test_state_hash():
+    """
+    Tests that UnoGame.get_state_hash is kept up to date by moves and undos, matches a full rehash,
+    and changes when the state changes
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    import random
+    rng = random.Random(30)
+
+    def full_hash(game: UnoGame) -> int:
+        copy = game.clone()
+        copy.rehash()
+        return copy.get_state_hash()
+
+    for _ in range(8):
+        test_game = UnoGame()
+        for name in ["jump_ins", "stacking", "seven_swap_hands", "zero_rotate_hands", "draw_until_can_play"]:
+            setattr(test_game.ruleset, name, rng.random() < 0.5)
+
+        for player_id in range(rng.randrange(2, 5)):
+            test_game.create_player(player_id)
+        test_game.start_game()
+        assert test_game.get_state_hash() == full_hash(test_game)
+
+        for _ in range(40):
+            legal_moves = []
+            for player in test_game.players:
+                legal_moves += test_game.get_legal_moves(player)
+            if len(legal_moves) == 0:
+                break
+
+            state_hash = test_game.get_state_hash()
+            for move in legal_moves:
+                test_game.apply(move)
+                assert test_game.get_state_hash() == full_hash(test_game), str(move)
+                test_game.undo()
+                assert test_game.get_state_hash() == state_hash, str(move)
+
+            test_game.apply(rng.choice(legal_moves))
+            assert test_game.get_state_hash() == full_hash(test_game)
+
+            if test_game.state == UnoStates.PLAYER_WON:
+                break
+
+    # Equal games hash the same, and any change to the state changes the hash
+    test_game = UnoGame()
+    test_game.create_player(0)
+    test_game.create_player(1)
+    test_game.start_game()
+    test_game.deck.top_card = Card(CardColors.RED, CardFaces.ONE)
+    test_game.players[0].hand = [Card(CardColors.RED, CardFaces.TWO), Card(CardColors.BLUE, CardFaces.TWO)]
+    test_game.players[1].hand = [Card(CardColors.GREEN, CardFaces.TWO)]
+    test_game.rehash()
+
+    assert test_game.clone().get_state_hash() == test_game.get_state_hash()
+
+    # Same cards held by different players
+    swapped_game = test_game.clone()
+    swapped_game.players[0].hand, swapped_game.players[1].hand = [Card(CardColors.GREEN, CardFaces.TWO)], [Card(CardColors.RED, CardFaces.TWO), Card(CardColors.BLUE, CardFaces.TWO)]
+    swapped_game.rehash()
+    assert swapped_game.get_state_hash() != test_game.get_state_hash()
+
+    state_hash = test_game.get_state_hash()
+    test_game.reversed = not test_game.reversed
+    assert test_game.get_state_hash() != state_hash
+    test_game.reversed = not test_game.reversed
+    test_game.turn_index = 1
+    assert test_game.get_state_hash() != state_hash
+    test_game.turn_index = 0
+    test_game.current_stack = 2
+    assert test_game.get_state_hash() != state_hash
+    test_game.current_stack = 0
+    test_game.deck.top_card = Card(CardColors.RED, CardFaces.THREE)
+    assert test_game.get_state_hash() != state_hash
+
+
+def test_events():
+    """
+    Tests that moves send the right events to subscribers, in order, and that clones and unsubscribed callbacks get nothing
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    test_game = UnoGame(UnoRules(force_play=False, draw_until_can_play=False, stacking=True, jump_ins=True))
+    for player_id in range(3):
+        test_game.create_player(player_id)
+    test_game.start_game()
+    player_0, player_1, player_2 = test_game.players
+
+    events: list[GameEvent] = []
+    test_game.subscribe(events.append)
+    turn_events: list[GameEvent] = []
+    test_game.subscribe(turn_events.append, TurnAdvanced)
+
+    # Reverse: the card, the direction, then the turn
+    player_0.hand = [Card(CardColors.RED, CardFaces.REVERSE), Card(CardColors.RED, CardFaces.ONE)]
+    test_game.deck.top_card = Card(CardColors.RED, CardFaces.FIVE)
+    test_game.rebuild_card_index()
+    test_game.rehash()
+    test_game.play_card_move(player_0, Card(CardColors.RED, CardFaces.REVERSE))
+    assert events == [CardPlayed(0, Card(CardColors.RED, CardFaces.REVERSE), False), DirectionReversed(True), TurnAdvanced(0, 2, 2)]
+    assert turn_events == [TurnAdvanced(0, 2, 2)]
+
+    # Plus two: the card, the stack, then the turn
+    events.clear()
+    player_2.hand = [Card(CardColors.RED, CardFaces.PLUS_TWO), Card(CardColors.BLUE, CardFaces.ONE)]
+    test_game.rebuild_card_index()
+    test_game.rehash()
+    test_game.play_card_move(player_2, Card(CardColors.RED, CardFaces.PLUS_TWO))
+    assert events == [CardPlayed(2, Card(CardColors.RED, CardFaces.PLUS_TWO), False), StackChanged(0, 2), TurnAdvanced(2, 1, 1)]
+
+    # Accepting the stack: the cards drawn, the stack, then the turn
+    events.clear()
+    hand_size = len(player_1.hand)
+    test_game.draw_card_move(player_1)
+    assert events == [CardsDrawn(1, tuple(player_1.hand[hand_size:])), StackChanged(2, 0), TurnAdvanced(1, 0, 0)]
+    assert len(player_1.hand) == hand_size + 2
+
+    # Jump-ins say so
+    events.clear()
+    player_2.hand = [Card(CardColors.RED, CardFaces.PLUS_TWO), Card(CardColors.BLUE, CardFaces.ONE)]
+    test_game.rebuild_card_index()
+    test_game.rehash()
+    test_game.play_card_move(player_2, Card(CardColors.RED, CardFaces.PLUS_TWO))
+    assert events[0] == CardPlayed(2, Card(CardColors.RED, CardFaces.PLUS_TWO), True)
+    test_game.draw_card_move(test_game.players[test_game.turn_index])
+
+    # Wilds: the card, then the color, then the turn
+    events.clear()
+    player = test_game.players[test_game.turn_index]
+    player.hand = [Card(CardColors.WILD, CardFaces.WILD), Card(CardColors.BLUE, CardFaces.ONE)]
+    test_game.rebuild_card_index()
+    test_game.rehash()
+    test_game.play_card_move(player, Card(CardColors.WILD, CardFaces.WILD))
+    assert events == [CardPlayed(player.player_id, Card(CardColors.WILD, CardFaces.WILD), False)]
+    previous_turn_index = test_game.turn_index
+    test_game.choose_color_move(player, CardColors.BLUE)
+    assert events[1:] == [ColorChosen(player.player_id, CardColors.BLUE),
+        TurnAdvanced(previous_turn_index, test_game.turn_index, test_game.players[test_game.turn_index].player_id)]
+
+    # Winning
+    events.clear()
+    player = test_game.players[test_game.turn_index]
+    player.hand = [Card(CardColors.BLUE, CardFaces.THREE)]
+    test_game.rebuild_card_index()
+    test_game.rehash()
+    test_game.play_card_move(player, Card(CardColors.BLUE, CardFaces.THREE))
+    assert events[0] == CardPlayed(player.player_id, Card(CardColors.BLUE, CardFaces.THREE), False)
+    assert events[-1] == PlayerWon(player.player_id)
+
+    # Clones don't send events, and unsubscribed callbacks don't get them
+    test_game = UnoGame(UnoRules(seven_swap_hands=True, zero_rotate_hands=True, force_play=False))
+    for player_id in range(3):
+        test_game.create_player(player_id)
+    test_game.start_game()
+    events = []
+    test_game.subscribe(events.append, HandsSwapped, HandsRotated)
+
+    test_game.state = UnoStates.WAITING_FOR_PICK_PLAYER_TO_SWAP
+    test_game.clone().seven_swap_move(test_game.players[0], 1)
+    assert events == []
+    test_game.seven_swap_move(test_game.players[0], 1)
+    assert events == [HandsSwapped(0, 1)]
+
+    test_game.state = UnoStates.WAITING_FOR_CHOOSE_TO_ROTATE
+    test_game.zero_rotate_move(test_game.players[1], True)
+    assert events == [HandsSwapped(0, 1), HandsRotated(False)]
+
+    test_game.unsubscribe(events.append)
+    test_game.state = UnoStates.WAITING_FOR_PICK_PLAYER_TO_SWAP
+    test_game.seven_swap_move(test_game.players[2], 0)
+    assert len(events) == 2
+
+    try:
+        test_game.unsubscribe(events.append)
+        raise AssertionError("unsubscribe should have raised a ValueError")
+    except ValueError:
+        pass
+
+
+def test_scale_decks():
+    """
+    Tests that scale_decks adds decks as players join, and that the game still replays the same
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    # Without it, one deck runs out
+    test_game = UnoGame(seed=5)
+    try:
+        for player_id in range(100):
+            test_game.create_player(player_id)
+        raise AssertionError("create_player should have raised an OutOfCardsError")
+    except OutOfCardsError:
+        pass
+
+    test_game = UnoGame(UnoRules(scale_decks=True), seed=5)
+    for player_id in range(10):
+        test_game.create_player(player_id)
+    assert test_game.ruleset.number_of_decks == 1
+    test_game.create_player(10)
+    assert test_game.ruleset.number_of_decks == 2
+    for player_id in range(11, 100):
+        test_game.create_player(player_id)
+    assert test_game.ruleset.number_of_decks == 10
+    # Every card of every deck is somewhere
+    assert len(test_game.deck) + 1 + sum([len(player.hand) for player in test_game.players]) == 108 * 10
+    test_game.start_game()
+
+    assert test_game.record is not None
+    replayed_game = GameReplayer(test_game.record).play_to_end()
+    assert replayed_game.ruleset.to_key() == test_game.ruleset.to_key()
+    assert replayed_game.get_state_hash() == test_game.get_state_hash()
+    assert replayed_game.deck.draw_pile == test_game.deck.draw_pile
@@ -0,0 +1,80 @@
+from bot.game_actor import GameActor, GameBusyError
+from unogame.game import UnoGame, UnoRules, OutOfTurnError
+
+import asyncio
+
+def create_test_game() -> UnoGame:
+    test_game = UnoGame(UnoRules(force_play=False, draw_until_can_play=False))
+    for player_id in range(3):
+        test_game.create_player(player_id)
+    test_game.start_game()
+    return test_game
+
+
+def test_game_actor():
+    """
+    Tests that GameActor runs commands one at a time in order, passes errors back, tells when renders are out of date,
+    and turns commands away when it's full
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    test_game = create_test_game()
+    actor = GameActor(test_game, max_queue_depth=4)
+    other_actor = GameActor(create_test_game(), max_queue_depth=4)
+    order = []
+
+    def draw(player_index: int):
+        def command(game: UnoGame):
+            order.append(player_index)
+            game.draw_card_move(game.players[player_index])
+            # What the caller renders is from right after its own move
+            return game.turn_index, game.get_state_hash()
+        return command
+
+    async def run_test():
+        turn_index = test_game.turn_index
+        results = await asyncio.gather(*[actor.submit(draw((turn_index + i) % 3)) for i in range(3)], return_exceptions=True)
+        assert order == [turn_index, (turn_index + 1) % 3, (turn_index + 2) % 3]
+        assert [result[0] for result in results] == [(turn_index + 1) % 3, (turn_index + 2) % 3, turn_index]
+        # Only the last render is still up to date
+        assert [actor.is_superseded(result[1]) for result in results] == [True, True, False]
+
+        # A move that fails after one that went through doesn't make the first one's render out of date
+        turn_index = test_game.turn_index
+        results = await asyncio.gather(actor.submit(draw(turn_index)), actor.submit(draw(turn_index)), return_exceptions=True)
+        assert isinstance(results[1], OutOfTurnError)
+        assert not actor.is_superseded(results[0][1])
+
+        # Errors go back to whoever submitted the command
+        try:
+            await actor.submit(draw((test_game.turn_index + 1) % 3))
+            raise AssertionError("submit should have raised an OutOfTurnError")
+        except OutOfTurnError:
+            pass
+
+        # Only 4 can wait, the rest are told the game is busy, and other games aren't held up
+        submissions = [asyncio.ensure_future(actor.submit(lambda game: game.turn_index)) for _ in range(6)]
+        other_result = await other_actor.submit(lambda game: "other")
+        results = await asyncio.gather(*submissions, return_exceptions=True)
+        assert other_result == "other"
+        assert sum([isinstance(result, GameBusyError) for result in results]) == 2
+        assert results[:4] == [test_game.turn_index] * 4
+
+        # The actor stops when there's nothing to do, and starts again when there is
+        await asyncio.sleep(0)
+        assert actor._task is None or actor._task.done()
+        assert await actor.submit(lambda game: len(game.players)) == 3
+
+        # Stopping cancels anything waiting
+        waiting = asyncio.ensure_future(actor.submit(lambda game: None))
+        await asyncio.sleep(0)
+        actor.stop()
+        try:
+            await waiting
+            raise AssertionError("the waiting command should have been cancelled")
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run_test())
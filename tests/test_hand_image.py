@@ -0,0 +1,78 @@
+from bot.hand_image import HandImageRenderer, SpriteAtlas, AtlasError, BACK_SPRITE, write_atlas
+from unogame.card import Card
+
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+
+def read_png(png: bytes) -> tuple[int, int, bytes]:
+    """
+    Returns the width, height, and RGBA pixels of a PNG made by encode_png
+    """
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+    width, height = struct.unpack(">II", png[16:24])
+    position = 8
+    data = b""
+    while position < len(png):
+        length = struct.unpack(">I", png[position:position + 4])[0]
+        chunk_type = png[position + 4:position + 8]
+        chunk = png[position + 8:position + 8 + length]
+        assert struct.unpack(">I", png[position + 8 + length:position + 12 + length])[0] == zlib.crc32(chunk_type + chunk)
+        if chunk_type == b"IDAT":
+            data += chunk
+        position += 12 + length
+    raw = zlib.decompress(data)
+    stride = width * 4 + 1
+    return width, height, b"".join([raw[row * stride + 1:(row + 1) * stride] for row in range(height)])
+
+
+def test_hand_image():
+    """
+    Tests that HandImageRenderer draws hands from the atlas, overlapping cards, and remembers hands whatever order they're in
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    # Every sprite is 3x2 and filled with its own index, so it's easy to see which is where
+    sprites = [bytes([index, index, index, 255]) * 6 for index in range(BACK_SPRITE + 1)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        atlas_path = Path(directory) / "atlas.bin"
+        write_atlas(atlas_path, 3, 2, sprites)
+        renderer = HandImageRenderer(SpriteAtlas(atlas_path), max_size=2, cards_per_row=2)
+
+        red_five = Card.from_string("red five")
+        blue_seven = Card.from_string("blue seven")
+        name, png = renderer.render([red_five, blue_seven, red_five])
+        width, height, pixels = read_png(png)
+        # Two cards in the first row, one step (a third of a card) apart, then one in the next row
+        assert (width, height) == (4, 4)
+        first, second = sorted([red_five.card_id, blue_seven.card_id])
+        assert pixels[0] == first and pixels[4] == second and pixels[12] == second
+        assert pixels[2 * 16] == red_five.card_id and pixels[2 * 16 + 12 + 3] == 0
+
+        # The same cards in any order are the same image
+        assert renderer.render([red_five, red_five, blue_seven]) == (name, png)
+        assert renderer.hits == 1 and renderer.misses == 1
+        assert renderer.render([red_five])[0] != name
+
+        # Empty hands show the back of a card
+        _, _, pixels = read_png(renderer.render([])[1])
+        assert pixels[0] == BACK_SPRITE
+        assert len(renderer) == 2
+        renderer.atlas.close()  # type: ignore - the atlas was given above
+
+        (Path(directory) / "bad.bin").write_bytes(b"not an atlas at all")
+        try:
+            SpriteAtlas(Path(directory) / "bad.bin")
+            raise AssertionError("SpriteAtlas should have raised an AtlasError")
+        except AtlasError:
+            pass
+
+    try:
+        HandImageRenderer().render([red_five])
+        raise AssertionError("render should have raised an AtlasError")
+    except AtlasError:
+        pass
@@ -0,0 +1,55 @@
+from bot.hand_pages import HandPageCache, build_hand_pages, MAX_SELECT_OPTIONS, MAX_FIELD_LENGTH
+from unogame.card import Card
+from unogame.deck import DeckManager
+
+import random
+
+def test_build_hand_pages():
+    """
+    Tests that build_hand_pages groups duplicate cards and splits big hands into pages that fit Discord's limits
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    hand = [Card.from_string("red five"), Card.from_string("blue seven"), Card.from_string("red five")]
+    pages = build_hand_pages(hand)
+    assert len(pages) == 1
+    assert pages[0].cards == ((Card.from_string("red five"), 2), (Card.from_string("blue seven"), 1))
+    assert pages[0].text == f"{Card.from_string('red five').get_emoji_mention()} x2, {Card.from_string('blue seven').get_emoji_mention()}"
+
+    assert len(build_hand_pages([])) == 1 and build_hand_pages([])[0].cards == ()
+
+    # Several decks' worth of cards, more than fits on one page
+    deck = DeckManager(4, random.Random(0))
+    big_hand = [deck.draw_card() for _ in range(300)]
+    pages = build_hand_pages(big_hand)
+    assert len(pages) > 1
+    for page in pages:
+        assert 0 < len(page.cards) <= MAX_SELECT_OPTIONS
+        assert len(page.text) <= MAX_FIELD_LENGTH
+    # Every card is on exactly one page
+    assert sum([count for page in pages for _, count in page.cards]) == 300
+    assert len(set([card for page in pages for card, _ in page.cards])) == sum([len(page.cards) for page in pages])
+
+
+def test_hand_page_cache():
+    """
+    Tests that HandPageCache only builds pages for versions it hasn't seen, and forgets the least recently used
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    cache = HandPageCache(max_size=2)
+    hand = [Card.from_string("red five")]
+    pages = cache.get_pages(1, 2, 3, hand)
+    # The same version gives back the same pages, without looking at the hand
+    assert cache.get_pages(1, 2, 3, []) is pages
+    assert cache.get_pages(1, 2, 4, []) is not pages
+
+    cache.get_pages(1, 2, 3, hand)
+    cache.get_pages(1, 2, 5, hand)
+    assert len(cache) == 2
+    assert cache.get_pages(1, 2, 3, []) is pages
+    assert cache.get_pages(1, 2, 4, [])[0].cards == ()
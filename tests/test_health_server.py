@@ -0,0 +1,165 @@
+from bot.health_server import HealthServer, RateLimitCounter, estimate_game_memory
+from bot.interaction_metrics import timed_interaction
+from bot.loop_monitor import LoopLagMonitor
+from unogame.game import UnoGame, UnoRules
+from unogame.instrumentation import disable_instrumentation, enable_instrumentation
+
+import asyncio
+import logging
+import time
+
+def test_render_metrics():
+    """
+    Tests that HealthServer.render_metrics reports games by state, moves, engine latency, memory, rate limits, and readiness
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    games = {}
+    for channel_id in range(3):
+        games[channel_id] = UnoGame(UnoRules(force_play=False, draw_until_can_play=False))
+        games[channel_id].create_player(0)
+        games[channel_id].create_player(1)
+    games[0].start_game()
+
+    ready = [True]
+    health_server = HealthServer(games, lambda: ready[0])
+    enable_instrumentation(health_server.stats)
+    try:
+        for _ in range(3):
+            games[0].draw_card_move(games[0].players[games[0].turn_index])
+    finally:
+        disable_instrumentation()
+
+    rate_limits = health_server.rate_limits
+    logger = logging.getLogger("discord.http")
+    logger.addHandler(rate_limits)
+    try:
+        logger.warning("We are being rate limited. Retrying in %.2f seconds. Handled under the bucket \"%s\"", 1.5, "abc")
+        logger.warning("Something else")
+    finally:
+        logger.removeHandler(rate_limits)
+
+    metrics_page = health_server.render_metrics()
+    metrics = {}
+    for line in metrics_page.splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            metrics[name] = float(value)
+
+    assert metrics['uno_games{state="waiting_for_play"}'] == 1
+    assert metrics['uno_games{state="pregame"}'] == 2
+    assert metrics['uno_moves_total{operation="draw_card_move"}'] == 3
+    assert metrics['uno_engine_latency_seconds_count{operation="draw_card_move"}'] == 3
+    assert metrics['uno_engine_latency_seconds_bucket{operation="draw_card_move",le="+Inf"}'] == 3
+    assert metrics['discord_rate_limit_waits_total'] == 1
+    assert metrics['discord_rate_limit_wait_seconds_total'] == 1.5
+    assert metrics['uno_ready'] == 1
+    # Games that have been dealt have cards in hand
+    assert metrics['uno_game_memory_bytes{channel="0"}'] > 0
+    assert estimate_game_memory(games[0]) > estimate_game_memory(games[1]) * 0.5
+
+    # Histogram buckets are cumulative
+    bucket_counts = [value for name, value in metrics.items() if name.startswith('uno_engine_latency_seconds_bucket{operation="draw_card_move"')]
+    assert bucket_counts == sorted(bucket_counts)
+
+    # Scraping again doesn't change the counters
+    assert health_server.render_metrics().count('uno_moves_total{operation="draw_card_move"} 3') == 1
+
+    ready[0] = False
+    assert not health_server.is_ready()
+    assert "uno_ready 0" in health_server.render_metrics()
+
+
+def test_loop_lag_monitor():
+    """
+    Tests that LoopLagMonitor notices when something holds the event loop
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    lag_monitor = LoopLagMonitor(interval=0.01, stall_threshold=0.05)
+
+    async def run_test():
+        lag_monitor.start()
+        await asyncio.sleep(0.05)
+        # Block the loop
+        time.sleep(0.1)
+        await asyncio.sleep(0.05)
+        lag_monitor.stop()
+
+    asyncio.run(run_test())
+    assert not lag_monitor.running
+    assert lag_monitor.histogram.count >= 3
+    assert lag_monitor.max_lag >= 0.08
+    assert lag_monitor.last_lag < 0.08
+    # Nothing was running as an interaction
+    assert lag_monitor.stall_count == 1
+    assert lag_monitor.stalls[0].interaction_name is None
+
+
+def test_stall_capture():
+    """
+    Tests that LoopLagMonitor's watchdog catches a callback stalling the loop, with the callback's stack and game,
+    and doesn't blame an interaction that was only waiting while something else stalled the loop
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    class FakeContext:
+        channel_id = 42
+
+    def slow_engine_call():
+        time.sleep(0.3)
+
+    @timed_interaction("slow_command")
+    async def slow_command(ctx: FakeContext):
+        # Stalls partway through, after the interaction has already waited once
+        await asyncio.sleep(0.01)
+        slow_engine_call()
+
+    @timed_interaction("fast_command")
+    async def fast_command(ctx: FakeContext):
+        await asyncio.sleep(0.01)
+
+    lag_monitor = LoopLagMonitor(interval=0.02, stall_threshold=0.05)
+
+    async def run_test():
+        lag_monitor.start()
+        await asyncio.sleep(0.05)
+        await asyncio.gather(fast_command(FakeContext()), slow_command(FakeContext()), fast_command(FakeContext()))
+        await asyncio.sleep(0.05)
+        lag_monitor.stop()
+
+    asyncio.run(run_test())
+    assert lag_monitor.stall_count == 1
+    stall = lag_monitor.stalls[0]
+    assert stall.interaction_name == "slow_command"
+    assert stall.channel_id == 42
+    assert stall.duration is not None and stall.duration >= 0.25
+    assert 1 <= len(stall.stack_samples) <= 5
+    assert "slow_engine_call" in stall.stack_samples[0]
+    assert "slow_command" in str(stall)
+
+    @timed_interaction("waiting_command")
+    async def waiting_command(ctx: FakeContext):
+        await asyncio.sleep(0.5)
+
+    async def slow_background_work():
+        await asyncio.sleep(0.05)
+        slow_engine_call()
+
+    lag_monitor = LoopLagMonitor(interval=0.02, stall_threshold=0.05)
+
+    async def run_waiting_test():
+        lag_monitor.start()
+        await asyncio.gather(waiting_command(FakeContext()), slow_background_work())
+        lag_monitor.stop()
+
+    asyncio.run(run_waiting_test())
+    assert lag_monitor.stall_count == 1
+    assert lag_monitor.stalls[0].interaction_name is None
+    assert "slow_background_work" in lag_monitor.stalls[0].stack_samples[0]
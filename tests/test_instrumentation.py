@@ -0,0 +1,91 @@
+from unogame.instrumentation import EngineStats, LatencyHistogram, enable_instrumentation, disable_instrumentation, get_hand_size_bucket
+from unogame.game import UnoGame, UnoRules
+from unogame.card import Card, CardColors, CardFaces
+
+def test_histograms():
+    """
+    Tests that LatencyHistogram buckets latencies and estimates percentiles, and that hand sizes are bucketed
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    histogram = LatencyHistogram()
+    assert histogram.percentile(0.5) == 0
+    for elapsed_ns in [100] * 98 + [5000, 1_000_000]:
+        histogram.add(elapsed_ns)
+
+    assert histogram.count == 100
+    assert histogram.mean_ns == (9800 + 5000 + 1_000_000) / 100
+    # 100ns falls in the 64-128ns bucket
+    assert histogram.percentile(0.5) == 128
+    assert histogram.percentile(0.99) == 8192
+    assert histogram.percentile(1) == 1 << 20
+
+    assert [get_hand_size_bucket(hand_size) for hand_size in (0, 1, 2, 3, 4, 5, 7, 8, 15, 16, 100)] == \
+        ["0", "1", "2", "3-4", "3-4", "5-7", "5-7", "8-15", "8-15", "16+", "16+"]
+
+
+def test_instrumentation():
+    """
+    Tests that enabled instrumentation counts engine calls by operation, rules, and hand size, and that disabling it stops counting
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    test_game = UnoGame(UnoRules(force_play=False, draw_until_can_play=False))
+    test_game.create_player(0)
+    test_game.create_player(1)
+    test_game.start_game()
+    rule_flags = test_game.ruleset.to_key().flags
+
+    stats = enable_instrumentation()
+    try:
+        test_game.draw_card_move(test_game.players[test_game.turn_index])
+        player = test_game.players[test_game.turn_index]
+        player.hand = [Card(CardColors.WILD, CardFaces.WILD), Card(CardColors.RED, CardFaces.ONE)]
+        test_game.rebuild_card_index()
+        test_game.rehash()
+        test_game.play_card_move(player, Card(CardColors.WILD, CardFaces.WILD))
+        # Failed calls are counted too
+        try:
+            test_game.play_card_move(player, Card(CardColors.BLUE, CardFaces.ONE))
+        except Exception:
+            pass
+        player.has_card_to_play(test_game.deck.top_card)
+    finally:
+        disable_instrumentation()
+
+    assert stats.histograms[("draw_card_move", rule_flags, "5-7")].count == 1
+    assert stats.histograms[("play_card_move", rule_flags, "2")].count == 1
+    assert stats.histograms[("play_card_move", rule_flags, "1")].count == 1
+    assert stats.histograms[("has_card_to_play", None, "1")].count == 1
+
+    totals = stats.get_operation_totals()
+    assert totals["deck.draw_card"].count == 1
+    assert totals["deck.play_card"].count == 1
+    assert totals["play_card_move"].count == 2
+    assert "play_card_move" in stats.summary()
+
+    # Nothing is recorded once it's off
+    call_count = sum(histogram.count for histogram in stats.histograms.values())
+    test_game.players[0].has_card_to_play(test_game.deck.top_card)
+    assert sum(histogram.count for histogram in stats.histograms.values()) == call_count
+
+    # A single game can be measured on its own
+    game_stats = EngineStats()
+    other_game = UnoGame()
+    other_game.create_player(0)
+    test_game.stats = game_stats
+    test_game.players[0].has_card_to_play(test_game.deck.top_card)
+    try:
+        test_game.play_card_move(test_game.players[0], Card(CardColors.BLUE, CardFaces.ONE))
+    except Exception:
+        pass
+    try:
+        other_game.play_card_move(other_game.players[0], Card(CardColors.BLUE, CardFaces.ONE))
+    except Exception:
+        pass
+    assert list(game_stats.get_operation_totals()) == ["play_card_move"]
+    assert game_stats.get_operation_totals()["play_card_move"].count == 1
@@ -0,0 +1,88 @@
+from bot.interaction_metrics import InteractionMetrics, InteractionTimer, timed_interaction, engine_time, render_time, discord_time, metrics, \
+    TOTAL, ENGINE_PHASE, RENDER_PHASE, DISCORD_PHASE, OTHER_PHASE
+
+import asyncio
+import time
+
+def test_interaction_timer():
+    """
+    Tests that InteractionTimer splits time into phases that add up to the total, and that InteractionMetrics works out rolling percentiles
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    timer = InteractionTimer("test")
+    timer.enter_phase(DISCORD_PHASE)
+    time.sleep(0.01)
+    # Rendering inside a Discord call isn't counted as Discord time
+    timer.enter_phase(RENDER_PHASE)
+    time.sleep(0.02)
+    timer.exit_phase()
+    timer.exit_phase()
+    timer.finish()
+    # Nothing changes after the interaction is over
+    timer.enter_phase(ENGINE_PHASE)
+    timer.exit_phase()
+
+    assert sum(timer.phase_ns.values()) == timer.total_ns
+    assert timer.phase_ns[DISCORD_PHASE] >= 10_000_000
+    assert timer.phase_ns[RENDER_PHASE] >= 20_000_000
+    assert timer.phase_ns[DISCORD_PHASE] < timer.phase_ns[RENDER_PHASE]
+    assert timer.phase_ns[ENGINE_PHASE] == 0
+
+    test_metrics = InteractionMetrics(window=100)
+    assert test_metrics.get_percentiles() is None
+    for i in range(200):
+        sample = InteractionTimer("fast")
+        sample.end_ns = sample.start_ns + (i % 100 + 1) * 1_000_000
+        test_metrics.add(sample)
+    slow_sample = InteractionTimer("slow")
+    slow_sample.end_ns = slow_sample.start_ns + 500_000_000
+    test_metrics.add(slow_sample)
+
+    assert test_metrics.interaction_count == 201
+    assert len(test_metrics.latencies[TOTAL]) == 100
+    p50, p95, p99 = test_metrics.get_percentiles()  # type: ignore - there are samples
+    assert 50 <= p50 <= 53 and 95 <= p95 <= 98 and 99 <= p99 <= 500
+    assert test_metrics.get_percentiles(OTHER_PHASE) == (0, 0, 0)
+    assert test_metrics.get_slowest_names() == [("slow", 500), ("fast", test_metrics.get_percentiles(TOTAL, "fast")[1])]  # type: ignore - there are samples
+
+
+def test_timed_interaction():
+    """
+    Tests that timed_interaction records each interaction once, with the phases of nested calls, and keeps concurrent interactions apart
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    @timed_interaction("inner")
+    async def inner():
+        with render_time():
+            time.sleep(0.005)
+
+    @timed_interaction("outer")
+    async def outer(delay: float):
+        with engine_time():
+            time.sleep(0.005)
+        with discord_time():
+            assert metrics.discord_calls_in_flight > 0
+            await asyncio.sleep(delay)
+        await inner()
+
+    async def run_test():
+        await asyncio.gather(outer(0.05), outer(0.01))
+
+    interaction_count = metrics.interaction_count
+    asyncio.run(run_test())
+    assert metrics.interaction_count == interaction_count + 2
+    assert metrics.discord_calls_in_flight == 0
+    assert "inner" not in metrics.latencies_by_name
+
+    # Each interaction only counts its own waiting and work
+    discord_times = list(metrics.latencies[DISCORD_PHASE])[-2:]
+    assert min(discord_times) >= 10_000_000 and max(discord_times) >= 50_000_000
+    for engine_ns, render_ns in zip(list(metrics.latencies[ENGINE_PHASE])[-2:], list(metrics.latencies[RENDER_PHASE])[-2:]):
+        assert 5_000_000 <= engine_ns < 15_000_000
+        assert 5_000_000 <= render_ns < 15_000_000
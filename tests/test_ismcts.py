@@ -0,0 +1,81 @@
+from unogame.ismcts import SearchSettings, choose_move
+from unogame.game import UnoGame, UnoRules, UnoStates
+from unogame.card import Card, CardColors, CardFaces
+from unogame.move import UnoMove, MoveTypes
+
+import random
+import time
+
+def test_choose_move():
+    """
+    Tests that choose_move picks legal moves, doesn't change the game, and respects its budget
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    rng = random.Random(31)
+
+    for _ in range(5):
+        test_game = UnoGame(UnoRules(draw_until_can_play=False, jump_ins=rng.random() < 0.5))
+        for player_id in range(3):
+            test_game.create_player(player_id)
+        test_game.start_game()
+
+        for _ in range(6):
+            player = test_game.players[test_game.turn_index]
+            state_hash = test_game.get_state_hash()
+            legal_moves = test_game.get_legal_moves(player)
+
+            move = choose_move(test_game, player.player_id, SearchSettings(time_limit=None, max_iterations=20), rng)
+            assert test_game.get_state_hash() == state_hash
+            if len(legal_moves) == 0:
+                assert move is None
+                break
+            assert move in legal_moves
+
+            test_game.make_move(move)
+            if test_game.state == UnoStates.PLAYER_WON:
+                break
+
+    # Players with nothing to do get None
+    test_game = UnoGame()
+    test_game.create_player(0)
+    test_game.create_player(1)
+    assert choose_move(test_game, 0) is None
+
+    # The time limit is respected
+    test_game.start_game()
+    test_game.players[0].hand = [Card(CardColors.RED, CardFaces.ONE), Card(CardColors.BLUE, CardFaces.ONE), Card(CardColors.GREEN, CardFaces.ONE)]
+    test_game.deck.top_card = Card(CardColors.YELLOW, CardFaces.ONE)
+    test_game.ruleset.force_play = False
+    test_game.rebuild_card_index()
+    test_game.rehash()
+
+    start_time = time.perf_counter()
+    choose_move(test_game, 0, SearchSettings(time_limit=0.05), rng)
+    assert time.perf_counter() - start_time < 0.5
+
+
+def test_choose_winning_move():
+    """
+    Tests that choose_move finds an obvious win
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    rng = random.Random(31)
+    test_game = UnoGame(UnoRules(force_play=False, draw_until_can_play=False))
+    test_game.create_player(0)
+    test_game.create_player(1)
+    test_game.start_game()
+
+    # Playing the last card wins, drawing doesn't
+    test_game.players[0].hand = [Card(CardColors.RED, CardFaces.FIVE)]
+    test_game.deck.top_card = Card(CardColors.RED, CardFaces.ONE)
+    test_game.rebuild_card_index()
+    test_game.rehash()
+
+    move = choose_move(test_game, 0, SearchSettings(time_limit=None, max_iterations=50), rng)
+    assert move == UnoMove(MoveTypes.PLAY_CARD, 0, card=Card(CardColors.RED, CardFaces.FIVE))
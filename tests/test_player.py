@@ -66,4 +66,40 @@ def test_has_card_to_play():
 
     test_top_card = Card(CardColors.YELLOW, CardFaces.TWO)
 
-    assert not test_player.has_card_to_play(test_top_card)
\ No newline at end of file
+    assert not test_player.has_card_to_play(test_top_card)
+
+def test_hand_hash():
+    """
+    Tests that hand_hash is kept up to date by every way of changing the hand, and doesn't depend on card order
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+    from unogame.zobrist import hash_hand
+
+    test_player = Player(0)
+    assert test_player.hand_hash == 0
+
+    test_player.add_card_to_hand(Card(CardColors.BLUE, CardFaces.EIGHT))
+    test_player.add_card_to_hand(Card(CardColors.RED, CardFaces.SKIP))
+    test_player.add_card_to_hand(Card(CardColors.BLUE, CardFaces.EIGHT), 0)
+    assert test_player.hand_hash == hash_hand(test_player.hand)
+
+    # Order doesn't matter, but duplicates do
+    assert test_player.hand_hash == hash_hand([Card(CardColors.RED, CardFaces.SKIP), Card(CardColors.BLUE, CardFaces.EIGHT), Card(CardColors.BLUE, CardFaces.EIGHT)])
+    assert test_player.hand_hash != hash_hand([Card(CardColors.RED, CardFaces.SKIP), Card(CardColors.BLUE, CardFaces.EIGHT)])
+
+    test_player.play_card(Card(CardColors.BLUE, CardFaces.EIGHT))
+    assert test_player.hand_hash == hash_hand([Card(CardColors.RED, CardFaces.SKIP), Card(CardColors.BLUE, CardFaces.EIGHT)])
+
+    assert test_player.remove_card_at(1) == Card(CardColors.RED, CardFaces.SKIP)
+    assert test_player.hand_hash == hash_hand([Card(CardColors.BLUE, CardFaces.EIGHT)])
+
+    # Setting the hand directly rehashes it
+    test_player.hand = [Card(CardColors.GREEN, CardFaces.ONE)]
+    assert test_player.hand_hash == hash_hand([Card(CardColors.GREEN, CardFaces.ONE)])
+
+    other_player = Player(1)
+    test_player.swap_hands(other_player)
+    assert test_player.hand == [] and test_player.hand_hash == 0
+    assert other_player.hand_hash == hash_hand([Card(CardColors.GREEN, CardFaces.ONE)])
@@ -0,0 +1,48 @@
+from bot.player_list import PlayerListRenderer
+from unogame.game import UnoGame, UnoRules
+
+def create_test_game(player_count: int) -> UnoGame:
+    test_game = UnoGame(UnoRules(scale_decks=True), seed=1)
+    for player_id in range(player_count):
+        test_game.create_player(player_id)
+    test_game.start_game()
+    return test_game
+
+
+def test_player_list():
+    """
+    Tests that PlayerListRenderer only shows the players around whoever's turn it is, and only rebuilds lines that changed
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    mention = lambda player_id: f"Player {player_id}"
+
+    # Small games show everyone
+    small_game = create_test_game(4)
+    lines = PlayerListRenderer(small_game).render(mention).split("\n")
+    assert len(lines) == 4
+    assert lines[small_game.turn_index].startswith("__") and lines[small_game.turn_index].endswith("↓")
+
+    test_game = create_test_game(100)
+    test_game.turn_index = 0
+    player_list = PlayerListRenderer(test_game, players_ahead=4, players_behind=2)
+    assert player_list.get_window() == [98, 99, 0, 1, 2, 3, 4]
+    lines = player_list.render(mention).split("\n")
+    assert lines[2] == f"__Player 0 - Cards: {len(test_game.players[0].hand)}__ ↓"
+    assert lines[-1] == f"...and 93 more (100 players, {sum([len(player.hand) for player in test_game.players])} cards in hands)"
+    assert player_list.built_count == 7
+
+    # Ahead is the other way while reversed
+    test_game.reversed = True
+    assert player_list.get_window() == [96, 97, 98, 99, 0, 1, 2]
+
+    # Only the player whose hand changed is rebuilt
+    test_game.players[99].hand.pop()
+    player_list.render(mention)
+    assert player_list.built_count == 7 + 2 + 1
+
+    # Before the game starts, the first players are shown
+    lines = player_list.render(mention, show_turn=False).split("\n")
+    assert lines[0].startswith("Player 0") and "__" not in "".join(lines)
@@ -0,0 +1,44 @@
+from bot.render_scheduler import RenderScheduler
+
+import asyncio
+
+def test_render_scheduler():
+    """
+    Tests that RenderScheduler runs updates in the background, one at a time per key, replacing updates that haven't started yet
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    scheduler = RenderScheduler()
+    sent = []
+
+    def update(key: str, version: int):
+        async def render():
+            await asyncio.sleep(0.01)
+            sent.append((key, version))
+        return render
+
+    async def failing_update():
+        raise ValueError("Unknown Message")
+
+    async def run_test():
+        for version in range(5):
+            scheduler.schedule("lobby", update("lobby", version))
+        scheduler.schedule("hand", update("hand", 0))
+        scheduler.schedule("broken", failing_update)
+        # Nothing has been sent yet, the caller carries on straight away
+        assert sent == [] and scheduler.pending_count == 3
+
+        await asyncio.sleep(0)
+        # Only the newest of those lobby updates is being sent. New ones wait for it, and replace each other while they wait
+        scheduler.schedule("lobby", update("lobby", 5))
+        scheduler.schedule("lobby", update("lobby", 6))
+        await scheduler.flush()
+
+    asyncio.run(run_test())
+    assert [version for key, version in sent if key == "lobby"] == [4, 6]
+    assert ("hand", 0) in sent
+    assert scheduler.superseded_count == 5
+    assert scheduler.failed_count == 1
+    assert scheduler.pending_count == 0
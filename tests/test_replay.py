@@ -0,0 +1,154 @@
+from unogame.replay import GameReplayer, ReplayError
+from unogame.game_record import GameRecord, RecordEntryTypes, RecordError
+from unogame.game import UnoGame, UnoRules, UnoStates, OutOfTurnError
+from unogame.move import MoveTypes
+
+import random
+
+def game_summary(game: UnoGame) -> tuple:
+    return (
+        [(player.player_id, [str(card) for card in player.hand]) for player in game.players],
+        [str(card) for card in game.deck.draw_pile],
+        [str(card) for card in game.deck.discard_pile],
+        str(game.deck.top_card),
+        game.turn_index,
+        game.current_stack,
+        game.reversed,
+        game.state,
+        game.ruleset.to_key(),
+    )
+
+
+def test_seeds():
+    """
+    Tests that games with the same seed deal the same cards
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    test_games = [UnoGame(seed=36), UnoGame(seed=36)]
+    for test_game in test_games:
+        for player_id in range(3):
+            test_game.create_player(player_id)
+        test_game.start_game()
+        test_game.make_move(test_game.get_legal_moves(test_game.players[0])[0])
+        # Trying out moves on a copy doesn't change what the real deck draws next
+        test_game.clone().create_player(99)
+
+    assert game_summary(test_games[0]) == game_summary(test_games[1])
+    assert game_summary(UnoGame(seed=36)) != game_summary(UnoGame(seed=37))
+
+
+def test_replay():
+    """
+    Tests that GameReplayer rebuilds every point of a recorded game, including after seeking backwards and through encoding
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    rng = random.Random(36)
+    test_game = UnoGame(UnoRules(jump_ins=True, seven_swap_hands=True, zero_rotate_hands=True, draw_until_can_play=False))
+    test_game.create_player(764385563289452545)
+    test_game.create_player(1)
+    test_game.create_player(2)
+    test_game.create_player(3)
+    test_game.remove_player(3)
+    assert test_game.record is not None
+
+    # Failed attempts are recorded too, marked as failed
+    try:
+        test_game.create_player(1)
+    except ValueError:
+        pass
+    assert test_game.record.read_entries()[-1] == (RecordEntryTypes.ADD_PLAYER, 1, 0, 0, True)
+    # So are rule changes
+    test_game.ruleset.stacking = True
+    test_game.start_game()
+
+    summaries = [None] * (len(test_game.record) + 1)
+    summaries[len(test_game.record)] = game_summary(test_game)
+    for _ in range(150):
+        if test_game.state == UnoStates.PLAYER_WON:
+            break
+        legal_moves = [move for player in test_game.players for move in test_game.get_legal_moves(player)]
+        if len(legal_moves) == 0:
+            break
+        test_game.make_move(rng.choice(legal_moves))
+        summaries += [None] * (len(test_game.record) + 1 - len(summaries))
+        summaries[len(test_game.record)] = game_summary(test_game)
+
+    # Only moves made on the real game count
+    test_game.clone().create_player(99)
+
+    record = GameRecord.from_bytes(test_game.record.to_bytes())
+    assert len(record) == len(test_game.record)
+    replayer = GameReplayer(record, checkpoint_interval=16)
+
+    assert game_summary(replayer.play_to_end()) == game_summary(test_game)
+    assert replayer.game.get_state_hash() == test_game.get_state_hash()
+
+    # Seeking anywhere, in any order, gives the same game as when it was recorded
+    entry_indices = [i for i, summary in enumerate(summaries) if summary is not None]
+    for entry_index in rng.sample(entry_indices, len(entry_indices)):
+        assert game_summary(replayer.seek(entry_index)) == summaries[entry_index]
+
+    # The recorded moves can be read back
+    moves = [replayer.get_move(i) for i in range(len(replayer))]
+    assert moves[0] is None
+    assert any(move is not None and move.move_type == MoveTypes.PLAY_CARD for move in moves)
+
+    try:
+        replayer.seek(len(replayer) + 1)
+        raise AssertionError("seek should have raised an IndexError")
+    except IndexError:
+        pass
+
+    try:
+        GameRecord.from_bytes(test_game.record.to_bytes()[:-3])
+        raise AssertionError("from_bytes should have raised a RecordError")
+    except RecordError:
+        pass
+
+    # A replay that stops matching the game is caught, instead of being mistaken for a failed attempt
+    record = GameRecord.from_bytes(test_game.record.to_bytes())
+    record.add_entry(RecordEntryTypes.DRAW, 2)
+    record.add_entry(RecordEntryTypes.DRAW, 2)
+    try:
+        GameReplayer(record).play_to_end()
+        raise AssertionError("play_to_end should have raised a ReplayError")
+    except ReplayError:
+        pass
+
+
+def test_record_limits():
+    """
+    Tests that records fit games with hundreds of players, and that a game that can't be recorded keeps working without a record
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    test_game = UnoGame(UnoRules(scale_decks=True), seed=12)
+    for player_id in range(300):
+        test_game.create_player(player_id)
+    test_game.start_game()
+    assert test_game.record is not None
+    assert len(test_game.record.player_ids) == 300
+
+    record = GameRecord.from_bytes(test_game.record.to_bytes())
+    assert GameReplayer(record).play_to_end().get_state_hash() == test_game.get_state_hash()
+
+    # Player indexes past 255 are kept as they are
+    record.add_entry(RecordEntryTypes.SEVEN_SWAP, 299, 280)
+    assert record.read_entries()[-1] == (RecordEntryTypes.SEVEN_SWAP, 299, 280, 0, False)
+
+    # Anything too big to record turns recording off, and the move fails (or doesn't) the same as it would have
+    try:
+        test_game.seven_swap_move(test_game.players[0], 70000)
+        raise AssertionError("seven_swap_move should have raised an OutOfTurnError")
+    except OutOfTurnError:
+        pass
+    assert test_game.record is None
+    test_game.make_move(test_game.get_legal_moves(test_game.players[test_game.turn_index])[0])
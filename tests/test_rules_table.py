@@ -0,0 +1,175 @@
+from unogame.rules_table import RulesTable, compile_rules
+from unogame.reference_game import ReferenceUnoGame
+from unogame.game import UnoGame, UnoRules, UnoStates, OutOfTurnError, InvalidCardPlayedError
+from unogame.card import Card, CardColors, CardFaces
+
+import random
+
+def copy_game(game: UnoGame, game_class: type) -> UnoGame:
+    """
+    Makes an independent copy of the game as an instance of game_class
+    """
+    new_game = game.clone()
+    new_game.__class__ = game_class
+    return new_game
+
+def game_summary(game: UnoGame) -> tuple:
+    return (
+        [[str(card) for card in player.hand] for player in game.players],
+        game.turn_index,
+        game.current_stack,
+        game.reversed,
+        game.state,
+        str(game.deck.top_card),
+        [str(card) for card in game.deck.discard_pile],
+    )
+
+def random_rules(rng: random.Random) -> UnoRules:
+    rules = UnoRules()
+    for name in ["jump_ins", "stacking", "jump_ins_stack", "stack_plus_fours_on_plus_twos", "stack_all_plus_twos_on_plus_fours",
+            "stack_color_matching_plus_twos_on_plus_fours", "force_play", "draw_until_can_play", "seven_swap_hands",
+            "force_seven_swap", "zero_rotate_hands", "force_zero_rotate", "jump_in_during_seven", "jump_in_during_zero"]:
+        setattr(rules, name, rng.random() < 0.5)
+    return rules
+
+def play_random_move(game: UnoGame, rng: random.Random) -> None:
+    """
+    Tries random moves until one of them works (or gives up after a while)
+    """
+    for _ in range(50):
+        player = rng.choice(game.players)
+        choice = rng.randrange(6)
+        try:
+            if choice <= 1 and len(player.hand) > 0:
+                game.play_card_move(player, rng.choice(player.hand))
+            elif choice == 2:
+                game.draw_card_move(player)
+            elif choice == 3:
+                game.choose_color_move(player, rng.choice([CardColors.RED, CardColors.BLUE, CardColors.GREEN, CardColors.YELLOW]))
+            elif choice == 4:
+                game.seven_swap_move(player, rng.randrange(len(game.players)))
+            else:
+                game.zero_rotate_move(player, rng.random() < 0.5)
+            return
+        except Exception:
+            pass
+
+
+def test_transitions():
+    """
+    Tests that RulesTable.get_transition gives the right transitions for some basic plays
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    rules = UnoRules()
+    test_table = RulesTable(rules.to_key())
+
+    top_card = Card(CardColors.GREEN, CardFaces.EIGHT)
+
+    # Nothing can be played before the game starts
+    assert test_table.get_transition(UnoStates.PREGAME, True, top_card, Card(CardColors.GREEN, CardFaces.ONE)).error == OutOfTurnError
+
+    transition = test_table.get_transition(UnoStates.WAITING_FOR_PLAY, True, top_card, Card(CardColors.GREEN, CardFaces.ONE))
+    assert transition.error is None
+    assert transition.turn_delta == 1
+    assert transition.next_state == UnoStates.WAITING_FOR_PLAY
+
+    assert test_table.get_transition(UnoStates.WAITING_FOR_PLAY, True, top_card, Card(CardColors.RED, CardFaces.ONE)).error == InvalidCardPlayedError
+    assert test_table.get_transition(UnoStates.WAITING_FOR_PLAY, True, top_card, Card(CardColors.RED, CardFaces.ONE), True).error is None
+
+    transition = test_table.get_transition(UnoStates.WAITING_FOR_PLAY, True, top_card, Card(CardColors.GREEN, CardFaces.REVERSE))
+    assert transition.reverses
+    assert transition.turn_delta == 1
+    assert transition.two_player_turn_delta == 2
+
+    transition = test_table.get_transition(UnoStates.WAITING_FOR_PLAY, True, top_card, Card(CardColors.WILD, CardFaces.PLUS_FOUR))
+    assert transition.next_state == UnoStates.WAITING_FOR_WILD_COLOR
+    assert transition.stack_delta == 0
+
+    # Exact matches are only jump-ins when the rules allow it
+    assert test_table.get_transition(UnoStates.WAITING_FOR_PLAY, False, top_card, Card(CardColors.GREEN, CardFaces.EIGHT)).error == OutOfTurnError
+
+    rules.jump_ins = True
+    rules.stacking = True
+
+    # Tables are shared between equal rules
+    test_table = compile_rules(rules.to_key())
+    assert test_table is compile_rules(UnoRules(jump_ins=True, stacking=True).to_key())
+    assert test_table is not compile_rules(UnoRules().to_key())
+
+    transition = test_table.get_transition(UnoStates.WAITING_FOR_PLAY, False, top_card, Card(CardColors.GREEN, CardFaces.EIGHT))
+    assert transition.error is None
+    assert transition.jump_in
+
+    # Stacking a plus two on a plus two
+    top_card = Card(CardColors.GREEN, CardFaces.PLUS_TWO)
+    transition = test_table.get_transition(UnoStates.WAITING_FOR_PLUS_RESPONSE, True, top_card, Card(CardColors.RED, CardFaces.PLUS_TWO))
+    assert transition.error is None
+    assert transition.stack_delta == 2
+    assert transition.next_state == UnoStates.WAITING_FOR_PLUS_RESPONSE
+
+    # Jump-in stacks clear the stack unless jump_ins_stack is on
+    transition = test_table.get_transition(UnoStates.WAITING_FOR_PLUS_RESPONSE, False, top_card, Card(CardColors.GREEN, CardFaces.PLUS_TWO))
+    assert transition.jump_in
+    assert transition.clears_stack
+
+    # Plus fours can't go on plus twos unless the rule is on
+    assert test_table.get_transition(UnoStates.WAITING_FOR_PLUS_RESPONSE, True, top_card, Card(CardColors.WILD, CardFaces.PLUS_FOUR)).error == InvalidCardPlayedError
+
+
+def test_matches_reference_engine():
+    """
+    Tests that plays driven by the compiled rules table end up in the same state as the original if/elif engine (ReferenceUnoGame),
+    for every player and a range of cards, across random games with random rules
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    rng = random.Random(2023)
+    all_cards = [Card(color, face) for color in CardColors for face in CardFaces]
+
+    for _ in range(12):
+        game = UnoGame(random_rules(rng))
+        for player_id in range(rng.randrange(2, 5)):
+            game.create_player(player_id)
+        game.start_game()
+
+        for _ in range(20):
+            cards_to_try = rng.sample(all_cards, 6)
+            for player in game.players:
+                cards_to_try += player.hand
+            # Only try each kind of card once
+            cards_to_try = list({card.card_id: card for card in cards_to_try}.values())
+
+            for player_index in range(len(game.players)):
+                for card in cards_to_try:
+                    for allow_mismatch_play in (False, True):
+                        table_game = copy_game(game, UnoGame)
+                        reference_game = copy_game(game, ReferenceUnoGame)
+
+                        results = []
+                        for test_game in (table_game, reference_game):
+                            try:
+                                test_game.play_card_move(test_game.players[player_index], card, allow_mismatch_play)
+                                results.append(None)
+                            except Exception as e:
+                                results.append(type(e))
+
+                        assert results[0] == results[1], (game_summary(game), player_index, str(card), results)
+                        # The reference engine sometimes changes the game before raising, so only compare successful plays
+                        if results[0] is None:
+                            assert game_summary(table_game) == game_summary(reference_game)
+
+            # Choosing a color goes through the table too
+            if game.state == UnoStates.WAITING_FOR_WILD_COLOR:
+                for color in [CardColors.RED, CardColors.BLUE, CardColors.GREEN, CardColors.YELLOW]:
+                    table_game = copy_game(game, UnoGame)
+                    reference_game = copy_game(game, ReferenceUnoGame)
+                    table_game.choose_color_move(table_game.players[table_game.turn_index], color)
+                    reference_game.choose_color_move(reference_game.players[reference_game.turn_index], color)
+                    assert game_summary(table_game) == game_summary(reference_game)
+
+            play_random_move(game, rng)
@@ -0,0 +1,88 @@
+from unogame.snapshot import encode_game, decode_game, encode_move, decode_move, SnapshotError
+from unogame.game import UnoGame, UnoRules, UnoStates
+from unogame.card import Card, CardColors, CardFaces
+from unogame.move import UnoMove, MoveTypes
+
+import random
+
+def game_summary(game: UnoGame) -> tuple:
+    return (
+        [(player.player_id, [str(card) for card in player.hand]) for player in game.players],
+        [str(card) for card in game.deck.draw_pile],
+        [str(card) for card in game.deck.discard_pile],
+        str(game.deck.top_card),
+        game.deck.top_card.return_to_discard,
+        game.turn_index,
+        game.current_stack,
+        game.reversed,
+        game.state,
+        game.ruleset.to_key(),
+    )
+
+
+def test_encode_decode_game():
+    """
+    Tests that games and samplers come back the same after encode_game and decode_game
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    rng = random.Random(33)
+    test_game = UnoGame(UnoRules(jump_ins=True, seven_swap_hands=True, draw_until_can_play=False))
+    test_game.create_player(764385563289452545)
+    test_game.create_player(1)
+    test_game.create_player(2)
+    test_game.start_game()
+
+    for _ in range(30):
+        legal_moves = test_game.get_legal_moves(test_game.players[test_game.turn_index])
+        if len(legal_moves) == 0 or test_game.state == UnoStates.PLAYER_WON:
+            break
+        test_game.make_move(rng.choice(legal_moves))
+
+        sampler = test_game.get_hand_sampler(1)
+        snapshot = encode_game(test_game, sampler)
+        decoded_game, decoded_sampler = decode_game(snapshot)
+
+        assert game_summary(decoded_game) == game_summary(test_game)
+        assert decoded_game.get_state_hash() == test_game.get_state_hash()
+        assert decoded_game.card_index.holders == test_game.card_index.holders
+
+        assert decoded_sampler is not None
+        assert decoded_sampler.observer_id == 1
+        assert decoded_sampler.unseen_counts == sampler.unseen_counts
+        assert decoded_sampler.known_cards == sampler.known_cards
+
+        # Much smaller than pickling the game
+        assert len(snapshot) < 300
+
+    # Colored wilds on top stay ghost cards
+    test_game.deck.top_card = Card(CardColors.RED, CardFaces.WILD, return_to_discard=False)
+    decoded_game, decoded_sampler = decode_game(encode_game(test_game))
+    assert decoded_sampler is None
+    assert game_summary(decoded_game) == game_summary(test_game)
+
+    try:
+        decode_game(encode_game(test_game)[:-20])
+        raise AssertionError("decode_game should have raised a SnapshotError")
+    except SnapshotError:
+        pass
+
+
+def test_encode_decode_move():
+    """
+    Tests that moves come back the same after encode_move and decode_move
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    for move in [
+        UnoMove(MoveTypes.PLAY_CARD, 5, card=Card(CardColors.BLUE, CardFaces.SKIP)),
+        UnoMove(MoveTypes.DRAW, 764385563289452545),
+        UnoMove(MoveTypes.CHOOSE_COLOR, 1, color=CardColors.GREEN),
+        UnoMove(MoveTypes.SEVEN_SWAP, 1, target_index=2),
+        UnoMove(MoveTypes.ZERO_ROTATE, 1, rotate=True),
+    ]:
+        assert decode_move(encode_move(move)) == move
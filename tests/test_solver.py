@@ -0,0 +1,101 @@
+from unogame.solver import HintCache, solve_hint
+from unogame.game import UnoGame, UnoRules
+from unogame.card import Card, CardColors, CardFaces
+from unogame.move import MoveTypes
+
+import random
+import time
+
+def test_solve_hint():
+    """
+    Tests that solve_hint finds winning lines in endgames, solves small endgames exactly, and respects its time limit
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    rng = random.Random(34)
+    test_game = UnoGame(UnoRules(force_play=False, draw_until_can_play=False))
+    test_game.create_player(0)
+    test_game.create_player(1)
+    test_game.start_game()
+
+    # Skipping first wins, playing the five first lets the other player try to go out
+    test_game.players[0].hand = [Card(CardColors.RED, CardFaces.FIVE), Card(CardColors.RED, CardFaces.SKIP)]
+    test_game.players[1].hand = [Card(CardColors.GREEN, CardFaces.TWO)]
+    test_game.deck.top_card = Card(CardColors.RED, CardFaces.ONE)
+    test_game.rebuild_card_index()
+    test_game.rehash()
+    state_hash = test_game.get_state_hash()
+
+    start_time = time.perf_counter()
+    hint = solve_hint(test_game, 0, 0.3, rng)
+    assert time.perf_counter() - start_time < 1
+    assert hint is not None
+    assert hint.move.move_type == MoveTypes.PLAY_CARD and hint.move.card == Card(CardColors.RED, CardFaces.SKIP)
+    assert hint.score > 0.99
+    assert len(hint.ranked_moves) == 3
+    assert test_game.get_state_hash() == state_hash
+
+    # With only a few unseen cards every deal and draw can be gone through, so the answer is exact
+    test_game.deck.draw_pile = [Card(CardColors.BLUE, CardFaces.THREE), Card(CardColors.BLUE, CardFaces.FOUR)]
+    test_game.deck.discard_pile = []
+    test_game.players[0].hand = [Card(CardColors.RED, CardFaces.FIVE), Card(CardColors.BLUE, CardFaces.FIVE)]
+    test_game.rebuild_card_index()
+    test_game.rehash()
+
+    hint = solve_hint(test_game, 0, 2, rng)
+    assert hint is not None
+    assert hint.exact
+    assert hint.move.move_type == MoveTypes.PLAY_CARD
+    # The other player can't play a green two on a five, so playing either five wins
+    assert hint.score > 0.99
+
+    # Players with nothing to do get None
+    test_game = UnoGame()
+    test_game.create_player(0)
+    test_game.create_player(1)
+    assert solve_hint(test_game, 0, 0.1) is None
+
+    # Big games are sampled, and still finish in time
+    test_game = UnoGame()
+    for player_id in range(4):
+        test_game.create_player(player_id)
+    test_game.start_game()
+    player_id = test_game.players[test_game.turn_index].player_id
+
+    start_time = time.perf_counter()
+    hint = solve_hint(test_game, player_id, 0.1, rng)
+    assert time.perf_counter() - start_time < 0.5
+    assert hint is not None
+    assert not hint.exact
+    assert hint.move in test_game.get_legal_moves(test_game.get_player(player_id))
+
+
+def test_hint_cache():
+    """
+    Tests that HintCache remembers hints by state and player, and forgets the least recently used ones
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    test_game = UnoGame(UnoRules(force_play=False, draw_until_can_play=False))
+    test_game.create_player(0)
+    test_game.create_player(1)
+    test_game.start_game()
+    hint = solve_hint(test_game, test_game.players[test_game.turn_index].player_id, 0.05)
+    assert hint is not None
+
+    cache = HintCache(max_size=2)
+    cache.put(1, 0, hint)
+    cache.put(2, 0, hint)
+    assert cache.get(1, 0) is hint
+    assert cache.get(1, 1) is None
+
+    # 2 is the least recently used now
+    cache.put(3, 0, hint)
+    assert len(cache) == 2
+    assert cache.get(2, 0) is None
+    assert cache.get(1, 0) is hint
+    assert cache.get(3, 0) is hint
@@ -0,0 +1,127 @@
+from unogame.worker_pool import AIWorkerPool, PoolBusyError
+from unogame.ismcts import SearchSettings
+from unogame.game import UnoGame, UnoRules
+
+import asyncio
+import time
+
+def create_test_game() -> UnoGame:
+    # A seed where the first player has a few moves to pick from, so the search doesn't return straight away
+    test_game = UnoGame(UnoRules(force_play=False, draw_until_can_play=False), seed=1)
+    for player_id in range(3):
+        test_game.create_player(player_id)
+    test_game.start_game()
+    return test_game
+
+
+def test_choose_move():
+    """
+    Tests that AIWorkerPool.choose_move gets legal moves from the worker processes without blocking the event loop
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    test_game = create_test_game()
+    player = test_game.players[test_game.turn_index]
+    legal_moves = test_game.get_legal_moves(player)
+    test_pool = AIWorkerPool()
+
+    async def run_test():
+        ticks = 0
+        async def count_ticks():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(count_ticks())
+        move = await test_pool.choose_move("channel", test_game, player.player_id, SearchSettings(time_limit=0.3), 5,
+            test_game.get_hand_sampler(player.player_id))
+        ticker.cancel()
+        return move, ticks
+
+    try:
+        move, ticks = asyncio.run(run_test())
+        assert move in legal_moves
+        # The loop kept running while the search did
+        assert ticks >= 10
+        assert test_pool.queue_depth == 0
+    finally:
+        test_pool.shutdown()
+
+
+def test_deadlines_and_cancelling():
+    """
+    Tests that AIWorkerPool requests respect their deadlines, are cancelled by newer requests, and are limited by queue depth
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    test_game = create_test_game()
+    player_id = test_game.players[test_game.turn_index].player_id
+    test_pool = AIWorkerPool(max_workers=1, max_queue_depth=2)
+
+    async def run_test():
+        # A search longer than the deadline is cut short to fit it
+        start_time = time.perf_counter()
+        move = await test_pool.choose_move("deadline", test_game, player_id, SearchSettings(time_limit=10), 0.5)
+        assert time.perf_counter() - start_time < 1.5
+        assert move is not None
+
+        # A newer request for the same key cancels the old one
+        old_request = asyncio.create_task(test_pool.choose_move("channel", test_game, player_id, SearchSettings(time_limit=0.2), 5))
+        await asyncio.sleep(0)
+        new_request = asyncio.create_task(test_pool.choose_move("channel", test_game, player_id, SearchSettings(time_limit=0.2), 5))
+        assert await old_request is None
+        assert await new_request is not None
+
+        # Cancelled requests whose search already started still count until the worker is done with them
+        running_request = asyncio.create_task(test_pool.choose_move("running", test_game, player_id, SearchSettings(time_limit=0.5), 5))
+        await asyncio.sleep(0.2)
+        test_pool.cancel("running")
+        assert await running_request is None
+        assert test_pool.queue_depth == 1
+        await asyncio.sleep(0.6)
+        assert test_pool.queue_depth == 0
+
+        # Too many requests at once are refused
+        requests = [asyncio.create_task(test_pool.choose_move(key, test_game, player_id, SearchSettings(time_limit=0.2), 5)) for key in range(2)]
+        await asyncio.sleep(0)
+        try:
+            await test_pool.choose_move("one too many", test_game, player_id, SearchSettings(time_limit=0.2), 5)
+            raise AssertionError("choose_move should have raised a PoolBusyError")
+        except PoolBusyError:
+            pass
+        await asyncio.gather(*requests)
+
+    try:
+        asyncio.run(run_test())
+    finally:
+        test_pool.shutdown()
+
+
+def test_get_hint():
+    """
+    Tests that AIWorkerPool.get_hint gets hints from the worker processes in time
+
+    Raises:
+        AssertionError: If any of the tests fail
+    """
+
+    test_game = create_test_game()
+    player = test_game.players[test_game.turn_index]
+    legal_moves = test_game.get_legal_moves(player)
+    test_pool = AIWorkerPool()
+
+    try:
+        start_time = time.perf_counter()
+        hint = asyncio.run(test_pool.get_hint(("hint", player.player_id), test_game, player.player_id, 10, 1,
+            test_game.get_hand_sampler(player.player_id)))
+        assert time.perf_counter() - start_time < 2
+        assert hint is not None
+        assert hint.move in legal_moves
+        assert hint.ranked_moves[0] == (hint.move, hint.score)
+    finally:
+        test_pool.shutdown()
@@ -13,16 +13,29 @@ class Card:
         self.color = color
         self.face = face
         self.return_to_discard = return_to_discard
+        # Compact id shared by every card with this color and face, used to key lookup tables
+        self.card_id = CARD_IDS[(color, face)]
 
     @classmethod
-    def from_string(cls, string) -> Card:
-        card_color_string, card_face_string = tuple(string.split(" "))
-        card_color = CardColors(card_color_string)
-        card_face = CardFaces(card_face_string)
-        if (card_face == CardFaces.WILD or card_face == CardFaces.PLUS_FOUR) and card_color != CardColors.WILD:
-            return Card(card_color, card_face, return_to_discard=False)
-        else:
-            return Card(card_color, card_face)
+    def from_string(cls, string: str) -> Card:
+        """
+        Returns the card for a string from str(card) (like "red five"), or for its card_id as a string (like "17").
+        This is one lookup in a table made up front, and gives back the same shared card every time (see CARDS_BY_ID),
+        so don't change the card it returns
+
+        Args:
+            string (str): The card's string or card_id
+
+        Raises:
+            ValueError: If the string isn't a card
+
+        Returns:
+            Card: The card
+        """
+        card = _CARDS_BY_STRING.get(string)
+        if card is None:
+            raise ValueError(f"{string!r} is not a card")
+        return card
 
     def get_emoji_mention(self) -> str:
         """
@@ -127,6 +140,9 @@ class Card:
             return __o.color == self.color and __o.face == self.face
         else:
             return False
+
+    def __hash__(self) -> int:
+        return self.card_id
         
     def __str__(self) -> str:
         return f"{self.color.value} {self.face.value}"
@@ -159,3 +175,23 @@ class CardFaces(Enum):
     PLUS_TWO = 'plus_two'
     PLUS_FOUR = 'plus_four'
     WILD = 'wild'
+
+# Every color/face pair gets a small integer id (0 to 74), colored wilds included
+CARD_IDS: dict[tuple[CardColors, CardFaces], int] = {
+    (color, face): color_index * len(CardFaces) + face_index
+    for color_index, color in enumerate(CardColors)
+    for face_index, face in enumerate(CardFaces)
+}
+
+# One shared card for every card_id, for anything that turns ids or strings back into cards.
+# Colored wilds are ghost cards, since they're only ever made by choosing a color
+CARDS_BY_ID: list[Card] = [
+    Card(color, face, return_to_discard=not ((face == CardFaces.WILD or face == CardFaces.PLUS_FOUR) and color != CardColors.WILD))
+    for (color, face) in CARD_IDS
+]
+
+# str(card) and str(card_id) -> the shared card, for Card.from_string
+_CARDS_BY_STRING: dict[str, Card] = {
+    **{str(card): card for card in CARDS_BY_ID},
+    **{str(card.card_id): card for card in CARDS_BY_ID},
+}
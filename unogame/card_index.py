@@ -0,0 +1,117 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+from unogame.card import Card
+from unogame.player import Player
+
+class CardLocationIndex:
+
+    def __init__(self) -> None:
+        """
+        Tracks which players are holding each card, keyed by `Card.card_id`.
+        The index is only correct as long as every change to a hand is reported to it,
+        so hands that are modified directly need `rebuild` to be called afterwards
+        """
+
+        # card_id -> {player_id: number of copies held}
+        self.holders: dict[int, dict[int, int]] = {}
+
+    def add_card(self, player_id: int, card: Card) -> None:
+        """
+        Records that the given player gained a copy of the card
+
+        Args:
+            player_id (int): The id of the player who gained the card
+            card (Card): The card gained
+        """
+        card_holders = self.holders.get(card.card_id)
+        if card_holders is None:
+            self.holders[card.card_id] = {player_id: 1}
+        else:
+            card_holders[player_id] = card_holders.get(player_id, 0) + 1
+
+    def remove_card(self, player_id: int, card: Card) -> None:
+        """
+        Records that the given player lost a copy of the card.
+        Removing a card the index doesn't know about does nothing
+
+        Args:
+            player_id (int): The id of the player who lost the card
+            card (Card): The card lost
+        """
+        card_holders = self.holders.get(card.card_id)
+        if card_holders is None or player_id not in card_holders:
+            return
+
+        if card_holders[player_id] > 1:
+            card_holders[player_id] -= 1
+        else:
+            del card_holders[player_id]
+            # Keep empty entries out so lookups never have to filter them
+            if len(card_holders) == 0:
+                del self.holders[card.card_id]
+
+    def add_hand(self, player_id: int, hand: list[Card]) -> None:
+        """
+        Records every card in the hand as held by the given player
+
+        Args:
+            player_id (int): The id of the player holding the hand
+            hand (list[Card]): The cards to add
+        """
+        for card in hand:
+            self.add_card(player_id, card)
+
+    def remove_hand(self, player_id: int, hand: list[Card]) -> None:
+        """
+        Records every card in the hand as no longer held by the given player
+
+        Args:
+            player_id (int): The id of the player who held the hand
+            hand (list[Card]): The cards to remove
+        """
+        for card in hand:
+            self.remove_card(player_id, card)
+
+    def move_holders(self, new_player_ids: dict[int, int]) -> None:
+        """
+        Moves every card held by each player in new_player_ids to the player it maps to, for when whole hands change owners.
+        Only looks at each card once, instead of at every copy in every hand
+
+        Args:
+            new_player_ids (dict[int, int]): The id of each player whose hand moved -> the id of the player who has it now
+        """
+        for card_id, card_holders in self.holders.items():
+            self.holders[card_id] = {new_player_ids.get(player_id, player_id): count for player_id, count in card_holders.items()}
+
+    def get_holders(self, card: Card) -> set[int]:
+        """
+        Returns the ids of every player holding at least one copy of the card
+
+        Args:
+            card (Card): The card to look up
+
+        Returns:
+            set[int]: The ids of the players holding the card
+        """
+        return set(self.holders.get(card.card_id, ()))
+
+    def clone(self) -> CardLocationIndex:
+        """
+        Returns an independent copy of the index
+
+        Returns:
+            CardLocationIndex: The copy
+        """
+        new_index = CardLocationIndex()
+        new_index.holders = {card_id: card_holders.copy() for card_id, card_holders in self.holders.items()}
+        return new_index
+
+    def rebuild(self, players: list[Player]) -> None:
+        """
+        Throws away the current index and rebuilds it from the hands of the given players
+
+        Args:
+            players (list[Player]): Every player in the game
+        """
+        self.holders = {}
+        for player in players:
+            self.add_hand(player.player_id, player.hand)
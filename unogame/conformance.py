@@ -0,0 +1,396 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+from typing import Callable
+
+from unogame.card import Card, CardColors, CardFaces
+from unogame.game import UnoGame, UnoRules, UnoStates, RulesKey, RULE_FLAGS
+from unogame.move import UnoMove, MoveTypes
+from unogame.reference_game import ReferenceUnoGame
+
+from concurrent.futures import ProcessPoolExecutor # type: ignore (pylance shadow stdlib issues)
+from dataclasses import dataclass, field # type: ignore (pylance shadow stdlib issues)
+import argparse # type: ignore (pylance shadow stdlib issues)
+import os # type: ignore (pylance shadow stdlib issues)
+import random # type: ignore (pylance shadow stdlib issues)
+import time # type: ignore (pylance shadow stdlib issues)
+
+# Differential testing between two engines. Both are created with the same rules and deck seed, get the same moves,
+# and have their full state compared after every move. Everything about a game (rules, players, moves) comes from one seed,
+# so any divergence can be reproduced from the seed alone, and is shrunk down to as few moves and rules as possible.
+# Moves are made with apply(), which rolls back failed moves, so engines that change the game before raising
+# (like ReferenceUnoGame) are still compared fairly
+
+# Creates an engine from the rules and the deck seed
+EngineFactory = Callable[[UnoRules, int], UnoGame]
+
+_ALL_CARDS = [Card(color, face) for color in CardColors for face in CardFaces]
+_ALL_COLORS = list(CardColors)
+# How often the policy tries a random (probably illegal) move instead of a legal one
+_RANDOM_MOVE_CHANCE = 0.15
+
+
+@dataclass
+class Divergence:
+    # The seed the game came from
+    seed: int
+    rules_key: RulesKey
+    player_count: int
+    # The moves made, ending with the one where the engines diverged
+    moves: list[UnoMove]
+    # The exception type each engine raised on the last move, or None
+    results: tuple[type | None, type | None]
+    # The state (see `get_full_state`) of each engine after the last move
+    states: tuple[tuple, tuple]
+
+    def __str__(self) -> str:
+        lines = [f"Seed {self.seed}, {self.player_count} players, rules {self.rules_key}"]
+        lines += [f"  {move}" for move in self.moves]
+        lines.append(f"Results: {self.results[0]} vs {self.results[1]}")
+        for i, (reference_part, candidate_part) in enumerate(zip(*self.states)):
+            if reference_part != candidate_part:
+                lines.append(f"State part {i}: {reference_part} vs {candidate_part}")
+        return "\n".join(lines)
+
+
+@dataclass
+class ConformanceReport:
+    games: int = 0
+    moves: int = 0
+    seconds: float = 0.0
+    divergences: list[Divergence] = field(default_factory=list)
+
+    @property
+    def moves_per_minute(self) -> float:
+        return self.moves / self.seconds * 60 if self.seconds > 0 else 0.0
+
+
+def create_reference_game(rules: UnoRules, seed: int) -> UnoGame:
+    return ReferenceUnoGame(rules, seed=seed, record=False)
+
+def create_game(rules: UnoRules, seed: int) -> UnoGame:
+    return UnoGame(rules, seed=seed, record=False)
+
+
+def get_full_state(game: UnoGame) -> tuple:
+    """
+    Returns everything about the game that two engines should agree on, as a tuple that can be compared
+
+    Args:
+        game (UnoGame): The game
+
+    Returns:
+        tuple: The state
+    """
+    return (
+        tuple((player.player_id, tuple(card.card_id for card in player.hand)) for player in game.players),
+        tuple(card.card_id for card in game.deck.draw_pile),
+        tuple(card.card_id for card in game.deck.discard_pile),
+        game.deck.top_card.card_id,
+        game.deck.top_card.return_to_discard,
+        game.turn_index,
+        game.current_stack,
+        game.reversed,
+        game.state,
+        game.get_state_hash(),
+    )
+
+
+def random_rules(rng: random.Random) -> RulesKey:
+    """
+    Picks random rules, with every on/off rule equally likely to be on or off and a random hand size
+
+    Args:
+        rng (random.Random): The random number generator to use
+
+    Returns:
+        RulesKey: The rules
+    """
+    return RulesKey(rng.getrandbits(len(RULE_FLAGS)), rng.choice((1, 2, 3, 5, 7)), 1)
+
+
+def choose_policy_move(game: UnoGame, rng: random.Random) -> UnoMove:
+    """
+    Picks a move for any player. Usually a legal one (including jump-ins), but sometimes a random one to test errors
+
+    Args:
+        game (UnoGame): The game
+        rng (random.Random): The random number generator to use
+
+    Returns:
+        UnoMove: The move
+    """
+    if rng.random() >= _RANDOM_MOVE_CHANCE:
+        legal_moves = [move for player in game.players for move in game.get_legal_moves(player)]
+        if len(legal_moves) > 0:
+            return rng.choice(legal_moves)
+
+    player_id = rng.choice(game.players).player_id
+    move_type = rng.choice(list(MoveTypes))
+    match move_type:
+        case MoveTypes.PLAY_CARD:
+            return UnoMove(move_type, player_id, card=rng.choice(_ALL_CARDS))
+        case MoveTypes.CHOOSE_COLOR:
+            return UnoMove(move_type, player_id, color=rng.choice(_ALL_COLORS))
+        case MoveTypes.SEVEN_SWAP:
+            return UnoMove(move_type, player_id, target_index=rng.randrange(len(game.players)))
+        case MoveTypes.ZERO_ROTATE:
+            return UnoMove(move_type, player_id, rotate=rng.random() < 0.5)
+        case _:
+            return UnoMove(move_type, player_id)
+
+
+def run_game(seed: int, max_moves: int = 200, reference_factory: EngineFactory = create_reference_game,
+        candidate_factory: EngineFactory = create_game) -> tuple[int, Divergence | None]:
+    """
+    Plays one game from the seed on both engines, comparing them after every move
+
+    Args:
+        seed (int): Decides the rules, the number of players, the deck, and every move
+        max_moves (int): The most moves to make
+        reference_factory (EngineFactory): Creates the engine that is assumed to be right
+        candidate_factory (EngineFactory): Creates the engine being checked
+
+    Returns:
+        tuple[int, Divergence | None]: How many moves were made, and the divergence if the engines disagreed
+    """
+    rng = random.Random(seed)
+    rules_key = random_rules(rng)
+    player_count = rng.randrange(2, 7)
+
+    games = _create_games(rules_key, player_count, seed, reference_factory, candidate_factory)
+    if isinstance(games, Divergence):
+        return 0, games
+    reference_game, candidate_game = games
+
+    moves: list[UnoMove] = []
+    for move_count in range(max_moves):
+        if reference_game.state == UnoStates.PLAYER_WON:
+            return move_count, None
+
+        move = choose_policy_move(reference_game, rng)
+        moves.append(move)
+        divergence = _compare_move(reference_game, candidate_game, move)
+        if divergence is not None:
+            return move_count + 1, Divergence(seed, rules_key, player_count, moves, *divergence)
+
+    return max_moves, None
+
+
+def replay_moves(seed: int, rules_key: RulesKey, player_count: int, moves: list[UnoMove],
+        reference_factory: EngineFactory = create_reference_game, candidate_factory: EngineFactory = create_game) -> Divergence | None:
+    """
+    Makes a fixed list of moves on both engines, stopping at the first divergence
+
+    Args:
+        seed (int): The deck seed
+        rules_key (RulesKey): The rules
+        player_count (int): How many players the game has
+        moves (list[UnoMove]): The moves to make
+        reference_factory (EngineFactory): Creates the engine that is assumed to be right
+        candidate_factory (EngineFactory): Creates the engine being checked
+
+    Returns:
+        Divergence | None: The divergence, or None if the engines agreed the whole way
+    """
+    games = _create_games(rules_key, player_count, seed, reference_factory, candidate_factory)
+    if isinstance(games, Divergence):
+        return games
+    reference_game, candidate_game = games
+
+    for i, move in enumerate(moves):
+        # Moves by players who aren't in a shrunk game just fail on both engines
+        divergence = _compare_move(reference_game, candidate_game, move)
+        if divergence is not None:
+            return Divergence(seed, rules_key, player_count, moves[:i + 1], *divergence)
+    return None
+
+
+def shrink(divergence: Divergence, reference_factory: EngineFactory = create_reference_game,
+        candidate_factory: EngineFactory = create_game) -> Divergence:
+    """
+    Makes a divergence as small as possible while the engines still disagree: first removing moves
+    (in chunks, then one at a time), then turning rules off, then removing players
+
+    Args:
+        divergence (Divergence): The divergence from `run_game`
+        reference_factory (EngineFactory): Creates the engine that is assumed to be right
+        candidate_factory (EngineFactory): Creates the engine being checked
+
+    Returns:
+        Divergence: The smallest divergence found
+    """
+    def check(rules_key: RulesKey, player_count: int, moves: list[UnoMove]) -> Divergence | None:
+        return replay_moves(divergence.seed, rules_key, player_count, moves, reference_factory, candidate_factory)
+
+    best = divergence
+
+    # Remove chunks of moves, halving the chunk size whenever nothing can be removed
+    chunk_size = max(len(best.moves) // 2, 1)
+    while chunk_size >= 1:
+        removed_any = False
+        start = 0
+        while start < len(best.moves):
+            result = check(best.rules_key, best.player_count, best.moves[:start] + best.moves[start + chunk_size:])
+            if result is not None:
+                best = result
+                removed_any = True
+            else:
+                start += chunk_size
+        if not removed_any:
+            chunk_size //= 2
+
+    # Turn off rules that don't matter
+    for bit in range(len(RULE_FLAGS)):
+        if best.rules_key.flags & (1 << bit):
+            rules_key = RulesKey(best.rules_key.flags & ~(1 << bit), best.rules_key.starting_hand_size, best.rules_key.number_of_decks)
+            result = check(rules_key, best.player_count, best.moves)
+            if result is not None:
+                best = result
+
+    # Use fewer players if possible
+    for player_count in range(2, best.player_count):
+        result = check(best.rules_key, player_count, best.moves)
+        if result is not None:
+            best = result
+            break
+
+    return best
+
+
+def run_conformance(game_count: int, max_moves: int = 200, first_seed: int = 0, processes: int | None = None,
+        max_divergences: int = 10, reference_factory: EngineFactory = create_reference_game,
+        candidate_factory: EngineFactory = create_game) -> ConformanceReport:
+    """
+    Runs `run_game` for game_count seeds in a row on every core, and shrinks any divergences found.
+    The factories must be picklable (module level functions or classes) to be sent to the worker processes
+
+    Args:
+        game_count (int): How many games to play
+        max_moves (int): The most moves per game
+        first_seed (int): The seed of the first game. The rest count up from it
+        processes (int | None): How many worker processes to use. Defaults to the number of cores, and 1 runs everything here
+        max_divergences (int): Stop after finding this many divergences
+        reference_factory (EngineFactory): Creates the engine that is assumed to be right
+        candidate_factory (EngineFactory): Creates the engine being checked
+
+    Returns:
+        ConformanceReport: How many games and moves were played and the shrunk divergences
+    """
+    processes = processes if processes is not None else os.cpu_count() or 1
+    report = ConformanceReport()
+    start_time = time.perf_counter()
+
+    # Batches are big enough that sending them to workers costs little, and small enough to stop soon after finding divergences
+    batch_size = max(1, min(64, game_count // (processes * 4)))
+    batches = [(seed, min(seed + batch_size, first_seed + game_count), max_moves, reference_factory, candidate_factory)
+        for seed in range(first_seed, first_seed + game_count, batch_size)]
+
+    def add_results(results: tuple[int, int, list[Divergence]]) -> None:
+        games, moves, divergences = results
+        report.games += games
+        report.moves += moves
+        for divergence in divergences:
+            if len(report.divergences) < max_divergences:
+                report.divergences.append(shrink(divergence, reference_factory, candidate_factory))
+
+    if processes <= 1:
+        for batch in batches:
+            add_results(_run_batch(*batch))
+            if len(report.divergences) >= max_divergences:
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(_run_batch, *batch) for batch in batches]
+            for future in futures:
+                add_results(future.result())
+                if len(report.divergences) >= max_divergences:
+                    for remaining_future in futures:
+                        remaining_future.cancel()
+                    break
+
+    report.seconds = time.perf_counter() - start_time
+    return report
+
+
+def _run_batch(first_seed: int, end_seed: int, max_moves: int, reference_factory: EngineFactory,
+        candidate_factory: EngineFactory) -> tuple[int, int, list[Divergence]]:
+    """
+    Runs the games for seeds first_seed up to end_seed. Runs in the worker processes
+
+    Returns:
+        tuple[int, int, list[Divergence]]: The number of games, the number of moves, and the divergences
+    """
+    moves = 0
+    divergences = []
+    for seed in range(first_seed, end_seed):
+        move_count, divergence = run_game(seed, max_moves, reference_factory, candidate_factory)
+        moves += move_count
+        if divergence is not None:
+            divergences.append(divergence)
+    return end_seed - first_seed, moves, divergences
+
+
+def _create_games(rules_key: RulesKey, player_count: int, seed: int, reference_factory: EngineFactory,
+        candidate_factory: EngineFactory) -> tuple[UnoGame, UnoGame] | Divergence:
+    """
+    Creates both engines, adds the players, and starts the games
+
+    Returns:
+        tuple[UnoGame, UnoGame] | Divergence: The reference and candidate games, or a divergence if they already disagree
+    """
+    reference_game = reference_factory(rules_key.to_rules(), seed)
+    candidate_game = candidate_factory(rules_key.to_rules(), seed)
+    for game in (reference_game, candidate_game):
+        for player_id in range(player_count):
+            game.create_player(player_id)
+        game.start_game()
+
+    reference_state = get_full_state(reference_game)
+    candidate_state = get_full_state(candidate_game)
+    if reference_state != candidate_state:
+        return Divergence(seed, rules_key, player_count, [], (None, None), (reference_state, candidate_state))
+    return reference_game, candidate_game
+
+
+def _compare_move(reference_game: UnoGame, candidate_game: UnoGame, move: UnoMove) -> tuple[tuple[type | None, type | None], tuple[tuple, tuple]] | None:
+    """
+    Makes the move on both engines and compares the results and states
+
+    Returns:
+        tuple[tuple[type | None, type | None], tuple[tuple, tuple]] | None: The results and states if they differ, or None
+    """
+    results = (_try_move(reference_game, move), _try_move(candidate_game, move))
+    reference_state = get_full_state(reference_game)
+    candidate_state = get_full_state(candidate_game)
+    if results[0] != results[1] or reference_state != candidate_state:
+        return results, (reference_state, candidate_state)
+    return None
+
+
+def _try_move(game: UnoGame, move: UnoMove) -> type | None:
+    """
+    Makes the move with apply, so failed moves are rolled back, and forgets the undo information straight away
+
+    Returns:
+        type | None: The type of exception the move raised, or None
+    """
+    try:
+        game.apply(move)
+    except Exception as error:
+        return type(error)
+    game._undo_stack.clear()
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ReferenceUnoGame and UnoGame on random games")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--max-moves", type=int, default=200)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    report = run_conformance(args.games, args.max_moves, args.first_seed, args.processes)
+    print(f"{report.games} games, {report.moves} moves in {report.seconds:.1f}s ({report.moves_per_minute:,.0f} moves per minute)")
+    for divergence in report.divergences:
+        print()
+        print(divergence)
@@ -1,18 +1,33 @@
 from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
 from unogame.card import Card, CardColors, CardFaces
+from unogame.instrumentation import EngineStats
 
 import random # type: ignore (pylance shadow stdlib issues)
+import time # type: ignore (pylance shadow stdlib issues)
+from typing import Callable
+
+# Clones draw with this instead of the real deck's generator, so trying out moves never changes what the real deck draws next
+_clone_rng = random.Random()
 
 class DeckManager:
 
-    def __init__(self, deck_count: int = 1) -> None:
+    # Where draw_card and play_card record calls, if instrumentation is enabled (see instrumentation.py)
+    stats: EngineStats | None = None
+
+    def __init__(self, deck_count: int = 1, rng: random.Random | None = None) -> None:
         """
         Represents a draw and discard pile. By default initializes with a standard deck loaded
+
+        Args:
+            deck_count (int): How many standard decks to shuffle together
+            rng (random.Random | None): The random number generator for every draw. A seeded one makes the deck order repeatable. Defaults to a new one
         """
 
         if deck_count < 1:
             raise ValueError("Deck count must be 1 or more")
 
+        self.rng = rng if rng is not None else random.Random()
+
         self.draw_pile: list[Card] = []
 
         for _ in range(deck_count):
@@ -20,6 +35,9 @@ class DeckManager:
 
         self.discard_pile: list[Card] = []
 
+        # If set, every change to the piles adds a step here that undoes it (see UnoGame.apply)
+        self.journal: list[Callable[[], None]] | None = None
+
         self.top_card: Card = self.draw_starting_card()
 
     def create_deck(self) -> list[Card]:
@@ -47,6 +65,12 @@ class DeckManager:
 
         return cards
 
+    def add_deck(self) -> None:
+        """
+        Shuffles another standard deck into the draw pile, for games that grow past what their decks can deal
+        """
+        self.draw_pile += self.create_deck()
+
     def draw_card(self) -> Card:
         """
         Draws a random card from the draw pile. Will reshuffle if needed
@@ -57,9 +81,26 @@ class DeckManager:
         Returns:
             Card: A random card from the draw pile
         """
+        stats = self.stats
+        if stats is None:
+            return self._draw_card()
 
+        start_ns = time.perf_counter_ns()
+        try:
+            return self._draw_card()
+        finally:
+            stats.record("deck.draw_card", None, None, time.perf_counter_ns() - start_ns)
+
+    def _draw_card(self) -> Card:
+        """
+        The untimed body of `draw_card`
+        """
         # If the draw pile is empty, add the discard pile back into the draw pile
         if self.draw_pile.__len__() == 0:
+            if self.journal is not None:
+                old_discard_pile = self.discard_pile
+                self.journal.append(lambda: self._undo_reshuffle(old_discard_pile))
+
             self.draw_pile += self.discard_pile
             self.discard_pile = []
 
@@ -67,8 +108,13 @@ class DeckManager:
         if self.draw_pile.__len__() == 0:
             raise IndexError("No cards left to draw")
 
-        index: int = random.randrange(0, self.draw_pile.__len__())
-        return self.draw_pile.pop(index)
+        index: int = self.rng.randrange(0, self.draw_pile.__len__())
+        card = self.draw_pile.pop(index)
+
+        if self.journal is not None:
+            self.journal.append(lambda: self.draw_pile.insert(index, card))
+
+        return card
 
     def play_card(self, card: Card) -> None:
         """
@@ -78,11 +124,66 @@ class DeckManager:
         Args:
             card (Card): Card to play
         """
+        stats = self.stats
+        if stats is None:
+            return self._play_card(card)
+
+        start_ns = time.perf_counter_ns()
+        try:
+            return self._play_card(card)
+        finally:
+            stats.record("deck.play_card", None, None, time.perf_counter_ns() - start_ns)
+
+    def _play_card(self, card: Card) -> None:
+        """
+        The untimed body of `play_card`
+        """
+        if self.journal is not None:
+            self.journal.append(lambda previous_top_card=self.top_card: self._undo_play_card(previous_top_card))
+
         # If the card is a "ghost card", such as a colored wild card, then don't return it
         if self.top_card.return_to_discard:
             self.discard_pile.append(self.top_card)
         self.top_card = card
 
+    def _undo_play_card(self, previous_top_card: Card) -> None:
+        """
+        Puts back the top card from before the last `play_card`
+
+        Args:
+            previous_top_card (Card): The top card before the play
+        """
+        if previous_top_card.return_to_discard:
+            self.discard_pile.pop()
+        self.top_card = previous_top_card
+
+    def _undo_reshuffle(self, old_discard_pile: list[Card]) -> None:
+        """
+        Moves the cards that were shuffled in from the discard pile back out of the draw pile.
+        Only valid once every draw made after the reshuffle has been undone, so the draw pile holds exactly those cards again
+
+        Args:
+            old_discard_pile (list[Card]): The discard pile list from before the reshuffle (which is never changed afterwards)
+        """
+        self.draw_pile.clear()
+        self.discard_pile = old_discard_pile
+
+    def clone(self) -> DeckManager:
+        """
+        Returns a copy of the deck. The cards themselves are shared, only the piles are copied.
+        The copy doesn't share this deck's random number generator, so its draws don't follow the seed
+
+        Returns:
+            DeckManager: The copy
+        """
+        new_deck = object.__new__(DeckManager)
+        new_deck.draw_pile = self.draw_pile.copy()
+        new_deck.discard_pile = self.discard_pile.copy()
+        new_deck.top_card = self.top_card
+        new_deck.journal = None
+        new_deck.rng = _clone_rng
+        return new_deck
+
     def draw_starting_card(self) -> Card:
         """
         Draws cards until a card that is a valid starting card (anything non wild) is drawn
@@ -0,0 +1,363 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+from typing import TYPE_CHECKING, Sequence
+
+from unogame.card import Card, CARD_IDS, CARDS_BY_ID
+
+from array import array # type: ignore (pylance shadow stdlib issues)
+import random # type: ignore (pylance shadow stdlib issues)
+
+if TYPE_CHECKING:
+    from unogame.game import UnoGame
+    from unogame.player import Player
+
+class HiddenHandSampler:
+
+    def __init__(self, observer_id: int) -> None:
+        """
+        Keeps track of which cards one player (the observer) hasn't seen, and deals them out into random
+        hands that fit everything the observer knows. Unseen cards are the other players' hands and the draw pile,
+        minus any cards the observer knows another player is holding (from seven swaps and zero rotations).
+
+        Use `UnoGame.get_hand_sampler` to get a sampler that the game keeps up to date as moves are made,
+        or `from_game` for a one off sampler
+
+        Args:
+            observer_id (int): The id of the player whose point of view is used
+        """
+        self.observer_id = observer_id
+
+        # card_id -> number of unseen copies
+        self.unseen_counts: list[int] = [0] * len(CARD_IDS)
+        self.unseen_total = 0
+        # player_id -> card_ids the observer knows are in that player's hand
+        self.known_cards: dict[int, list[int]] = {}
+
+        # unseen_counts flattened into an array of card_ids, reused (and reshuffled) by every deal until the unseen cards change
+        self._unseen_card_ids: array | None = None
+
+    @classmethod
+    def from_game(cls, game: UnoGame, observer_id: int) -> HiddenHandSampler:
+        """
+        Creates a sampler for the given observer from the current state of the game
+
+        Args:
+            game (UnoGame): The game
+            observer_id (int): The id of the player whose point of view is used
+
+        Returns:
+            HiddenHandSampler: The sampler
+        """
+        sampler = cls(observer_id)
+        sampler.rebuild(game)
+        return sampler
+
+    def rebuild(self, game: UnoGame) -> None:
+        """
+        Works out the unseen cards from scratch. Forgets any known cards, since they can't be worked out from the game alone
+
+        Args:
+            game (UnoGame): The game
+        """
+        self.unseen_counts = [0] * len(CARD_IDS)
+        self.known_cards = {}
+
+        for card in game.deck.draw_pile:
+            self.unseen_counts[card.card_id] += 1
+        for player in game.players:
+            if player.player_id != self.observer_id:
+                for card in player.hand:
+                    self.unseen_counts[card.card_id] += 1
+
+        self.unseen_total = sum(self.unseen_counts)
+        self._unseen_card_ids = None
+
+    def copy(self) -> HiddenHandSampler:
+        """
+        Returns an independent copy of the sampler
+
+        Returns:
+            HiddenHandSampler: The copy
+        """
+        new_sampler = HiddenHandSampler(self.observer_id)
+        new_sampler.unseen_counts = self.unseen_counts.copy()
+        new_sampler.unseen_total = self.unseen_total
+        new_sampler.known_cards = {player_id: card_ids.copy() for player_id, card_ids in self.known_cards.items()}
+        return new_sampler
+
+    def card_drawn(self, player_id: int, card: Card) -> None:
+        """
+        Records a card being drawn. Only the observer's own draws are seen
+
+        Args:
+            player_id (int): The id of the player who drew
+            card (Card): The card drawn
+        """
+        if player_id == self.observer_id:
+            self._see_card(card.card_id)
+
+    def card_played(self, player_id: int, card: Card) -> None:
+        """
+        Records a card leaving a hand face up (played, or put back when a player leaves)
+
+        Args:
+            player_id (int): The id of the player who held the card
+            card (Card): The card
+        """
+        if player_id == self.observer_id:
+            return
+
+        known_card_ids = self.known_cards.get(player_id)
+        if known_card_ids is not None and card.card_id in known_card_ids:
+            known_card_ids.remove(card.card_id)
+        else:
+            self._see_card(card.card_id)
+
+    def cards_reshuffled(self, cards: list[Card]) -> None:
+        """
+        Records the discard pile being shuffled back into the draw pile, so those cards are unseen again
+
+        Args:
+            cards (list[Card]): The cards shuffled back in
+        """
+        for card in cards:
+            self.unseen_counts[card.card_id] += 1
+        self.unseen_total += len(cards)
+        self._unseen_card_ids = None
+
+    def hands_swapped(self, player: Player, other_player: Player) -> None:
+        """
+        Records two players swapping hands. Must be called after the swap.
+        If the observer is one of them, they see their new hand and know exactly what the other player now holds
+
+        Args:
+            player (Player): One of the players
+            other_player (Player): The other player
+        """
+        if other_player.player_id == self.observer_id:
+            player, other_player = other_player, player
+
+        if player.player_id == self.observer_id:
+            known_card_ids = self.known_cards.get(other_player.player_id, [])
+            for card in player.hand:
+                if card.card_id in known_card_ids:
+                    known_card_ids.remove(card.card_id)
+                else:
+                    self._see_card(card.card_id)
+            self.known_cards[other_player.player_id] = [card.card_id for card in other_player.hand]
+
+        else:
+            known_card_ids = self.known_cards.pop(player.player_id, None)
+            other_known_card_ids = self.known_cards.pop(other_player.player_id, None)
+            if other_known_card_ids is not None:
+                self.known_cards[player.player_id] = other_known_card_ids
+            if known_card_ids is not None:
+                self.known_cards[other_player.player_id] = known_card_ids
+
+    def hands_rotated(self, players: list[Player], backwards: bool) -> None:
+        """
+        Records every hand being passed one seat along (see `UnoGame.zero_rotate_move`). Must be called after the rotation
+
+        Args:
+            players (list[Player]): Every player in the game, in seat order
+            backwards (bool): If True, everyone got the hand of the player after them, otherwise the player before them
+        """
+        giver_offset = 1 if backwards else -1
+        old_known_cards = [self.known_cards.pop(player.player_id, None) for player in players]
+
+        for i, player in enumerate(players):
+            giver_index = (i + giver_offset) % len(players)
+            giver_known_card_ids = old_known_cards[giver_index]
+
+            if player.player_id == self.observer_id:
+                for card in player.hand:
+                    if giver_known_card_ids is not None and card.card_id in giver_known_card_ids:
+                        giver_known_card_ids.remove(card.card_id)
+                    else:
+                        self._see_card(card.card_id)
+
+            # Whoever got the observer's hand is holding exactly what the observer had
+            elif players[giver_index].player_id == self.observer_id:
+                self.known_cards[player.player_id] = [card.card_id for card in player.hand]
+
+            elif giver_known_card_ids is not None:
+                self.known_cards[player.player_id] = giver_known_card_ids
+
+    def add_known_cards(self, player_id: int, card_ids: list[int]) -> None:
+        """
+        Records that the observer knows the given player is holding these cards (used when loading a saved sampler)
+
+        Args:
+            player_id (int): The id of the player holding the cards
+            card_ids (list[int]): The card_ids of the cards
+        """
+        self.known_cards.setdefault(player_id, []).extend(card_ids)
+        for card_id in card_ids:
+            self._see_card(card_id)
+
+    def player_removed(self, player: Player) -> None:
+        """
+        Records a player leaving the game. Their hand goes to the discard pile, so it is seen
+
+        Args:
+            player (Player): The player leaving
+        """
+        for card in player.hand:
+            self.card_played(player.player_id, card)
+        self.known_cards.pop(player.player_id, None)
+
+    def sample(self, game: UnoGame, rng: random.Random) -> array:
+        """
+        Deals out the unseen cards once. See `sample_batch` for the layout
+
+        Args:
+            game (UnoGame): The game, for the current hand sizes
+            rng (random.Random): The random number generator to use
+
+        Returns:
+            array: The card_ids of the deal
+        """
+        hand_card_count = self._get_hand_card_count(game)
+        cards = self._get_unseen_card_ids()
+        self._shuffle(cards, hand_card_count, rng)
+        return cards[:]
+
+    def sample_batch(self, game: UnoGame, count: int, rng: random.Random, out: array | None = None) -> array:
+        """
+        Deals out the unseen cards `count` times into one flat array of card_ids, `unseen_total` ids per deal.
+        Each deal lists the unknown part of every other player's hand in seat order, then the rest of the cards (the draw pile).
+        Each deal is a partial Fisher-Yates shuffle, so it only costs one random number per card dealt to a hand and a copy
+
+        Args:
+            game (UnoGame): The game, for the current hand sizes
+            count (int): How many deals to make
+            rng (random.Random): The random number generator to use
+            out (array | None): A preallocated array of unsigned bytes (typecode "B") to write into, at least count * unseen_total long
+
+        Raises:
+            ValueError: If the sampler is out of date with the game, or out is too short
+
+        Returns:
+            array: The deals (out, if it was given)
+        """
+        hand_card_count = self._get_hand_card_count(game)
+        deal_size = self.unseen_total
+
+        if out is None:
+            out = array("B", bytes(count * deal_size))
+        elif len(out) < count * deal_size:
+            raise ValueError("out is too short to hold every deal")
+
+        cards = self._get_unseen_card_ids()
+        for deal_index in range(count):
+            self._shuffle(cards, hand_card_count, rng)
+            out[deal_index * deal_size:(deal_index + 1) * deal_size] = cards
+
+        return out
+
+    def determinize(self, game: UnoGame, rng: random.Random, deal: Sequence[int] | None = None) -> UnoGame:
+        """
+        Returns a copy of the game with the unseen cards dealt out. Every hand keeps its size,
+        the observer keeps their hand, and known cards stay with the player known to hold them
+
+        Args:
+            game (UnoGame): The game to copy
+            rng (random.Random): The random number generator to use if no deal is given
+            deal (Sequence[int] | None): A deal from `sample_batch` to use (one deal, not the whole batch)
+
+        Raises:
+            ValueError: If the sampler is out of date with the game
+
+        Returns:
+            UnoGame: The determinized copy
+        """
+        if deal is None:
+            hand_card_count = self._get_hand_card_count(game)
+            deal = self._get_unseen_card_ids()
+            self._shuffle(deal, hand_card_count, rng)
+        else:
+            self._get_hand_card_count(game)
+
+        new_game = game.clone()
+
+        position = 0
+        for player in new_game.players:
+            if player.player_id == self.observer_id:
+                continue
+
+            hand = [CARDS_BY_ID[card_id] for card_id in self.known_cards.get(player.player_id, ())]
+            unknown_count = len(player.hand) - len(hand)
+            hand += [CARDS_BY_ID[card_id] for card_id in deal[position:position + unknown_count]]
+            position += unknown_count
+            player.hand = hand
+
+        new_game.deck.draw_pile = [CARDS_BY_ID[card_id] for card_id in deal[position:self.unseen_total]]
+
+        new_game.rebuild_card_index()
+        new_game.rehash()
+        return new_game
+
+    def _get_unseen_card_ids(self) -> array:
+        """
+        Returns the unseen cards as a flat array of card_ids, in whatever order the last deal left them
+
+        Returns:
+            array: The card_ids
+        """
+        if self._unseen_card_ids is None:
+            self._unseen_card_ids = array("B")
+            for card_id, card_count in enumerate(self.unseen_counts):
+                if card_count > 0:
+                    self._unseen_card_ids.extend([card_id] * card_count)
+        return self._unseen_card_ids
+
+    def _shuffle(self, cards: array, hand_card_count: int, rng: random.Random) -> None:
+        """
+        Shuffles the first `hand_card_count` positions of the array (a partial Fisher-Yates shuffle).
+        The rest is left in any order, since it only becomes the draw pile, and drawing is random anyway.
+        Shuffling an already shuffled array this way is still a uniform shuffle, so the same array can be reused
+
+        Args:
+            cards (array): The card_ids to shuffle
+            hand_card_count (int): How many positions to shuffle
+            rng (random.Random): The random number generator to use
+        """
+        random_float = rng.random
+        card_count = len(cards)
+        for i in range(hand_card_count):
+            j = i + int(random_float() * (card_count - i))
+            cards[i], cards[j] = cards[j], cards[i]
+
+    def _see_card(self, card_id: int) -> None:
+        """
+        Removes a card from the unseen cards. Cards the sampler didn't think were unseen are ignored
+
+        Args:
+            card_id (int): The card_id of the card seen
+        """
+        if self.unseen_counts[card_id] > 0:
+            self.unseen_counts[card_id] -= 1
+            self.unseen_total -= 1
+            self._unseen_card_ids = None
+
+    def _get_hand_card_count(self, game: UnoGame) -> int:
+        """
+        Returns how many unseen cards have to be dealt to hands, and checks that the sampler still matches the game
+
+        Args:
+            game (UnoGame): The game
+
+        Raises:
+            ValueError: If the number of unseen cards doesn't match the hands and draw pile
+
+        Returns:
+            int: The number of unseen cards in other players' hands
+        """
+        hand_card_count = 0
+        for player in game.players:
+            if player.player_id != self.observer_id:
+                hand_card_count += len(player.hand) - len(self.known_cards.get(player.player_id, ()))
+
+        if hand_card_count < 0 or hand_card_count + len(game.deck.draw_pile) != self.unseen_total:
+            raise ValueError("Sampler is out of date with the game, call rebuild")
+
+        return hand_card_count
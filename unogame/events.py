@@ -0,0 +1,70 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+from unogame.card import Card, CardColors
+
+from dataclasses import dataclass # type: ignore (pylance shadow stdlib issues)
+
+# Events UnoGame sends to its subscribers (see `UnoGame.subscribe`) describing what a move changed.
+# One move can send several events, always in this order: what the player did (CardPlayed, CardsDrawn, ColorChosen,
+# HandsSwapped, HandsRotated), then StackChanged, DirectionReversed, TurnAdvanced, and finally PlayerWon
+
+@dataclass(frozen=True)
+class GameEvent:
+    pass
+
+
+@dataclass(frozen=True)
+class CardPlayed(GameEvent):
+    player_id: int
+    card: Card
+    # True if the card was played out of turn
+    jump_in: bool
+
+
+@dataclass(frozen=True)
+class CardsDrawn(GameEvent):
+    player_id: int
+    # In the order they were drawn
+    cards: tuple[Card, ...]
+
+
+@dataclass(frozen=True)
+class ColorChosen(GameEvent):
+    player_id: int
+    color: CardColors
+
+
+@dataclass(frozen=True)
+class HandsSwapped(GameEvent):
+    player_id: int
+    other_player_id: int
+
+
+@dataclass(frozen=True)
+class HandsRotated(GameEvent):
+    # True if hands moved towards the start of the player list
+    backwards: bool
+
+
+@dataclass(frozen=True)
+class StackChanged(GameEvent):
+    previous_stack: int
+    current_stack: int
+
+
+@dataclass(frozen=True)
+class DirectionReversed(GameEvent):
+    # The new direction
+    reversed: bool
+
+
+@dataclass(frozen=True)
+class TurnAdvanced(GameEvent):
+    previous_turn_index: int
+    turn_index: int
+    # The id of the player whose turn it is now
+    player_id: int
+
+
+@dataclass(frozen=True)
+class PlayerWon(GameEvent):
+    player_id: int
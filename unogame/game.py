@@ -1,32 +1,102 @@
 from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
 
 from unogame.card import Card, CardColors, CardFaces
+from unogame.card_index import CardLocationIndex
 from unogame.deck import DeckManager, OutOfCardsError
+from unogame.determinize import HiddenHandSampler
+from unogame.game_record import GameRecord, RecordEntryTypes, RecordError, RECORD_COLORS
+from unogame.instrumentation import EngineStats
+from unogame.events import (GameEvent, CardPlayed, CardsDrawn, ColorChosen, HandsSwapped, HandsRotated, StackChanged,
+    DirectionReversed, TurnAdvanced, PlayerWon)
 from unogame.player import Player
+from unogame.rules_table import RulesTable, Transition, compile_rules
+from unogame.move import UnoMove, MoveTypes
+from unogame.zobrist import DIRECTION_KEY, TOP_CARD_KEYS, player_hand_key, stack_key, state_key, turn_key
 
 from dataclasses import dataclass # type: ignore (pylance shadow stdlib issues)
+from typing import Callable
+import functools # type: ignore (pylance shadow stdlib issues)
+import random # type: ignore (pylance shadow stdlib issues)
+import logging # type: ignore (pylance shadow stdlib issues)
+import time # type: ignore (pylance shadow stdlib issues)
 from enum import Enum # type: ignore (pylance shadow stdlib issues)
 
+logger = logging.getLogger(__name__)
+
+def _records_outcome(method: Callable) -> Callable:
+    """
+    Marks the entry a recorded method logs as failed if the method raises an error (see `GameRecord.mark_failed`).
+    The entry is always logged first thing in the method, so it's there to mark
+    """
+    @functools.wraps(method)
+    def wrapper(self: UnoGame, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except Exception:
+            if self.record is not None:
+                self.record.mark_failed()
+            raise
+    return wrapper
+
 class UnoGame:
 
-    def __init__(self, ruleset: UnoRules | None = None) -> None:
+    # Where play_card_move and draw_card_move record calls, if instrumentation is enabled (see instrumentation.py)
+    stats: EngineStats | None = None
+
+    def __init__(self, ruleset: UnoRules | None = None, seed: int | None = None, record: bool = True) -> None:
+        """
+        Creates a new game, waiting for players to join
+
+        Args:
+            ruleset (UnoRules | None): The rules. Defaults to UnoRules()
+            seed (int | None): The seed of the deck, which decides every card drawn. Defaults to a random one
+            record (bool): If True, everything done to the game is logged in `record` so it can be replayed (see replay.py)
+        """
 
         self.ruleset = ruleset if ruleset is not None else UnoRules()
 
         self.players: list[Player] = []
-        self.deck = DeckManager(self.ruleset.number_of_decks)
+        # The same seed and the same moves always give the same game
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.deck = DeckManager(self.ruleset.number_of_decks, random.Random(self.seed))
+        # Which players hold which cards, kept up to date by every move that changes a hand
+        self.card_index = CardLocationIndex()
 
         self.turn_index = 0
         self.current_stack = 0
         self.reversed = False
         self.state = UnoStates.PREGAME
 
+        # Unseen card trackers for players' points of view, kept up to date like card_index (see get_hand_sampler)
+        self._hand_samplers: dict[int, HiddenHandSampler] = {}
+
+        # XOR of player_hand_key for every player, kept up to date by every change to a hand (see get_state_hash)
+        self._hands_hash = 0
+
+        # What each card play does under the current rules
+        self._rules_table = compile_rules(self.ruleset.to_key())
+
+        # (callback, event types or None for every type) for everything listening to this game's events (see subscribe).
+        # Replaced instead of changed, so subscribers can unsubscribe while an event is being sent
+        self._subscribers: tuple[tuple[Callable[[GameEvent], None], tuple[type[GameEvent], ...] | None], ...] = ()
+
+        # The log of everything done to this game, for replaying it
+        self.record: GameRecord | None = None
+        if record:
+            rules_key = self.ruleset.to_key()
+            self.record = GameRecord(self.seed, rules_key.flags, rules_key.starting_hand_size, rules_key.number_of_decks)
+
+        # Undo information for moves made with apply(). _journal collects undo steps while a move is being applied
+        self._journal: list[Callable[[], None]] | None = None
+        self._undo_stack: list[tuple[tuple[int, int, bool, UnoStates], list[Callable[[], None]]]] = []
+
         # Status message stuff
         self.status_message = "Waiting to start..."
         self.status_players = ()
         # Discord interaction stuff
         self.lobby_message_id: int | None = None
 
+    @_records_outcome
     def create_player(self, player_id: int) -> None:
         """
         Creates a player with the provided id, then draws them a hand and adds them to the game 
@@ -39,26 +109,49 @@ class UnoGame:
             OutOfCardsError: If there are not enough cards left to add another player
         """
 
+        if self.record is not None:
+            self._record(RecordEntryTypes.ADD_PLAYER, player_id)
+
         # If the ID is already used, throw an error
         if (player_id in [player.player_id for player in self.players]):
             raise ValueError(f"player_id {player_id} already in use")
 
+        if self.ruleset.scale_decks:
+            self._scale_decks(len(self.players) + 1)
+
         # If there aren't enough cards for another player, raise an error
         if len(self.deck) < self.ruleset.starting_hand_size:
             raise OutOfCardsError
 
         # Create player
         new_player = Player(player_id)
+        # Start with their empty hand in the hash, the draws below will update it
+        self._hands_hash ^= player_hand_key(player_id, new_player.hand_hash)
 
         # Draw player a hand
         for _ in range(self.ruleset.starting_hand_size):
-            card = self.deck.draw_card()
-            new_player.add_card_to_hand(card)
+            self._draw_card_to_hand(new_player)
 
         # Add them to the list
         self.players.append(new_player)
 
 
+    def _scale_decks(self, player_count: int) -> None:
+        """
+        Shuffles in more decks until there are enough for this many players (see get_deck_count). Done the same way when replaying,
+        and the new number_of_decks is logged as a rules change, so records still replay the same
+        """
+        deck_count = get_deck_count(player_count, self.ruleset.starting_hand_size)
+        if deck_count <= self.ruleset.number_of_decks:
+            return
+        for _ in range(deck_count - self.ruleset.number_of_decks):
+            self.deck.add_deck()
+        self.ruleset.number_of_decks = deck_count
+        # Samplers counted the old decks' cards
+        for sampler in self._hand_samplers.values():
+            sampler.rebuild(self)
+
+    @_records_outcome
     def remove_player(self, player_id: int) -> None:
         """
         Removes the provided player_id from the game and returns all their cards to the discard pile
@@ -70,6 +163,9 @@ class UnoGame:
             ValueError: If the player_id is not the id of a player in this game
         """
 
+        if self.record is not None:
+            self._record(RecordEntryTypes.REMOVE_PLAYER, player_id)
+
         # Get the index of the player (Let ValueError propagate)
         index = self.players.index(Player(player_id))
 
@@ -79,6 +175,10 @@ class UnoGame:
         # Put all the cards back in the deck (don't need to bother removing them from the hand because its about to get deleted)
         for card in player.hand:
             self.deck.play_card(card)
+        self.card_index.remove_hand(player.player_id, player.hand)
+        self._hands_hash ^= player_hand_key(player.player_id, player.hand_hash)
+        for sampler in self._hand_samplers.values():
+            sampler.player_removed(player)
 
         # Add them to the list
         self.players.pop(index)
@@ -111,155 +211,258 @@ class UnoGame:
         """
         return self.players.index(player) == self.turn_index
     
-    # TODO?
-    # def is_legal_play(self, card: Card) -> bool:
-    #     """
-    #     Returns true if the given card is a valid card to play at the current point in the game assuming that it would be played by the player whose turn it is.
-    #     Takes stacking rules into account.
-
-    #     Args:
-    #         card (Card): The card to check
-
-    #     Returns:
-    #         bool: True if the card is allowed to be played
-    #     """
-
-
-    def play_card_move(self, player: Player, card: Card, allow_mismatch_play: bool = False) -> None:
+    def get_legal_moves(self, player: Player) -> list[UnoMove]:
         """
-        Has the player given play the card given from their hand,
-        and will update game state accordingly
+        Returns every move the given player could make right now, including jump-ins.
+        Each distinct card in their hand is only listed once
 
         Args:
-            player (Player): The player who plays a card
-            card (Card): The card they are playing
-            allow_mismatch_play (bool): If True, any card will count as a valid card to play on top of the top card. Only affects standard play, not jump-ins 
+            player (Player): The player to get moves for
 
-        Raises:
-            OutOfTurnError: If the move was made out of turn (or an invalid jump-in card was attempted to be played)
-            InvalidCardPlayedError: It is that player's turn, but the card they played was an invalid move
-            PlayerDoesNotHaveCardError: The play was valid, but the player did not have the card they attempted to play
+        Returns:
+            list[UnoMove]: The legal moves
         """
-        # Can't play a card before the game starts or after someone won
+        moves: list[UnoMove] = []
         if self.state == UnoStates.PREGAME or self.state == UnoStates.PLAYER_WON:
-            raise OutOfTurnError
+            return moves
 
-        # Can't play a card during a seven/zero if the rules are set to not allow jump-ins during those
-        # This is only to stop jump-ins during those cases
-        elif self.state == UnoStates.WAITING_FOR_PICK_PLAYER_TO_SWAP and not self.ruleset.jump_in_during_seven:
-            raise OutOfTurnError
-        elif self.state == UnoStates.WAITING_FOR_CHOOSE_TO_ROTATE and not self.ruleset.jump_in_during_zero:
-            raise OutOfTurnError
+        is_current_player = self._is_current_player(player)
+        rules_table = self._get_rules_table()
+        top_card = self.deck.top_card
 
-        # If the game is waiting for the next move and the player who just tried to make a move was the current turn,
-        # then process the play
-        elif ((self.state == UnoStates.WAITING_FOR_PLAY or self.state == UnoStates.WAITING_FOR_DRAW_RESPONSE) and 
-                self.players[self.turn_index] == player):
-            # Check if the card is valid in the first place
-            if not card.can_be_played(self.deck.top_card) and not allow_mismatch_play:
-                raise InvalidCardPlayedError
-            
-            # Remove the card from the player
-            if not player.play_card(card):
-                raise PlayerDoesNotHaveCardError
+        seen_card_ids: set[int] = set()
+        for card in player.hand:
+            if card.card_id in seen_card_ids:
+                continue
+            seen_card_ids.add(card.card_id)
 
-            self.deck.play_card(card)
+            if rules_table.get_transition(self.state, is_current_player, top_card, card).error is None:
+                moves.append(UnoMove(MoveTypes.PLAY_CARD, player.player_id, card=card))
 
-            # Check if the player who just played a card ran out of cards and won
-            if len(player.hand) == 0:
-                self.state = UnoStates.PLAYER_WON
+        # Everything else can only be done on your own turn
+        if not is_current_player:
+            return moves
 
-            self._process_card_state_changes(player, card)
+        # Same checks as draw_card_move and pass_turn_move
+        if self.state == UnoStates.WAITING_FOR_PLUS_RESPONSE:
+            moves.append(UnoMove(MoveTypes.DRAW, player.player_id))
 
-        elif (self.state == UnoStates.WAITING_FOR_PLUS_RESPONSE):
-            # If the card is a plus card that can be stacked, then the card is added to the stack and play continues
-            # Keep in mind the various rules for stacking plus_twos on plus_fours
+        elif self.state == UnoStates.WAITING_FOR_PLAY or self.state == UnoStates.WAITING_FOR_DRAW_RESPONSE:
+            has_card_to_play = player.has_card_to_play(top_card)
 
-            # Case stacking is off
-            if not self.ruleset.stacking:
-                raise InvalidCardPlayedError("Stacking is disabled")
+            if self.state == UnoStates.WAITING_FOR_PLAY and not (self.ruleset.force_play and has_card_to_play):
+                moves.append(UnoMove(MoveTypes.DRAW, player.player_id))
 
-            # Case standard stack
-            elif self.deck.top_card.face == card.face:
-                # The card can be played as normal
+            if ((self.state == UnoStates.WAITING_FOR_DRAW_RESPONSE and not self.ruleset.force_play) or
+                    (len(self.deck) == 0 and not has_card_to_play)):
+                moves.append(UnoMove(MoveTypes.PASS, player.player_id))
 
-                # Update the state so play_card_move will process it
-                self.state = UnoStates.WAITING_FOR_PLAY
+        elif self.state == UnoStates.WAITING_FOR_WILD_COLOR:
+            for color in (CardColors.RED, CardColors.YELLOW, CardColors.GREEN, CardColors.BLUE):
+                moves.append(UnoMove(MoveTypes.CHOOSE_COLOR, player.player_id, color=color))
 
-                self.play_card_move(player, card)
+        elif self.state == UnoStates.WAITING_FOR_PICK_PLAYER_TO_SWAP:
+            for player_index in range(len(self.players)):
+                if player_index != self.turn_index or not self.ruleset.force_seven_swap:
+                    moves.append(UnoMove(MoveTypes.SEVEN_SWAP, player.player_id, target_index=player_index))
 
-            # Case plus fours can be stacked on plus twos
-            elif (self.ruleset.stack_plus_fours_on_plus_twos and
-                    self.deck.top_card.face == CardFaces.PLUS_TWO and 
-                    card.face == CardFaces.PLUS_FOUR):
-                # The card can be played as normal
+        elif self.state == UnoStates.WAITING_FOR_CHOOSE_TO_ROTATE:
+            moves.append(UnoMove(MoveTypes.ZERO_ROTATE, player.player_id, rotate=True))
+            if not self.ruleset.force_zero_rotate:
+                moves.append(UnoMove(MoveTypes.ZERO_ROTATE, player.player_id, rotate=False))
 
-                # Update the state so play_card_move will process it
-                self.state = UnoStates.WAITING_FOR_PLAY
+        return moves
 
-                self.play_card_move(player, card)
+    def make_move(self, move: UnoMove) -> None:
+        """
+        Makes the given move by calling the matching *_move method.
+        Raises the same errors as that method, plus ValueError if the player isn't in the game
 
-            # Case plus twos can always be stacked on plus fours
-            elif (self.ruleset.stack_all_plus_twos_on_plus_fours and 
-                    self.deck.top_card.face == CardFaces.PLUS_FOUR and 
-                    card.face == CardFaces.PLUS_TWO):
-                # The card can be played as normal
+        Args:
+            move (UnoMove): The move to make
+        """
+        player = self.get_player(move.player_id)
+
+        match move.move_type:
+            case MoveTypes.PLAY_CARD:
+                if move.card is None:
+                    raise ValueError("PLAY_CARD moves need a card")
+                self.play_card_move(player, move.card)
+            case MoveTypes.DRAW:
+                self.draw_card_move(player)
+            case MoveTypes.PASS:
+                self.pass_turn_move(player)
+            case MoveTypes.CHOOSE_COLOR:
+                if move.color is None:
+                    raise ValueError("CHOOSE_COLOR moves need a color")
+                self.choose_color_move(player, move.color)
+            case MoveTypes.SEVEN_SWAP:
+                self.seven_swap_move(player, move.target_index)
+            case MoveTypes.ZERO_ROTATE:
+                self.zero_rotate_move(player, move.rotate)
+
+    def apply(self, move: UnoMove) -> None:
+        """
+        Makes the given move like `make_move`, but remembers how to take it back with `undo`.
+        If the move raises an error, anything it already changed is rolled back before the error is passed on
 
-                # Update the state so play_card_move will process it
-                self.state = UnoStates.WAITING_FOR_PLAY
+        Args:
+            move (UnoMove): The move to make
+        """
+        saved_values = (self.turn_index, self.current_stack, self.reversed, self.state)
+        journal: list[Callable[[], None]] = []
+
+        self._journal = journal
+        self.deck.journal = journal
+        try:
+            self.make_move(move)
+        except Exception:
+            self._journal = None
+            self.deck.journal = None
+            self._roll_back(saved_values, journal)
+            raise
+
+        self._journal = None
+        self.deck.journal = None
+        self._undo_stack.append((saved_values, journal))
+
+    def undo(self) -> None:
+        """
+        Takes back the last move made with `apply`
 
-                # We must bypass restrictions in this case, because the plus two may not normally be a valid move
-                self.play_card_move(player, card, True)
+        Raises:
+            IndexError: If there are no moves to undo
+        """
+        if len(self._undo_stack) == 0:
+            raise IndexError("No moves to undo")
 
-            # Case only color matched plus twos can be stacked on plus fours
-            elif (self.ruleset.stack_color_matching_plus_twos_on_plus_fours and 
-                    self.deck.top_card.face == CardFaces.PLUS_FOUR and 
-                    card.face == CardFaces.PLUS_TWO and
-                    self.deck.top_card.color == card.color):
-                # The card can be played as normal
+        saved_values, journal = self._undo_stack.pop()
+        self._roll_back(saved_values, journal)
 
-                # Update the state so play_card_move will process it
-                self.state = UnoStates.WAITING_FOR_PLAY
+    def _roll_back(self, saved_values: tuple[int, int, bool, UnoStates], journal: list[Callable[[], None]]) -> None:
+        """
+        Runs the undo steps in a journal, newest first, then restores the saved turn/stack/direction/state
 
-                self.play_card_move(player, card)
+        Args:
+            saved_values (tuple[int, int, bool, UnoStates]): turn_index, current_stack, reversed, and state from before the move
+            journal (list[Callable[[], None]]): The undo steps recorded during the move
+        """
+        for undo_step in reversed(journal):
+            undo_step()
 
+        self.turn_index, self.current_stack, self.reversed, self.state = saved_values
 
-            # If the card is anything else, thats an InvalidCardPlayedError
-            else:
-                raise InvalidCardPlayedError
+        # Samplers don't keep undo information, so they start over from what is visible now
+        for sampler in self._hand_samplers.values():
+            sampler.rebuild(self)
 
-        # Otherwise, if the card is a jump-in (and the jump-in rule is enabled), then its always* valid
-        # *not valid if the game hasn't started, or depending on jump_in_during_seven/zero rules
-        elif card.can_be_jumped_in(self.deck.top_card) and self.ruleset.jump_ins:
-            # Do the jump-in stuff
-            # Start by updating turn_index to the index of whoever jumped in
-            self.turn_index = self.players.index(player)
-            # Then proceed normally
+    def clone(self) -> UnoGame:
+        """
+        Returns a copy of this game that can be changed without affecting this one, for trying out moves.
+        Cards are never changed once created, so they are shared rather than copied, and only the lists holding them are copied.
+        The ruleset is shared too, and the undo history is not copied
 
-            # Remove the card from the player
-            if not player.play_card(card):
-                raise PlayerDoesNotHaveCardError
+        Returns:
+            UnoGame: The copy
+        """
+        new_game = object.__new__(type(self))
+        new_game.__dict__.update(self.__dict__)
 
-            # Return card to deck
-            self.deck.play_card(card)
+        new_game.players = [player.clone() for player in self.players]
+        new_game.deck = self.deck.clone()
+        new_game.card_index = self.card_index.clone()
 
-            # Check if the player who just played a card ran out of cards and won
-            if len(player.hand) == 0:
-                self.state = UnoStates.PLAYER_WON
+        new_game._journal = None
+        new_game._undo_stack = []
+        new_game._hand_samplers = {}
+        # Copies are for trying out moves, which shouldn't reach anyone listening to the real game
+        new_game._subscribers = ()
+        new_game.record = None
 
-            # Important: we must check if the card could be a stack card and jump-in stacking is disabled here,
-            # as process_standard_card_play does not clear a stack in that case
-            if not self.ruleset.jump_ins_stack and (card.face == CardFaces.PLUS_FOUR or card.face == CardFaces.PLUS_TWO):
-                # Reset the stack if jump-ins are supposed to clear the stack
-                self.current_stack = 0
+        return new_game
 
+    def subscribe(self, callback: Callable[[GameEvent], None], *event_types: type[GameEvent]) -> None:
+        """
+        Calls the callback with every event (see events.py) sent by moves from now on, right after the move changes the game.
+        Events are only created when something is subscribed, so games nobody listens to don't pay for them.
+        `undo` doesn't send events, and neither do changes made directly to the game
 
-            self._process_card_state_changes(player, card)
-        
-        # If we still haven't hit a valid case for playing a card, then raise an error, as the play wasn't valid
-        else:
-            raise OutOfTurnError
+        Args:
+            callback (Callable[[GameEvent], None]): The function to call with each event
+            *event_types (type[GameEvent]): Only send events of these types. Sends every event if none are given
+        """
+        self._subscribers += ((callback, event_types if len(event_types) > 0 else None),)
+
+    def unsubscribe(self, callback: Callable[[GameEvent], None]) -> None:
+        """
+        Stops sending events to the callback
+
+        Args:
+            callback (Callable[[GameEvent], None]): The callback given to `subscribe`
 
+        Raises:
+            ValueError: If the callback isn't subscribed
+        """
+        subscribers = tuple(subscriber for subscriber in self._subscribers if subscriber[0] != callback)
+        if len(subscribers) == len(self._subscribers):
+            raise ValueError("callback is not subscribed")
+        self._subscribers = subscribers
+
+    def is_legal_play(self, card: Card) -> bool:
+        """
+        Returns true if the given card is a valid card to play at the current point in the game assuming that it would be played by the player whose turn it is.
+        Takes stacking rules into account. Does not check if the player has the card
+
+        Args:
+            card (Card): The card to check
+
+        Returns:
+            bool: True if the card is allowed to be played
+        """
+        return self._get_rules_table().get_transition(self.state, True, self.deck.top_card, card).error is None
+
+    @_records_outcome
+    def play_card_move(self, player: Player, card: Card, allow_mismatch_play: bool = False) -> None:
+        """
+        Has the player given play the card given from their hand,
+        and will update game state accordingly
+
+        Args:
+            player (Player): The player who plays a card
+            card (Card): The card they are playing
+            allow_mismatch_play (bool): If True, any card will count as a valid card to play on top of the top card. Only affects standard play, not jump-ins 
+
+        Raises:
+            OutOfTurnError: If the move was made out of turn (or an invalid jump-in card was attempted to be played)
+            InvalidCardPlayedError: It is that player's turn, but the card they played was an invalid move
+            PlayerDoesNotHaveCardError: The play was valid, but the player did not have the card they attempted to play
+        """
+        stats = self.stats
+        if stats is None:
+            return self._play_card_move(player, card, allow_mismatch_play)
+
+        start_ns = time.perf_counter_ns()
+        start_hand_size = len(player.hand)
+        try:
+            return self._play_card_move(player, card, allow_mismatch_play)
+        finally:
+            stats.record("play_card_move", self.ruleset.to_key().flags, start_hand_size, time.perf_counter_ns() - start_ns)
+
+    def _play_card_move(self, player: Player, card: Card, allow_mismatch_play: bool = False) -> None:
+        """
+        The untimed body of `play_card_move`
+        """
+        if self.record is not None:
+            self._record(RecordEntryTypes.PLAY_CARD, player.player_id, card.card_id, allow_mismatch_play)
+
+        transition = self._get_rules_table().get_transition(self.state, self._is_current_player(player), self.deck.top_card, card, allow_mismatch_play)
+
+        if transition.error is not None:
+            raise transition.error(*transition.error_args)
+
+        self._apply_card_play(player, card, transition)
+
+    @_records_outcome
     def draw_card_move(self, player: Player) -> None:
         """
         The given player draws a card, or as many cards as needed to obtain a playable card,
@@ -274,6 +477,26 @@ class UnoGame:
             OutOfTurnError: If it is not the player's turn, or drawing a card is not a valid option
             MustPlayCardError: If forceplay is on and the player can play a card
         """
+        stats = self.stats
+        if stats is None:
+            return self._draw_card_move(player)
+
+        start_ns = time.perf_counter_ns()
+        start_hand_size = len(player.hand)
+        try:
+            return self._draw_card_move(player)
+        finally:
+            stats.record("draw_card_move", self.ruleset.to_key().flags, start_hand_size, time.perf_counter_ns() - start_ns)
+
+    def _draw_card_move(self, player: Player) -> None:
+        """
+        The untimed body of `draw_card_move`
+        """
+        if self.record is not None:
+            self._record(RecordEntryTypes.DRAW, player.player_id)
+
+        watched_values = self._get_watched_values() if self._subscribers else None
+        hand_size = len(player.hand)
 
         # Make sure its this player's turn
         if self.turn_index != self.players.index(player):
@@ -283,7 +506,7 @@ class UnoGame:
         elif self.state == UnoStates.WAITING_FOR_PLUS_RESPONSE:
             for _ in range(self.current_stack):
                 try:
-                    player.add_card_to_hand(self.deck.draw_card())
+                    self._draw_card_to_hand(player)
                 # If the deck somehow runs out of cards, then cancel drawing more
                 except OutOfCardsError:
                     break
@@ -304,13 +527,13 @@ class UnoGame:
         # Now we know that this was a valid move and just a general draw attempt
         else:
             # They will always draw at least one card
-            player.add_card_to_hand(self.deck.draw_card())
-            
+            self._draw_card_to_hand(player)
+
             # but if draw_until_can_play is on, then they might need to keep going
             if self.ruleset.draw_until_can_play:
                 while not player.has_card_to_play(self.deck.top_card):
                     try:
-                        player.add_card_to_hand(self.deck.draw_card())
+                        self._draw_card_to_hand(player)
                     # If somehow the deck ran out of cards, than just cancel the drawing (This case will need to handled by other functions
                     # that expect the player to be able to play)
                     except OutOfCardsError:
@@ -323,6 +546,12 @@ class UnoGame:
                 self.turn_index = self._next_turn_index(1)
                 self.state = UnoStates.WAITING_FOR_PLAY
 
+        if watched_values is not None:
+            if len(player.hand) > hand_size:
+                self._emit(CardsDrawn(player.player_id, tuple(player.hand[hand_size:])))
+            self._emit_changes(watched_values)
+
+    @_records_outcome
     def pass_turn_move(self, player: Player) -> None:
         """
         This is ONLY valid when the deck is out of cards and the player has no cards that are valid plays,
@@ -335,6 +564,9 @@ class UnoGame:
         Raises:
             OutOfTurnError: If it is not valid for that player to pass
         """
+        if self.record is not None:
+            self._record(RecordEntryTypes.PASS, player.player_id)
+
         if self.players[self.turn_index] != player:
             raise OutOfTurnError("Not this player's turn")
 
@@ -352,10 +584,16 @@ class UnoGame:
         elif player.has_card_to_play(self.deck.top_card):
             raise OutOfTurnError("Player has at least one valid play")
 
+        watched_values = self._get_watched_values() if self._subscribers else None
+
         # If all checks are passes, then this is allowed
         self.turn_index = self._next_turn_index(1)
         self.state = UnoStates.WAITING_FOR_PLAY
 
+        if watched_values is not None:
+            self._emit_changes(watched_values)
+
+    @_records_outcome
     def choose_color_move(self, player: Player, color: CardColors) -> None:
         """
         The given player chooses a color for a wild card.
@@ -368,6 +606,8 @@ class UnoGame:
             OutOfTurnError: If the game is not waiting for the given player to choose a color
             InvalidCardPlayedError: If the color given is WILD
         """
+        if self.record is not None:
+            self._record(RecordEntryTypes.CHOOSE_COLOR, player.player_id, RECORD_COLORS.index(color))
 
         # If we aren't waiting for a color or it isn't this player's turn
         if self.state != UnoStates.WAITING_FOR_WILD_COLOR or self.players[self.turn_index] != player:
@@ -375,13 +615,198 @@ class UnoGame:
         
         if color == CardColors.WILD:
             raise InvalidCardPlayedError("Must choose a color that isn't wild")
+
+        if self._subscribers:
+            self._emit(ColorChosen(player.player_id, color))
         
-        card = Card(color, self.deck.top_card.face)
         # This is a temp card to show the color and do potential plus card processing. Do not store it in discard pile
-        card.return_to_discard = False
-        # Change state so play_card_move will process it
-        self.state = UnoStates.WAITING_FOR_PLAY
-        self.play_card_move(player, card)
+        card = Card(color, self.deck.top_card.face, return_to_discard=False)
+        # It is processed the same as the player playing it normally
+        transition = self._get_rules_table().get_transition(UnoStates.WAITING_FOR_PLAY, True, self.deck.top_card, card)
+        self._apply_card_play(player, card, transition)
+
+    def get_jump_in_player_ids(self) -> set[int]:
+        """
+        Returns the ids of every player who could jump in on the current top card right now.
+        The player whose turn it is never counts, since for them it would just be a normal play.
+        Uses `card_index`, so this doesn't need to look through any hands
+
+        Returns:
+            set[int]: The ids of the players holding a valid jump-in card
+        """
+
+        if not self.ruleset.jump_ins:
+            return set()
+
+        # Same restrictions as play_card_move
+        if self.state == UnoStates.PREGAME or self.state == UnoStates.PLAYER_WON:
+            return set()
+        elif self.state == UnoStates.WAITING_FOR_PICK_PLAYER_TO_SWAP and not self.ruleset.jump_in_during_seven:
+            return set()
+        elif self.state == UnoStates.WAITING_FOR_CHOOSE_TO_ROTATE and not self.ruleset.jump_in_during_zero:
+            return set()
+        # Stacked plus cards can only be jumped in on if stacking is on
+        elif self.state == UnoStates.WAITING_FOR_PLUS_RESPONSE and not self.ruleset.stacking:
+            return set()
+
+        top_card = self.deck.top_card
+
+        # Matches Card.can_be_jumped_in: wild top cards can't be jumped in on,
+        # otherwise it's an exact match or a wild card with the same face
+        if top_card.color == CardColors.WILD:
+            return set()
+
+        player_ids = self.card_index.get_holders(top_card)
+        player_ids |= self.card_index.get_holders(Card(CardColors.WILD, top_card.face))
+
+        if len(self.players) > 0:
+            player_ids.discard(self.players[self.turn_index].player_id)
+
+        return player_ids
+
+    def get_hand_sampler(self, observer_id: int) -> HiddenHandSampler:
+        """
+        Returns the sampler of hidden hands for the given player's point of view.
+        The sampler is created the first time it is asked for, and then kept up to date by every move.
+        Clones don't copy samplers, so use `HiddenHandSampler.copy` to take one along
+
+        Args:
+            observer_id (int): The id of the player whose point of view is used
+
+        Returns:
+            HiddenHandSampler: The sampler
+        """
+        sampler = self._hand_samplers.get(observer_id)
+        if sampler is None:
+            sampler = HiddenHandSampler.from_game(self, observer_id)
+            self._hand_samplers[observer_id] = sampler
+        return sampler
+
+    def rebuild_card_index(self) -> None:
+        """
+        Rebuilds `card_index` from scratch. Needed if hands were changed directly instead of through moves
+        """
+        self.card_index.rebuild(self.players)
+
+    def get_state_hash(self) -> int:
+        """
+        Returns a 64 bit hash of the top card, every player's hand, turn_index, direction, current_stack, and state.
+        The hands part is kept up to date as cards move, so this is O(1) and much cheaper than comparing or serializing games.
+        Equal hashes almost certainly mean equal states (see zobrist.py)
+
+        Returns:
+            int: The hash
+        """
+        state_hash = (self._hands_hash ^ TOP_CARD_KEYS[self.deck.top_card.card_id] ^ turn_key(self.turn_index) ^
+            stack_key(self.current_stack) ^ state_key(self.state))
+        if self.reversed:
+            state_hash ^= DIRECTION_KEY
+        return state_hash
+
+    def rehash(self) -> None:
+        """
+        Recalculates the hand hashes from scratch. Needed if hands or players were changed directly instead of through moves
+        """
+        self._hands_hash = 0
+        for player in self.players:
+            player.hand = player.hand
+            self._hands_hash ^= player_hand_key(player.player_id, player.hand_hash)
+
+    def _update_hands_hash(self, player: Player, old_hand_hash: int) -> None:
+        """
+        Swaps the player's old hand out of the state hash for their current hand
+
+        Args:
+            player (Player): The player whose hand changed
+            old_hand_hash (int): Their hand_hash from before the change
+        """
+        self._hands_hash ^= player_hand_key(player.player_id, old_hand_hash) ^ player_hand_key(player.player_id, player.hand_hash)
+
+    def _draw_card_to_hand(self, player: Player) -> None:
+        """
+        Draws a card from the deck into the given player's hand and records it in the card index
+
+        Args:
+            player (Player): The player drawing the card
+
+        Raises:
+            IndexError: If there are no cards left to draw
+        """
+        # The deck shuffles the discard pile back in when the draw pile runs out
+        reshuffled_cards = self.deck.discard_pile if len(self.deck.draw_pile) == 0 else None
+
+        card = self.deck.draw_card()
+        old_hand_hash = player.hand_hash
+        player.add_card_to_hand(card)
+        self.card_index.add_card(player.player_id, card)
+        self._update_hands_hash(player, old_hand_hash)
+
+        for sampler in self._hand_samplers.values():
+            if reshuffled_cards is not None:
+                sampler.cards_reshuffled(reshuffled_cards)
+            sampler.card_drawn(player.player_id, card)
+
+        if self._journal is not None:
+            self._journal.append(lambda: self._undo_draw_card_to_hand(player, card))
+
+    def _undo_draw_card_to_hand(self, player: Player, card: Card) -> None:
+        """
+        Takes back the last card drawn by `_draw_card_to_hand`. The deck is handled by its own journal
+
+        Args:
+            player (Player): The player who drew the card
+            card (Card): The card they drew
+        """
+        old_hand_hash = player.hand_hash
+        player.remove_card_at(len(player.hand) - 1)
+        self.card_index.remove_card(player.player_id, card)
+        self._update_hands_hash(player, old_hand_hash)
+
+    def _remove_card_from_hand(self, player: Player, card: Card) -> bool:
+        """
+        Removes the card from the given player's hand (see `Player.play_card`) and records it in the card index
+
+        Args:
+            player (Player): The player playing the card
+            card (Card): The card to remove
+
+        Returns:
+            bool: True if the player had the card or the card is a "ghost card", False otherwise
+        """
+        # Remember where the card was, so undo can put it back in the same place
+        position = None
+        if self._journal is not None and card.return_to_discard and card in player.hand:
+            position = player.hand.index(card)
+
+        old_hand_hash = player.hand_hash
+        if not player.play_card(card):
+            return False
+
+        # Ghost cards never came from a hand, so the index doesn't change
+        if card.return_to_discard:
+            self.card_index.remove_card(player.player_id, card)
+            self._update_hands_hash(player, old_hand_hash)
+            for sampler in self._hand_samplers.values():
+                sampler.card_played(player.player_id, card)
+
+        if self._journal is not None and position is not None:
+            self._journal.append(lambda: self._undo_remove_card_from_hand(player, card, position))
+
+        return True
+
+    def _undo_remove_card_from_hand(self, player: Player, card: Card, position: int) -> None:
+        """
+        Puts a card removed by `_remove_card_from_hand` back where it was
+
+        Args:
+            player (Player): The player who played the card
+            card (Card): The card they played
+            position (int): Where the card was in their hand
+        """
+        old_hand_hash = player.hand_hash
+        player.add_card_to_hand(card, position)
+        self.card_index.add_card(player.player_id, card)
+        self._update_hands_hash(player, old_hand_hash)
 
     def _next_turn_index(self, change: int) -> int:
         """
@@ -396,45 +821,138 @@ class UnoGame:
         """
         return (self.turn_index + (change if not self.reversed else -change)) % len(self.players)
 
-    def _process_card_state_changes(self, player: Player, card: Card):
+    def _apply_card_play(self, player: Player, card: Card, transition: Transition) -> None:
         """
-        Processes the state change after a card is played normally.
-        Sets state to WAITING_FOR_WILD_COLOR after a wild for example.
-        Also processes skips, reverses, and plus cards
-
+        Plays the card from the player's hand and updates the game state as described by the transition.
+        The transition must not have an error
 
         Args:
             player (Player): The player that played the card
             card (Card): The card that was played
+            transition (Transition): The transition for this play from the rules table
+
+        Raises:
+            PlayerDoesNotHaveCardError: The play was valid, but the player did not have the card they attempted to play
         """
-        if card.color == CardColors.WILD:
-            self.state = UnoStates.WAITING_FOR_WILD_COLOR
-        elif card.face == CardFaces.PLUS_FOUR:
-            self.current_stack += 4
-            self.turn_index = self._next_turn_index(1)
-            self.state = UnoStates.WAITING_FOR_PLUS_RESPONSE
-        elif card.face == CardFaces.PLUS_TWO:
-            self.current_stack += 2
-            self.turn_index = self._next_turn_index(1)
-            self.state = UnoStates.WAITING_FOR_PLUS_RESPONSE
-        elif card.face == CardFaces.SKIP:
-            self.turn_index = self._next_turn_index(2)
-            self.state = UnoStates.WAITING_FOR_PLAY
-        elif card.face == CardFaces.REVERSE:
+        # Find out where a jump-in player is sitting before changing anything (Let ValueError propagate)
+        player_index = self.players.index(player) if transition.jump_in else self.turn_index
+        watched_values = self._get_watched_values() if self._subscribers else None
+
+        # Remove the card from the player
+        if not self._remove_card_from_hand(player, card):
+            raise PlayerDoesNotHaveCardError
+
+        # Jump-ins take the turn from whoever had it
+        self.turn_index = player_index
+
+        self.deck.play_card(card)
+        # Colors chosen for wilds are sent as ColorChosen instead
+        if watched_values is not None and card.return_to_discard:
+            self._emit(CardPlayed(player.player_id, card, transition.jump_in))
+
+        if transition.clears_stack:
+            self.current_stack = 0
+        self.current_stack += transition.stack_delta
+
+        if transition.reverses:
             self.reversed = not self.reversed
-            if len(self.players) == 2:
-                # Acts as a skip in 1v1 per Uno rules
-                self.turn_index = self._next_turn_index(2)
-            else:
-                self.turn_index = self._next_turn_index(1)
-            self.state = UnoStates.WAITING_FOR_PLAY
-        elif card.face == CardFaces.ZERO and self.ruleset.zero_rotate_hands:
-            self.state = UnoStates.WAITING_FOR_CHOOSE_TO_ROTATE
-        elif card.face == CardFaces.SEVEN and self.ruleset.seven_swap_hands:
-            self.state = UnoStates.WAITING_FOR_PICK_PLAYER_TO_SWAP
-        else:
-            self.turn_index = self._next_turn_index(1)
 
+        turn_delta = transition.two_player_turn_delta if len(self.players) == 2 else transition.turn_delta
+        if turn_delta != 0:
+            self.turn_index = self._next_turn_index(turn_delta)
+
+        # Check if the player who just played a card ran out of cards and won
+        if len(player.hand) == 0 and transition.keeps_win:
+            self.state = UnoStates.PLAYER_WON
+        elif transition.next_state is not None:
+            self.state = transition.next_state
+
+        if watched_values is not None:
+            self._emit_changes(watched_values)
+            if self.state == UnoStates.PLAYER_WON:
+                self._emit(PlayerWon(player.player_id))
+
+    def _record(self, entry_type: RecordEntryTypes, player_id: int, arg: int = 0, flag: bool = False) -> None:
+        """
+        Logs an action in `record`, along with any rule changes since the last one. Only called when recording.
+        If the action can't be recorded, recording is turned off for this game instead of the action failing
+
+        Args:
+            entry_type (RecordEntryTypes): What is being done
+            player_id (int): The id of the player doing it
+            arg (int): The extra value for the entry type (see `GameRecord.add_entry`)
+            flag (bool): The extra flag for the entry type
+        """
+        assert self.record is not None
+        rules_key = self.ruleset.to_key()
+        try:
+            self.record.check_rules(rules_key.flags, rules_key.starting_hand_size, rules_key.number_of_decks)
+            self.record.add_entry(entry_type, player_id, arg, flag)
+        except RecordError as error:
+            logger.warning(f"Stopped recording game {self.seed}: {error}")
+            self.record = None
+
+    def _get_watched_values(self) -> tuple[int, int, bool]:
+        """
+        Returns the values `_emit_changes` compares against. Only called when something is subscribed
+
+        Returns:
+            tuple[int, int, bool]: turn_index, current_stack, and reversed
+        """
+        return self.turn_index, self.current_stack, self.reversed
+
+    def _emit_changes(self, watched_values: tuple[int, int, bool]) -> None:
+        """
+        Sends StackChanged, DirectionReversed, and TurnAdvanced for whichever of them changed during a move
+
+        Args:
+            watched_values (tuple[int, int, bool]): The values from `_get_watched_values` from before the move
+        """
+        previous_turn_index, previous_stack, previous_reversed = watched_values
+        if self.current_stack != previous_stack:
+            self._emit(StackChanged(previous_stack, self.current_stack))
+        if self.reversed != previous_reversed:
+            self._emit(DirectionReversed(self.reversed))
+        if self.turn_index != previous_turn_index:
+            self._emit(TurnAdvanced(previous_turn_index, self.turn_index, self.players[self.turn_index].player_id))
+
+    def _emit(self, event: GameEvent) -> None:
+        """
+        Sends the event to every subscriber that wants it
+
+        Args:
+            event (GameEvent): The event
+        """
+        for callback, event_types in self._subscribers:
+            if event_types is None or type(event) in event_types:
+                callback(event)
+
+    def _is_current_player(self, player: Player) -> bool:
+        """
+        Checks if it is the given player's turn without raising if they aren't in the game
+
+        Args:
+            player (Player): The player to check
+
+        Returns:
+            bool: True if it is the given player's turn
+        """
+        return len(self.players) > 0 and self.players[self.turn_index] == player
+
+    def _get_rules_table(self) -> RulesTable:
+        """
+        Returns the rules table for the current ruleset, compiling a new one if the rules changed
+
+        Returns:
+            RulesTable: The compiled rules
+        """
+        # Rules can be changed mid-game, in which case to_key gives a new key
+        rules_key = self.ruleset.to_key()
+        if rules_key is not self._rules_table.key:
+            self._rules_table = compile_rules(rules_key)
+        return self._rules_table
+
+    @_records_outcome
     def seven_swap_move(self, player: Player, player_index: int):
         """
         Represents a player picking a another player to swap hands with.
@@ -449,6 +967,10 @@ class UnoGame:
             ValueError: If the index is the index of the player making the move and force_seven_swap is on
             IndexError: The index is out of range 
         """
+        if self.record is not None:
+            self._record(RecordEntryTypes.SEVEN_SWAP, player.player_id, player_index)
+
+        watched_values = self._get_watched_values() if self._subscribers else None
 
         # Can only do this while the game is waiting for someone to pick a player, and that player is the player provided
         if self.state != UnoStates.WAITING_FOR_PICK_PLAYER_TO_SWAP or self.players[self.turn_index] != player:
@@ -468,13 +990,20 @@ class UnoGame:
 
         # Now that we know this is valid, do the thing
         else:
-            temp = player.hand
-            player.hand = self.players[player_index].hand
-            self.players[player_index].hand = temp
+            other_player = self.players[player_index]
+            self._swap_hands(player, other_player)
+            if self._journal is not None:
+                self._journal.append(lambda: self._swap_hands(player, other_player))
+            if watched_values is not None:
+                self._emit(HandsSwapped(player.player_id, other_player.player_id))
 
         self.turn_index = self._next_turn_index(1)
         self.state = UnoStates.WAITING_FOR_PLAY
 
+        if watched_values is not None:
+            self._emit_changes(watched_values)
+
+    @_records_outcome
     def zero_rotate_move(self, player: Player, choose_to_rotate: bool):
         """
         Represents a player choosing to rotate all hands or not.
@@ -488,6 +1017,8 @@ class UnoGame:
             OutOfTurnError: If it is not this players turn or the game is not waiting for this
             ValueError: If the choice is False and force_zero_rotate is on
         """
+        if self.record is not None:
+            self._record(RecordEntryTypes.ZERO_ROTATE, player.player_id, flag=choose_to_rotate)
 
         # Can only do this while the game is waiting for someone to pick a player, and that player is the player provided
         if self.state != UnoStates.WAITING_FOR_CHOOSE_TO_ROTATE or self.players[self.turn_index] != player:
@@ -497,38 +1028,88 @@ class UnoGame:
         if self.ruleset.force_zero_rotate and not choose_to_rotate:
             raise ValueError("choose_to_rotate must be False because force_zero_rotate is on")
 
+        watched_values = self._get_watched_values() if self._subscribers else None
+
         # Now that we know this is valid, do the thing
         if choose_to_rotate:
 
             # If the number of players is one or less(???) then don't even try
-            if len(self.players) < 2:
-                pass
-                
-            # Reversed direction
-            elif self.reversed:
-                first_player_hand = self.players[0].hand
-
-                for i in range(len(self.players) - 1):
-                    self.players[i].hand = self.players[i+1].hand
-                
-                self.players[-1].hand = first_player_hand
-                
-
-            # Normal direction
-            else:
-                last_player_hand = self.players[-1].hand
-                
-                for i in range(len(self.players)-1, -1, -1):
-                    self.players[i].hand = self.players[i-1].hand
-                
-                self.players[0].hand = last_player_hand
+            if len(self.players) >= 2:
+                rotate_backwards = self.reversed
+                self._rotate_hands(rotate_backwards)
+                if self._journal is not None:
+                    self._journal.append(lambda: self._rotate_hands(not rotate_backwards))
+                if watched_values is not None:
+                    self._emit(HandsRotated(rotate_backwards))
 
         self.turn_index = self._next_turn_index(1)
         self.state = UnoStates.WAITING_FOR_PLAY
 
+        if watched_values is not None:
+            self._emit_changes(watched_values)
+
 
         
 
+    def _swap_hands(self, player: Player, other_player: Player) -> None:
+        """
+        Swaps the hands of two players and updates the card index
+
+        Args:
+            player (Player): One of the players
+            other_player (Player): The other player
+        """
+        # Swapping with yourself changes nothing
+        if player is other_player:
+            return
+
+        self.card_index.remove_hand(player.player_id, player.hand)
+        self.card_index.remove_hand(other_player.player_id, other_player.hand)
+
+        old_hand_hash = player.hand_hash
+        other_old_hand_hash = other_player.hand_hash
+        player.swap_hands(other_player)
+        self._update_hands_hash(player, old_hand_hash)
+        self._update_hands_hash(other_player, other_old_hand_hash)
+
+        self.card_index.add_hand(player.player_id, player.hand)
+        self.card_index.add_hand(other_player.player_id, other_player.hand)
+
+        for sampler in self._hand_samplers.values():
+            sampler.hands_swapped(player, other_player)
+
+    def _rotate_hands(self, backwards: bool) -> None:
+        """
+        Passes every hand one seat along, and updates the card index
+
+        Args:
+            backwards (bool): If True, hands move towards the start of the player list (the direction when the game is reversed)
+        """
+        old_hand_hashes = [player.hand_hash for player in self.players]
+        # Each hand moves exactly one seat, so the index only needs its holders renamed
+        step = -1 if backwards else 1
+        new_holder_ids = {player.player_id: self.players[(i + step) % len(self.players)].player_id for i, player in enumerate(self.players)}
+
+        # Hands are passed along by swapping neighbours, which moves each hand's hash along with it
+        # Reversed direction (everyone gets the hand of the player after them)
+        if backwards:
+            for i in range(len(self.players) - 1):
+                self.players[i].swap_hands(self.players[i+1])
+
+        # Normal direction (everyone gets the hand of the player before them)
+        else:
+            for i in range(len(self.players)-1, 0, -1):
+                self.players[i].swap_hands(self.players[i-1])
+
+        for player, old_hand_hash in zip(self.players, old_hand_hashes):
+            self._update_hands_hash(player, old_hand_hash)
+
+        self.card_index.move_holders(new_holder_ids)
+
+        for sampler in self._hand_samplers.values():
+            sampler.hands_rotated(self.players, backwards)
+
+    @_records_outcome
     def start_game(self):
         """
         Starts the game
@@ -536,6 +1117,9 @@ class UnoGame:
         Raises:
             OutOfTurnError: If the game has already started
         """
+        if self.record is not None:
+            self._record(RecordEntryTypes.START_GAME, self.players[0].player_id if len(self.players) > 0 else 0)
+
         if self.state != UnoStates.PREGAME:
             raise OutOfTurnError
         
@@ -545,27 +1129,135 @@ class UnoGame:
 
 @dataclass
 class UnoRules:
-    starting_hand_size = 7
-    number_of_decks = 1
-    jump_ins = False
+    starting_hand_size: int = 7
+    number_of_decks: int = 1
+    jump_ins: bool = False
 
-    stacking = False
+    stacking: bool = False
     # Stacking rules
-    jump_ins_stack = False
-    stack_plus_fours_on_plus_twos = False
-    stack_all_plus_twos_on_plus_fours = False
-    stack_color_matching_plus_twos_on_plus_fours = False
+    jump_ins_stack: bool = False
+    stack_plus_fours_on_plus_twos: bool = False
+    stack_all_plus_twos_on_plus_fours: bool = False
+    stack_color_matching_plus_twos_on_plus_fours: bool = False
     
-    force_play = True
-    draw_until_can_play = True
+    force_play: bool = True
+    draw_until_can_play: bool = True
 
     # 7-0
-    seven_swap_hands = False
-    force_seven_swap = False
-    zero_rotate_hands = False
-    force_zero_rotate = False
-    jump_in_during_seven = False
-    jump_in_during_zero = False
+    seven_swap_hands: bool = False
+    force_seven_swap: bool = False
+    zero_rotate_hands: bool = False
+    force_zero_rotate: bool = False
+    jump_in_during_seven: bool = False
+    jump_in_during_zero: bool = False
+
+    # Add decks as players join, instead of running out of cards (see get_deck_count)
+    scale_decks: bool = False
+
+    # Goes up every time a rule is changed, so compiled rules can tell when they're out of date (not a dataclass field)
+    revision = 0
+
+    def __setattr__(self, name: str, value) -> None:
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, "revision", self.revision + 1)
+
+    def to_key(self) -> RulesKey:
+        """
+        Returns the hashable RulesKey for the current rules.
+        The key is cached until a rule changes, so calling this repeatedly is cheap
+
+        Returns:
+            RulesKey: The key for these rules
+        """
+        cached_key: RulesKey | None = self.__dict__.get("_key")
+        if cached_key is not None and self.__dict__.get("_key_revision") == self.revision:
+            return cached_key
+
+        flags = 0
+        for bit, name in enumerate(RULE_FLAGS):
+            if getattr(self, name):
+                flags |= 1 << bit
+
+        key = RulesKey(flags, self.starting_hand_size, self.number_of_decks)
+
+        # Set these directly so that caching the key doesn't count as changing the rules
+        self.__dict__["_key"] = key
+        self.__dict__["_key_revision"] = self.revision
+        return key
+
+# The order of the on/off rules in RulesKey.flags. Only ever add to the end, so existing keys keep their meaning
+RULE_FLAGS = (
+    "jump_ins",
+    "stacking",
+    "jump_ins_stack",
+    "stack_plus_fours_on_plus_twos",
+    "stack_all_plus_twos_on_plus_fours",
+    "stack_color_matching_plus_twos_on_plus_fours",
+    "force_play",
+    "draw_until_can_play",
+    "seven_swap_hands",
+    "force_seven_swap",
+    "zero_rotate_hands",
+    "force_zero_rotate",
+    "jump_in_during_seven",
+    "jump_in_during_zero",
+    "scale_decks",
+)
+
+# Cards in one standard deck
+DECK_SIZE = 108
+
+def get_deck_count(player_count: int, starting_hand_size: int) -> int:
+    """
+    Returns how many decks scale_decks uses for this many players, one for up to 10 players with 7 card hands
+
+    Args:
+        player_count (int): How many players there are
+        starting_hand_size (int): How many cards each player starts with
+
+    Returns:
+        int: The number of decks, at least 1
+    """
+    dealt_cards = player_count * starting_hand_size
+    # Starting hands take up at most 2/3 of the cards, so there's plenty left to draw (rounded up)
+    return max(1, -(-dealt_cards * 3 // (DECK_SIZE * 2)))
+
+@dataclass(frozen=True)
+class RulesKey:
+    """
+    A frozen, hashable version of UnoRules, with every on/off rule packed into one bitmask (see RULE_FLAGS).
+    Used to key anything that is cached per ruleset
+    """
+    flags: int
+    starting_hand_size: int
+    number_of_decks: int
+
+    def has_rule(self, name: str) -> bool:
+        """
+        Checks if an on/off rule is enabled
+
+        Args:
+            name (str): The name of the rule, as in UnoRules
+
+        Raises:
+            ValueError: If the name is not an on/off rule
+
+        Returns:
+            bool: True if the rule is on
+        """
+        return bool(self.flags & (1 << RULE_FLAGS.index(name)))
+
+    def to_rules(self) -> UnoRules:
+        """
+        Creates a new UnoRules with the rules in this key
+
+        Returns:
+            UnoRules: The rules
+        """
+        rules = UnoRules(starting_hand_size=self.starting_hand_size, number_of_decks=self.number_of_decks)
+        for bit, name in enumerate(RULE_FLAGS):
+            setattr(rules, name, bool(self.flags & (1 << bit)))
+        return rules
 
 class UnoStates(Enum):
     PREGAME = 0
@@ -580,4 +1272,7 @@ class UnoStates(Enum):
 class OutOfTurnError(Exception): pass
 class PlayerDoesNotHaveCardError(Exception): pass
 class InvalidCardPlayedError(Exception): pass
-class MustPlayCardError(Exception): pass
\ No newline at end of file
+class MustPlayCardError(Exception): pass
+
+# Everything a move can raise when it isn't allowed, as opposed to a bug
+MOVE_ERRORS = (OutOfTurnError, PlayerDoesNotHaveCardError, InvalidCardPlayedError, MustPlayCardError, OutOfCardsError, ValueError, IndexError)
\ No newline at end of file
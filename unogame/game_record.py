@@ -0,0 +1,214 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+from unogame.card import CardColors
+
+from enum import Enum # type: ignore (pylance shadow stdlib issues)
+import struct # type: ignore (pylance shadow stdlib issues)
+
+# A compact log of everything done to a game, enough to play it again exactly (see replay.py).
+# The game's seed decides the deck order and every draw, so only the actions need to be stored, not the cards drawn.
+# Layout (little endian):
+#   header: version, seed, rule flags, starting_hand_size, number_of_decks, number of player ids, number of entries
+#   player ids, in the order they first joined
+#   entries: entry type, then either a rules key (for RULES) or player slot, arg, flags.
+#   The flags byte holds the entry's flag, and whether the action raised an error when it was done
+
+RECORD_VERSION = 2
+
+_HEADER = struct.Struct("<BQIHHHI")
+_PLAYER_ID = struct.Struct("<q")
+_ENTRY = struct.Struct("<BHHB")
+# Player slots and args are stored in 2 bytes
+MAX_ENTRY_VALUE = 0xFFFF
+_FLAG = 1
+_FAILED = 2
+# Where the flags byte is in an entry
+_FLAGS_OFFSET = 5
+_RULES_ENTRY = struct.Struct("<BIHH")
+
+# The order of colors in CHOOSE_COLOR entries
+RECORD_COLORS = list(CardColors)
+
+class RecordError(Exception): pass
+
+
+class RecordEntryTypes(Enum):
+    # The same values as MoveTypes
+    PLAY_CARD = 0
+    DRAW = 1
+    PASS = 2
+    CHOOSE_COLOR = 3
+    SEVEN_SWAP = 4
+    ZERO_ROTATE = 5
+    # Everything else that can be done to a game
+    ADD_PLAYER = 6
+    REMOVE_PLAYER = 7
+    START_GAME = 8
+    RULES = 9
+
+
+class GameRecord:
+
+    def __init__(self, seed: int, rule_flags: int, starting_hand_size: int, number_of_decks: int) -> None:
+        """
+        The log of one game, kept up to date by UnoGame as things are done to it (see `UnoGame.record`).
+        Every attempt is logged, including ones that raise an error, since those can change the game partway through too.
+        Those are marked as failed (see mark_failed), so a replay can tell when it stops matching the real game
+
+        Args:
+            seed (int): The seed of the game's deck
+            rule_flags (int): RulesKey.flags of the rules the game was created with
+            starting_hand_size (int): RulesKey.starting_hand_size of those rules
+            number_of_decks (int): RulesKey.number_of_decks of those rules
+        """
+        self.seed = seed
+        self.rule_flags = rule_flags
+        self.starting_hand_size = starting_hand_size
+        self.number_of_decks = number_of_decks
+
+        # Entries refer to players by their index in this list, so every entry fits in 6 bytes
+        self.player_ids: list[int] = []
+        self._player_slots: dict[int, int] = {}
+
+        self.entries = bytearray()
+        self.entry_count = 0
+        # Where the last action entry starts, for mark_failed
+        self._last_entry_position: int | None = None
+        # The rules the last entry was made under, so rule changes can be logged as they happen
+        self._rules = (rule_flags, starting_hand_size, number_of_decks)
+
+    def add_entry(self, entry_type: RecordEntryTypes, player_id: int, arg: int = 0, flag: bool = False) -> None:
+        """
+        Logs one action
+
+        Args:
+            entry_type (RecordEntryTypes): What was done
+            player_id (int): The id of the player who did it (anything for START_GAME)
+            arg (int): card_id for PLAY_CARD, color index for CHOOSE_COLOR, and player index for SEVEN_SWAP
+            flag (bool): allow_mismatch_play for PLAY_CARD, and choose_to_rotate for ZERO_ROTATE
+
+        Raises:
+            RecordError: If more than 65536 different players are in the game, or arg doesn't fit in 2 bytes
+        """
+        if not 0 <= arg <= MAX_ENTRY_VALUE:
+            raise RecordError(f"{arg} is too big to record")
+        player_slot = self._player_slots.get(player_id)
+        if player_slot is None:
+            if len(self.player_ids) > MAX_ENTRY_VALUE:
+                raise RecordError("Too many players to record")
+            player_slot = len(self.player_ids)
+            self.player_ids.append(player_id)
+            self._player_slots[player_id] = player_slot
+
+        self._last_entry_position = len(self.entries)
+        self.entries += _ENTRY.pack(entry_type.value, player_slot, arg, _FLAG if flag else 0)
+        self.entry_count += 1
+
+    def mark_failed(self) -> None:
+        """
+        Marks the last action logged as having raised an error
+
+        Raises:
+            RecordError: If no actions have been logged
+        """
+        if self._last_entry_position is None:
+            raise RecordError("No entries to mark")
+        self.entries[self._last_entry_position + _FLAGS_OFFSET] |= _FAILED
+
+    def check_rules(self, rule_flags: int, starting_hand_size: int, number_of_decks: int) -> None:
+        """
+        Logs a RULES entry if the rules changed since the last entry
+
+        Args:
+            rule_flags (int): RulesKey.flags of the current rules
+            starting_hand_size (int): RulesKey.starting_hand_size of the current rules
+            number_of_decks (int): RulesKey.number_of_decks of the current rules
+        """
+        rules = (rule_flags, starting_hand_size, number_of_decks)
+        if rules == self._rules:
+            return
+
+        self._rules = rules
+        self.entries += _RULES_ENTRY.pack(RecordEntryTypes.RULES.value, rule_flags, starting_hand_size, number_of_decks)
+        self.entry_count += 1
+
+    def read_entries(self) -> list[tuple[RecordEntryTypes, int, int, int, bool]]:
+        """
+        Decodes every entry
+
+        Raises:
+            RecordError: If the entries are cut off or have an unknown type
+
+        Returns:
+            list[tuple[RecordEntryTypes, int, int, int, bool]]: For RULES entries (type, flags, starting_hand_size, number_of_decks, False),
+                and for everything else (type, player_id, arg, flag, failed)
+        """
+        entries: list[tuple[RecordEntryTypes, int, int, int, bool]] = []
+        position = 0
+        try:
+            while position < len(self.entries):
+                entry_type = RecordEntryTypes(self.entries[position])
+                if entry_type == RecordEntryTypes.RULES:
+                    _, flags, starting_hand_size, number_of_decks = _RULES_ENTRY.unpack_from(self.entries, position)
+                    entries.append((entry_type, flags, starting_hand_size, number_of_decks, False))
+                    position += _RULES_ENTRY.size
+                else:
+                    _, player_slot, arg, flags = _ENTRY.unpack_from(self.entries, position)
+                    entries.append((entry_type, self.player_ids[player_slot], arg, flags & _FLAG, bool(flags & _FAILED)))
+                    position += _ENTRY.size
+        except (struct.error, IndexError, ValueError) as error:
+            raise RecordError(str(error)) from error
+
+        return entries
+
+    def to_bytes(self) -> bytes:
+        """
+        Encodes the record for saving
+
+        Returns:
+            bytes: The encoded record
+        """
+        parts = [_HEADER.pack(RECORD_VERSION, self.seed, self.rule_flags, self.starting_hand_size, self.number_of_decks,
+            len(self.player_ids), self.entry_count)]
+        parts += [_PLAYER_ID.pack(player_id) for player_id in self.player_ids]
+        parts.append(bytes(self.entries))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> GameRecord:
+        """
+        Decodes a record made by `to_bytes`
+
+        Args:
+            data (bytes): The encoded record
+
+        Raises:
+            RecordError: If the record is from a different version or is cut off
+
+        Returns:
+            GameRecord: The record
+        """
+        try:
+            version, seed, rule_flags, starting_hand_size, number_of_decks, player_count, entry_count = _HEADER.unpack_from(data, 0)
+            if version != RECORD_VERSION:
+                raise RecordError(f"Record version {version} is not supported")
+            position = _HEADER.size
+
+            record = cls(seed, rule_flags, starting_hand_size, number_of_decks)
+            for _ in range(player_count):
+                player_id, = _PLAYER_ID.unpack_from(data, position)
+                position += _PLAYER_ID.size
+                record._player_slots[player_id] = len(record.player_ids)
+                record.player_ids.append(player_id)
+
+        except struct.error as error:
+            raise RecordError(str(error)) from error
+
+        record.entries = bytearray(data[position:])
+        record.entry_count = entry_count
+        if len(record.read_entries()) != entry_count:
+            raise RecordError("Record is cut off")
+
+        return record
+
+    def __len__(self) -> int:
+        return self.entry_count
@@ -0,0 +1,163 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+
+# Opt-in counters and latency histograms for the engine's hot paths.
+# UnoGame, DeckManager, and Player each have a `stats` class attribute that is None unless instrumentation is enabled,
+# so when it is off every instrumented method only pays for loading that attribute and checking it against None.
+# Set `stats` on a single instance instead to only measure one game
+
+# Hand sizes are grouped into these buckets: 0, 1, 2, 3-4, 5-7, 8-15, 16+
+HAND_SIZE_BUCKETS = ("0", "1", "2", "3-4", "5-7", "8-15", "16+")
+_HAND_SIZE_BUCKET_INDEXES = (0, 1, 2, 3, 3, 4, 4, 4) + (5,) * 8
+
+# Histogram buckets go up in powers of two, from under 1ns to over a second
+_HISTOGRAM_BUCKET_COUNT = 32
+
+def get_hand_size_bucket(hand_size: int) -> str:
+    """
+    Returns the name of the bucket a hand size falls in
+
+    Args:
+        hand_size (int): The number of cards in the hand
+
+    Returns:
+        str: The bucket (see HAND_SIZE_BUCKETS)
+    """
+    if hand_size >= len(_HAND_SIZE_BUCKET_INDEXES):
+        return HAND_SIZE_BUCKETS[-1]
+    return HAND_SIZE_BUCKETS[_HAND_SIZE_BUCKET_INDEXES[hand_size]]
+
+
+class LatencyHistogram:
+
+    __slots__ = ("counts", "count", "total_ns")
+
+    def __init__(self) -> None:
+        """
+        Counts latencies in power of two buckets: bucket i holds latencies from 2^(i-1) up to 2^i nanoseconds
+        """
+        self.counts = [0] * _HISTOGRAM_BUCKET_COUNT
+        self.count = 0
+        self.total_ns = 0
+
+    def add(self, elapsed_ns: int) -> None:
+        self.counts[min(elapsed_ns.bit_length(), _HISTOGRAM_BUCKET_COUNT - 1)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count > 0 else 0.0
+
+    def percentile(self, fraction: float) -> int:
+        """
+        Returns an upper bound on the latency that `fraction` of the measurements were under
+
+        Args:
+            fraction (float): From 0 to 1, for example 0.99 for the 99th percentile
+
+        Returns:
+            int: The top of the bucket the percentile falls in, in nanoseconds (0 if nothing was measured)
+        """
+        target = fraction * self.count
+        seen = 0
+        for bucket, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if bucket_count > 0 and seen >= target:
+                return 1 << bucket
+        return 0
+
+
+class EngineStats:
+
+    def __init__(self) -> None:
+        """
+        Collects call counts and latency histograms, keyed by (operation, rule flags, hand size bucket).
+        Operations that don't know the rules or hand size use None for those parts
+        """
+        self.histograms: dict[tuple[str, int | None, str | None], LatencyHistogram] = {}
+
+    def record(self, operation: str, rule_flags: int | None, hand_size: int | None, elapsed_ns: int) -> None:
+        """
+        Records one call
+
+        Args:
+            operation (str): What was called, for example "play_card_move"
+            rule_flags (int | None): RulesKey.flags of the game's rules, or None if unknown
+            hand_size (int | None): The size of the hand involved before the call, or None if there isn't one
+            elapsed_ns (int): How long the call took, in nanoseconds
+        """
+        key = (operation, rule_flags, get_hand_size_bucket(hand_size) if hand_size is not None else None)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = LatencyHistogram()
+            self.histograms[key] = histogram
+        histogram.add(elapsed_ns)
+
+    def get_operation_totals(self) -> dict[str, LatencyHistogram]:
+        """
+        Returns the histograms merged over every ruleset and hand size, by operation
+
+        Returns:
+            dict[str, LatencyHistogram]: operation -> merged histogram
+        """
+        totals: dict[str, LatencyHistogram] = {}
+        for (operation, _, _), histogram in self.histograms.items():
+            total = totals.get(operation)
+            if total is None:
+                total = LatencyHistogram()
+                totals[operation] = total
+            total.counts = [a + b for a, b in zip(total.counts, histogram.counts)]
+            total.count += histogram.count
+            total.total_ns += histogram.total_ns
+        return totals
+
+    def summary(self) -> str:
+        """
+        Returns a table of calls, total time, mean, and 99th percentile for each operation, most total time first
+
+        Returns:
+            str: The table
+        """
+        lines = [f"{'operation':<20}{'calls':>12}{'total ms':>12}{'mean ns':>10}{'p99 ns':>12}"]
+        totals = sorted(self.get_operation_totals().items(), key=lambda item: item[1].total_ns, reverse=True)
+        for operation, histogram in totals:
+            lines.append(f"{operation:<20}{histogram.count:>12}{histogram.total_ns / 1e6:>12.1f}{histogram.mean_ns:>10.0f}{histogram.percentile(0.99):>12}")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        self.histograms = {}
+
+
+def enable_instrumentation(stats: EngineStats | None = None) -> EngineStats:
+    """
+    Starts recording calls from every game, deck, and player into the stats
+
+    Args:
+        stats (EngineStats | None): Where to record. Defaults to a new EngineStats
+
+    Returns:
+        EngineStats: The stats being recorded into
+    """
+    # Imported here since the engine modules import this one
+    from unogame.deck import DeckManager
+    from unogame.game import UnoGame
+    from unogame.player import Player
+
+    stats = stats if stats is not None else EngineStats()
+    UnoGame.stats = stats
+    DeckManager.stats = stats
+    Player.stats = stats
+    return stats
+
+
+def disable_instrumentation() -> None:
+    """
+    Stops recording calls (instances with their own `stats` keep recording)
+    """
+    from unogame.deck import DeckManager
+    from unogame.game import UnoGame
+    from unogame.player import Player
+
+    UnoGame.stats = None
+    DeckManager.stats = None
+    Player.stats = None
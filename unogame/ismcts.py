@@ -0,0 +1,311 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+from unogame.card import CardColors
+from unogame.determinize import HiddenHandSampler
+from unogame.game import UnoGame, UnoStates, MOVE_ERRORS
+from unogame.move import UnoMove, MoveTypes
+from unogame.player import Player
+
+from dataclasses import dataclass # type: ignore (pylance shadow stdlib issues)
+import math # type: ignore (pylance shadow stdlib issues)
+import random # type: ignore (pylance shadow stdlib issues)
+import time # type: ignore (pylance shadow stdlib issues)
+
+# Information set Monte Carlo tree search (single observer ISMCTS).
+# The searching player can't see the other hands or the draw pile, so every iteration deals those cards out randomly
+# (a determinization), then walks one shared tree of moves using only the moves that are legal in that deal.
+# Each node is scored from the point of view of the player who made the move leading to it
+
+@dataclass
+class SearchSettings:
+    # How long to search for, in seconds. None means only max_iterations is used
+    time_limit: float | None = 0.15
+    # How many iterations to run at most. None means only time_limit is used
+    max_iterations: int | None = None
+    # How many moves a rollout plays before the game is scored by hand sizes instead
+    rollout_depth: int = 60
+    # UCB exploration constant. Higher values try more moves, lower values focus on the best ones
+    exploration: float = 0.7
+
+
+class _SearchNode:
+
+    __slots__ = ("move", "mover_id", "parent", "children", "visits", "availability", "total_reward")
+
+    def __init__(self, move: UnoMove | None, parent: _SearchNode | None) -> None:
+        """
+        A node in the search tree, reached by making `move` from the parent node
+
+        Args:
+            move (UnoMove | None): The move leading to this node (None for the root)
+            parent (_SearchNode | None): The parent node (None for the root)
+        """
+        self.move = move
+        self.mover_id = move.player_id if move is not None else None
+        self.parent = parent
+        self.children: dict[UnoMove, _SearchNode] = {}
+
+        self.visits = 0
+        # How many times this node's move was legal when its parent was visited
+        self.availability = 1
+        self.total_reward = 0.0
+
+    def ucb_score(self, exploration: float) -> float:
+        return self.total_reward / self.visits + exploration * math.sqrt(math.log(self.availability) / self.visits)
+
+
+def choose_move(game: UnoGame, player_id: int, settings: SearchSettings | None = None, rng: random.Random | None = None,
+        sampler: HiddenHandSampler | None = None) -> UnoMove | None:
+    """
+    Searches for the best move for the given player. The game is not changed.
+    Only uses what the player could know, so it can be given the real game
+
+    Args:
+        game (UnoGame): The game to search
+        player_id (int): The id of the player to pick a move for
+        settings (SearchSettings | None): How long and how widely to search. Defaults to SearchSettings()
+        rng (random.Random | None): The random number generator to use. Defaults to a new one
+        sampler (HiddenHandSampler | None): The player's sampler of hidden hands (see `UnoGame.get_hand_sampler`).
+            Defaults to a new one, which doesn't know about cards seen in earlier swaps
+
+    Raises:
+        ValueError: If the player isn't in the game
+
+    Returns:
+        UnoMove | None: The best move found, or None if the player has no legal moves
+    """
+    root_moves = game.get_legal_moves(game.get_player(player_id))
+    if len(root_moves) == 0:
+        return None
+    elif len(root_moves) == 1:
+        return root_moves[0]
+
+    ranked_moves = rank_moves(game, player_id, settings, rng, sampler)
+    if len(ranked_moves) == 0:
+        return root_moves[0]
+    return ranked_moves[0][0]
+
+
+def rank_moves(game: UnoGame, player_id: int, settings: SearchSettings | None = None, rng: random.Random | None = None,
+        sampler: HiddenHandSampler | None = None) -> list[tuple[UnoMove, float]]:
+    """
+    Searches like `choose_move`, but returns every move the search tried with its average reward
+    (roughly the chance of winning after making it), most visited first
+
+    Args:
+        game (UnoGame): The game to search
+        player_id (int): The id of the player to rank moves for
+        settings (SearchSettings | None): How long and how widely to search. Defaults to SearchSettings()
+        rng (random.Random | None): The random number generator to use. Defaults to a new one
+        sampler (HiddenHandSampler | None): The player's sampler of hidden hands. Defaults to a new one
+
+    Raises:
+        ValueError: If the player isn't in the game
+
+    Returns:
+        list[tuple[UnoMove, float]]: The moves and their average rewards. Empty if the player has no legal moves
+    """
+    settings = settings if settings is not None else SearchSettings()
+    rng = rng if rng is not None else random.Random()
+    sampler = sampler if sampler is not None else HiddenHandSampler.from_game(game, player_id)
+
+    if len(game.get_legal_moves(game.get_player(player_id))) == 0:
+        return []
+
+    root = _SearchNode(None, None)
+    deadline = time.perf_counter() + settings.time_limit if settings.time_limit is not None else None
+    iterations = 0
+
+    while True:
+        if settings.max_iterations is not None and iterations >= settings.max_iterations:
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        # Always make sure at least one iteration happens, even without any limits
+        if settings.max_iterations is None and deadline is None and iterations > 0:
+            break
+
+        _run_iteration(game, root, player_id, sampler, settings, rng)
+        iterations += 1
+
+    # The most visited move is the most reliable choice
+    children = sorted(root.children.values(), key=lambda child: child.visits, reverse=True)
+    return [(child.move, child.total_reward / child.visits) for child in children if child.visits > 0]  # type: ignore - only the root has no move
+
+
+def _run_iteration(game: UnoGame, root: _SearchNode, player_id: int, sampler: HiddenHandSampler, settings: SearchSettings, rng: random.Random) -> None:
+    """
+    Runs one iteration of the search: determinize, select down the tree, expand one node, roll out, and backpropagate
+
+    Args:
+        game (UnoGame): The real game
+        root (_SearchNode): The root of the tree
+        player_id (int): The id of the searching player
+        sampler (HiddenHandSampler): The searching player's sampler of hidden hands
+        settings (SearchSettings): The search settings
+        rng (random.Random): The random number generator to use
+    """
+    state = sampler.determinize(game, rng)
+    node = root
+    finished = False
+
+    # Selection and expansion
+    while not finished:
+        # At the root, only the searching player's moves matter
+        if node is root:
+            moves = state.get_legal_moves(state.get_player(player_id))
+        else:
+            moves = _get_all_moves(state)
+
+        if len(moves) == 0:
+            break
+
+        untried_moves = []
+        best_child = None
+        best_score = -math.inf
+        for move in moves:
+            child = node.children.get(move)
+            if child is None:
+                untried_moves.append(move)
+                continue
+            child.availability += 1
+            score = child.ucb_score(settings.exploration)
+            if score > best_score:
+                best_child = child
+                best_score = score
+
+        if len(untried_moves) > 0:
+            move = rng.choice(untried_moves)
+            child = _SearchNode(move, node)
+            node.children[move] = child
+            node = child
+            finished = make_search_move(state, move)
+            break
+
+        assert best_child is not None
+        node = best_child
+        finished = make_search_move(state, best_child.move)  # type: ignore - only the root has no move
+
+    rewards = score_game(state) if finished else _rollout(state, settings.rollout_depth, rng)
+
+    # Backpropagation
+    while node is not None:
+        node.visits += 1
+        if node.mover_id is not None:
+            node.total_reward += rewards.get(node.mover_id, 0.0)
+        node = node.parent
+
+
+def _get_all_moves(game: UnoGame) -> list[UnoMove]:
+    """
+    Returns the legal moves of the player whose turn it is, plus every jump-in from the other players
+
+    Args:
+        game (UnoGame): The game
+
+    Returns:
+        list[UnoMove]: The legal moves
+    """
+    moves = game.get_legal_moves(game.players[game.turn_index])
+    # The card index means only players who really can jump in need to be checked
+    for jump_in_player_id in game.get_jump_in_player_ids():
+        moves += game.get_legal_moves(game.get_player(jump_in_player_id))
+    return moves
+
+
+def make_search_move(game: UnoGame, move: UnoMove) -> bool:
+    """
+    Makes the move without keeping undo information
+
+    Args:
+        game (UnoGame): The game
+        move (UnoMove): The move
+
+    Returns:
+        bool: True if the game is over afterwards
+    """
+    try:
+        game.make_move(move)
+    # Moves that fail in a determinization (drawing from an empty deck for example) end the game where it is.
+    # Anything else is a bug, and is passed on
+    except MOVE_ERRORS:
+        return True
+
+    if game.state == UnoStates.PLAYER_WON:
+        return True
+    # Special cards overwrite PLAYER_WON, but an empty hand has still won
+    return len(game.get_player(move.player_id).hand) == 0
+
+
+def _rollout(game: UnoGame, depth: int, rng: random.Random) -> dict[int, float]:
+    """
+    Plays the game out with a fast, simple policy, then scores it.
+    Only the player whose turn it is moves, so jump-ins are left to the tree
+
+    Args:
+        game (UnoGame): The game to play out (it is changed)
+        depth (int): The most moves to play
+        rng (random.Random): The random number generator to use
+
+    Returns:
+        dict[int, float]: The reward for each player id
+    """
+    for _ in range(depth):
+        move = _rollout_policy(game, game.players[game.turn_index], rng)
+        if move is None or make_search_move(game, move):
+            break
+
+    return score_game(game)
+
+
+def _rollout_policy(game: UnoGame, player: Player, rng: random.Random) -> UnoMove | None:
+    """
+    Picks a move for a rollout. Plays a random card if possible, and picks the color the player has most of for wilds.
+    This is the hot loop of the search, so it avoids building the full list of legal moves whenever it can
+
+    Args:
+        game (UnoGame): The game
+        player (Player): The player moving
+        rng (random.Random): The random number generator to use
+
+    Returns:
+        UnoMove | None: The chosen move, or None if the player can't do anything
+    """
+    if game.state == UnoStates.WAITING_FOR_WILD_COLOR:
+        color_counts = {CardColors.RED: 0, CardColors.YELLOW: 0, CardColors.GREEN: 0, CardColors.BLUE: 0}
+        for card in player.hand:
+            if card.color in color_counts:
+                color_counts[card.color] += 1
+        best_color = max(color_counts, key=lambda color: color_counts[color])
+        return UnoMove(MoveTypes.CHOOSE_COLOR, player.player_id, color=best_color)
+
+    if game.state != UnoStates.WAITING_FOR_PICK_PLAYER_TO_SWAP and game.state != UnoStates.WAITING_FOR_CHOOSE_TO_ROTATE:
+        # Look through the hand from a random starting point and play the first card that works
+        hand = player.hand
+        start = rng.randrange(len(hand)) if len(hand) > 0 else 0
+        for i in range(len(hand)):
+            card = hand[(start + i) % len(hand)]
+            if game.is_legal_play(card):
+                return UnoMove(MoveTypes.PLAY_CARD, player.player_id, card=card)
+
+    moves = game.get_legal_moves(player)
+    if len(moves) == 0:
+        return None
+    return rng.choice(moves)
+
+
+def score_game(game: UnoGame) -> dict[int, float]:
+    """
+    Scores the game for every player. A player with no cards left gets 1 and everyone else 0.
+    Unfinished games are scored by hand size, where the smallest hand gets 0.5 and bigger hands get less
+
+    Args:
+        game (UnoGame): The game to score
+
+    Returns:
+        dict[int, float]: The reward for each player id
+    """
+    smallest_hand = min(len(player.hand) for player in game.players)
+    if smallest_hand == 0:
+        return {player.player_id: 1.0 if len(player.hand) == 0 else 0.0 for player in game.players}
+
+    return {player.player_id: (smallest_hand + 1) / (len(player.hand) + 1) * 0.5 for player in game.players}
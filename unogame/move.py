@@ -0,0 +1,43 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+from unogame.card import Card, CardColors
+
+from dataclasses import dataclass # type: ignore (pylance shadow stdlib issues)
+from enum import Enum # type: ignore (pylance shadow stdlib issues)
+
+@dataclass(frozen=True)
+class UnoMove:
+    """
+    A single move by a player, matching one of the UnoGame *_move methods.
+    Only the fields used by the move type need to be set
+    """
+    move_type: MoveTypes
+    player_id: int
+    # PLAY_CARD
+    card: Card | None = None
+    # CHOOSE_COLOR
+    color: CardColors | None = None
+    # SEVEN_SWAP
+    target_index: int = 0
+    # ZERO_ROTATE
+    rotate: bool = False
+
+    def __str__(self) -> str:
+        match self.move_type:
+            case MoveTypes.PLAY_CARD:
+                return f"{self.player_id} plays {self.card}"
+            case MoveTypes.CHOOSE_COLOR:
+                return f"{self.player_id} chooses {self.color.value if self.color is not None else None}"
+            case MoveTypes.SEVEN_SWAP:
+                return f"{self.player_id} swaps with seat {self.target_index}"
+            case MoveTypes.ZERO_ROTATE:
+                return f"{self.player_id} {'rotates' if self.rotate else 'does not rotate'}"
+            case _:
+                return f"{self.player_id} {self.move_type.name.lower()}"
+
+class MoveTypes(Enum):
+    PLAY_CARD = 0
+    DRAW = 1
+    PASS = 2
+    CHOOSE_COLOR = 3
+    SEVEN_SWAP = 4
+    ZERO_ROTATE = 5
@@ -1,20 +1,39 @@
 from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
 from unogame.card import Card
+from unogame.instrumentation import EngineStats
+from unogame.zobrist import CARD_KEYS, MASK_64, hash_hand
+
+import time # type: ignore (pylance shadow stdlib issues)
 
 class Player:
 
+    # Where has_card_to_play records calls, if instrumentation is enabled (see instrumentation.py)
+    stats: EngineStats | None = None
+
     def __init__(self, player_id: int) -> None:
 
         self.player_id = player_id
         self.hand: list[Card] = []
 
+    @property
+    def hand(self) -> list[Card]:
+        return self._hand
+
+    @hand.setter
+    def hand(self, hand: list[Card]) -> None:
+        self._hand = hand
+        # Multiset hash of the hand (see zobrist.hash_hand), kept up to date by the methods below.
+        # Changing the list directly instead of through these methods leaves it out of date
+        self.hand_hash = hash_hand(hand)
+
     
-    def add_card_to_hand(self, card: Card):
+    def add_card_to_hand(self, card: Card, position: int | None = None):
         """
         Adds the provided card to hand
 
         Args:
             card (Card): The card to add
+            position (int | None): Where in the hand to put the card. Defaults to the end
 
         Raises:
             TypeError: If the card provided is not a card
@@ -23,7 +42,11 @@ class Player:
         if type(card) != Card:
             raise TypeError(card)
 
-        self.hand.append(card)
+        if position is None:
+            self._hand.append(card)
+        else:
+            self._hand.insert(position, card)
+        self.hand_hash = (self.hand_hash + CARD_KEYS[card.card_id]) & MASK_64
 
     def play_card(self, card: Card) -> bool:
         """
@@ -40,13 +63,41 @@ class Player:
         if not card.return_to_discard:
             return True
 
-        if card not in self.hand:
+        if card not in self._hand:
             return False
 
         else:
-            self.hand.remove(card)
+            self._hand.remove(card)
+            self.hand_hash = (self.hand_hash - CARD_KEYS[card.card_id]) & MASK_64
             return True
 
+    def remove_card_at(self, position: int) -> Card:
+        """
+        Removes the card at the given position in the hand
+
+        Args:
+            position (int): The position of the card
+
+        Raises:
+            IndexError: If there is no card at that position
+
+        Returns:
+            Card: The card removed
+        """
+        card = self._hand.pop(position)
+        self.hand_hash = (self.hand_hash - CARD_KEYS[card.card_id]) & MASK_64
+        return card
+
+    def swap_hands(self, other_player: Player) -> None:
+        """
+        Swaps hands with another player
+
+        Args:
+            other_player (Player): The player to swap with
+        """
+        self._hand, other_player._hand = other_player._hand, self._hand
+        self.hand_hash, other_player.hand_hash = other_player.hand_hash, self.hand_hash
+
     def has_card_to_play(self, top_card: Card) -> bool:
         """
         Determines if the player has a card that is a valid play on top of top_card
@@ -57,12 +108,38 @@ class Player:
         Returns:
             bool: True if the player has a valid card to play, False otherwise
         """
-        for card in self.hand:
+        stats = self.stats
+        if stats is None:
+            return self._has_card_to_play(top_card)
+
+        start_ns = time.perf_counter_ns()
+        try:
+            return self._has_card_to_play(top_card)
+        finally:
+            stats.record("has_card_to_play", None, len(self._hand), time.perf_counter_ns() - start_ns)
+
+    def _has_card_to_play(self, top_card: Card) -> bool:
+        """
+        The untimed body of `has_card_to_play`
+        """
+        for card in self._hand:
             if card.can_be_played(top_card):
                 return True
 
         return False
 
+    def clone(self) -> Player:
+        """
+        Returns a copy of the player with their own copy of the hand. The cards themselves are shared
+
+        Returns:
+            Player: The copy
+        """
+        new_player = Player(self.player_id)
+        new_player._hand = self._hand.copy()
+        new_player.hand_hash = self.hand_hash
+        return new_player
+
     def __eq__(self, __o: object) -> bool:
         if isinstance(__o, Player):
             return __o.player_id == self.player_id
@@ -71,4 +148,4 @@ class Player:
         
 
         
-        
\ No newline at end of file
+        
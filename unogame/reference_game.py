@@ -0,0 +1,215 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+
+from unogame.card import Card, CardColors, CardFaces
+from unogame.game import UnoGame, UnoStates, OutOfTurnError, InvalidCardPlayedError, PlayerDoesNotHaveCardError
+from unogame.player import Player
+
+class ReferenceUnoGame(UnoGame):
+    """
+    UnoGame with the original if/elif implementation of card plays, before they were driven by `RulesTable`.
+    This is kept as the reference the compiled rules are checked against, and should not be used for real games.
+
+    Known differences from UnoGame: some invalid plays here change the game before raising
+    (a failed stack attempt leaves the state at WAITING_FOR_PLAY, and a failed jump-in keeps the new turn_index)
+    """
+
+    def play_card_move(self, player: Player, card: Card, allow_mismatch_play: bool = False) -> None:
+        """
+        Has the player given play the card given from their hand,
+        and will update game state accordingly
+
+        Args:
+            player (Player): The player who plays a card
+            card (Card): The card they are playing
+            allow_mismatch_play (bool): If True, any card will count as a valid card to play on top of the top card. Only affects standard play, not jump-ins 
+
+        Raises:
+            OutOfTurnError: If the move was made out of turn (or an invalid jump-in card was attempted to be played)
+            InvalidCardPlayedError: It is that player's turn, but the card they played was an invalid move
+            PlayerDoesNotHaveCardError: The play was valid, but the player did not have the card they attempted to play
+        """
+        # Can't play a card before the game starts or after someone won
+        if self.state == UnoStates.PREGAME or self.state == UnoStates.PLAYER_WON:
+            raise OutOfTurnError
+
+        # Can't play a card during a seven/zero if the rules are set to not allow jump-ins during those
+        # This is only to stop jump-ins during those cases
+        elif self.state == UnoStates.WAITING_FOR_PICK_PLAYER_TO_SWAP and not self.ruleset.jump_in_during_seven:
+            raise OutOfTurnError
+        elif self.state == UnoStates.WAITING_FOR_CHOOSE_TO_ROTATE and not self.ruleset.jump_in_during_zero:
+            raise OutOfTurnError
+
+        # If the game is waiting for the next move and the player who just tried to make a move was the current turn,
+        # then process the play
+        elif ((self.state == UnoStates.WAITING_FOR_PLAY or self.state == UnoStates.WAITING_FOR_DRAW_RESPONSE) and 
+                self.players[self.turn_index] == player):
+            # Check if the card is valid in the first place
+            if not card.can_be_played(self.deck.top_card) and not allow_mismatch_play:
+                raise InvalidCardPlayedError
+            
+            # Remove the card from the player
+            if not self._remove_card_from_hand(player, card):
+                raise PlayerDoesNotHaveCardError
+
+            self.deck.play_card(card)
+
+            # Check if the player who just played a card ran out of cards and won
+            if len(player.hand) == 0:
+                self.state = UnoStates.PLAYER_WON
+
+            self._process_card_state_changes(player, card)
+
+        elif (self.state == UnoStates.WAITING_FOR_PLUS_RESPONSE):
+            # If the card is a plus card that can be stacked, then the card is added to the stack and play continues
+            # Keep in mind the various rules for stacking plus_twos on plus_fours
+
+            # Case stacking is off
+            if not self.ruleset.stacking:
+                raise InvalidCardPlayedError("Stacking is disabled")
+
+            # Case standard stack
+            elif self.deck.top_card.face == card.face:
+                # The card can be played as normal
+
+                # Update the state so play_card_move will process it
+                self.state = UnoStates.WAITING_FOR_PLAY
+
+                self.play_card_move(player, card)
+
+            # Case plus fours can be stacked on plus twos
+            elif (self.ruleset.stack_plus_fours_on_plus_twos and
+                    self.deck.top_card.face == CardFaces.PLUS_TWO and 
+                    card.face == CardFaces.PLUS_FOUR):
+                # The card can be played as normal
+
+                # Update the state so play_card_move will process it
+                self.state = UnoStates.WAITING_FOR_PLAY
+
+                self.play_card_move(player, card)
+
+            # Case plus twos can always be stacked on plus fours
+            elif (self.ruleset.stack_all_plus_twos_on_plus_fours and 
+                    self.deck.top_card.face == CardFaces.PLUS_FOUR and 
+                    card.face == CardFaces.PLUS_TWO):
+                # The card can be played as normal
+
+                # Update the state so play_card_move will process it
+                self.state = UnoStates.WAITING_FOR_PLAY
+
+                # We must bypass restrictions in this case, because the plus two may not normally be a valid move
+                self.play_card_move(player, card, True)
+
+            # Case only color matched plus twos can be stacked on plus fours
+            elif (self.ruleset.stack_color_matching_plus_twos_on_plus_fours and 
+                    self.deck.top_card.face == CardFaces.PLUS_FOUR and 
+                    card.face == CardFaces.PLUS_TWO and
+                    self.deck.top_card.color == card.color):
+                # The card can be played as normal
+
+                # Update the state so play_card_move will process it
+                self.state = UnoStates.WAITING_FOR_PLAY
+
+                self.play_card_move(player, card)
+
+
+            # If the card is anything else, thats an InvalidCardPlayedError
+            else:
+                raise InvalidCardPlayedError
+
+        # Otherwise, if the card is a jump-in (and the jump-in rule is enabled), then its always* valid
+        # *not valid if the game hasn't started, or depending on jump_in_during_seven/zero rules
+        elif card.can_be_jumped_in(self.deck.top_card) and self.ruleset.jump_ins:
+            # Do the jump-in stuff
+            # Start by updating turn_index to the index of whoever jumped in
+            self.turn_index = self.players.index(player)
+            # Then proceed normally
+
+            # Remove the card from the player
+            if not self._remove_card_from_hand(player, card):
+                raise PlayerDoesNotHaveCardError
+
+            # Return card to deck
+            self.deck.play_card(card)
+
+            # Check if the player who just played a card ran out of cards and won
+            if len(player.hand) == 0:
+                self.state = UnoStates.PLAYER_WON
+
+            # Important: we must check if the card could be a stack card and jump-in stacking is disabled here,
+            # as process_standard_card_play does not clear a stack in that case
+            if not self.ruleset.jump_ins_stack and (card.face == CardFaces.PLUS_FOUR or card.face == CardFaces.PLUS_TWO):
+                # Reset the stack if jump-ins are supposed to clear the stack
+                self.current_stack = 0
+
+
+            self._process_card_state_changes(player, card)
+        
+        # If we still haven't hit a valid case for playing a card, then raise an error, as the play wasn't valid
+        else:
+            raise OutOfTurnError
+
+    def choose_color_move(self, player: Player, color: CardColors) -> None:
+        """
+        The given player chooses a color for a wild card.
+
+        Args:
+            player (Player): The player picking the color
+            color (CardColors): The color chosen. Cannot be WILD
+
+        Raises:
+            OutOfTurnError: If the game is not waiting for the given player to choose a color
+            InvalidCardPlayedError: If the color given is WILD
+        """
+
+        # If we aren't waiting for a color or it isn't this player's turn
+        if self.state != UnoStates.WAITING_FOR_WILD_COLOR or self.players[self.turn_index] != player:
+            raise OutOfTurnError
+        
+        if color == CardColors.WILD:
+            raise InvalidCardPlayedError("Must choose a color that isn't wild")
+        
+        card = Card(color, self.deck.top_card.face)
+        # This is a temp card to show the color and do potential plus card processing. Do not store it in discard pile
+        card.return_to_discard = False
+        # Change state so play_card_move will process it
+        self.state = UnoStates.WAITING_FOR_PLAY
+        self.play_card_move(player, card)
+
+    def _process_card_state_changes(self, player: Player, card: Card):
+        """
+        Processes the state change after a card is played normally.
+        Sets state to WAITING_FOR_WILD_COLOR after a wild for example.
+        Also processes skips, reverses, and plus cards
+
+
+        Args:
+            player (Player): The player that played the card
+            card (Card): The card that was played
+        """
+        if card.color == CardColors.WILD:
+            self.state = UnoStates.WAITING_FOR_WILD_COLOR
+        elif card.face == CardFaces.PLUS_FOUR:
+            self.current_stack += 4
+            self.turn_index = self._next_turn_index(1)
+            self.state = UnoStates.WAITING_FOR_PLUS_RESPONSE
+        elif card.face == CardFaces.PLUS_TWO:
+            self.current_stack += 2
+            self.turn_index = self._next_turn_index(1)
+            self.state = UnoStates.WAITING_FOR_PLUS_RESPONSE
+        elif card.face == CardFaces.SKIP:
+            self.turn_index = self._next_turn_index(2)
+            self.state = UnoStates.WAITING_FOR_PLAY
+        elif card.face == CardFaces.REVERSE:
+            self.reversed = not self.reversed
+            if len(self.players) == 2:
+                # Acts as a skip in 1v1 per Uno rules
+                self.turn_index = self._next_turn_index(2)
+            else:
+                self.turn_index = self._next_turn_index(1)
+            self.state = UnoStates.WAITING_FOR_PLAY
+        elif card.face == CardFaces.ZERO and self.ruleset.zero_rotate_hands:
+            self.state = UnoStates.WAITING_FOR_CHOOSE_TO_ROTATE
+        elif card.face == CardFaces.SEVEN and self.ruleset.seven_swap_hands:
+            self.state = UnoStates.WAITING_FOR_PICK_PLAYER_TO_SWAP
+        else:
+            self.turn_index = self._next_turn_index(1)
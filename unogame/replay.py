@@ -0,0 +1,211 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+
+from unogame.card import CARDS_BY_ID
+from unogame.game import UnoGame, RulesKey, MOVE_ERRORS
+from unogame.game_record import GameRecord, RecordEntryTypes, RECORD_COLORS
+from unogame.move import UnoMove, MoveTypes
+from unogame.player import Player
+
+import random # type: ignore (pylance shadow stdlib issues)
+
+class ReplayError(Exception): pass
+
+
+class GameReplayer:
+
+    def __init__(self, record: GameRecord, checkpoint_interval: int = 64) -> None:
+        """
+        Plays a recorded game again from its seed and entries, as fast as the engine can go.
+        A copy of the game is kept every checkpoint_interval entries, so seeking backwards
+        only has to replay from the closest checkpoint instead of from the start
+
+        Args:
+            record (GameRecord): The record to replay (see `UnoGame.record`)
+            checkpoint_interval (int): How many entries apart checkpoints are
+
+        Raises:
+            RecordError: If the record can't be decoded
+        """
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be 1 or more")
+
+        self.record = record
+        self.checkpoint_interval = checkpoint_interval
+        self.entries = record.read_entries()
+
+        # entry index -> (game, deck random state, rules key) from just before that entry
+        self._checkpoints: dict[int, tuple[UnoGame, tuple, RulesKey]] = {}
+        self._game = UnoGame(RulesKey(record.rule_flags, record.starting_hand_size, record.number_of_decks).to_rules(),
+            seed=record.seed, record=False)
+        self._position = 0
+        self._save_checkpoint()
+
+    @property
+    def position(self) -> int:
+        """
+        How many entries have been replayed
+        """
+        return self._position
+
+    @property
+    def game(self) -> UnoGame:
+        """
+        The game after `position` entries. Changing it changes the replay, so clone it first
+        """
+        return self._game
+
+    def seek(self, entry_index: int) -> UnoGame:
+        """
+        Replays up to just after entry_index entries, going back to a checkpoint if needed
+
+        Args:
+            entry_index (int): How many entries should be replayed, from 0 to len(replayer)
+
+        Raises:
+            IndexError: If entry_index is out of range
+
+        Returns:
+            UnoGame: The game at that point (see `game`)
+        """
+        if entry_index < 0 or entry_index > len(self.entries):
+            raise IndexError(f"entry_index must be from 0 to {len(self.entries)}")
+
+        # Jump to the closest checkpoint if going back, or if it is further ahead than where the replay is now
+        checkpoint_index = entry_index - entry_index % self.checkpoint_interval
+        while checkpoint_index not in self._checkpoints:
+            checkpoint_index -= self.checkpoint_interval
+        if entry_index < self._position or checkpoint_index > self._position:
+            self._load_checkpoint(checkpoint_index)
+
+        while self._position < entry_index:
+            self.step()
+        return self._game
+
+    def play_to_end(self) -> UnoGame:
+        """
+        Replays every entry
+
+        Returns:
+            UnoGame: The final game (see `game`)
+        """
+        return self.seek(len(self.entries))
+
+    def step(self) -> bool:
+        """
+        Replays the next entry. Entries that raised an error when recorded should raise one here too, which is ignored
+
+        Raises:
+            IndexError: If every entry has already been replayed
+            ReplayError: If the entry went through when it failed in the real game, or the other way around
+
+        Returns:
+            bool: True if the entry went through without an error
+        """
+        if self._position >= len(self.entries):
+            raise IndexError("No entries left to replay")
+
+        entry_type, player_id, arg, flag, failed = self.entries[self._position]
+        try:
+            self._replay_entry(entry_type, player_id, arg, flag)
+        except MOVE_ERRORS as error:
+            if not failed:
+                raise ReplayError(f"Entry {self._position} ({entry_type.name}) failed in the replay but not in the game: {error!r}") from error
+            succeeded = False
+        else:
+            if failed:
+                raise ReplayError(f"Entry {self._position} ({entry_type.name}) went through in the replay but failed in the game")
+            succeeded = True
+
+        self._position += 1
+        if self._position % self.checkpoint_interval == 0 and self._position not in self._checkpoints:
+            self._save_checkpoint()
+        return succeeded
+
+    def get_move(self, entry_index: int) -> UnoMove | None:
+        """
+        Returns the move an entry made, for going through real games' moves
+
+        Args:
+            entry_index (int): The index of the entry
+
+        Raises:
+            IndexError: If entry_index is out of range
+
+        Returns:
+            UnoMove | None: The move, or None if the entry isn't a move (players joining or leaving, the game starting, or rule changes)
+        """
+        entry_type, player_id, arg, flag, _ = self.entries[entry_index]
+        match entry_type:
+            case RecordEntryTypes.PLAY_CARD:
+                return UnoMove(MoveTypes.PLAY_CARD, player_id, card=CARDS_BY_ID[arg])
+            case RecordEntryTypes.DRAW:
+                return UnoMove(MoveTypes.DRAW, player_id)
+            case RecordEntryTypes.PASS:
+                return UnoMove(MoveTypes.PASS, player_id)
+            case RecordEntryTypes.CHOOSE_COLOR:
+                return UnoMove(MoveTypes.CHOOSE_COLOR, player_id, color=RECORD_COLORS[arg])
+            case RecordEntryTypes.SEVEN_SWAP:
+                return UnoMove(MoveTypes.SEVEN_SWAP, player_id, target_index=arg)
+            case RecordEntryTypes.ZERO_ROTATE:
+                return UnoMove(MoveTypes.ZERO_ROTATE, player_id, rotate=bool(flag))
+            case _:
+                return None
+
+    def _replay_entry(self, entry_type: RecordEntryTypes, player_id: int, arg: int, flag: int) -> None:
+        """
+        Does what the entry did to the game, the same way it was done the first time
+
+        Args:
+            entry_type (RecordEntryTypes): The type of the entry
+            player_id (int): The player_id (or rule flags for RULES)
+            arg (int): The extra value (or starting_hand_size for RULES)
+            flag (int): The extra flag (or number_of_decks for RULES)
+        """
+        game = self._game
+        match entry_type:
+            case RecordEntryTypes.RULES:
+                # Replaced instead of changed, since checkpoints share the rules object
+                game.ruleset = RulesKey(player_id, arg, flag).to_rules()
+            case RecordEntryTypes.ADD_PLAYER:
+                game.create_player(player_id)
+            case RecordEntryTypes.REMOVE_PLAYER:
+                game.remove_player(player_id)
+            case RecordEntryTypes.START_GAME:
+                game.start_game()
+            case RecordEntryTypes.PLAY_CARD:
+                game.play_card_move(self._get_player(player_id), CARDS_BY_ID[arg], bool(flag))
+            case RecordEntryTypes.DRAW:
+                game.draw_card_move(self._get_player(player_id))
+            case RecordEntryTypes.PASS:
+                game.pass_turn_move(self._get_player(player_id))
+            case RecordEntryTypes.CHOOSE_COLOR:
+                game.choose_color_move(self._get_player(player_id), RECORD_COLORS[arg])
+            case RecordEntryTypes.SEVEN_SWAP:
+                game.seven_swap_move(self._get_player(player_id), arg)
+            case RecordEntryTypes.ZERO_ROTATE:
+                game.zero_rotate_move(self._get_player(player_id), bool(flag))
+
+    def _get_player(self, player_id: int) -> Player:
+        """
+        Returns the player in the game, or a new Player with the id if they aren't in it
+        (moves by players who aren't in the game can still be recorded, and should fail the same way again)
+        """
+        try:
+            return self._game.get_player(player_id)
+        except ValueError:
+            return Player(player_id)
+
+    def _save_checkpoint(self) -> None:
+        self._checkpoints[self._position] = (self._game.clone(), self._game.deck.rng.getstate(), self._game.ruleset.to_key())
+
+    def _load_checkpoint(self, entry_index: int) -> None:
+        checkpoint_game, rng_state, rules_key = self._checkpoints[entry_index]
+        self._game = checkpoint_game.clone()
+        self._game.ruleset = rules_key.to_rules()
+        # Clones don't keep the deck's random number generator (see DeckManager.clone), but replays need the same draws
+        self._game.deck.rng = random.Random()
+        self._game.deck.rng.setstate(rng_state)
+        self._position = entry_index
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,204 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+from typing import TYPE_CHECKING
+
+from unogame.card import Card, CardColors, CardFaces, CARD_IDS
+
+from dataclasses import dataclass # type: ignore (pylance shadow stdlib issues)
+from functools import lru_cache # type: ignore (pylance shadow stdlib issues)
+
+if TYPE_CHECKING:
+    from unogame.game import RulesKey, UnoStates
+
+
+@dataclass(frozen=True)
+class Transition:
+    """
+    What happens when a card is played in a specific situation.
+    If `error` is set, the play is not allowed and nothing else in the transition matters
+    """
+
+    error: type[Exception] | None = None
+    error_args: tuple = ()
+
+    # The player moves the turn to themselves before the card is processed
+    jump_in: bool = False
+    # The stack is cleared before the card is added to it (jump-ins when jump_ins_stack is off)
+    clears_stack: bool = False
+    stack_delta: int = 0
+    reverses: bool = False
+    turn_delta: int = 0
+    # Reverses act as skips in 1v1
+    two_player_turn_delta: int = 0
+    next_state: UnoStates | None = None
+    # If the player runs out of cards, the game stays won instead of moving to next_state
+    keeps_win: bool = False
+
+
+class RulesTable:
+
+    def __init__(self, rules_key: RulesKey) -> None:
+        """
+        A transition table for card plays compiled from a ruleset.
+        Transitions are keyed by (state, whether it is the player's turn, allow_mismatch_play, top card, played card),
+        and each combination is worked out the first time it is needed and then reused.
+        Use `compile_rules` to get a table, so tables are shared between games with the same rules
+
+        Args:
+            rules_key (RulesKey): The rules to compile
+        """
+
+        self.key = rules_key
+
+        self.jump_ins = rules_key.has_rule("jump_ins")
+        self.stacking = rules_key.has_rule("stacking")
+        self.jump_ins_stack = rules_key.has_rule("jump_ins_stack")
+        self.stack_plus_fours_on_plus_twos = rules_key.has_rule("stack_plus_fours_on_plus_twos")
+        self.stack_all_plus_twos_on_plus_fours = rules_key.has_rule("stack_all_plus_twos_on_plus_fours")
+        self.stack_color_matching_plus_twos_on_plus_fours = rules_key.has_rule("stack_color_matching_plus_twos_on_plus_fours")
+        self.seven_swap_hands = rules_key.has_rule("seven_swap_hands")
+        self.zero_rotate_hands = rules_key.has_rule("zero_rotate_hands")
+        self.jump_in_during_seven = rules_key.has_rule("jump_in_during_seven")
+        self.jump_in_during_zero = rules_key.has_rule("jump_in_during_zero")
+
+        self.transitions: dict[int, Transition] = {}
+
+    def get_transition(self, state: UnoStates, is_players_turn: bool, top_card: Card, card: Card, allow_mismatch_play: bool = False) -> Transition:
+        """
+        Looks up what happens when a card is played
+
+        Args:
+            state (UnoStates): The current game state
+            is_players_turn (bool): If it is the turn of the player playing the card
+            top_card (Card): The top card of the deck
+            card (Card): The card being played
+            allow_mismatch_play (bool): See `UnoGame.play_card_move`
+
+        Returns:
+            Transition: What happens as a result of the play
+        """
+        key = ((((state.value << 1) | is_players_turn) << 1 | allow_mismatch_play) * len(CARD_IDS) + top_card.card_id) * len(CARD_IDS) + card.card_id
+
+        transition = self.transitions.get(key)
+        if transition is None:
+            transition = self._compile_transition(state, is_players_turn, top_card, card, allow_mismatch_play)
+            self.transitions[key] = transition
+
+        return transition
+
+    def _compile_transition(self, state: UnoStates, is_players_turn: bool, top_card: Card, card: Card, allow_mismatch_play: bool) -> Transition:
+        """
+        Works out a single transition. This follows the same order of checks that `UnoGame.play_card_move` always has
+
+        Args:
+            state (UnoStates): The current game state
+            is_players_turn (bool): If it is the turn of the player playing the card
+            top_card (Card): The top card of the deck
+            card (Card): The card being played
+            allow_mismatch_play (bool): See `UnoGame.play_card_move`
+
+        Returns:
+            Transition: What happens as a result of the play
+        """
+        from unogame.game import UnoStates, OutOfTurnError, InvalidCardPlayedError
+
+        # Can't play a card before the game starts or after someone won
+        if state == UnoStates.PREGAME or state == UnoStates.PLAYER_WON:
+            return Transition(error=OutOfTurnError)
+
+        # Can't jump-in during a seven/zero if the rules are set to not allow it
+        elif state == UnoStates.WAITING_FOR_PICK_PLAYER_TO_SWAP and not self.jump_in_during_seven:
+            return Transition(error=OutOfTurnError)
+        elif state == UnoStates.WAITING_FOR_CHOOSE_TO_ROTATE and not self.jump_in_during_zero:
+            return Transition(error=OutOfTurnError)
+
+        # Standard play
+        elif (state == UnoStates.WAITING_FOR_PLAY or state == UnoStates.WAITING_FOR_DRAW_RESPONSE) and is_players_turn:
+            if not card.can_be_played(top_card) and not allow_mismatch_play:
+                return Transition(error=InvalidCardPlayedError)
+            return self._compile_card_effects(state, card, jump_in=False)
+
+        elif state == UnoStates.WAITING_FOR_PLUS_RESPONSE:
+            if not self.stacking:
+                return Transition(error=InvalidCardPlayedError, error_args=("Stacking is disabled",))
+
+            # Case standard stack, or plus fours on plus twos
+            elif (top_card.face == card.face or
+                    (self.stack_plus_fours_on_plus_twos and top_card.face == CardFaces.PLUS_TWO and card.face == CardFaces.PLUS_FOUR)):
+                stack_mismatch_allowed = False
+
+            # Case plus twos can always be stacked on plus fours
+            # Restrictions have to be bypassed here, because the plus two may not normally be a valid move
+            elif self.stack_all_plus_twos_on_plus_fours and top_card.face == CardFaces.PLUS_FOUR and card.face == CardFaces.PLUS_TWO:
+                stack_mismatch_allowed = True
+
+            # Case only color matched plus twos can be stacked on plus fours
+            elif (self.stack_color_matching_plus_twos_on_plus_fours and top_card.face == CardFaces.PLUS_FOUR and
+                    card.face == CardFaces.PLUS_TWO and top_card.color == card.color):
+                stack_mismatch_allowed = False
+
+            else:
+                return Transition(error=InvalidCardPlayedError)
+
+            # A valid stack card is then played as if the game was waiting for a normal play,
+            # so the player whose turn it is plays it normally and anyone else has to jump-in
+            return self._compile_transition(UnoStates.WAITING_FOR_PLAY, is_players_turn, top_card, card, stack_mismatch_allowed)
+
+        # Otherwise, the only option left is a jump-in
+        elif card.can_be_jumped_in(top_card) and self.jump_ins:
+            return self._compile_card_effects(state, card, jump_in=True)
+
+        else:
+            return Transition(error=OutOfTurnError)
+
+    def _compile_card_effects(self, state: UnoStates, card: Card, jump_in: bool) -> Transition:
+        """
+        Works out the state changes from a card that is allowed to be played.
+        Sets state to WAITING_FOR_WILD_COLOR after a wild for example.
+        Also processes skips, reverses, and plus cards
+
+        Args:
+            state (UnoStates): The game state when the card is played
+            card (Card): The card being played
+            jump_in (bool): If the card is being played as a jump-in
+
+        Returns:
+            Transition: What happens as a result of the play
+        """
+        from unogame.game import UnoStates
+
+        # Jump-ins clear the stack if jump-ins aren't supposed to stack
+        clears_stack = jump_in and not self.jump_ins_stack and (card.face == CardFaces.PLUS_FOUR or card.face == CardFaces.PLUS_TWO)
+
+        if card.color == CardColors.WILD:
+            return Transition(jump_in=jump_in, clears_stack=clears_stack, next_state=UnoStates.WAITING_FOR_WILD_COLOR)
+        elif card.face == CardFaces.PLUS_FOUR:
+            return Transition(jump_in=jump_in, clears_stack=clears_stack, stack_delta=4, turn_delta=1, two_player_turn_delta=1,
+                next_state=UnoStates.WAITING_FOR_PLUS_RESPONSE)
+        elif card.face == CardFaces.PLUS_TWO:
+            return Transition(jump_in=jump_in, clears_stack=clears_stack, stack_delta=2, turn_delta=1, two_player_turn_delta=1,
+                next_state=UnoStates.WAITING_FOR_PLUS_RESPONSE)
+        elif card.face == CardFaces.SKIP:
+            return Transition(jump_in=jump_in, turn_delta=2, two_player_turn_delta=2, next_state=UnoStates.WAITING_FOR_PLAY)
+        elif card.face == CardFaces.REVERSE:
+            return Transition(jump_in=jump_in, reverses=True, turn_delta=1, two_player_turn_delta=2, next_state=UnoStates.WAITING_FOR_PLAY)
+        elif card.face == CardFaces.ZERO and self.zero_rotate_hands:
+            return Transition(jump_in=jump_in, next_state=UnoStates.WAITING_FOR_CHOOSE_TO_ROTATE)
+        elif card.face == CardFaces.SEVEN and self.seven_swap_hands:
+            return Transition(jump_in=jump_in, next_state=UnoStates.WAITING_FOR_PICK_PLAYER_TO_SWAP)
+        else:
+            # Normal cards just pass the turn along and leave the state alone
+            return Transition(jump_in=jump_in, turn_delta=1, two_player_turn_delta=1, next_state=state, keeps_win=True)
+
+
+@lru_cache(maxsize=256)
+def compile_rules(rules_key: RulesKey) -> RulesTable:
+    """
+    Returns the compiled rules table for the given rules, reusing the same table for every game with the same rules
+
+    Args:
+        rules_key (RulesKey): The rules to compile (see `UnoRules.to_key`)
+
+    Returns:
+        RulesTable: The compiled rules
+    """
+    return RulesTable(rules_key)
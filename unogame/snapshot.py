@@ -0,0 +1,166 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+
+from unogame.card import Card, CardColors, CARDS_BY_ID
+from unogame.determinize import HiddenHandSampler
+from unogame.game import UnoGame, UnoStates, RulesKey
+from unogame.move import UnoMove, MoveTypes
+from unogame.player import Player
+
+import struct # type: ignore (pylance shadow stdlib issues)
+
+# Compact binary snapshots of games, for sending games to other processes.
+# Cards are stored as one byte card_ids, so a whole game is a couple hundred bytes instead of a pickled object graph.
+# Layout (little endian):
+#   header: version, rule flags, starting_hand_size, number_of_decks, turn_index, current_stack, reversed, state, top card,
+#           number of players, draw pile size, discard pile size
+#   each player: player_id, hand size, card_ids
+#   draw pile card_ids, discard pile card_ids
+#   sampler: 0/1 for whether one is included, then observer_id, number of known hands, and for each player_id, size, card_ids
+
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct("<BIHHHH?BBHHH")
+_PLAYER = struct.Struct("<qH")
+_SAMPLER = struct.Struct("<qH")
+
+_COLORS = list(CardColors)
+
+class SnapshotError(Exception): pass
+
+
+def encode_game(game: UnoGame, sampler: HiddenHandSampler | None = None) -> bytes:
+    """
+    Encodes the game (and optionally a sampler of hidden hands) as a compact snapshot.
+    Status messages, Discord info, undo history, and other samplers are not included
+
+    Args:
+        game (UnoGame): The game to encode
+        sampler (HiddenHandSampler | None): A sampler to include, so the observer's knowledge of other hands is kept
+
+    Returns:
+        bytes: The snapshot
+    """
+    rules_key = game.ruleset.to_key()
+    parts = [_HEADER.pack(SNAPSHOT_VERSION, rules_key.flags, rules_key.starting_hand_size, rules_key.number_of_decks,
+        game.turn_index, game.current_stack, game.reversed, game.state.value, game.deck.top_card.card_id,
+        len(game.players), len(game.deck.draw_pile), len(game.deck.discard_pile))]
+
+    for player in game.players:
+        parts.append(_PLAYER.pack(player.player_id, len(player.hand)))
+        parts.append(bytes(card.card_id for card in player.hand))
+
+    parts.append(bytes(card.card_id for card in game.deck.draw_pile))
+    parts.append(bytes(card.card_id for card in game.deck.discard_pile))
+
+    if sampler is None:
+        parts.append(b"\x00")
+    else:
+        parts.append(b"\x01")
+        parts.append(_SAMPLER.pack(sampler.observer_id, len(sampler.known_cards)))
+        for player_id, card_ids in sampler.known_cards.items():
+            parts.append(_PLAYER.pack(player_id, len(card_ids)))
+            parts.append(bytes(card_ids))
+
+    return b"".join(parts)
+
+
+def decode_game(data: bytes) -> tuple[UnoGame, HiddenHandSampler | None]:
+    """
+    Rebuilds a game (and the sampler, if one was included) from a snapshot made by `encode_game`
+
+    Args:
+        data (bytes): The snapshot
+
+    Raises:
+        SnapshotError: If the snapshot is from a different version or is cut off
+
+    Returns:
+        tuple[UnoGame, HiddenHandSampler | None]: The game, and the sampler or None
+    """
+    try:
+        (version, flags, starting_hand_size, number_of_decks, turn_index, current_stack, is_reversed, state_value, top_card_id,
+            player_count, draw_count, discard_count) = _HEADER.unpack_from(data, 0)
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Snapshot version {version} is not supported")
+        position = _HEADER.size
+
+        game = UnoGame(RulesKey(flags, starting_hand_size, number_of_decks).to_rules(), record=False)
+
+        for _ in range(player_count):
+            player_id, hand_size = _PLAYER.unpack_from(data, position)
+            position += _PLAYER.size
+            player = Player(player_id)
+            player.hand = _read_cards(data, position, hand_size)
+            position += hand_size
+            game.players.append(player)
+
+        game.deck.draw_pile = _read_cards(data, position, draw_count)
+        position += draw_count
+        game.deck.discard_pile = _read_cards(data, position, discard_count)
+        position += discard_count
+        game.deck.top_card = CARDS_BY_ID[top_card_id]
+
+        game.turn_index = turn_index
+        game.current_stack = current_stack
+        game.reversed = is_reversed
+        game.state = UnoStates(state_value)
+        game.rebuild_card_index()
+        game.rehash()
+
+        sampler = None
+        if data[position] == 1:
+            observer_id, known_count = _SAMPLER.unpack_from(data, position + 1)
+            position += 1 + _SAMPLER.size
+            # The unseen cards are everything hidden from the observer that isn't known
+            sampler = HiddenHandSampler.from_game(game, observer_id)
+            for _ in range(known_count):
+                player_id, card_count = _PLAYER.unpack_from(data, position)
+                position += _PLAYER.size
+                sampler.add_known_cards(player_id, list(data[position:position + card_count]))
+                position += card_count
+
+    except (struct.error, IndexError, ValueError) as error:
+        raise SnapshotError(str(error)) from error
+
+    return game, sampler
+
+
+def encode_move(move: UnoMove) -> tuple[int, int, int, int, int, bool]:
+    """
+    Encodes a move as a small tuple of ints
+
+    Args:
+        move (UnoMove): The move
+
+    Returns:
+        tuple[int, int, int, int, int, bool]: move type, player_id, card_id (-1 for none), color index (-1 for none), target_index, rotate
+    """
+    return (move.move_type.value, move.player_id, move.card.card_id if move.card is not None else -1,
+        _COLORS.index(move.color) if move.color is not None else -1, move.target_index, move.rotate)
+
+
+def decode_move(encoded_move: tuple[int, int, int, int, int, bool]) -> UnoMove:
+    """
+    Rebuilds a move encoded by `encode_move`
+
+    Args:
+        encoded_move (tuple[int, int, int, int, int, bool]): The encoded move
+
+    Returns:
+        UnoMove: The move
+    """
+    move_type, player_id, card_id, color_index, target_index, rotate = encoded_move
+    return UnoMove(MoveTypes(move_type), player_id, card=CARDS_BY_ID[card_id] if card_id >= 0 else None,
+        color=_COLORS[color_index] if color_index >= 0 else None, target_index=target_index, rotate=rotate)
+
+
+def _read_cards(data: bytes, position: int, count: int) -> list[Card]:
+    """
+    Reads `count` card_ids starting at `position`
+
+    Raises:
+        SnapshotError: If the snapshot ends before all the cards
+    """
+    if position + count > len(data):
+        raise SnapshotError("Snapshot is cut off")
+    return [CARDS_BY_ID[card_id] for card_id in data[position:position + count]]
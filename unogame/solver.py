@@ -0,0 +1,379 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+from typing import Iterator
+
+from unogame.determinize import HiddenHandSampler
+from unogame.game import UnoGame, UnoStates
+from unogame.ismcts import SearchSettings, make_search_move, rank_moves, score_game
+from unogame.move import UnoMove, MoveTypes
+
+from collections import OrderedDict # type: ignore (pylance shadow stdlib issues)
+from dataclasses import dataclass # type: ignore (pylance shadow stdlib issues)
+from math import comb # type: ignore (pylance shadow stdlib issues)
+import random # type: ignore (pylance shadow stdlib issues)
+import time # type: ignore (pylance shadow stdlib issues)
+
+# Games with at most this many cards across all hands are solved by searching to the end instead of sampling
+ENDGAME_CARD_LIMIT = 8
+# The most deals of the unseen cards the endgame solver will go through. If there are more possible deals, it samples this many
+MAX_ENDGAME_DEALS = 24
+MAX_ENDGAME_DEPTH = 16
+# Single card draws with at most this many different cards to draw go through every card, other draws are sampled
+MAX_DRAW_OUTCOMES = 6
+# How many times draws that can't be listed out are sampled
+SAMPLED_DRAWS = 2
+# Scores at least this high are wins every time (averaging can leave them a little under 1)
+_CERTAIN_WIN = 1 - 1e-9
+
+@dataclass
+class Hint:
+    move: UnoMove
+    # Roughly the chance of winning after making the move, from 0 to 1
+    score: float
+    # True if the score came from solving every possible deal to the end of the game
+    exact: bool
+    # Every move looked at and its score, best first
+    ranked_moves: list[tuple[UnoMove, float]]
+
+
+class HintCache:
+
+    def __init__(self, max_size: int = 1024) -> None:
+        """
+        Remembers hints by (state hash, player id), so asking again in the same position doesn't search again.
+        The least recently used hints are forgotten once there are more than max_size
+
+        Args:
+            max_size (int): The most hints to remember
+        """
+        self.max_size = max_size
+        self._hints: OrderedDict[tuple[int, int], Hint] = OrderedDict()
+
+    def get(self, state_hash: int, player_id: int) -> Hint | None:
+        """
+        Returns the remembered hint for the player in this state, if there is one
+
+        Args:
+            state_hash (int): The state hash (see `UnoGame.get_state_hash`)
+            player_id (int): The id of the player who asked
+
+        Returns:
+            Hint | None: The hint, or None if there isn't one
+        """
+        key = (state_hash, player_id)
+        hint = self._hints.get(key)
+        if hint is not None:
+            self._hints.move_to_end(key)
+        return hint
+
+    def put(self, state_hash: int, player_id: int, hint: Hint) -> None:
+        """
+        Remembers a hint for the player in this state
+
+        Args:
+            state_hash (int): The state hash (see `UnoGame.get_state_hash`)
+            player_id (int): The id of the player who asked
+            hint (Hint): The hint
+        """
+        self._hints[(state_hash, player_id)] = hint
+        self._hints.move_to_end((state_hash, player_id))
+        while len(self._hints) > self.max_size:
+            self._hints.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._hints)
+
+
+class _OutOfTime(Exception): pass
+class _TooManyDeals(Exception): pass
+
+
+def solve_hint(game: UnoGame, player_id: int, time_limit: float = 0.5, rng: random.Random | None = None,
+        sampler: HiddenHandSampler | None = None) -> Hint | None:
+    """
+    Works out the best move for the player. Endgames (see ENDGAME_CARD_LIMIT) are solved by searching every possible deal
+    of the unseen cards to the end of the game, and everything else uses ISMCTS (see `ismcts.rank_moves`).
+    Never takes much longer than time_limit, and the game is not changed
+
+    Args:
+        game (UnoGame): The game
+        player_id (int): The id of the player to give a hint to
+        time_limit (float): How long to think for at most, in seconds
+        rng (random.Random | None): The random number generator to use. Defaults to a new one
+        sampler (HiddenHandSampler | None): The player's sampler of hidden hands. Defaults to a new one
+
+    Raises:
+        ValueError: If the player isn't in the game
+
+    Returns:
+        Hint | None: The hint, or None if the player has no legal moves
+    """
+    rng = rng if rng is not None else random.Random()
+    sampler = sampler if sampler is not None else HiddenHandSampler.from_game(game, player_id)
+    deadline = time.perf_counter() + time_limit
+
+    moves = game.get_legal_moves(game.get_player(player_id))
+    if len(moves) == 0:
+        return None
+
+    if sum(len(player.hand) for player in game.players) <= ENDGAME_CARD_LIMIT:
+        hint = _solve_endgame(game, player_id, moves, sampler, deadline, rng)
+        if hint is not None:
+            return hint
+
+    ranked_moves = rank_moves(game, player_id, SearchSettings(time_limit=max(deadline - time.perf_counter(), 0)), rng, sampler)
+    if len(ranked_moves) == 0:
+        return Hint(moves[0], 0.0, False, [(moves[0], 0.0)])
+    return Hint(ranked_moves[0][0], ranked_moves[0][1], False, ranked_moves)
+
+
+def _solve_endgame(game: UnoGame, player_id: int, moves: list[UnoMove], sampler: HiddenHandSampler, deadline: float,
+        rng: random.Random) -> Hint | None:
+    """
+    Scores every move by searching each deal of the unseen cards, deeper and deeper until the deadline,
+    until every line reaches the end of the game, or until a certain win is found
+
+    Args:
+        game (UnoGame): The game
+        player_id (int): The id of the player getting the hint
+        moves (list[UnoMove]): Their legal moves
+        sampler (HiddenHandSampler): Their sampler of hidden hands
+        deadline (float): The time.perf_counter() to stop by
+        rng (random.Random): The random number generator to use
+
+    Returns:
+        Hint | None: The hint, or None if there wasn't even time for a one move search
+    """
+    try:
+        deals = [(weight, sampler.determinize(game, rng, deal)) for weight, deal in _list_deals(game, sampler, MAX_ENDGAME_DEALS)]
+        all_deals_listed = True
+        # Listed deals have the draw pile in card_id order, which would make sampled multi card draws lopsided
+        for _, deal_game in deals:
+            rng.shuffle(deal_game.deck.draw_pile)
+    except _TooManyDeals:
+        deals = [(1, sampler.determinize(game, rng)) for _ in range(MAX_ENDGAME_DEALS)]
+        all_deals_listed = False
+
+    # state hash -> (depth searched, values, exact), shared between depths and deals
+    table: dict[int, tuple[int, dict[int, float], bool]] = {}
+    ranked_moves: list[tuple[UnoMove, float]] | None = None
+    exact = False
+
+    for depth in range(1, MAX_ENDGAME_DEPTH + 1):
+        try:
+            scores, exact_scores = _score_root_moves(deals, player_id, moves, depth, deadline, table, rng)
+        except _OutOfTime:
+            break
+
+        best_index = max(range(len(moves)), key=lambda i: scores[i])
+        ranked_moves = sorted(zip(moves, scores), key=lambda move_score: move_score[1], reverse=True)
+        # The best move is certain if every line already reaches the end of the game, or if it always wins.
+        # Either way searching deeper can't change anything
+        depth_exact = exact_scores[best_index] and (all(exact_scores) or scores[best_index] >= _CERTAIN_WIN)
+        exact = depth_exact and all_deals_listed
+        if depth_exact:
+            break
+
+    if ranked_moves is None:
+        return None
+    return Hint(ranked_moves[0][0], ranked_moves[0][1], exact, ranked_moves)
+
+
+def _list_deals(game: UnoGame, sampler: HiddenHandSampler, limit: int) -> list[tuple[int, list[int]]]:
+    """
+    Lists every different way the unseen cards could be split between the other players' hands,
+    with how many ways each split can happen (so splits can be weighted by how likely they are)
+
+    Args:
+        game (UnoGame): The game
+        sampler (HiddenHandSampler): The observer's sampler
+        limit (int): The most deals to list
+
+    Raises:
+        _TooManyDeals: If there are more than limit deals
+        ValueError: If the sampler is out of date with the game
+
+    Returns:
+        list[tuple[int, list[int]]]: Each deal's weight, and the deal in the layout `HiddenHandSampler.sample_batch` uses
+    """
+    unknown_hand_sizes = [len(player.hand) - len(sampler.known_cards.get(player.player_id, ()))
+        for player in game.players if player.player_id != sampler.observer_id]
+    if sum(unknown_hand_sizes) + len(game.deck.draw_pile) != sampler.unseen_total:
+        raise ValueError("Sampler is out of date with the game, call rebuild")
+
+    deals: list[tuple[int, list[int]]] = []
+
+    def deal_hands(hand_index: int, counts: list[int], weight: int, dealt: list[int]) -> None:
+        if hand_index == len(unknown_hand_sizes):
+            draw_pile = [card_id for card_id, count in enumerate(counts) for _ in range(count)]
+            deals.append((weight, dealt + draw_pile))
+            if len(deals) > limit:
+                raise _TooManyDeals
+            return
+
+        for hand, hand_weight in _list_hands(counts, unknown_hand_sizes[hand_index]):
+            for card_id in hand:
+                counts[card_id] -= 1
+            deal_hands(hand_index + 1, counts, weight * hand_weight, dealt + hand)
+            for card_id in hand:
+                counts[card_id] += 1
+
+    deal_hands(0, sampler.unseen_counts.copy(), 1, [])
+    return deals
+
+
+def _list_hands(counts: list[int], hand_size: int, start: int = 0) -> Iterator[tuple[list[int], int]]:
+    """
+    Lists every different hand of hand_size cards that can be made from the card counts, and how many ways it can be picked
+
+    Args:
+        counts (list[int]): card_id -> number of copies available
+        hand_size (int): The size of the hand
+        start (int): Only use card_ids from here on (used when recursing)
+
+    Yields:
+        tuple[list[int], int]: The card_ids in the hand, and the number of ways to pick it
+    """
+    if hand_size == 0:
+        yield [], 1
+        return
+
+    for card_id in range(start, len(counts)):
+        count = counts[card_id]
+        for copies in range(1, min(count, hand_size) + 1):
+            for rest, rest_weight in _list_hands(counts, hand_size - copies, card_id + 1):
+                yield [card_id] * copies + rest, comb(count, copies) * rest_weight
+
+
+def _score_root_moves(deals: list[tuple[int, UnoGame]], player_id: int, moves: list[UnoMove], depth: int, deadline: float,
+        table: dict[int, tuple[int, dict[int, float], bool]], rng: random.Random) -> tuple[list[float], list[bool]]:
+    """
+    Scores each of the player's moves, averaged over every deal
+
+    Returns:
+        tuple[list[float], list[bool]]: The score of each move, and if each score is exact
+    """
+    total_weight = sum(weight for weight, _ in deals)
+    scores = [0.0] * len(moves)
+    exact_scores = [True] * len(moves)
+
+    for weight, deal_game in deals:
+        for i, move in enumerate(moves):
+            values, move_exact = _score_move(deal_game, move, depth, deadline, table, rng)
+            scores[i] += weight * values.get(player_id, 0.0) / total_weight
+            exact_scores[i] = exact_scores[i] and move_exact
+
+    return scores, exact_scores
+
+
+def _score_move(game: UnoGame, move: UnoMove, depth: int, deadline: float,
+        table: dict[int, tuple[int, dict[int, float], bool]], rng: random.Random) -> tuple[dict[int, float], bool]:
+    """
+    Scores a move for every player, averaging over the cards that could be drawn
+
+    Returns:
+        tuple[dict[int, float], bool]: The value for each player id, and if it is exact
+    """
+    outcomes, exact = _get_outcomes(game, move, rng)
+
+    values: dict[int, float] = {}
+    for probability, child, finished in outcomes:
+        if finished:
+            child_values = score_game(child)
+            # A move that failed doesn't end the game for real
+            child_exact = any(len(player.hand) == 0 for player in child.players)
+        else:
+            child_values, child_exact = _search(child, depth - 1, deadline, table, rng)
+
+        for child_player_id, value in child_values.items():
+            values[child_player_id] = values.get(child_player_id, 0.0) + probability * value
+        exact = exact and child_exact
+
+    return values, exact
+
+
+def _search(game: UnoGame, depth: int, deadline: float, table: dict[int, tuple[int, dict[int, float], bool]],
+        rng: random.Random) -> tuple[dict[int, float], bool]:
+    """
+    Max^n search: the player whose turn it is picks the move that is best for them.
+    Other players' jump-ins are left out to keep the tree small
+
+    Raises:
+        _OutOfTime: If the deadline passes
+
+    Returns:
+        tuple[dict[int, float], bool]: The value for each player id, and if it is exact
+    """
+    if time.perf_counter() > deadline:
+        raise _OutOfTime
+
+    state_hash = game.get_state_hash()
+    entry = table.get(state_hash)
+    if entry is not None and (entry[2] or entry[0] >= depth):
+        return entry[1], entry[2]
+
+    if depth <= 0:
+        return score_game(game), False
+
+    player = game.players[game.turn_index]
+    moves = game.get_legal_moves(player)
+    # A stuck game can't be solved
+    if len(moves) == 0:
+        return score_game(game), False
+
+    best_values: dict[int, float] | None = None
+    best_exact = False
+    all_exact = True
+    for move in moves:
+        values, move_exact = _score_move(game, move, depth, deadline, table, rng)
+        all_exact = all_exact and move_exact
+        if best_values is None or values.get(player.player_id, 0.0) > best_values.get(player.player_id, 0.0):
+            best_values = values
+            best_exact = move_exact
+        # A certain win can't be beaten, so the other moves don't need to be looked at
+        if best_exact and best_values.get(player.player_id, 0.0) >= _CERTAIN_WIN:
+            break
+
+    assert best_values is not None
+    exact = best_exact and (all_exact or best_values.get(player.player_id, 0.0) >= _CERTAIN_WIN)
+    table[state_hash] = (depth, best_values, exact)
+    return best_values, exact
+
+
+def _get_outcomes(game: UnoGame, move: UnoMove, rng: random.Random) -> tuple[list[tuple[float, UnoGame, bool]], bool]:
+    """
+    Makes the move on copies of the game. Single card draws from a small draw pile get one copy for each different card
+    that could be drawn, and other draws are sampled
+
+    Returns:
+        tuple[list[tuple[float, UnoGame, bool]], bool]: The probability, game, and whether the game is over for each outcome,
+            and if the outcomes are exact (False if draws had to be sampled)
+    """
+    if move.move_type != MoveTypes.DRAW or len(game.deck.draw_pile) == 0:
+        child = game.clone()
+        return [(1.0, child, make_search_move(child, move))], True
+
+    card_counts: dict[int, int] = {}
+    for card in game.deck.draw_pile:
+        card_counts[card.card_id] = card_counts.get(card.card_id, 0) + 1
+
+    # A normal draw takes one card, unless draw_until_can_play is on
+    if game.state == UnoStates.WAITING_FOR_PLAY and not game.ruleset.draw_until_can_play and len(card_counts) <= MAX_DRAW_OUTCOMES:
+        outcomes = []
+        for card_id, count in card_counts.items():
+            child = game.clone()
+            rest_of_pile = child.deck.draw_pile
+            drawn_card = next(card for card in rest_of_pile if card.card_id == card_id)
+            rest_of_pile.remove(drawn_card)
+
+            # With only one card to draw, the deck has to draw that card
+            child.deck.draw_pile = [drawn_card]
+            finished = make_search_move(child, move)
+            child.deck.draw_pile = rest_of_pile
+            outcomes.append((count / len(game.deck.draw_pile), child, finished))
+        return outcomes, True
+
+    outcomes = []
+    for _ in range(SAMPLED_DRAWS):
+        child = game.clone()
+        outcomes.append((1 / SAMPLED_DRAWS, child, make_search_move(child, move)))
+    return outcomes, False
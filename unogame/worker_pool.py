@@ -0,0 +1,219 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+from typing import Any, Callable, Hashable
+
+from unogame.determinize import HiddenHandSampler
+from unogame.game import UnoGame
+from unogame.ismcts import SearchSettings, choose_move
+from unogame.move import UnoMove
+from unogame.snapshot import encode_game, decode_game, encode_move, decode_move
+from unogame.solver import Hint, solve_hint
+
+from concurrent.futures import Future, ProcessPoolExecutor # type: ignore (pylance shadow stdlib issues)
+from dataclasses import replace # type: ignore (pylance shadow stdlib issues)
+import asyncio # type: ignore (pylance shadow stdlib issues)
+import time # type: ignore (pylance shadow stdlib issues)
+
+# Searches stop this long before their deadline, to leave time to send the result back
+RESULT_MARGIN = 0.05
+
+class PoolBusyError(Exception): pass
+
+class AIWorkerPool:
+
+    def __init__(self, max_workers: int = 1, max_queue_depth: int = 8) -> None:
+        """
+        Runs searches in worker processes, so they never block the asyncio event loop.
+        Games are sent to the workers as compact snapshots (see snapshot.py), and every request has a deadline.
+        Each request has a key (a channel id for example), and a new request for the same key cancels the old one,
+        since the game it was for has moved on. The worker processes are only started when the first request is made
+
+        Args:
+            max_workers (int): How many worker processes to run
+            max_queue_depth (int): How many requests can be queued or running at once before new ones are refused
+        """
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+
+        self._executor: ProcessPoolExecutor | None = None
+        # key -> the latest request for that key
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        # Jobs sent to the workers that haven't finished. Cancelling a request can't stop a job that's already running,
+        # so jobs are counted until they actually finish
+        self._in_flight: set[Future] = set()
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        How many jobs are queued or running in the workers, including ones whose requests were cancelled after they started
+        """
+        return len(self._in_flight)
+
+    async def choose_move(self, key: Hashable, game: UnoGame, player_id: int, settings: SearchSettings, deadline: float,
+            sampler: HiddenHandSampler | None = None) -> UnoMove | None:
+        """
+        Searches for a move for the given player in a worker process (see `ismcts.choose_move`).
+        The search is cut short to finish by the deadline, and gives up if the request waited in the queue past it
+
+        Args:
+            key (Hashable): What the request is for. A new request with the same key cancels this one
+            game (UnoGame): The game to search. It is copied when the request is made, so it can keep changing
+            player_id (int): The id of the player to pick a move for
+            settings (SearchSettings): The search settings
+            deadline (float): How many seconds from now the result is needed by
+            sampler (HiddenHandSampler | None): The player's sampler of hidden hands
+
+        Raises:
+            PoolBusyError: If too many requests are already queued
+
+        Returns:
+            UnoMove | None: The move, or None if the player had no moves, the deadline passed, or the request was cancelled
+        """
+        encoded_move = await self._run_job(key, deadline, _run_search_job, encode_game(game, sampler), player_id, settings)
+        return decode_move(encoded_move) if encoded_move is not None else None
+
+    async def get_hint(self, key: Hashable, game: UnoGame, player_id: int, time_limit: float, deadline: float,
+            sampler: HiddenHandSampler | None = None) -> Hint | None:
+        """
+        Works out a hint for the given player in a worker process (see `solver.solve_hint`).
+        Requests work the same way as `choose_move`
+
+        Args:
+            key (Hashable): What the request is for. A new request with the same key cancels this one
+            game (UnoGame): The game. It is copied when the request is made, so it can keep changing
+            player_id (int): The id of the player to give a hint to
+            time_limit (float): How long the solver can think for at most, in seconds
+            deadline (float): How many seconds from now the result is needed by
+            sampler (HiddenHandSampler | None): The player's sampler of hidden hands
+
+        Raises:
+            PoolBusyError: If too many requests are already queued
+
+        Returns:
+            Hint | None: The hint, or None if the player had no moves, the deadline passed, or the request was cancelled
+        """
+        result = await self._run_job(key, deadline, _run_hint_job, encode_game(game, sampler), player_id, time_limit)
+        if result is None:
+            return None
+
+        encoded_ranked_moves, exact = result
+        ranked_moves = [(decode_move(encoded_move), score) for encoded_move, score in encoded_ranked_moves]
+        return Hint(ranked_moves[0][0], ranked_moves[0][1], exact, ranked_moves)
+
+    async def _run_job(self, key: Hashable, deadline: float, job: Callable[..., Any], snapshot: bytes, *args: Any) -> Any:
+        """
+        Runs job(snapshot, *args, expires_at) in a worker process, and waits for it until the deadline
+
+        Raises:
+            PoolBusyError: If too many requests are already queued
+
+        Returns:
+            Any: What the job returned, or None if the deadline passed or the request was cancelled
+        """
+        if self.queue_depth >= self.max_queue_depth:
+            raise PoolBusyError(f"{self.queue_depth} requests already queued")
+
+        self.cancel(key)
+
+        # time.time, since monotonic clocks aren't shared between processes
+        expires_at = time.time() + deadline
+
+        job_future = self._get_executor().submit(job, snapshot, *args, expires_at)
+        self._in_flight.add(job_future)
+        # Runs on the executor's thread, but discarding from a set is atomic
+        job_future.add_done_callback(self._in_flight.discard)
+        # Cancelling this stops the job if it hasn't started, and either way stops waiting for it
+        future = asyncio.wrap_future(job_future)
+        self._pending[key] = future
+
+        try:
+            done, _ = await asyncio.wait({future}, timeout=deadline)
+        finally:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+        if future not in done:
+            future.cancel()
+            return None
+        if future.cancelled():
+            return None
+
+        return future.result()
+
+    def cancel(self, key: Hashable) -> None:
+        """
+        Cancels the current request for the key, if there is one.
+        Requests that haven't started yet never run, and the result of a running request is thrown away
+
+        Args:
+            key (Hashable): The key of the request
+        """
+        future = self._pending.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def shutdown(self) -> None:
+        """
+        Cancels every request and stops the worker processes
+        """
+        for future in list(self._pending.values()):
+            future.cancel()
+        self._pending = {}
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+
+def _run_search_job(snapshot: bytes, player_id: int, settings: SearchSettings, expires_at: float) -> tuple | None:
+    """
+    Runs in a worker process. Decodes the game and searches until the settings or the deadline say to stop
+
+    Args:
+        snapshot (bytes): The game from `encode_game`
+        player_id (int): The id of the player to pick a move for
+        settings (SearchSettings): The search settings
+        expires_at (float): The time.time() the result is needed by
+
+    Returns:
+        tuple | None: The move from `encode_move`, or None if there's no move or no time left
+    """
+    time_left = expires_at - time.time() - RESULT_MARGIN
+    if time_left <= 0:
+        return None
+
+    game, sampler = decode_game(snapshot)
+    time_limit = time_left if settings.time_limit is None else min(settings.time_limit, time_left)
+    move = choose_move(game, player_id, replace(settings, time_limit=time_limit), sampler=sampler)
+
+    return encode_move(move) if move is not None else None
+
+
+def _run_hint_job(snapshot: bytes, player_id: int, time_limit: float, expires_at: float) -> tuple | None:
+    """
+    Runs in a worker process. Decodes the game and works out a hint, stopping in time for the deadline
+
+    Args:
+        snapshot (bytes): The game from `encode_game`
+        player_id (int): The id of the player to give a hint to
+        time_limit (float): How long to think for at most, in seconds
+        expires_at (float): The time.time() the result is needed by
+
+    Returns:
+        tuple | None: The ranked moves (as `encode_move` tuples with their scores) and whether the hint is exact,
+            or None if there's no move or no time left
+    """
+    time_left = expires_at - time.time() - RESULT_MARGIN
+    if time_left <= 0:
+        return None
+
+    game, sampler = decode_game(snapshot)
+    hint = solve_hint(game, player_id, min(time_limit, time_left), sampler=sampler)
+    if hint is None:
+        return None
+
+    return [(encode_move(move), score) for move, score in hint.ranked_moves], hint.exact
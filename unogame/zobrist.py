@@ -0,0 +1,90 @@
+from __future__ import annotations # type: ignore (pylance shadow stdlib issues)
+from typing import TYPE_CHECKING
+
+from unogame.card import Card, CARD_IDS
+
+if TYPE_CHECKING:
+    from unogame.game import UnoStates
+
+# Zobrist style hashing for game states. Every part of the state gets a fixed random 64 bit key,
+# and the keys are combined so that changing one part of the state only needs that part's key to be swapped out.
+# All keys are generated with splitmix64 from fixed salts, so hashes are the same in every process and every run
+
+MASK_64 = (1 << 64) - 1
+
+def splitmix64(value: int) -> int:
+    """
+    Scrambles a 64 bit integer into a well mixed 64 bit integer (the splitmix64 finalizer)
+
+    Args:
+        value (int): The value to scramble
+
+    Returns:
+        int: The scrambled value
+    """
+    value = (value + 0x9E3779B97F4A7C15) & MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+_CARD_SALT = 0x1000
+_TOP_CARD_SALT = 0x2000
+_STATE_SALT = 0x3000
+_TURN_SALT = 0x4000_0000
+_STACK_SALT = 0x5000_0000
+_PLAYER_SALT = 0x6000_0000_0000_0000
+_DIRECTION_SALT = 0x7000
+
+# Keys for a card being in a hand, and for a card being on top of the deck, indexed by card_id
+CARD_KEYS: list[int] = [splitmix64(_CARD_SALT + card_id) for card_id in range(len(CARD_IDS))]
+TOP_CARD_KEYS: list[int] = [splitmix64(_TOP_CARD_SALT + card_id) for card_id in range(len(CARD_IDS))]
+DIRECTION_KEY = splitmix64(_DIRECTION_SALT)
+
+# Turn indexes and stacks are nearly always small, so the common keys are worked out ahead of time
+_PRECOMPUTED_KEY_COUNT = 256
+_TURN_KEYS: list[int] = [splitmix64(_TURN_SALT + index) for index in range(_PRECOMPUTED_KEY_COUNT)]
+_STACK_KEYS: list[int] = [splitmix64(_STACK_SALT + stack) for stack in range(_PRECOMPUTED_KEY_COUNT)]
+_STATE_KEYS: list[int] = [splitmix64(_STATE_SALT + value) for value in range(16)]
+
+
+def hash_hand(hand: list[Card]) -> int:
+    """
+    Hashes a hand from scratch. Hands are hashed as multisets by adding up card keys,
+    so the order of the cards doesn't matter and a card can be added or removed by adding or subtracting its key
+
+    Args:
+        hand (list[Card]): The hand to hash
+
+    Returns:
+        int: The hand hash
+    """
+    hand_hash = 0
+    for card in hand:
+        hand_hash += CARD_KEYS[card.card_id]
+    return hand_hash & MASK_64
+
+def player_hand_key(player_id: int, hand_hash: int) -> int:
+    """
+    Combines a hand hash with the id of the player holding it, so equal hands held by different players hash differently
+
+    Args:
+        player_id (int): The id of the player holding the hand
+        hand_hash (int): The hash of the hand (see `hash_hand`)
+
+    Returns:
+        int: The key for this player holding this hand
+    """
+    return splitmix64(hand_hash ^ splitmix64(_PLAYER_SALT ^ (player_id & MASK_64)))
+
+def turn_key(turn_index: int) -> int:
+    if turn_index < _PRECOMPUTED_KEY_COUNT:
+        return _TURN_KEYS[turn_index]
+    return splitmix64(_TURN_SALT + turn_index)
+
+def stack_key(current_stack: int) -> int:
+    if current_stack < _PRECOMPUTED_KEY_COUNT:
+        return _STACK_KEYS[current_stack]
+    return splitmix64(_STACK_SALT + current_stack)
+
+def state_key(state: UnoStates) -> int:
+    return _STATE_KEYS[state.value]